@@ -53,6 +53,20 @@ def validate_iso(name, val):
     return val
 
 
+def parse_tag_filter():
+    """
+    Read tag filters from the query string: ?tag=a&tag=b or ?tags=a,b,
+    plus ?tag_mode=all (default) or any. Returns (tags, match_all).
+    """
+    tags = list(request.args.getlist('tag'))
+    for part in request.args.getlist('tags'):
+        tags.extend(t for t in part.split(',') if t.strip())
+    mode = request.args.get('tag_mode', 'all')
+    if mode not in ('all', 'any'):
+        error('"tag_mode" must be "all" or "any"', 400)
+    return tags, mode == 'all'
+
+
 def identify(payload, repo_by_uid, repo_by_id):
     if 'uid' in payload:
         uid = payload['uid']
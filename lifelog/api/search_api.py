@@ -0,0 +1,49 @@
+# lifelog/api/search_api.py
+
+import logging
+
+from flask import request, jsonify, Blueprint
+
+from lifelog.api.auth import require_device_token
+from lifelog.api.errors import debug_api, error
+from lifelog.utils.db import search_index
+
+search_bp = Blueprint('search', __name__, url_prefix='/search')
+logger = logging.getLogger(__name__)
+
+MAX_SEARCH_LIMIT = 100
+
+
+@search_bp.route('/', methods=['GET'])
+@require_device_token
+@debug_api
+def search():
+    """
+    GET /search?q=<text>[&kind=task,time,tracker][&limit=N]
+    Ranked hits with <mark>-highlighted snippets.
+    """
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        error('Missing query parameter "q"', 400)
+
+    kinds = None
+    kind_arg = request.args.get('kind')
+    if kind_arg:
+        kinds = [k.strip() for k in kind_arg.split(',') if k.strip()]
+        unknown = [k for k in kinds if k not in search_index.SEARCH_KINDS]
+        if unknown:
+            error(f'Unknown kind(s): {", ".join(unknown)}', 400)
+
+    try:
+        limit = int(request.args.get('limit', search_index.DEFAULT_LIMIT))
+    except ValueError:
+        error('"limit" must be an integer', 400)
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+    hits = search_index.search(q, kinds=kinds, limit=limit,
+                               highlight=('<mark>', '</mark>'))
+    return jsonify({
+        'query': q,
+        'fts': search_index.fts5_available(),
+        'results': hits,
+    }), 200
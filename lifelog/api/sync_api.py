@@ -1,14 +1,20 @@
-from flask import request, jsonify, Blueprint
+from flask import Response, request, jsonify, Blueprint, stream_with_context
 from datetime import datetime
 import logging
 
 from lifelog.api.task_api import _filter_and_validate_task_data
 from lifelog.api.auth import require_device_token
-from lifelog.utils.db import task_repository, time_repository, track_repository
+from lifelog.utils import metrics
+from lifelog.utils.db import get_connection, task_repository, time_repository, track_repository
+from lifelog.utils.db import change_log, snapshot
 
 sync_bp = Blueprint('sync', __name__, url_prefix='/sync')
 logger = logging.getLogger(__name__)
 
+SYNC_TABLES = ('tasks', 'time_history', 'trackers', 'goals')
+SYNC_OPERATIONS = ('create', 'update', 'delete')
+MAX_CHANGES_PAGE = 5000
+
 
 def error_response(message: str, code: int = 400):
     return jsonify({'error': message}), code
@@ -19,7 +25,7 @@ def parse_sync_request():
     if not isinstance(data, dict):
         return None, error_response('Invalid JSON payload')
     operation = data.get('operation')
-    if operation not in {'create', 'update', 'delete'}:
+    if operation not in SYNC_OPERATIONS:
         return None, error_response('Invalid operation')
     payload = data.get('data')
     if not isinstance(payload, dict):
@@ -34,6 +40,66 @@ def require_uid(payload):
     return uid, None
 
 
+def _current_device_id():
+    token = request.headers.get('X-Device-Token')
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT id FROM api_devices WHERE device_token = ?", (token,)).fetchone()
+    return row['id'] if row else None
+
+
+@sync_bp.route('/<table>/changes', methods=['GET'])
+@require_device_token
+def sync_changes(table: str):
+    """
+    Serve rows of `table` changed after `since_seq` from the change log.
+    Asking for `since_seq=N` acknowledges everything up to N for this device,
+    which lets compact_change_log truncate it.
+    """
+    if table not in SYNC_TABLES:
+        return error_response('Invalid table for sync')
+    since_seq = request.args.get('since_seq', 0, type=int)
+    limit = request.args.get(
+        'limit', change_log.DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_CHANGES_PAGE))
+    after_id = request.args.get('after_id', 0, type=int)
+    dump_seq = request.args.get('dump_seq', None, type=int)
+    try:
+        page = change_log.changed_rows_since(table, since_seq, limit, after_id, dump_seq)
+        device_id = _current_device_id()
+        if device_id is not None and since_seq > 0:
+            change_log.ack(f"device:{device_id}:{table}", since_seq)
+    except Exception:
+        logger.exception("Sync changes error for %s", table)
+        return error_response('Failed to read changes', 500)
+    metrics.SYNC_ROWS_SERVED.inc(len(page['rows']), table=table, kind='changed')
+    metrics.SYNC_ROWS_SERVED.inc(len(page['deleted']), table=table, kind='deleted')
+    return jsonify(page)
+
+
+@sync_bp.route('/snapshot', methods=['GET'])
+@require_device_token
+def sync_snapshot():
+    """
+    Stream a gzip-compressed, consistent SQLite snapshot for bootstrapping a
+    new device. The change-log mark it corresponds to is sent in the
+    X-Lifelog-Snapshot-Seq header.
+    """
+    try:
+        path, seq = snapshot.create_snapshot()
+    except Exception:
+        logger.exception("Snapshot creation failed")
+        return error_response('Failed to create snapshot', 500)
+
+    resp = Response(stream_with_context(snapshot.iter_compressed(path)),
+                    mimetype='application/octet-stream')
+    resp.headers[snapshot.SNAPSHOT_SEQ_HEADER] = str(seq)
+    resp.headers['Content-Disposition'] = 'attachment; filename=lifelog-snapshot.db.gz'
+    resp.cache_control.no_store = True
+    resp.call_on_close(lambda: path.unlink(missing_ok=True))
+    return resp
+
+
 @sync_bp.route('/<table>', methods=['POST'])
 @require_device_token
 def handle_sync(table: str):
@@ -42,17 +108,21 @@ def handle_sync(table: str):
         return err
     op = req['operation']
     data = req['payload']
+    # Metric labels only take known values, whatever the client sends.
+    op_label = op if op in SYNC_OPERATIONS else 'other'
 
-    if table == 'tasks':
-        return _sync_tasks(op, data)
-    elif table == 'time_history':
-        return _sync_time(op, data)
-    elif table == 'trackers':
-        return _sync_trackers(op, data)
-    elif table == 'goals':
-        return _sync_goals(op, data)
-    else:
+    handler = _SYNC_HANDLERS.get(table)
+    if handler is None:
         return error_response('Invalid table for sync')
+    try:
+        rv = handler(op, data)
+    except Exception:
+        metrics.SYNC_OPS.inc(table=table, operation=op_label, result='error')
+        raise
+    status = rv[1] if isinstance(rv, tuple) and len(rv) > 1 else getattr(rv, 'status_code', 200)
+    metrics.SYNC_OPS.inc(table=table, operation=op_label,
+                         result='ok' if int(status) < 400 else 'error')
+    return rv
 
 
 def _sync_tasks(operation: str, payload: dict):
@@ -103,7 +173,8 @@ def _sync_time(operation: str, payload: dict):
         if payload.get('start') is None:
             return error_response('Missing "start" for create')
         try:
-            time_repository.add_time_entry(payload)
+            # Entries recorded on another device are kept even if they overlap.
+            time_repository.add_time_entry(payload, reject_overlap=False)
         except ValueError as ve:
             return error_response(str(ve))
         except Exception:
@@ -212,3 +283,11 @@ def _sync_goals(operation: str, payload: dict):
         return jsonify(status='success')
 
     return error_response('Unsupported operation')
+
+
+_SYNC_HANDLERS = {
+    'tasks': _sync_tasks,
+    'time_history': _sync_time,
+    'trackers': _sync_trackers,
+    'goals': _sync_goals,
+}
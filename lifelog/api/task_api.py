@@ -2,9 +2,9 @@
 
 import logging
 from flask import request, jsonify, Blueprint
-from lifelog.api.errors import debug_api, parse_json, error, require_fields, validate_iso
+from lifelog.api.errors import debug_api, parse_json, parse_tag_filter, error, require_fields, validate_iso
 from lifelog.api.auth import require_device_token
-from lifelog.utils.db import task_repository
+from lifelog.utils.db import task_repository, task_time
 from lifelog.config.config_manager import is_host_server
 from lifelog.utils.db.models import Task, TaskStatus, get_task_fields
 
@@ -124,6 +124,34 @@ def _get_task_by_uid_or_404(uid: str):
     return tasks[0]
 
 
+@tasks_bp.route('/', methods=['GET'])
+@require_device_token
+@debug_api
+def list_tasks():
+    filters = {}
+    for key in ('title_contains', 'category', 'project', 'due_contains', 'status', 'sort'):
+        val = request.args.get(key)
+        if val:
+            filters[key] = val
+    importance = request.args.get('importance')
+    if importance is not None:
+        try:
+            filters['importance'] = int(importance)
+        except ValueError:
+            error('"importance" must be an integer', 400)
+    filters['show_completed'] = request.args.get('show_completed', '').lower() in ('1', 'true', 'yes')
+    filters['tags'], filters['match_all_tags'] = parse_tag_filter()
+
+    tasks = task_repository.query_tasks(**filters)
+    result = [t.to_dict() for t in tasks]
+    # Opt-in: sync pulls upsert these dicts and must not see extra keys.
+    if request.args.get('with_time', '').lower() in ('1', 'true', 'yes'):
+        times = task_time.get_task_times(t.id for t in tasks)
+        for item in result:
+            item['time_spent'] = times.get(item['id'])
+    return jsonify(result), 200
+
+
 @tasks_bp.route('/', methods=['POST'])
 @require_device_token
 @debug_api
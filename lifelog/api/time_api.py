@@ -4,9 +4,9 @@ from datetime import datetime
 import logging
 from flask import request, jsonify, Blueprint
 
-from lifelog.api.errors import debug_api, parse_json, error, validate_iso
+from lifelog.api.errors import debug_api, parse_json, parse_tag_filter, error, validate_iso
 from lifelog.api.auth import require_device_token
-from lifelog.utils.db import time_repository, task_repository
+from lifelog.utils.db import time_audit, time_repository, task_repository
 from lifelog.config.config_manager import is_host_server
 
 time_bp = Blueprint('time', __name__, url_prefix='/time')
@@ -32,9 +32,11 @@ def list_time_entries():
     since = request.args.get('since')
     if since:
         validate_iso('since', since)
+    tags, match_all = parse_tag_filter()
 
     try:
-        entries = time_repository.get_all_time_logs(since=since)
+        entries = time_repository.get_all_time_logs(
+            since=since, tags=tags, match_all_tags=match_all)
         return jsonify([e.to_dict() for e in entries]), 200
     except Exception:
         logger.exception("Failed to fetch time entries")
@@ -88,6 +90,8 @@ def create_time_entry():
     try:
         new_entry = time_repository.start_time_entry(repo_data)
         return jsonify(new_entry.to_dict()), 201
+    except time_audit.OverlapError as e:
+        error(str(e), 409)
     except Exception as e:
         logger.exception("Failed to create time entry")
         error('Failed to create entry', 500)
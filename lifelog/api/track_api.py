@@ -6,7 +6,7 @@ import logging
 from flask import request, jsonify, Blueprint
 
 from lifelog.api.auth import require_device_token
-from lifelog.api.errors import debug_api, parse_json, error, validate_iso
+from lifelog.api.errors import debug_api, parse_json, parse_tag_filter, error, validate_iso
 from lifelog.utils.db import track_repository
 from lifelog.config.config_manager import is_host_server
 
@@ -37,6 +37,7 @@ def list_trackers():
     category = request.args.get('category')
     if category:
         filters['category'] = category
+    filters['tags'], filters['match_all_tags'] = parse_tag_filter()
 
     trackers = track_repository.get_all_trackers(**filters)
 
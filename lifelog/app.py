@@ -1,13 +1,16 @@
 import os
 import logging
-from flask import Flask, jsonify
+import time
+from flask import Flask, Response, g, jsonify, request
 from lifelog.api.task_api import tasks_bp
 from lifelog.api.auth import auth_bp
 from lifelog.api.time_api import time_bp
 from lifelog.api.track_api import trackers_bp
 from lifelog.api.sync_api import sync_bp
+from lifelog.api.search_api import search_bp
 from lifelog.api.errors import register_error_handlers
 from lifelog.config.config_manager import get_deployment_mode
+from lifelog.utils import metrics
 from lifelog.utils.db import initialize_schema
 
 app = Flask(__name__)
@@ -36,10 +39,45 @@ app.register_blueprint(tasks_bp)
 app.register_blueprint(time_bp)
 app.register_blueprint(trackers_bp)
 app.register_blueprint(sync_bp)
+app.register_blueprint(search_bp)
 
 register_error_handlers(app)
 
 
+@app.before_request
+def start_request_metrics():
+    g.metrics_t0 = time.perf_counter()
+    metrics.HTTP_IN_FLIGHT.inc()
+
+
+# Metric labels only take known methods, whatever the client sends.
+HTTP_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS")
+
+
+def _finish_request_metrics(status: int) -> None:
+    t0 = g.pop("metrics_t0", None)
+    if t0 is None:
+        return
+    metrics.HTTP_IN_FLIGHT.dec()
+    # The rule template, not the path, so /tasks/<id> stays one series.
+    route = request.url_rule.rule if request.url_rule else "<unmatched>"
+    method = request.method if request.method in HTTP_METHODS else "other"
+    metrics.HTTP_LATENCY.observe(time.perf_counter() - t0, method=method, route=route)
+    metrics.HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+
+
+@app.after_request
+def record_request_metrics(response):
+    _finish_request_metrics(response.status_code)
+    return response
+
+
+@app.teardown_request
+def record_failed_request_metrics(exc):
+    # after_request is skipped when a request dies with an unhandled error.
+    _finish_request_metrics(500)
+
+
 @app.before_request
 def optimize_request():
     """Pi-specific request optimizations"""
@@ -54,7 +92,7 @@ def optimize_request():
 def optimize_response(response):
     """Pi-specific response optimizations"""
     # Add efficient caching headers for Pi
-    if not response.cache_control.max_age:
+    if not response.cache_control.max_age and not response.cache_control.no_store:
         response.cache_control.max_age = 300  # 5 minute default cache
 
     # Compress response for slower Pi network
@@ -76,6 +114,14 @@ def api_status():
     return "OK", 200
 
 
+@app.route("/api/metrics")
+def api_metrics():
+    """Prometheus text exposition of the in-process metrics."""
+    response = Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+    response.cache_control.no_store = True
+    return response
+
+
 if __name__ == '__main__':
     # Production server settings for resource-constrained devices
     is_debug = os.environ.get(
@@ -169,6 +169,7 @@ def api_pair_new():
                         "[red]Failed to save device token to config.[/red]")
                     raise typer.Exit(1)
                 console.print("[green]✓ Device paired successfully![/green]")
+                _initial_snapshot_sync()
             else:
                 console.print("[red]Pairing failed—no token received.[/red]")
                 raise typer.Exit(1)
@@ -186,6 +187,24 @@ def api_pair_new():
         raise typer.Exit(1)
 
 
+def _initial_snapshot_sync():
+    """Fill a freshly paired client from a host snapshot instead of row-by-row pulls."""
+    from lifelog.utils.db.snapshot import bootstrap_from_host, needs_bootstrap
+    try:
+        if not needs_bootstrap():
+            return
+        console.print("[cyan]Downloading initial snapshot from host…[/cyan]")
+        seq = bootstrap_from_host()
+    except Exception as e:
+        logger.warning(f"Initial snapshot sync failed: {e}", exc_info=True)
+        seq = None
+    if seq is None:
+        console.print(
+            "[yellow]Snapshot unavailable; data will sync incrementally instead.[/yellow]")
+    else:
+        console.print("[green]✓ Local database initialized from host.[/green]")
+
+
 @app.command("get-server-url")
 def get_server_url():
     """
@@ -198,6 +217,25 @@ def get_server_url():
     console.print(f"[cyan]Server URL:[/cyan] {server_url}")
 
 
+@app.command("compact-changes")
+def compact_changes(
+    max_age_days: int = typer.Option(
+        30, help="Also drop unacknowledged entries older than this many days")
+):
+    """
+    Truncate change-log entries that every paired device has acknowledged.
+    """
+    log_utils.setup_logging()
+    from lifelog.utils.db.change_log import compact_change_log
+    try:
+        removed = compact_change_log(max_age_days=max_age_days)
+    except Exception as e:
+        logger.error(f"Change log compaction failed: {e}", exc_info=True)
+        console.print(f"[red]Compaction failed: {e}[/red]")
+        raise typer.Exit(1)
+    console.print(f"[green]Removed {removed} change-log entries.[/green]")
+
+
 @app.command("docker")
 def docker_cmd(
     action: Annotated[str, typer.Argument(
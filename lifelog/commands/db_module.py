@@ -0,0 +1,228 @@
+# lifelog/commands/db_module.py
+"""
+`llog db`: schema version, migrations, index health, query-plan audit,
+cold-storage archiving and the analytics series cache.
+"""
+import typer
+from rich.console import Console
+from rich.table import Table
+
+app = typer.Typer(help="🗄️ Database schema and indexes")
+console = Console()
+
+
+def _print_index_report(report) -> None:
+    if report.missing or report.drifted:
+        table = Table(title="Index problems")
+        table.add_column("Index")
+        table.add_column("Table")
+        table.add_column("Problem")
+        table.add_column("Migration", justify="right")
+        for idx in report.missing:
+            table.add_row(idx.name, idx.table, "[red]missing[/red]", str(idx.migration))
+        for idx in report.drifted:
+            table.add_row(idx.name, idx.table, "[yellow]definition differs[/yellow]", str(idx.migration))
+        console.print(table)
+    else:
+        console.print(f"[green]✓ All {report.declared} declared indexes present.[/green]")
+
+    if report.redundant:
+        console.print("[yellow]Redundant indexes[/yellow] (a left prefix of another index on the same table):")
+        for name, other in sorted(report.redundant.items()):
+            console.print(f"  • {name}  [dim]covered by {other}[/dim]")
+    if report.undeclared:
+        console.print("[dim]Indexes not declared by any migration: "
+                      f"{', '.join(report.undeclared)}[/dim]")
+
+    if report.unused is None:
+        console.print("[dim]Unused-index check skipped: no traced queries yet "
+                      "(run commands with LIFELOG_TRACE_SQL=1).[/dim]")
+    elif report.unused:
+        console.print(f"[yellow]Not used by any of {report.traced_queries} traced query shapes:[/yellow] "
+                      f"{', '.join(report.unused)}")
+    else:
+        console.print(f"[green]✓ Every declared index is used by the "
+                      f"{report.traced_queries} traced query shapes.[/green]")
+
+
+@app.command("status")
+def status(
+    usage: bool = typer.Option(True, "--usage/--no-usage",
+                               help="Check index usage against traced queries."),
+):
+    """
+    Show the schema version, pending migrations and index health.
+    Exits 1 if migrations are pending or declared indexes are missing.
+    """
+    from lifelog.utils.db import get_connection, migrations
+
+    with get_connection() as conn:
+        version = migrations.get_version(conn)
+        todo = migrations.pending(conn)
+        report = migrations.verify_indexes(conn, check_usage=usage)
+        stats = migrations.has_statistics(conn)
+
+    console.print(f"Schema version [bold]{version}[/bold] of {migrations.LATEST_VERSION}")
+    if version > migrations.LATEST_VERSION:
+        console.print("[yellow]This database was migrated by a newer lifelog.[/yellow]")
+    for step in todo:
+        console.print(f"  [yellow]pending[/yellow] {step.version:>3}  {step.name}")
+    if not stats:
+        console.print("[yellow]No planner statistics[/yellow] (sqlite_stat1); `llog db migrate` runs ANALYZE.")
+    _print_index_report(report)
+
+    if todo or not report.ok:
+        console.print("Run [bold]llog db migrate[/bold] to fix.")
+        raise typer.Exit(1)
+
+
+@app.command("migrate")
+def migrate(
+    analyze: bool = typer.Option(True, "--analyze/--no-analyze",
+                                 help="Refresh planner statistics afterwards."),
+):
+    """
+    Apply pending migrations, recreate missing or changed declared indexes,
+    and run ANALYZE.
+    """
+    from lifelog.utils.db import get_connection, migrations
+
+    with get_connection() as conn:
+        applied = migrations.migrate(conn, analyze_after=False)
+        report = migrations.verify_indexes(conn, check_usage=False)
+        repaired = migrations.repair_indexes(conn, report)
+        if analyze:
+            migrations.analyze(conn)
+        report = migrations.verify_indexes(conn)
+        version = migrations.get_version(conn)
+
+    for step in applied:
+        console.print(f"[green]✓ Migration {step.version}: {step.name}[/green]")
+    if not applied:
+        console.print(f"[dim]No pending migrations (schema version {version}).[/dim]")
+    for name in repaired:
+        console.print(f"[green]✓ Rebuilt index {name}[/green]")
+    if analyze:
+        console.print("[green]✓ Planner statistics refreshed (ANALYZE).[/green]")
+    _print_index_report(report)
+
+
+@app.command("audit")
+def audit(
+    min_rows: int = typer.Option(1000, help="Only report tables with at least this many rows."),
+    show_all: bool = typer.Option(False, "--all", help="Also show small tables and unfiltered reads."),
+):
+    """
+    EXPLAIN lifelog's SQL (from the source and from traced queries) against
+    this database and list full scans and temp B-tree sorts, with index
+    suggestions. Exits 1 if any are found on large tables.
+    """
+    from pathlib import Path
+
+    from lifelog.utils.db import get_connection, query_audit, query_trace
+
+    statements = query_audit.collect_static(Path(__file__).resolve().parent.parent)
+    traced = [(s.sql, s.site) for s in query_trace.stored_stats()]
+    traced += [(r.sql, r.site) for r in query_trace.stored_recent()]
+    query_audit.add_captured(traced, statements)
+    with get_connection() as conn:
+        result = query_audit.audit(conn, statements.values())
+
+    findings = [f for f in result.findings if show_all or f.severe(min_rows)]
+    console.print(f"{result.explained} of {result.statements} statements explained "
+                  f"({len(traced)} from traced queries).")
+    if not findings:
+        console.print(f"[green]✓ No full scans or temp sorts on tables with ≥ {min_rows} rows.[/green]")
+        return
+
+    table = Table(title="Query plan findings")
+    table.add_column("Table")
+    table.add_column("Rows", justify="right")
+    table.add_column("Plan")
+    table.add_column("Statement / suggestion")
+    for f in findings:
+        detail = f"{' '.join(f.statement.sql.split())[:120]}\n[dim]{', '.join(sorted(f.statement.sites)[:2])}[/dim]"
+        if f.suggestion:
+            colour = "green" if f.verified else "yellow"
+            detail += f"\n[{colour}]{f.suggestion}[/{colour}]"
+        if f.existing:
+            detail += f"\n[yellow]{f.existing} matches but is not used[/yellow]"
+        table.add_row(f.table, str(f.rows), f.detail, detail)
+    console.print(table)
+    if result.severe(min_rows):
+        raise typer.Exit(1)
+
+
+@app.command("archive")
+def archive(
+    horizon: int = typer.Option(None, "--horizon-days",
+                                help="Archive rows older than this (default: [archive] horizon_days)."),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Only show what would move."),
+    vacuum: bool = typer.Option(False, "--vacuum", help="Shrink lifelog.db afterwards."),
+):
+    """
+    Move old time logs and tracker entries into per-year archive files.
+    Reports still include them; recent-window queries no longer read them.
+    """
+    from lifelog.utils.db import archive as cold, get_connection
+
+    days = cold.horizon_days() if horizon is None else horizon
+    if days <= 0:
+        console.print("[dim]Archiving is off (set [archive] horizon_days or pass --horizon-days).[/dim]")
+        return
+    moved = cold.archive_old_rows(days, dry_run=dry_run)
+    verb = "Would archive" if dry_run else "Archived"
+    for table, years in sorted(moved.items()):
+        for year, count in sorted(years.items()):
+            console.print(f"[green]✓ {verb} {count} {table} rows from {year}[/green]")
+    if not moved:
+        console.print(f"[dim]Nothing older than {days} days to archive.[/dim]")
+    if vacuum and moved and not dry_run:
+        with get_connection() as conn:
+            conn.commit()
+            conn.execute("VACUUM")
+        console.print("[green]✓ lifelog.db vacuumed.[/green]")
+
+    entries = cold.manifest()
+    if entries:
+        table = Table(title=f"Archives in {cold.archive_dir()}")
+        table.add_column("Year", justify="right")
+        table.add_column("Table")
+        table.add_column("Rows", justify="right")
+        table.add_column("From")
+        table.add_column("To")
+        for e in entries:
+            table.add_row(str(e["year"]), e["table_name"], str(e["rows"]),
+                          (e["min_ts"] or "")[:10], (e["max_ts"] or "")[:10])
+        console.print(table)
+
+
+@app.command("cache")
+def cache(
+    clear: bool = typer.Option(False, "--clear", help="Delete the cached series."),
+):
+    """
+    Show (or clear) the per-tracker series cache analytics read from.
+    Entries are re-read from the database as the change log requires.
+    """
+    from lifelog.utils.reporting.analytics import series_cache
+
+    if clear:
+        removed = series_cache.clear()
+        console.print(f"[green]✓ Removed {removed} cache files from {series_cache.cache_dir()}[/green]")
+        return
+    if not series_cache.enabled():
+        console.print("[dim]The series cache is off ([reporting] series_cache = false).[/dim]")
+    entries = series_cache.cached()
+    if not entries:
+        console.print("[dim]No tracker series cached yet.[/dim]")
+        return
+    table = Table(title=f"Series cache in {series_cache.cache_dir()}")
+    table.add_column("Tracker", justify="right")
+    table.add_column("Rows", justify="right")
+    table.add_column("Change seq", justify="right")
+    table.add_column("Size", justify="right")
+    for e in entries:
+        table.add_row(str(e["tracker_id"]), str(e["rows"]), str(e["seq"]),
+                      f"{e['bytes'] / 1024:.1f} KB")
+    console.print(table)
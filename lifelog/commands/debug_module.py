@@ -0,0 +1,101 @@
+# lifelog/commands/debug_module.py
+"""
+`llog debug`: diagnostics for slow commands.
+"""
+from datetime import datetime
+
+import typer
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+
+app = typer.Typer(help="🔧 Diagnostics")
+console = Console()
+
+def _site(site: str) -> str:
+    return site.replace("lifelog/", "", 1)
+
+
+def _clip(sql: str, limit: int = 200) -> str:
+    return sql if len(sql) <= limit else sql[:limit - 1] + "…"
+
+
+SORT_KEYS = {
+    "total": lambda s: s.total_s,
+    "mean": lambda s: s.mean_s,
+    "max": lambda s: s.max_s,
+    "calls": lambda s: s.calls,
+}
+
+
+@app.command("queries")
+def queries(
+    top: int = typer.Option(20, "--top", "-n", min=1, help="Number of query shapes to show."),
+    sort: str = typer.Option("total", "--sort", help="total, mean, max or calls."),
+    recent: int = typer.Option(0, "--recent", min=0, help="Also show the last N traced statements."),
+    slow: int = typer.Option(0, "--slow", min=0, help="Also show the last N slow-log lines."),
+    reset: bool = typer.Option(False, "--reset", help="Clear the collected statistics."),
+):
+    """
+    Show the SQL that took the most time, from traced runs.
+    Enable tracing with LIFELOG_TRACE_SQL=1 or [debug] trace_sql = true.
+    """
+    from lifelog.utils.db import query_trace
+
+    if reset:
+        query_trace.reset()
+        console.print("[green]✓ Query statistics cleared.[/green]")
+        return
+    if sort not in SORT_KEYS:
+        console.print(f"[red]Unknown sort '{sort}'. Use one of: {', '.join(SORT_KEYS)}.[/red]")
+        raise typer.Exit(1)
+
+    stats = query_trace.stored_stats()
+    if not stats:
+        console.print("[yellow]No traced queries yet.[/yellow] Run commands with "
+                      "[bold]LIFELOG_TRACE_SQL=1[/bold] (or set [debug] trace_sql = true), then try again.")
+        return
+
+    stats.sort(key=SORT_KEYS[sort], reverse=True)
+    total = sum(s.total_s for s in stats) or 1.0
+    table = Table(title=f"Top {min(top, len(stats))} of {len(stats)} query shapes by {sort}")
+    table.add_column("Total ms", justify="right")
+    table.add_column("Calls", justify="right")
+    table.add_column("Mean ms", justify="right")
+    table.add_column("Max ms", justify="right")
+    table.add_column("Rows", justify="right")
+    table.add_column("Call site / SQL", overflow="fold")
+    for s in stats[:top]:
+        timed = s.timed_calls > 0
+        table.add_row(
+            f"{s.total_s * 1000:.1f} ({s.total_s / total:.0%})" if timed else "-",
+            str(s.calls),
+            f"{s.mean_s * 1000:.2f}" if timed else "-",
+            f"{s.max_s * 1000:.1f}" if timed else "-",
+            str(s.rows),
+            Text.assemble((_site(s.site), "cyan"), "\n", _clip(s.sql)),
+        )
+    console.print(table)
+    console.print("[dim]'-' marks statements seen only by the trace callback (not timed).[/dim]")
+
+    if recent:
+        rt = Table(title=f"Last {recent} traced statements")
+        rt.add_column("Time")
+        rt.add_column("ms", justify="right")
+        rt.add_column("Rows", justify="right")
+        rt.add_column("Call site / SQL", overflow="fold")
+        for r in query_trace.stored_recent()[-recent:]:
+            rt.add_row(datetime.fromtimestamp(r.ts).strftime("%H:%M:%S"),
+                       "-" if r.duration is None else f"{r.duration * 1000:.1f}",
+                       "-" if r.rows is None else str(r.rows),
+                       Text.assemble((_site(r.site), "cyan"), "\n", _clip(r.sql)))
+        console.print(rt)
+
+    if slow:
+        try:
+            lines = query_trace.SLOW_LOG_FILE.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            lines = []
+        console.rule(f"Slow log ({query_trace.SLOW_LOG_FILE})")
+        for line in lines[-slow:] or ["(empty)"]:
+            console.print(line, markup=False, highlight=False)
@@ -0,0 +1,81 @@
+# lifelog/commands/scheduler_module.py
+"""
+`llog scheduler`: run and inspect the reminder daemon.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from lifelog.utils import log_utils
+from lifelog.utils.shared_utils import utc_iso_to_local
+
+app = typer.Typer(help="⏰ Reminder scheduler daemon")
+console = Console()
+logger = logging.getLogger(__name__)
+
+
+def _fmt(value: Optional[str]) -> str:
+    if not value:
+        return "-"
+    try:
+        return utc_iso_to_local(value).strftime("%Y-%m-%d %H:%M")
+    except Exception:
+        return value
+
+
+@app.command("run")
+def run(
+    jobs: Optional[bool] = typer.Option(
+        None, "--jobs/--no-jobs",
+        help="Also run the [cron] jobs from the config (default: [scheduler] run_jobs)."),
+    poll: Optional[float] = typer.Option(
+        None, "--poll", min=1.0,
+        help="Seconds between change-log polls (default: [scheduler] poll_interval)."),
+):
+    """
+    Run the scheduler in the foreground until interrupted.
+    Start it from your session autostart or a systemd user unit.
+    """
+    log_utils.setup_logging()
+    from lifelog.utils.scheduler import run_daemon
+    console.print("[green]⏰ Scheduler running. Press Ctrl+C to stop.[/green]")
+    try:
+        run_daemon(run_jobs=jobs, poll_interval=poll)
+    except RuntimeError as e:
+        console.print(f"[yellow]⚠️ {e}[/yellow]")
+        raise typer.Exit(1)
+    console.print("[dim]Scheduler stopped.[/dim]")
+
+
+@app.command("status")
+def status():
+    """
+    Show whether the daemon is running and what fires next.
+    """
+    from lifelog.utils.db import reminders
+    from lifelog.utils.scheduler import running_pid
+
+    pid = running_pid()
+    if pid:
+        console.print(f"[green]✓ Scheduler running (pid {pid})[/green]")
+    else:
+        console.print("[yellow]Scheduler is not running. Start it with `llog scheduler run`.[/yellow]")
+
+    pending = reminders.pending_reminders()
+    table = Table("ID", "Task", "Fires at", "Message", title=f"Pending reminders ({len(pending)})")
+    for r in pending[:20]:
+        table.add_row(str(r["id"]), str(r["task_id"] or "-"), _fmt(r["fire_at"]),
+                      (r["message"] or "")[:60])
+    console.print(table)
+
+    jobs = reminders.get_jobs()
+    if jobs:
+        jt = Table("Job", "Schedule", "Next run", "Last run", "Status", title="Jobs")
+        for j in jobs:
+            jt.add_row(j["name"], j["schedule"], _fmt(j["next_run"]), _fmt(j["last_run"]),
+                       "-" if j["last_status"] is None else str(j["last_status"]))
+        console.print(jt)
@@ -8,10 +8,10 @@ import sys
 from lifelog.utils.hooks import run_hooks
 from lifelog.utils.get_quotes import get_feedback_saying
 from lifelog.utils.shared_options import category_option, project_option, due_option, impt_option, recur_option, past_option
-from lifelog.config.schedule_manager import IS_POSIX, apply_scheduled_jobs, build_linux_notifier, build_windows_notifier, save_config
+from lifelog.config.schedule_manager import IS_POSIX, apply_scheduled_jobs, build_windows_notifier, save_config
 import lifelog.config.config_manager as cf
-from lifelog.utils.shared_utils import add_category_to_config, add_project_to_config, add_tag_to_config, calculate_priority, format_datetime_for_user, format_due_for_display, get_available_categories, get_available_projects, get_available_tags, now_local, parse_date_string, create_recur_schedule, parse_args, parse_offset_to_timedelta, utc_iso_to_local, validate_task_inputs
-from lifelog.utils.db import task_repository, time_repository
+from lifelog.utils.shared_utils import add_category_to_config, add_project_to_config, add_tag_to_config, calculate_priority, format_datetime_for_user, format_due_for_display, get_available_categories, get_available_projects, get_available_tags, now_local, to_local, parse_date_string, create_recur_schedule, parse_args, parse_offset_to_timedelta, utc_iso_to_local, validate_task_inputs
+from lifelog.utils.db import priority, recurrence, should_sync, task_repository, task_time, time_repository
 from lifelog.utils.db.models import Task, get_task_fields
 import calendar
 from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn
@@ -35,8 +35,6 @@ from dataclasses import asdict
 from datetime import datetime, timedelta, timezone
 import re
 import platform
-from shlex import quote
-import shutil
 import subprocess
 try:
     import termios
@@ -47,7 +45,6 @@ except ImportError:
     tty = None
     HAS_TERMIOS = False
 import typer
-import json
 from datetime import datetime, timedelta
 from typing import List, Optional
 _plt = None
@@ -76,6 +73,14 @@ console = Console()
 MAX_TASKS_DISPLAY = 50
 
 
+def _format_minutes(minutes: float) -> str:
+    """Compact h/m rendering of a minute count."""
+    minutes = int(round(minutes or 0))
+    if minutes >= 60:
+        return f"{minutes // 60}h {minutes % 60:02d}m"
+    return f"{minutes}m"
+
+
 @app.command()
 @with_operation_header("Adding New Task", "Create and configure task with validation")
 @database_operation("Add Task")
@@ -225,11 +230,20 @@ def list(
     show_completed: bool = typer.Option(
         False, help="Include completed tasks."),
     args: Optional[List[str]] = typer.Argument(
-        None, help="(Ignored currently, tags filtering not yet in DB)")
+        None, help="Optional +tags; only tasks carrying all of them are listed."),
+    any_tag: bool = typer.Option(
+        False, "--any-tag", help="Match tasks carrying any of the +tags instead of all."),
+    show_time: bool = typer.Option(
+        False, "--time", help="Add a column with the time logged on each task."),
 ):
     """
     List tasks using clean SQL filtering & sorting.
     """
+    # The title argument swallows the first word, so it may itself be a +tag.
+    words = ([title] if title else []) + [*(args or [])]
+    tags = [w[1:] for w in words if w.startswith("+") and len(w) > 1]
+    title = " ".join(w for w in words if not w.startswith("+")) or None
+
     tasks = task_repository.query_tasks(
         title_contains=title,
         category=category,
@@ -238,7 +252,9 @@ def list(
         due_contains=due,
         status=status,
         show_completed=show_completed,
-        sort=sort
+        sort=sort,
+        tags=tags,
+        match_all_tags=not any_tag
     )
 
     if not tasks:
@@ -258,6 +274,10 @@ def list(
     table.add_column("Title", overflow="ellipsis", min_width=8)
     table.add_column("Priority", width=3, overflow="ellipsis")
     table.add_column("Due", style="yellow", width=8, overflow="ellipsis")
+    spent = {}
+    if show_time:
+        table.add_column("Spent", justify="right", width=7)
+        spent = task_time.get_task_times(t.id for t in tasks)
 
     for task in tasks:
         id_str = str(task.id)
@@ -273,7 +293,10 @@ def list(
         prio_text = Text(prio)
         prio_text.stylize(color)
 
-        table.add_row(id_str, title_str, prio_text, due_str)
+        row = [id_str, title_str, prio_text, due_str]
+        if show_time:
+            row.append(_format_minutes(spent[task.id]["total_minutes"]))
+        table.add_row(*row)
 
     console.print(table)
 
@@ -352,6 +375,16 @@ def info(id: int):
             value = "-"
         console.print(f"[bold blue]{key.capitalize()}:[/bold blue] {value}")
 
+    spent = task_time.get_task_time(id)
+    console.rule("⏱️ Time Spent")
+    console.print(f"[bold blue]Total:[/bold blue] {_format_minutes(spent['total_minutes'])}"
+                  f" in {spent['sessions']} session(s)")
+    console.print(f"[bold blue]Focused:[/bold blue] {_format_minutes(spent['focused_minutes'])}"
+                  f"  [bold blue]Distracted:[/bold blue] {_format_minutes(spent['distracted_minutes'])}")
+    last = spent["last_worked"]
+    console.print(f"[bold blue]Last worked:[/bold blue] "
+                  f"{utc_iso_to_local(last).strftime('%Y-%m-%d %H:%M') if last else '-'}")
+
 
 @app.command()
 def start(id: int):
@@ -920,11 +953,16 @@ def focus_cli(
 
 
 def build_calendar_panel(now: datetime, tasks: list) -> Panel:
-    """Build a calendar panel showing the current month with due dates highlighted."""
+    """Build a calendar panel showing the current month with due dates and upcoming recurrences highlighted."""
     cal = calendar.TextCalendar(firstweekday=0)
     month_str = cal.formatmonth(now.year, now.month)
 
     due_days = set()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_end = month_start.replace(
+        day=calendar.monthrange(now.year, now.month)[1], hour=23, minute=59, second=59)
+    for occ in recurrence.expand_occurrences(month_start, month_end):
+        due_days.add(occ["when"].day)
     for t in tasks:
         if t.due:
             try:
@@ -955,118 +993,29 @@ def build_calendar_panel(now: datetime, tasks: list) -> Panel:
 @app.command("auto_recur")
 def auto_recur():
     """
-    Check all recurring tasks and create new instances if due.
+    Create instances of recurring tasks that have come due, including any missed runs.
     """
-    tasks = task_repository.get_all_tasks()
-    now = now_local()
-    today_weekday = now.weekday()
-    new_tasks_count = 0
-
-    for task in tasks:
-        recur_interval = task.recur_interval
-        recur_unit = task.recur_unit
-        recur_base = task.recur_base
-        recur_days_of_week = task.recur_days_of_week
-
-        if not (recur_interval and recur_unit and recur_base):
-            continue
+    if should_sync():
+        console.print(
+            "[cyan]ℹ️ Recurring tasks are generated on the host and arrive with the next sync.[/cyan]")
+        return
+    created = recurrence.run_due_recurrences()
 
-        try:
-            if isinstance(recur_base, datetime):
-                base_dt = recur_base
-            else:
-                base_dt = datetime.fromisoformat(recur_base)
-        except (ValueError, TypeError):
-            continue
-        interval = recur_interval
-        unit = recur_unit
-        try:
-            days_of_week = json.loads(
-                recur_days_of_week) if recur_days_of_week else []
-        except (json.JSONDecodeError, TypeError):
-            days_of_week = []
-
-        should_recur = False
-
-        if unit == "day":
-            days_since = (now.date() - base_dt.date()).days
-            if days_since > 0 and days_since % interval == 0:
-                should_recur = True
-        elif unit == "week":
-            days_since = (now.date() - base_dt.date()).days
-            if days_since > 0:
-                weeks_since = days_since // 7
-                if days_of_week:
-                    if weeks_since % interval == 0 and today_weekday in days_of_week:
-                        should_recur = True
-                else:
-                    if days_since % (interval * 7) == 0:
-                        should_recur = True
-        elif unit == "month":
-            months_since = (now.year - base_dt.year) * \
-                12 + (now.month - base_dt.month)
-            if months_since % interval == 0 and now.day == base_dt.day:
-                should_recur = True
-        elif unit == "year":
-            years_since = now.year - base_dt.year
-            if years_since > 0 and now.month == base_dt.month and now.day == base_dt.day:
-                should_recur = True
-
-        if should_recur:
-            new_task_data = clone_task_for_db(task, now)
-            task_repository.add_task(new_task_data)
-            task_repository.update_task(
-                task.id, {"recur_base": now.isoformat()})
-            new_tasks_count += 1
-
-    if new_tasks_count:
+    if created:
         console.print(
-            f"[green]🔁 Recreated {new_tasks_count} recurring task(s).[/green]")
+            f"[green]🔁 Recreated {len(created)} recurring task(s).[/green]")
     else:
         console.print("[cyan]ℹ️ No recurring tasks needed today.[/cyan]")
 
 
-def clone_task_for_db(task, now):
+@app.command("rescore")
+def rescore():
     """
-    Clone task for SQL-based insertion.
+    Recompute priorities of all open tasks (deadlines drift closer every day).
     """
-    new_due = None
-    if task.due and task.created:
-        try:
-            if isinstance(task.due, datetime):
-                due_dt = task.due
-            else:
-                due_dt = datetime.fromisoformat(task.due)
-
-            if isinstance(task.created, datetime):
-                created_dt = task.created
-            else:
-                created_dt = datetime.fromisoformat(task.created)
-
-            offset = due_dt - created_dt
-            new_due = (now + offset).replace(microsecond=0).isoformat()
-        except Exception:
-            new_due = None
-
-    return Task(
-        title=task.title,
-        project=task.project,
-        category=task.category,
-        importance=task.importance if hasattr(task, "importance") else 1,
-        created=now.replace(hour=0, minute=0, second=0,
-                            microsecond=0).isoformat(),
-        due=new_due,
-        status="backlog",
-        start=None,
-        end=None,
-        priority=0,
-        recur_interval=task.recur_interval,
-        recur_unit=task.recur_unit,
-        recur_days_of_week=task.recur_days_of_week,
-        recur_base=now.isoformat(),
-        tags=task.tags,
-        notes=task.notes
-    )
+    stats = priority.rescore_open_tasks()
+    console.print(
+        f"[green]✓ Re-scored {stats['scored']} open task(s); {stats['updated']} changed.[/green]")
 
 
 def get_due_color(due_str: str, now: datetime) -> str:
@@ -1128,13 +1077,18 @@ def parse_due_offset(due_str):
 def create_due_alert(task: Task, offset_str: str):
     """
     Schedule a one-off reminder for `task` at (due_local_time - offset).
-    On POSIX: uses `at` if available, else falls back to cron via schedule_manager.
+    On POSIX: queues it for the `llog scheduler` daemon, which also follows
+    later due-date changes.
     On Windows: uses schtasks.exe to run a PowerShell modal + sound.
     """
     if not task.due:
         raise ValueError("Task has no due date")
 
-    due_local: datetime = utc_iso_to_local(task.due)
+    if isinstance(task.due, datetime):
+        due_utc = task.due if task.due.tzinfo else task.due.replace(tzinfo=timezone.utc)
+        due_local: datetime = to_local(due_utc)
+    else:
+        due_local = utc_iso_to_local(task.due)
     offset = parse_offset_to_timedelta(offset_str)
     alert_local = due_local - offset
 
@@ -1149,37 +1103,14 @@ def create_due_alert(task: Task, offset_str: str):
 
     system = platform.system()
     if system in ("Linux", "Darwin"):
-        notifier = build_linux_notifier(msg)
-
-        if shutil.which("at"):
-            at_time = alert_local.strftime("%H:%M %m/%d/%Y")
-            full = f"echo {quote(notifier)} | at {at_time}"
-            subprocess.run(["bash", "-lc", full], check=True, timeout=30)
+        from lifelog.utils.db import reminders
+        from lifelog.utils.scheduler import running_pid
+        reminders.add_reminder(task.id, alert_local, msg, offset)
+        console.print(
+            f"[green]✅ Reminder scheduled at {alert_local.strftime('%Y-%m-%d %H:%M')}[/green]")
+        if not running_pid():
             console.print(
-                f"[green]✅ Reminder scheduled via at at {alert_local.strftime('%Y-%m-%d %H:%M')}[/green]"
-            )
-        else:
-            from lifelog.config.schedule_manager import save_config, apply_scheduled_jobs
-            import lifelog.config.config_manager as cf
-            cfg = cf.load_config()
-            name = f"task_due_{task.id}"
-            entry = {
-                "schedule": f"{alert_local.minute} {alert_local.hour} {alert_local.day} {alert_local.month} *",
-                "command": notifier
-            }
-            cron_sec = cfg.get("cron", {})
-            cron_sec[name] = entry
-            cfg["cron"] = cron_sec
-            if not save_config(cfg):
-                raise RuntimeError("Failed to save cron reminder")
-            ok = apply_scheduled_jobs()
-            if ok:
-                console.print(
-                    f"[green]✅ Reminder scheduled at {alert_local.strftime('%Y-%m-%d %H:%M')}[/green]")
-            else:
-                console.print(
-                    f"[yellow]⚠️ Could not schedule via cron – you may need to `crontab -l` or run with sudo[/yellow]"
-                )
+                "[yellow]⚠️ The scheduler is not running – start it with `llog scheduler run` to get notified.[/yellow]")
 
     elif system == "Windows":
         ps_cmd = build_windows_notifier(msg)
@@ -1209,6 +1140,9 @@ def create_due_alert(task: Task, offset_str: str):
 
 def clear_due_alert(task):
     if IS_POSIX:
+        from lifelog.utils.db import reminders
+        removed = reminders.clear_reminders(task.id)
+        # Reminders scheduled before the daemon existed live in the [cron] section.
         doc = cf.load_config()
         cron_section = doc.get("cron", {})
         name = f"task_due_{task.id}"
@@ -1217,6 +1151,8 @@ def clear_due_alert(task):
             doc["cron"] = cron_section
             save_config(doc)
             apply_scheduled_jobs()
+            removed += 1
+        if removed:
             console.print(
                 f"[green]✅ Reminder cleared for task {task.id}[/green]")
         else:
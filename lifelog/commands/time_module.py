@@ -7,7 +7,7 @@ It allows users to start and stop timers, view current tracking status, and mana
 
 from typing import List, Optional
 import typer
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from rich.console import Console
 from rich.table import Table
@@ -26,10 +26,12 @@ from lifelog.utils.shared_utils import (
     add_project_to_config,
     get_available_categories,
     get_available_projects,
+    get_user_timezone,
     now_utc,
     parse_date_string,
     parse_args,
     parse_offset_to_timedelta,
+    to_local,
 )
 
 app = typer.Typer(help="⏱️  Track time spent in different life categories.")
@@ -235,11 +237,15 @@ def time_summary(
     period: Optional[str] = typer.Option(
         None, help="Period to filter: 'day', 'week', 'month'. Leave blank for all time."
     ),
+    args: Optional[List[str]] = typer.Argument(
+        None, help="Optional +tags; only entries carrying all of them are counted."
+    ),
 ):
     """
     📊 Summarize time tracked by title, category, or project.
     Shows focused (duration minus distracted) and distracted minutes.
     """
+    tags = [a[1:] for a in (args or []) if a.startswith("+") and len(a) > 1]
     now = now_utc()
     if period:
         if period == "day":
@@ -257,7 +263,7 @@ def time_summary(
         since = now - timedelta(days=365)
 
     try:
-        history = time_repository.get_all_time_logs(since=since)
+        history = time_repository.get_all_time_logs(since=since, tags=tags)
     except Exception as e:
         console.print(f"[bold red]Failed to fetch time logs: {e}[/bold red]")
         raise typer.Exit(code=1)
@@ -299,6 +305,93 @@ def time_summary(
     console.print(table)
 
 
+def _audit_since(since: str, now: datetime) -> datetime:
+    """
+    Start of an audit range: a span (7d, 2w, 3h) counts back from `now`, and
+    a day without a time of day (today, 4/5) starts at its local midnight
+    rather than the 23:59 parse_date_string gives it.
+    """
+    try:
+        return now - parse_offset_to_timedelta(since)
+    except ValueError:
+        pass
+    since_dt = parse_date_string(since, now=now)
+    if "T" in since or ":" in since:
+        return since_dt
+    if since_dt.tzinfo is None:
+        since_dt = since_dt.replace(tzinfo=get_user_timezone())
+    midnight = to_local(since_dt).replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight.astimezone(timezone.utc)
+
+
+@app.command("audit")
+def audit(
+    since: str = typer.Option(
+        "7d", "--since", help="Start of the range (e.g. 7d, 2w, today)."),
+    until: Optional[str] = typer.Option(
+        None, "--until", help="End of the range (default: now)."),
+    min_gap: int = typer.Option(
+        15, "--min-gap", min=0, help="Ignore untracked gaps shorter than this many minutes."),
+    limit: int = typer.Option(
+        20, "--limit", min=1, help="Rows to show per table."),
+):
+    """
+    🔍 Find overlapping entries (double-counted time) and untracked gaps.
+    """
+    from lifelog.utils.db import time_audit
+
+    now = now_utc()
+    try:
+        since_dt = _audit_since(since, now)
+        until_dt = parse_date_string(until, now=now) if until else now
+    except ValueError as e:
+        console.print(f"[bold red]Invalid date: {e}[/bold red]")
+        raise typer.Exit(code=1)
+    if until_dt <= since_dt:
+        console.print("[bold red]--until must be after --since.[/bold red]")
+        raise typer.Exit(code=1)
+
+    report = time_audit.audit(since_dt, until_dt, min_gap_minutes=min_gap)
+
+    def fmt(ts: float) -> str:
+        return to_local(time_audit.from_epoch(ts)).strftime("%a %m-%d %H:%M")
+
+    console.print(
+        f"\n[bold]Time audit[/bold] {fmt(report.since)} → {fmt(report.until)}: "
+        f"{report.entries} entries, {_format_duration(report.logged_minutes)} logged, "
+        f"{_format_duration(report.tracked_minutes)} tracked\n")
+
+    if report.overlaps:
+        table = Table(title=f"Overlaps ({len(report.overlaps)}, "
+                            f"{_format_duration(report.double_counted_minutes)} double-counted)",
+                      header_style="bold red")
+        table.add_column("From")
+        table.add_column("To")
+        table.add_column("Entry")
+        table.add_column("Overlaps")
+        table.add_column("Minutes", justify="right")
+        for o in sorted(report.overlaps, key=lambda o: -o.minutes)[:limit]:
+            table.add_row(fmt(o.start), fmt(o.end),
+                          f"#{o.first.id} {o.first.title}", f"#{o.second.id} {o.second.title}",
+                          f"{o.minutes:.0f}")
+        console.print(table)
+    else:
+        console.print("[green]✓ No overlapping entries.[/green]")
+
+    if report.gaps:
+        table = Table(title=f"Untracked gaps ≥ {min_gap} min ({len(report.gaps)}, "
+                            f"{_format_duration(report.untracked_minutes)})",
+                      header_style="bold yellow")
+        table.add_column("From")
+        table.add_column("To")
+        table.add_column("Length", justify="right")
+        for g in sorted(report.gaps, key=lambda g: -g.minutes)[:limit]:
+            table.add_row(fmt(g.start), fmt(g.end), _format_duration(g.minutes))
+        console.print(table)
+    else:
+        console.print("[green]✓ No untracked gaps.[/green]")
+
+
 @app.command("distracted")
 def distracted(
     duration: str = typer.Argument(...,
@@ -339,7 +432,8 @@ def distracted(
             notes=note_str
         )
         try:
-            time_repository.add_time_entry(distraction)
+            # Overlaps the running session by design.
+            time_repository.add_time_entry(distraction, reject_overlap=False)
         except Exception as e:
             console.print(
                 f"[yellow]Warning: failed to log separate distraction entry: {e}[/yellow]")
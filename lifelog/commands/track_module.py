@@ -50,6 +50,9 @@ def add(
                              help="The data type (int, float, bool, str)."),
     args: Optional[List[str]] = typer.Argument(
         None, help="Optional +tags and notes."),
+    retention_policy: Optional[str] = typer.Option(
+        None, "--retention",
+        help="Downsample old entries, e.g. 'raw:90d,hour:365d,day'."),
 ):
     '''
     Add a new tracker definition to the database.
@@ -60,6 +63,8 @@ def add(
     except ValueError as e:
         console.print(f"[red]Error: {e}[/red]")
         raise typer.Exit(code=1)
+    if retention_policy:
+        retention_policy = _checked_policy(retention_policy, type)
 
     existing_trackers = track_repository.get_all_trackers()
     for tracker in existing_trackers:
@@ -97,6 +102,7 @@ def add(
         created=now.isoformat(),
         tags=",".join(tags) if tags else None,
         notes=" ".join(notes) if notes else None,
+        retention=retention_policy,
     )
 
     try:
@@ -254,6 +260,63 @@ def delete(
         f"[green]🗑️ Tracker '{tracker.title}' deleted successfully.[/green]")
 
 
+def _checked_policy(policy: str, tracker_type: str) -> str:
+    from lifelog.utils.db import retention
+    if tracker_type not in retention.NUMERIC_TYPES:
+        console.print(f"[red]Only numeric trackers can be downsampled, not '{tracker_type}'.[/red]")
+        raise typer.Exit(code=1)
+    try:
+        return retention.format_policy(retention.parse_policy(policy))
+    except ValueError as e:
+        console.print(f"[red]Invalid retention policy: {e}[/red]")
+        raise typer.Exit(code=1)
+
+
+@app.command("retention")
+def set_retention(
+    id: int = typer.Argument(..., help="Tracker ID"),
+    policy: str = typer.Argument(...,
+                                 help="e.g. 'raw:90d,hour:365d,day', or 'off' to keep every entry."),
+):
+    """
+    Set how a tracker's old entries are downsampled by `llog track compact`.
+    Tiers run finest first; compacted rows keep sum, count, min, max and the
+    last value, so goals and reports give the same results.
+    """
+    tracker = track_repository.get_tracker_by_id(id)
+    if not tracker:
+        console.print(f"[bold red]❌ Tracker with ID {id} not found.[/bold red]")
+        raise typer.Exit(code=1)
+    value = None if policy.strip().lower() == "off" else _checked_policy(policy, tracker.type)
+    track_repository.update_tracker(id, {"retention": value})
+    if value:
+        console.print(f"[green]✅ '{tracker.title}' keeps {value}.[/green]")
+    else:
+        console.print(f"[green]✅ '{tracker.title}' keeps every raw entry.[/green]")
+
+
+@app.command("compact")
+def compact(
+    id: Optional[int] = typer.Option(None, "--id", help="Only this tracker."),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report without rewriting."),
+):
+    """
+    Apply tracker retention policies: rewrite old entries into hourly/daily
+    aggregate rows.
+    """
+    from lifelog.utils.db import retention
+
+    result = retention.compact(id, dry_run=dry_run)
+    if not result:
+        console.print("[dim]Nothing to compact.[/dim]")
+        return
+    titles = {t.id: t.title for t in track_repository.get_all_trackers()}
+    verb = "would become" if dry_run else "→"
+    for tracker_id, (rows_in, rows_out) in sorted(result.items()):
+        console.print(f"[green]✓ {titles.get(tracker_id, tracker_id)}: "
+                      f"{rows_in} entries {verb} {rows_out}[/green]")
+
+
 @app.command("goals-help")
 def goals_help():
     """
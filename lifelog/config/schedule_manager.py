@@ -132,11 +132,13 @@ def _apply_user_cron_jobs(lines: str) -> bool:
             timeout=30
         )
         old = p.stdout.splitlines() if p.returncode == 0 else []
+        commands = [cmd for _, _, cmd in build_cron_jobs()]
 
         filtered = [
             ln for ln in old
             if "llog task auto_recur" not in ln
                and "llog env sync-all" not in ln
+               and not any(cmd in ln for cmd in commands)
                and not ln.strip().startswith("# Lifelog")
         ]
 
@@ -19,6 +19,10 @@ Lifelog CLI
 A command-line interface for tracking habits, time, tasks, and environmental data.
 This CLI allows users to log their daily activities, manage tasks, and sync environmental data.
 '''
+import sys
+from lifelog.utils import profiling
+profiling.start_from_argv(sys.argv)  # before the heavy imports, so they are measured
+
 import logging
 import curses
 from datetime import datetime
@@ -26,8 +30,7 @@ import os
 import time
 from pathlib import Path
 import sqlite3
-import sys
-from typing import Annotated
+from typing import Annotated, Optional
 import requests
 import typer
 
@@ -35,7 +38,7 @@ from lifelog.config.schedule_manager import apply_scheduled_jobs
 from lifelog.first_time_run import LOGO_SMALL, run_wizard
 from lifelog.utils.db import database_manager
 import lifelog.config.config_manager as cf
-from lifelog.commands import api_module, task_module, time_module, track_module, report, environmental_sync, hero
+from lifelog.commands import api_module, db_module, debug_module, task_module, time_module, track_module, report, environmental_sync, hero, scheduler_module
 from lifelog.ui import main as ui_main
 from lifelog.utils import get_quotes
 
@@ -79,6 +82,26 @@ app.add_typer(environmental_sync.app, name="environment sync",
               help="Sync data about your local weather.")
 app.add_typer(api_module.app, name="api",
               help="API server control & device pairing")
+app.add_typer(scheduler_module.app, name="scheduler",
+              help="Run the reminder daemon and inspect pending reminders.")
+app.add_typer(debug_module.app, name="debug",
+              help="Diagnostics: traced SQL statistics and the slow-query log.")
+app.add_typer(db_module.app, name="db",
+              help="Schema version, migrations and index health.")
+
+
+@app.callback()
+def root_callback(
+    profile: Optional[str] = typer.Option(
+        None, "--profile", metavar="[=PATH]",
+        help="Profile the command: writes PATH.pstats, PATH.collapsed and PATH.imports "
+             "(default ~/.lifelog/profiles/) and prints a time breakdown."),
+):
+    """
+    Lifelog CLI: Track your habits, health, time, and tasks.
+    """
+    # --profile itself is consumed by profiling.start_from_argv before parsing.
+    profiling.mark_command()
 
 # TODO: Fix UI for small screens and implement later.
 # @app.command("ui")
@@ -355,21 +378,111 @@ def config_edit():
 
 
 @app.command("sync")
-def sync_command():
+def sync_command(
+    bootstrap: Annotated[bool, typer.Option(
+        "--bootstrap", help="Replace the local database with a fresh host snapshot.")] = False
+):
     """
     Sync pending changes with the server (client mode only).
     """
     log_utils.setup_logging()
+    if bootstrap:
+        _bootstrap_from_snapshot()
+        return
     try:
-        from lifelog.utils.db import process_sync_queue
+        from lifelog.utils.db import compact_sync_queue, get_mode, process_sync_queue
+        from lifelog.utils.db.sync_breaker import sync_breaker
+        _, server_url = get_mode()
+        if should_sync():
+            stats = compact_sync_queue()
+            if stats["before"] != stats["after"]:
+                console.print(
+                    f"[dim]Compacted queue: {stats['before']} → {stats['after']} "
+                    f"operations ({stats['ratio']:.0%} fewer)[/dim]")
+        # An explicit sync always retries, even inside the backoff window.
+        if should_sync() and server_url:
+            sync_breaker.reset(server_url)
         process_sync_queue()
+        if should_sync() and sync_breaker.get_state(server_url)["failures"]:
+            console.print(
+                f"[yellow]Host {server_url} is unreachable; changes stay queued.[/yellow]")
+            raise typer.Exit(1)
         console.print("[green]Sync completed![/green]")
+    except typer.Exit:
+        raise
     except Exception as e:
         logger.error(f"Sync command failed: {e}", exc_info=True)
         console.print(f"[red]Sync failed: {e}[/red]")
         raise typer.Exit(1)
 
 
+def _bootstrap_from_snapshot():
+    """Download and install a host snapshot, then resume incremental sync."""
+    from lifelog.utils.db.snapshot import bootstrap_from_host
+    if not should_sync():
+        console.print("[yellow]Snapshot bootstrap is only available in client mode.[/yellow]")
+        raise typer.Exit(1)
+    if not typer.confirm("This replaces the local database with the host's copy. Continue?",
+                         default=False):
+        raise typer.Exit()
+    try:
+        seq = bootstrap_from_host()
+    except Exception as e:
+        logger.error(f"Snapshot bootstrap failed: {e}", exc_info=True)
+        console.print(f"[red]Snapshot bootstrap failed: {e}[/red]")
+        raise typer.Exit(1)
+    if seq is None:
+        console.print("[red]Could not download a snapshot from the host.[/red]")
+        raise typer.Exit(1)
+    console.print(f"[green]✓ Installed host snapshot (change seq {seq}).[/green]")
+
+
+@app.command("search")
+def search_command(
+    query: Annotated[str, typer.Argument(help="Words to search for (prefix match).")],
+    kind: Annotated[str, typer.Option(
+        "--kind", "-k", help="Limit to task, time or tracker (comma-separated).")] = None,
+    limit: Annotated[int, typer.Option("--limit", "-n", help="Maximum results.")] = 20,
+    rebuild: Annotated[bool, typer.Option(
+        "--rebuild", help="Rebuild the search index before searching.")] = False,
+):
+    """
+    Search tasks, time logs and trackers by title, notes and tags.
+    """
+    from rich.markup import escape
+    from lifelog.utils.db import search_index
+    log_utils.setup_logging()
+
+    kinds = [k.strip() for k in kind.split(",")] if kind else None
+    if kinds and any(k not in search_index.SEARCH_KINDS for k in kinds):
+        console.print(
+            f"[red]--kind must be one of: {', '.join(search_index.SEARCH_KINDS)}[/red]")
+        raise typer.Exit(1)
+    if rebuild:
+        count = search_index.rebuild_search_index()
+        console.print(f"[dim]Rebuilt search index ({count} entries).[/dim]")
+
+    # Sentinels survive markup escaping and are swapped for styles afterwards.
+    hits = search_index.search(query, kinds=kinds, limit=limit,
+                               highlight=("\x02", "\x03"))
+    if not hits:
+        console.print("[yellow]No matches.[/yellow]")
+        return
+
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Kind", style="cyan")
+    table.add_column("ID", justify="right")
+    table.add_column("Title")
+    table.add_column("Match")
+    for hit in hits:
+        snippet = escape(hit["snippet"] or "").replace(
+            "\x02", "[bold yellow]").replace("\x03", "[/bold yellow]")
+        table.add_row(hit["kind"], str(hit["id"]), escape(hit["title"] or ""), snippet)
+    console.print(table)
+    if not search_index.fts5_available():
+        console.print("[dim]FTS5 unavailable: results from a slower LIKE scan.[/dim]")
+
+
 @app.command("backup")
 def backup_command(
     output: Annotated[str, typer.Argument(
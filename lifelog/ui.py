@@ -17,20 +17,23 @@
 import curses
 import os
 import traceback
+from functools import partial
 
 from lifelog.utils.db import task_repository, time_repository, track_repository, environment_repository
 from lifelog.ui_views.ui_helpers import (
     draw_menu,
     draw_status,
+    has_unread_notifications,
     safe_addstr,
     set_current_stdscr,
 )
+from lifelog.ui_views.view_model import ViewModel, draw_loading, draw_spinner
 from lifelog.ui_views.popups import popup_confirm, popup_error, show_help_popup
 from lifelog.ui_views.start_day_ui import start_day_tui
 from lifelog.ui_views.reports_ui import draw_report, run_daily_tracker, run_summary_time, run_summary_trackers, draw_burndown
-from lifelog.ui_views.tasks_ui import add_task_tui, clone_task_tui, cycle_task_filter, delete_task_tui, done_task_tui, draw_agenda,  edit_notes_tui, edit_recurrence_tui, edit_task_tui, focus_mode_tui, quick_add_task_tui, set_task_reminder_tui, start_task_tui, stop_task_tui, view_task_tui
-from lifelog.ui_views.time_ui import add_manual_time_entry_tui, delete_time_entry_tui, draw_time, edit_time_entry_tui, set_time_period, start_time_tui, status_time_tui, stop_time_tui, stopwatch_tui, summary_time_tui, view_time_entry_tui
-from lifelog.ui_views.trackers_ui import add_tracker_tui, delete_goal_tui, delete_tracker_tui, draw_trackers, edit_tracker_tui, log_entry_tui, show_goals_help_tui, view_goals_list_tui, view_tracker_tui
+from lifelog.ui_views.tasks_ui import add_task_tui, clone_task_tui, cycle_task_filter, delete_task_tui, done_task_tui, draw_agenda, edit_notes_tui, load_agenda, make_agenda_list, edit_recurrence_tui, edit_task_tui, focus_mode_tui, quick_add_task_tui, set_task_reminder_tui, start_task_tui, stop_task_tui, view_task_tui
+from lifelog.ui_views.time_ui import add_manual_time_entry_tui, delete_time_entry_tui, draw_time, edit_time_entry_tui, load_time, make_time_list, set_time_period, start_time_tui, status_time_tui, stop_time_tui, stopwatch_tui, summary_time_tui, view_time_entry_tui
+from lifelog.ui_views.trackers_ui import add_tracker_tui, delete_goal_tui, delete_tracker_tui, draw_trackers, edit_tracker_tui, load_trackers, log_tracker_entry_tui, make_tracker_list, show_goals_help_tui, view_goals_list_tui, view_tracker_tui
 import lifelog.config.config_manager as cf
 from lifelog.first_time_run import show_welcome
 from lifelog.utils.shared_utils import log_error
@@ -54,7 +57,29 @@ def show_tui_welcome(stdscr):
     show_welcome(stdscr)
 
 
+# Key reads time out at this interval so the spinner can advance and
+# landed snapshots get drawn without waiting for input.
+TICK_MS = 120
+# Idle screens are reloaded in the background at most this often.
+REFRESH_SECONDS = 30
+
+SCREEN_TITLES = {"H": " Home ", "TSK": " Tasks ", "TM": " Time ",
+                 "TRK": " Trackers ", "R": " Reports ", "GM": " Game "}
+
+
+def create_view_model(lists):
+    """Background loaders for every data-backed tab plus the status bar."""
+    return ViewModel({
+        "H": load_home,
+        "TSK": partial(load_agenda, lists["TSK"]),
+        "TM": partial(load_time, lists["TM"]),
+        "TRK": partial(load_trackers, lists["TRK"]),
+        "status": has_unread_notifications,
+    })
+
+
 def main(stdscr, show_status: bool = True):
+    vm = None
     try:
         set_current_stdscr(stdscr)
         config = cf.load_config()
@@ -72,19 +97,33 @@ def main(stdscr, show_status: bool = True):
                          curses.COLOR_WHITE)
         curses.curs_set(0)
         stdscr.keypad(True)
+        stdscr.timeout(TICK_MS)
 
         current = 0
-        agenda_sel = 0
-        tracker_sel = 0
-        time_sel = 0
+        # Windowed list models; selections are tracked by row id.
+        lists = {
+            "TSK": make_agenda_list(),
+            "TM": make_time_list(),
+            "TRK": make_tracker_list(),
+        }
+        agenda, entries, trackers = lists["TSK"], lists["TM"], lists["TRK"]
 
         menu_h = 3
         h, w = stdscr.getmaxyx()
         panes = create_main_panes(stdscr, h, w, menu_h)
 
+        vm = create_view_model(lists).start()
+        vm.request(SCREENS[current], urgent=True)
+        vm.request("status")
+
         MIN_HEIGHT = 8
         MIN_WIDTH = 20
 
+        # What the screen currently shows; a full redraw happens only when
+        # this changes (new snapshot, resize, tab or selection move).
+        drawn_state = None
+        tick = 0
+
         while True:
             h, w = stdscr.getmaxyx()
             if h < MIN_HEIGHT or w < MIN_WIDTH:
@@ -93,118 +132,167 @@ def main(stdscr, show_status: bool = True):
                     0, 0, f"Terminal too small ({w}x{h}).", curses.A_BOLD)
                 stdscr.addstr(1, 0, "Resize or lower font size.")
                 stdscr.refresh()
+                drawn_state = None
                 key = stdscr.getch()
                 if key in (ord('q'), 27):  # quit or ESC
                     return
                 continue
 
-            # Draw menu bar
-            try:
-                draw_menu(stdscr, SCREENS, current, w, color_pair=1)
-            except Exception as e:
-                stdscr.addstr(0, 0, f"Menu err: {e}")
-
-            for pane in panes.values():
-                pane.erase()
-                pane.border()
-
-            # Draw the current tab content on its pane
             active_screen = SCREENS[current]
             active_pane = panes[active_screen]
-            try:
-                if active_screen == "H":
-                    draw_home(active_pane, h, w)
-                elif active_screen == "TSK":
-                    agenda_sel = draw_agenda(active_pane, h, w, agenda_sel)
-                elif active_screen == "TM":
-                    time_sel = draw_time(active_pane, h, w, time_sel)
-                elif active_screen == "TRK":
-                    tracker_sel = draw_trackers(
-                        active_pane, h, w, tracker_sel, color_pair=2)
-                elif active_screen == "R":
-                    draw_report(active_pane, h, w)
-            except Exception as e:
-                safe_addstr(active_pane, 1, 1, f"Tab err: {e}")
-
-            active_pane.noutrefresh()
-            if show_status:
+            state = (current, h, w, vm.version,
+                     agenda.selected_id, entries.selected_id, trackers.selected_id)
+
+            if state != drawn_state:
+                if drawn_state is not None and drawn_state[1:3] != (h, w):
+                    panes = create_main_panes(stdscr, h, w, menu_h)
+                    active_pane = panes[active_screen]
+                    stdscr.erase()
+
+                # Draw menu bar
                 try:
-                    draw_status(stdscr, h, w, current)
+                    draw_menu(stdscr, SCREENS, current, w, color_pair=1)
                 except Exception as e:
-                    stdscr.addstr(h-1, 0, f"Status err: {e}")
+                    stdscr.addstr(0, 0, f"Menu err: {e}")
 
-            stdscr.noutrefresh()
-            curses.doupdate()
+                active_pane.erase()
+                active_pane.border()
 
+                # Draw the current tab content on its pane
+                data, load_err = vm.get(active_screen)
+                try:
+                    if active_screen in ("H", "TSK", "TM", "TRK") and not vm.has_data(active_screen):
+                        draw_loading(active_pane, SCREEN_TITLES[active_screen])
+                    elif load_err is not None and data is None:
+                        draw_loading(active_pane, SCREEN_TITLES[active_screen])
+                        safe_addstr(active_pane, 2, 2, f"Load err: {load_err}")
+                    elif active_screen == "H":
+                        draw_home(active_pane, h, w, data)
+                    elif active_screen == "TSK":
+                        draw_agenda(active_pane, h, w, agenda, due_days=data)
+                    elif active_screen == "TM":
+                        draw_time(active_pane, h, w, entries, data)
+                    elif active_screen == "TRK":
+                        draw_trackers(active_pane, h, w, trackers, data or {},
+                                      color_pair=2)
+                    elif active_screen == "R":
+                        draw_report(active_pane, h, w)
+                except Exception as e:
+                    safe_addstr(active_pane, 1, 1, f"Tab err: {e}")
+
+                if vm.is_loading(active_screen):
+                    draw_spinner(active_pane, tick)
+                active_pane.noutrefresh()
+                if show_status:
+                    try:
+                        unread, _ = vm.get("status")
+                        draw_status(stdscr, h, w, current, unread=bool(unread))
+                    except Exception as e:
+                        stdscr.addstr(h-1, 0, f"Status err: {e}")
+
+                stdscr.noutrefresh()
+                curses.doupdate()
+                drawn_state = state
+
+            elif vm.is_loading(active_screen):
+                # Only the spinner cell changes while a load is in flight.
+                draw_spinner(active_pane, tick)
+                active_pane.noutrefresh()
+                curses.doupdate()
+
+            stdscr.timeout(TICK_MS)
             key = stdscr.getch()
+            tick += 1
+
+            if key == -1:
+                vm.refresh_if_older(active_screen, REFRESH_SECONDS)
+                continue
+            if key == curses.KEY_RESIZE:
+                continue
+
+            # Actions and popups wait for their keys; only the idle loop
+            # above polls with TICK_MS.
+            stdscr.timeout(-1)
 
             # --- Key handling ---
             if key == ord("Q"):
                 if popup_confirm(stdscr, "Exit the app? (Y/n)"):
                     break
                 else:
+                    drawn_state = None
                     continue
             if key == 27:
                 current = 0
                 continue
             if key == curses.KEY_RIGHT:
                 current = (current + 1) % len(SCREENS)
+                vm.refresh_if_older(SCREENS[current], REFRESH_SECONDS)
                 continue
             if key == curses.KEY_LEFT:
                 current = (current - 1) % len(SCREENS)
+                vm.refresh_if_older(SCREENS[current], REFRESH_SECONDS)
+                continue
+
+            # Selection keys only move the cursor over the current snapshot;
+            # anything else may open a popup or change data, so the whole
+            # screen is redrawn and the snapshots reloaded afterwards.
+            if key in (curses.KEY_UP, curses.KEY_DOWN, curses.KEY_PPAGE, curses.KEY_NPAGE):
+                lst = lists.get(active_screen)
+                if lst is not None:
+                    page_rows = max(active_pane.getmaxyx()[0] - 4, 1)
+                    step = {curses.KEY_UP: -1, curses.KEY_DOWN: 1,
+                            curses.KEY_PPAGE: -page_rows,
+                            curses.KEY_NPAGE: page_rows}[key]
+                    if lst.move(step):
+                        # Near the edge of the loaded window: re-centre it.
+                        vm.request(active_screen, urgent=True)
                 continue
 
+            drawn_state = None
+
             if active_screen == "H":
                 if key == ord("S"):
                     start_day_tui(stdscr)
                 elif key == ord("?"):
                     show_help_popup(stdscr, current)
+                else:
+                    continue
             elif active_screen == "TSK":
-                max_idx = len(task_repository.query_tasks(
-                    status=None, show_completed=False, sort="priority")) - 1
-                if key == curses.KEY_DOWN:
-                    agenda_sel = min(agenda_sel + 1, max_idx)
-                elif key == curses.KEY_UP:
-                    agenda_sel = max(agenda_sel - 1, 0)
-                elif key == ord("?"):
+                if key == ord("?"):
                     show_help_popup(stdscr, current)
                 elif key == ord("a"):
                     add_task_tui(stdscr)
                 elif key == ord("q"):
                     quick_add_task_tui(stdscr)
                 elif key == ord("c"):
-                    clone_task_tui(stdscr, agenda_sel)
+                    clone_task_tui(stdscr, agenda.selected_id)
                 elif key == ord("F"):
-                    focus_mode_tui(stdscr, agenda_sel)
+                    focus_mode_tui(stdscr, agenda.selected_id)
                 elif key == ord("m"):
-                    set_task_reminder_tui(stdscr, agenda_sel)
+                    set_task_reminder_tui(stdscr, agenda.selected_id)
                 elif key == ord("d"):
-                    delete_task_tui(stdscr, agenda_sel)
+                    delete_task_tui(stdscr, agenda.selected_id)
                 elif key == ord("e"):
-                    edit_task_tui(stdscr, agenda_sel)
+                    edit_task_tui(stdscr, agenda.selected_id)
                 elif key == ord("v"):
-                    view_task_tui(stdscr, agenda_sel)
+                    view_task_tui(stdscr, agenda.selected_id)
                 elif key == ord("s"):
-                    start_task_tui(stdscr, agenda_sel)
+                    start_task_tui(stdscr, agenda.selected_id)
                 elif key == ord("p"):
                     stop_task_tui(stdscr)
                 elif key == ord("o"):
-                    done_task_tui(stdscr, agenda_sel)
+                    done_task_tui(stdscr, agenda.selected_id)
                 elif key == ord("f"):
                     cycle_task_filter(stdscr)
                 elif key == ord("r"):
-                    edit_recurrence_tui(stdscr, agenda_sel)
+                    edit_recurrence_tui(stdscr, agenda.selected_id)
                 elif key == ord("n"):
-                    edit_notes_tui(stdscr, agenda_sel)
+                    edit_notes_tui(stdscr, agenda.selected_id)
+                else:
+                    continue
 
             elif active_screen == "TM":
-                max_idx = len(
-                    time_repository.get_all_time_logs(since=None)) - 1
-                if key == curses.KEY_DOWN:
-                    time_sel = min(time_sel + 1, max_idx)
-                elif key == curses.KEY_UP:
-                    time_sel = max(time_sel - 1, 0)
-                elif key == ord("?"):
+                if key == ord("?"):
                     show_help_popup(stdscr, current)
                 elif key == ord("s"):
                     start_time_tui(stdscr)
@@ -217,13 +305,13 @@ def main(stdscr, show_status: bool = True):
                 elif key == ord("v"):
                     status_time_tui(stdscr)
                 elif key == ord("t") or key in (10, 13):
-                    view_time_entry_tui(stdscr, time_sel)
+                    view_time_entry_tui(stdscr, entries.selected_id)
                 elif key == ord("y"):
                     summary_time_tui(stdscr)
                 elif key == ord("e"):
-                    edit_time_entry_tui(stdscr, time_sel)
+                    edit_time_entry_tui(stdscr, entries.selected_id)
                 elif key == ord("x"):
-                    delete_time_entry_tui(stdscr, time_sel)
+                    delete_time_entry_tui(stdscr, entries.selected_id)
                 elif key == ord("w"):
                     stopwatch_tui(stdscr)
                 elif key == ord("W"):
@@ -234,31 +322,30 @@ def main(stdscr, show_status: bool = True):
                     set_time_period('month')
                 elif key == ord("A"):
                     set_time_period('all')
+                else:
+                    continue
 
             elif active_screen == "TRK":
-                max_idx = len(track_repository.get_all_trackers()) - 1
-                if key == curses.KEY_DOWN:
-                    tracker_sel = min(tracker_sel + 1, max_idx)
-                elif key == curses.KEY_UP:
-                    tracker_sel = max(tracker_sel - 1, 0)
-                elif key == ord("?"):
+                if key == ord("?"):
                     show_help_popup(stdscr, current)
                 elif key == ord("a"):
                     add_tracker_tui(stdscr)
                 elif key == ord("d"):
-                    delete_tracker_tui(stdscr, tracker_sel)
+                    delete_tracker_tui(stdscr, trackers.selected_id)
                 elif key == ord("e"):
-                    edit_tracker_tui(stdscr, tracker_sel)
+                    edit_tracker_tui(stdscr, trackers.selected_id)
                 elif key == ord("l"):
-                    log_entry_tui(stdscr, tracker_sel)
+                    log_tracker_entry_tui(stdscr, trackers.selected_id)
                 elif key == ord("v"):
-                    view_tracker_tui(stdscr, tracker_sel)
+                    view_tracker_tui(stdscr, trackers.selected_id)
                 elif key == ord("x"):
-                    delete_goal_tui(stdscr, tracker_sel)
+                    delete_goal_tui(stdscr, trackers.selected_id)
                 elif key == ord("V"):
-                    view_goals_list_tui(stdscr, tracker_sel)
+                    view_goals_list_tui(stdscr, trackers.selected_id)
                 elif key == ord("h"):
                     show_goals_help_tui(stdscr)
+                else:
+                    continue
 
             elif active_screen == "R":
                 if key == ord("?"):
@@ -274,13 +361,94 @@ def main(stdscr, show_status: bool = True):
                     draw_burndown(stdscr, 0)
                 elif key in (ord("q"), 27):
                     current = 0
+                continue
+            else:
+                continue
+
+            # Back to polling for the idle loop.
+            stdscr.timeout(TICK_MS)
+            vm.invalidate(first=active_screen)
     except Exception as e:
         tb = traceback.format_exc()
         log_error(f"UI Error: {str(e)}", tb)
+        stdscr.timeout(-1)
         popup_error(stdscr, e)
+    finally:
+        if vm is not None:
+            vm.stop()
+
 
+def load_home():
+    """Everything the Home tab shows (runs off the UI thread)."""
+    sections = []
 
-def draw_home(pane, h, w):
+    try:
+        tasks = task_repository.query_tasks(sort="priority")[:3]
+        if tasks:
+            top_items = [(t.title or "<no title>", None) for t in tasks]
+            sections.append(("Top Tasks:", top_items))
+
+    except Exception as e:
+        sections.append(("Tasks Error", [(str(e), None)]))
+
+    try:
+        time_info = []
+        active = time_repository.get_active_time_entry()
+        if active:
+            time_info.append((f">> {active.title}", None))
+        else:
+            logs = time_repository.get_all_time_logs()
+            if logs:
+                logs.sort(key=lambda l: str(l.end or l.start or ''), reverse=True)
+                last = logs[0]
+                mins = int(last.duration_minutes or 0)
+                time_info.append(
+                    (f"Last: {last.title} ({mins} min)", None))
+
+        if time_info:
+            sections.append(("Time:", time_info))
+    except Exception as e:
+        sections.append(("Time Error", [(str(e), None)]))
+
+    try:
+        trackers = track_repository.get_all_trackers()[-2:]
+        if trackers:
+            sections.append(
+                ("Recent Trackers:", [(t.title, None) for t in trackers]))
+    except Exception as e:
+        sections.append(("Trackers Error", [(str(e), None)]))
+
+    env_text = None
+    try:
+        env_weather = environment_repository.get_latest_environment_data(
+            'weather')
+        env_air = environment_repository.get_latest_environment_data(
+            'air_quality')
+        env_moon = environment_repository.get_latest_environment_data(
+            'moon')
+
+        if any([env_weather, env_air, env_moon]):
+            weather = env_weather.get(
+                'summary', 'N/A') if env_weather else 'N/A'
+            aqi = env_air.get('index', 'N/A') if env_air else 'N/A'
+            moon = env_moon.get('phase', 'N/A') if env_moon else 'N/A'
+
+            env_text = f"Weather: {weather} | AQI: {aqi} | Moon: {moon}"
+    except Exception as e:
+        env_text = f"Env error: {e}"
+
+    try:
+        devices = get_all_api_devices()[:3]
+    except Exception as e:
+        devices = e
+
+    return {"sections": sections, "env": env_text, "devices": devices}
+
+
+def draw_home(pane, h, w, data=None):
+    if data is None:
+        data = load_home()
+    max_w = w
     try:
         pane.erase()
         max_h, max_w = pane.getmaxyx()
@@ -290,46 +458,7 @@ def draw_home(pane, h, w):
                     title, curses.A_BOLD)
 
         y = 2
-        sections = []
-
-        try:
-            tasks = task_repository.query_tasks(sort="priority")[:3]
-            if tasks:
-                top_items = [(t.title or "<no title>", None) for t in tasks]
-                sections.append(("Top Tasks:", top_items))
-
-        except Exception as e:
-            sections.append(("Tasks Error", [(str(e), None)]))
-
-        try:
-            time_info = []
-            active = time_repository.get_active_time_entry()
-            if active:
-                time_info.append((f">> {active.title}", None))
-            else:
-                logs = time_repository.get_all_time_logs()
-                if logs:
-                    logs.sort(key=lambda l: l.get(
-                        'end', l.get('start', '')), reverse=True)
-                    last = logs[0]
-                    mins = int(last.get('duration_minutes', 0))
-                    time_info.append(
-                        (f"Last: {last.title} ({mins} min)", None))
-
-            if time_info:
-                sections.append(("Time:", time_info))
-        except Exception as e:
-            sections.append(("Time Error", [str(e)]))
-
-        try:
-            trackers = track_repository.get_all_trackers()[-2:]
-            if trackers:
-                sections.append(
-                    ("Recent Trackers:", [(t['title'], None) for t in trackers]))
-        except Exception as e:
-            sections.append(("Trackers Error", [str(e)]))
-
-        for header, items in sections:
+        for header, items in data["sections"]:
             if y >= max_h - 4:
                 break
 
@@ -339,53 +468,31 @@ def draw_home(pane, h, w):
             for text, attr in items:
                 if y >= max_h - 3:
                     break
-                safe_addstr(pane, y, 4, text[:max_w-8], attr)
+                safe_addstr(pane, y, 4, text[:max_w-8], attr or 0)
                 y += 1
             y += 1
 
-        try:
-            if y <= max_h - 6:
-                env_y = max_h - 5
-                env_weather = environment_repository.get_latest_environment_data(
-                    'weather')
-                env_air = environment_repository.get_latest_environment_data(
-                    'air_quality')
-                env_moon = environment_repository.get_latest_environment_data(
-                    'moon')
-
-                if any([env_weather, env_air, env_moon]):
-                    weather = env_weather.get(
-                        'summary', 'N/A') if env_weather else 'N/A'
-                    aqi = env_air.get('index', 'N/A') if env_air else 'N/A'
-                    moon = env_moon.get('phase', 'N/A') if env_moon else 'N/A'
-
-                    env_text = f"Weather: {weather} | AQI: {aqi} | Moon: {moon}"
-                    safe_addstr(pane, env_y, 2, env_text[:max_w-4])
-        except Exception as e:
-            if y <= max_h - 5:
-                safe_addstr(pane, max_h - 5, 2,
-                            f"Env error: {str(e)[:max_w-4]}")
-
-        try:
-            if y <= max_h - 7:
-                devices_y = max_h - 7
-                devices = get_all_api_devices()
-                if devices:
-                    safe_addstr(pane, devices_y, 2,
-                                "Paired Devices:", curses.A_UNDERLINE)
-                    device_line_y = devices_y + 1
-                    for d in devices[:3]:
-                        if device_line_y >= max_h - 2:
-                            break
-                        paired_at = d.get('paired_at', '')
-                        display_time = paired_at[:16] if paired_at else "unknown"
-                        safe_addstr(pane, device_line_y, 4,
-                                    f"{d['device_name']} @ {display_time}"[:max_w-8])
-                        device_line_y += 1
-        except Exception as e:
-            if y <= max_h - 7:
-                safe_addstr(pane, max_h - 7, 2,
-                            f"Devices error: {str(e)[:max_w-4]}")
+        if data["env"] and y <= max_h - 6:
+            safe_addstr(pane, max_h - 5, 2, data["env"][:max_w-4])
+
+        devices = data["devices"]
+        if y <= max_h - 7:
+            devices_y = max_h - 7
+            if isinstance(devices, Exception):
+                safe_addstr(pane, devices_y, 2,
+                            f"Devices error: {str(devices)[:max_w-4]}")
+            elif devices:
+                safe_addstr(pane, devices_y, 2,
+                            "Paired Devices:", curses.A_UNDERLINE)
+                device_line_y = devices_y + 1
+                for d in devices:
+                    if device_line_y >= max_h - 2:
+                        break
+                    paired_at = d.get('paired_at', '')
+                    display_time = paired_at[:16] if paired_at else "unknown"
+                    safe_addstr(pane, device_line_y, 4,
+                                f"{d['device_name']} @ {display_time}"[:max_w-8])
+                    device_line_y += 1
 
         footer_y = max_h - 2
         safe_addstr(pane, footer_y, 2,
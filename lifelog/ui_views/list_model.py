@@ -0,0 +1,123 @@
+# lifelog/ui_views/list_model.py
+"""
+Windowed list model for the TUI.
+
+A ListWindow holds only a window of rows around the selection (the visible
+rows plus a prefetch margin on each side), read through a KeysetQuery, and
+remembers the selection by row id and sort key rather than by position.
+Moving the cursor works on the current window without touching the
+database; when it comes within `margin` rows of either edge, the caller
+queues a reload, which re-centres the window on the selected row.
+
+`load()` runs on the view-model worker thread; everything else runs on the
+UI thread and only reads the last published page. A load reads the
+selection once at the start and moves it (to the successor of a row that
+left the list) only if the cursor did not move while it ran, so a keypress
+during a reload is never overwritten.
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+from lifelog.utils.db.paging import Key, KeysetQuery
+
+
+@dataclass(frozen=True)
+class ListPage:
+    rows: List[Any] = field(default_factory=list)
+    keys: List[Key] = field(default_factory=list)
+    offset: int = 0      # absolute position of rows[0] in the full list
+    total: int = 0
+
+
+class ListWindow:
+    """Selection plus a keyset-paged window over a possibly long list."""
+
+    def __init__(self, query_factory: Callable[[], KeysetQuery],
+                 window: int = 120, margin: int = 20):
+        self._factory = query_factory
+        self.window = window
+        self.margin = margin
+        self.page = ListPage()
+        self.selected_id: Optional[Any] = None
+        self._selected_key: Optional[Key] = None
+        self._lock = threading.Lock()
+        self._moves = 0      # bumped by move(); see load()
+
+    # ─── worker thread ───
+
+    def load(self) -> ListPage:
+        """Fetch the window around the selected row and publish it."""
+        with self._lock:
+            selected_id, selected_key, moves = self.selected_id, self._selected_key, self._moves
+        query = self._factory()
+        total = query.count()
+        key = None
+        if selected_id is not None:
+            # Re-resolve: the row's sort key may have changed since it was drawn.
+            key = query.key_for(selected_id) or selected_key
+
+        if key is None:
+            before: List[Tuple[Key, Any]] = []
+            after = query.page(None, self.window)
+            offset = 0
+        else:
+            before = query.page(key, self.window // 2, backwards=True)
+            after = query.page(key, self.window - len(before), inclusive=True)
+            offset = query.count(before=key) - len(before)
+
+        pairs = before + after
+        page = ListPage(rows=[obj for _, obj in pairs], keys=[k for k, _ in pairs],
+                        offset=max(offset, 0), total=total)
+
+        ids = [getattr(obj, "id", None) for obj in page.rows]
+        with self._lock:
+            if self._moves == moves and selected_id not in ids:
+                # The selected row left the list: select its successor.
+                pick = after or before[-1:]
+                if pick:
+                    self.selected_id = getattr(pick[0][1], "id", None)
+                    self._selected_key = pick[0][0]
+                else:
+                    self.selected_id = self._selected_key = None
+            self.page = page
+        return page
+
+    # ─── UI thread ───
+
+    def index(self, page: Optional[ListPage] = None) -> int:
+        """Position of the selection within `page` (the current one by default)."""
+        page = page or self.page
+        for i, obj in enumerate(page.rows):
+            if getattr(obj, "id", None) == self.selected_id:
+                return i
+        return 0
+
+    def selected(self) -> Optional[Any]:
+        page = self.page
+        return page.rows[self.index(page)] if page.rows else None
+
+    def move(self, step: int) -> bool:
+        """
+        Move the selection by `step` rows within the loaded window.
+        Returns True when the window should be reloaded around it.
+        """
+        with self._lock:
+            page = self.page
+            if not page.rows:
+                return False
+            i = max(0, min(self.index(page) + step, len(page.rows) - 1))
+            self.selected_id = getattr(page.rows[i], "id", None)
+            self._selected_key = page.keys[i]
+            self._moves += 1
+        near_top = i < self.margin and page.offset > 0
+        near_bottom = (len(page.rows) - 1 - i < self.margin
+                       and page.offset + len(page.rows) < page.total)
+        return near_top or near_bottom
+
+    def visible(self, rows: int, page: Optional[ListPage] = None) -> Tuple[int, List[Any]]:
+        """(first index, rows) of the slice to draw so the selection is centred."""
+        page = page or self.page
+        i = self.index(page)
+        start = max(0, min(i - rows // 2, len(page.rows) - rows))
+        return start, page.rows[start:start + rows]
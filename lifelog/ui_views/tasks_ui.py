@@ -11,8 +11,9 @@ import re
 
 from lifelog.utils.db.models import Task
 from lifelog.commands.task_module import create_due_alert
-from lifelog.utils.db import task_repository, time_repository
+from lifelog.utils.db import task_repository, task_time, time_repository
 from lifelog.ui_views.popups import popup_confirm, popup_error, popup_input, popup_multiline_input, popup_show
+from lifelog.ui_views.list_model import ListWindow
 from lifelog.ui_views.ui_helpers import log_exception, safe_addstr
 from lifelog.ui_views.forms import TaskCloneForm, TaskEditForm, TaskForm, TaskViewForm, run_form
 from lifelog.utils.hooks import run_hooks
@@ -24,7 +25,36 @@ TASK_FILTERS = ["backlog", "active", "done"]
 current_filter_idx = 0
 
 
-def draw_agenda(pane, h, w, selected_idx):
+def _agenda_filters():
+    """query_tasks filters for the current agenda filter."""
+    # e.g., "backlog", "active", "done"
+    status_filter = TASK_FILTERS[current_filter_idx]
+    if status_filter == "done":
+        return {"status": "done", "show_completed": True}
+    return {"status": status_filter}
+
+
+def make_agenda_list():
+    """Windowed, keyset-paged task list backing the agenda."""
+    return ListWindow(lambda: task_repository.task_keyset(
+        sort="priority", **_agenda_filters()))
+
+
+def load_agenda(agenda):
+    """
+    Refresh the agenda window and the calendar's due days. Runs off the UI
+    thread; returns the due days for draw_agenda.
+    """
+    agenda.load()
+    now = now_local()
+    return set(task_repository.get_due_days(now.year, now.month, **_agenda_filters()))
+
+
+def draw_agenda(pane, h, w, agenda, due_days=()):
+    """
+    Draw the calendar and the visible slice of `agenda` (a ListWindow
+    loaded by load_agenda).
+    """
     try:
         pane.erase()
         max_h, max_w = pane.getmaxyx()
@@ -33,40 +63,12 @@ def draw_agenda(pane, h, w, selected_idx):
         safe_addstr(pane, 0, max((max_w - len(title)) // 2, 1),
                     title, curses.A_BOLD)
         now = now_local()
+        page = agenda.page
+        due_days = set(due_days or ())
 
-        # Determine filter
-        # e.g., "backlog", "active", "done"
-        status_filter = TASK_FILTERS[current_filter_idx]
-        show_completed = (status_filter == "done")
-        # If you want only backlog/active when status_filter != "done":
-        try:
-            tasks = task_repository.query_tasks(
-                show_completed=show_completed,
-                sort="priority"
-            )
-        except Exception as db_err:
-            popup_error(pane, f"Failed to load tasks: {db_err}")
-            return 0
-
-        if status_filter in ("backlog", "active"):
-            tasks = [t for t in tasks if getattr(
-                t, "status", None) == status_filter]
         # --- CALENDAR PANEL ---
         cal = calendar.TextCalendar(firstweekday=0)
         month_lines = cal.formatmonth(now.year, now.month).splitlines()
-        due_days = set()
-        for t in tasks:
-            due_val = getattr(t, "due", None)
-            if due_val:
-                if isinstance(due_val, datetime):
-                    due_dt = due_val
-                else:
-                    try:
-                        due_dt = datetime.fromisoformat(due_val)
-                    except Exception:
-                        continue
-                if due_dt.year == now.year and due_dt.month == now.month:
-                    due_days.add(due_dt.day)
         calendar_pad_top = 2
         calendar_pad_left = 2
         for i, line in enumerate(month_lines):
@@ -89,12 +91,13 @@ def draw_agenda(pane, h, w, selected_idx):
         cal_panel_height = calendar_pad_top + len(month_lines) + 1
 
         # --- TASK LIST ---
-        n = len(tasks)
+        n = len(page.rows)
         visible_rows = max_h - cal_panel_height - 5
         if visible_rows < 1:
             visible_rows = 1
 
-        safe_addstr(pane, cal_panel_height, 2, "Tasks:", curses.A_UNDERLINE)
+        header = f"Tasks ({page.offset + agenda.index(page) + 1}/{page.total}):" if n else "Tasks:"
+        safe_addstr(pane, cal_panel_height, 2, header, curses.A_UNDERLINE)
         task_win_left = 2
         task_win_top = cal_panel_height + 1
 
@@ -102,16 +105,15 @@ def draw_agenda(pane, h, w, selected_idx):
             safe_addstr(pane, task_win_top, task_win_left,
                         "(no tasks)", curses.A_DIM)
         else:
-            selected_idx = max(0, min(selected_idx, n-1))
-            start = max(0, selected_idx - visible_rows // 2)
-            end = min(start + visible_rows, n)
+            selected_idx = agenda.index(page)
+            start, shown = agenda.visible(visible_rows, page)
             # Clear area
             for i in range(visible_rows):
                 y = task_win_top + i
                 if y < max_h - 2:
                     safe_addstr(pane, y, task_win_left, " " * (max_w//2-4))
             # Draw tasks
-            for i, t in enumerate(tasks[start:end], start=start):
+            for i, t in enumerate(shown, start=start):
                 is_sel = (i == selected_idx)
                 attr = curses.A_REVERSE if is_sel else curses.A_NORMAL
                 id_val = getattr(t, "id", None)
@@ -127,7 +129,7 @@ def draw_agenda(pane, h, w, selected_idx):
             if max_w > 40:
                 preview_left = max_w//2 + 2
                 detail_y = cal_panel_height
-                t = tasks[selected_idx]
+                t = page.rows[selected_idx]
                 # Build preview lines via attribute access:
                 id_val = getattr(t, "id", None)
                 line_id = f"ID: {id_val}" if id_val is not None else "ID: -"
@@ -177,13 +179,19 @@ def draw_agenda(pane, h, w, selected_idx):
                                     line[:max_w//2-6])
 
         pane.noutrefresh()
-        return selected_idx
     except Exception as e:
         log_exception("draw_agenda", e)
         max_h, _ = pane.getmaxyx()
         safe_addstr(pane, max_h-2, 2, f"Agenda err: {e}", curses.A_BOLD)
         pane.noutrefresh()
-        return 0
+
+
+def _get_selected_task(stdscr, task_id):
+    """Resolve the agenda selection (a task id) to a Task, or report it missing."""
+    t = task_repository.get_task_by_id(task_id) if task_id is not None else None
+    if t is None:
+        popup_show(stdscr, ["No task selected"], title="Error")
+    return t
 
 
 # --- Main Add Task using Form ---
@@ -298,12 +306,10 @@ def batch_add_tasks_tui(stdscr):
 # --- Clone Task with Form ---
 
 
-def clone_task_tui(_stdscr, sel):
-    tasks = task_repository.get_all_tasks()
-    if sel < 0 or sel >= len(tasks):
-        popup_show(_stdscr, ["No tasks to clone"], title="Error")
+def clone_task_tui(_stdscr, task_id):
+    t = _get_selected_task(_stdscr, task_id)
+    if t is None:
         return
-    t = tasks[sel]
     # Use the modular TaskCloneForm, pre-filling values:
 
     class App(npyscreen.NPSAppManaged):
@@ -344,12 +350,10 @@ def clone_task_tui(_stdscr, sel):
 # --- Edit Task with Form ---
 
 
-def edit_task_tui(_stdscr, sel):
-    tasks = task_repository.get_all_tasks()
-    if sel < 0 or sel >= len(tasks):
-        popup_show(_stdscr, ["No task selected"], title="Error")
+def edit_task_tui(_stdscr, task_id):
+    t = _get_selected_task(_stdscr, task_id)
+    if t is None:
         return
-    t = tasks[sel]
 
     class App(npyscreen.NPSAppManaged):
         def onStart(selfx):
@@ -467,12 +471,10 @@ def edit_task_tui(_stdscr, sel):
 # --- View Task with Form (read-only) ---
 
 
-def view_task_tui(_stdscr, sel):
-    tasks = task_repository.get_all_tasks()
-    if sel < 0 or sel >= len(tasks):
-        popup_show(_stdscr, ["No task selected"], title="Error")
+def view_task_tui(_stdscr, task_id):
+    t = _get_selected_task(_stdscr, task_id)
+    if t is None:
         return
-    t = tasks[sel]
 
     class App(npyscreen.NPSAppManaged):
         def onStart(selfx):
@@ -569,7 +571,7 @@ def countdown_timer_ui(stdscr, total_seconds, title="Focus Session"):
     return completed
 
 
-def focus_mode_tui(stdscr, sel):
+def focus_mode_tui(stdscr, task_id):
     """
     Robust distraction-free focus mode for a task.
     - Locks keys so only pause or mark done will exit.
@@ -579,11 +581,9 @@ def focus_mode_tui(stdscr, sel):
     import time as _time
     from datetime import datetime as _datetime
 
-    tasks = task_repository.query_tasks(show_completed=False, sort="priority")
-    if sel < 0 or sel >= len(tasks):
-        popup_show(stdscr, ["No task selected"], title="Error")
+    t = _get_selected_task(stdscr, task_id)
+    if t is None:
         return
-    t = tasks[sel]
 
     # --- Start timer if not running for this task
     active = time_repository.get_active_time_entry()
@@ -611,16 +611,9 @@ def focus_mode_tui(stdscr, sel):
     else:
         timer_started = False
 
-    # Helper: total time for this task (sum of durations from TimeLog instances)
+    # Helper: total time for this task (finished entries, from the totals table)
     def get_total_task_time():
-        logs = time_repository.get_all_time_logs()
-        total = 0
-        for e in logs:
-            if getattr(e, "task_id", None) == t.id:
-                dur = getattr(e, "duration_minutes", None)
-                if dur:
-                    total += dur
-        return int(total)
+        return int(task_time.get_task_time(t.id)["total_minutes"])
 
     # Pomodoro settings
     pomodoro_mode = False
@@ -702,7 +695,7 @@ def focus_mode_tui(stdscr, sel):
             break
         if c == ord("d"):
             # Mark done
-            done_task_tui(stdscr, sel)
+            done_task_tui(stdscr, t.id)
             break
         if c == ord("P"):
             pomodoro_mode = not pomodoro_mode
@@ -732,15 +725,13 @@ def focus_mode_tui(stdscr, sel):
     stdscr.nodelay(False)
 
 
-def set_task_reminder_tui(stdscr, sel):
+def set_task_reminder_tui(stdscr, task_id):
     """
     Set a custom reminder for a task via popup, using user-specified offset.
     """
-    tasks = task_repository.query_tasks(show_completed=False, sort="priority")
-    if sel < 0 or sel >= len(tasks):
-        popup_show(stdscr, ["No task selected"], title="Error")
+    t = _get_selected_task(stdscr, task_id)
+    if t is None:
         return
-    t = tasks[sel]
 
     # Check due date:
     due = getattr(t, "due", None)
@@ -768,16 +759,11 @@ def set_task_reminder_tui(stdscr, sel):
         log_exception("set_task_reminder_tui", e)
 
 
-def delete_task_tui(stdscr, sel):
-    tasks = task_repository.query_tasks(show_completed=False, sort="priority")
-    # Guard: no tasks to delete
-    if not tasks:
-        return popup_show(stdscr, ["No tasks to delete"])
-    # Guard: sel out of range
-    if sel < 0 or sel >= len(tasks):
-        return popup_show(stdscr, ["No task selected"])
-
-    tid = tasks[sel].id
+def delete_task_tui(stdscr, task_id):
+    t = _get_selected_task(stdscr, task_id)
+    if t is None:
+        return
+    tid = t.id
     if popup_confirm(stdscr, f"Delete task #{tid}?"):
         try:
             task_repository.delete_task(tid)
@@ -787,12 +773,10 @@ def delete_task_tui(stdscr, sel):
             log_exception("delete_task_tui", e)
 
 
-def edit_recurrence_tui(stdscr, sel):
-    tasks = task_repository.query_tasks(show_completed=False, sort="priority")
-    if sel < 0 or sel >= len(tasks):
-        popup_show(stdscr, ["No task selected"], title="Error")
+def edit_recurrence_tui(stdscr, task_id):
+    t = _get_selected_task(stdscr, task_id)
+    if t is None:
         return
-    t = tasks[sel]
 
     # Get current recurrence or defaults
     rec = getattr(t, "recurrence", {}) or {}
@@ -877,12 +861,13 @@ def edit_recurrence_tui(stdscr, sel):
         log_exception("edit_recurrence_tui", e)
 
 
-def edit_notes_tui(stdscr, sel):
+def edit_notes_tui(stdscr, task_id):
     """
     Edit notes for the selected task, multi-line popup for convenience.
     """
-    tasks = task_repository.query_tasks(show_completed=False, sort="priority")
-    t = tasks[sel]
+    t = _get_selected_task(stdscr, task_id)
+    if t is None:
+        return
     current = t.notes or ""
     note = popup_multiline_input(
         stdscr, "Edit Notes (Ctrl+D=save, ESC=cancel):", initial=current)
@@ -897,22 +882,20 @@ def edit_notes_tui(stdscr, sel):
 def cycle_task_filter(stdscr):
     """
     Cycle through TASK_FILTERS and show the new filter.
-    draw_agenda() must read this state.
+    The agenda loader must read this state.
     """
     global current_filter_idx
     current_filter_idx = (current_filter_idx + 1) % len(TASK_FILTERS)
     popup_show(stdscr, [f"Filter: {TASK_FILTERS[current_filter_idx]}"])
 
 
-def start_task_tui(stdscr, sel):
+def start_task_tui(stdscr, task_id):
     """
     Starts timing the selected task. Optionally lets user update tags/notes.
     """
-    tasks = task_repository.query_tasks(show_completed=False, sort="priority")
-    if sel < 0 or sel >= len(tasks):
-        popup_show(stdscr, ["No task selected"], title="Error")
+    t = _get_selected_task(stdscr, task_id)
+    if t is None:
         return
-    t = tasks[sel]
 
     # Prompt for tags (show existing or empty)
     existing_tags = t.tags or ""
@@ -1027,15 +1010,13 @@ def stop_task_tui(stdscr):
         log_exception("stop_task_tui", e)
 
 
-def done_task_tui(stdscr, sel):
+def done_task_tui(stdscr, task_id):
     """
     Marks the selected task as done, prompts for tags/notes, stops timing if running.
     """
-    tasks = task_repository.query_tasks(show_completed=False, sort="priority")
-    if sel < 0 or sel >= len(tasks):
-        popup_show(stdscr, ["No task selected"], title="Error")
+    t = _get_selected_task(stdscr, task_id)
+    if t is None:
         return
-    t = tasks[sel]
 
     # Prompt for tags
     existing_tags = t.tags or ""
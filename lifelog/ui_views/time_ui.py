@@ -11,6 +11,7 @@ from lifelog.utils.db.models import TimeLog
 from lifelog.utils.db import time_repository
 from lifelog.utils.shared_utils import add_category_to_config, add_project_to_config, get_available_categories, get_available_projects, now_local, now_utc, parse_date_string
 from lifelog.ui_views.popups import popup_confirm, popup_input, popup_multiline_input, popup_select_option, popup_show
+from lifelog.ui_views.list_model import ListWindow
 from lifelog.ui_views.ui_helpers import safe_addstr
 from lifelog.ui_views.forms import TimeEntryForm, run_form
 
@@ -56,17 +57,33 @@ def get_since_from_period(period):
         return now - timedelta(days=365*10)
 
 
-def draw_time(pane, h, w, selected_idx):
+def make_time_list():
+    """Windowed, keyset-paged list of the entries in the current period."""
+    return ListWindow(lambda: time_repository.time_log_keyset(
+        since=get_since_from_period(get_time_period())))
+
+
+def load_time(entries):
     """
-    Draw the active timer (if any) and recent time entries in the UI pane.
-    Uses TimeLog dataclass attributes.
+    Refresh the entry window and the active timer. Runs off the UI thread;
+    returns the rest of the snapshot for draw_time.
+    """
+    period = get_time_period()
+    entries.load()
+    return {"period": period, "active": time_repository.get_active_time_entry()}
+
+
+def draw_time(pane, h, w, entries, data):
+    """
+    Draw the active timer (if any) and the visible slice of `entries`
+    (a ListWindow loaded by load_time). Uses TimeLog dataclass attributes.
     """
     try:
         pane.erase()
         max_h, max_w = pane.getmaxyx()
         pane.border()
         title = " Time "
-        period = get_time_period()
+        period = data["period"]
         period_title = {
             'day': ' (last 24h)',
             'week': ' (last 7 days)',
@@ -77,7 +94,7 @@ def draw_time(pane, h, w, selected_idx):
                     title + period_title, curses.A_BOLD)
 
         y = 2
-        active = time_repository.get_active_time_entry()
+        active = data["active"]
         if active:
             start_dt = getattr(active, "start", None)
             if isinstance(start_dt, datetime):
@@ -88,21 +105,17 @@ def draw_time(pane, h, w, selected_idx):
                 pane, y, 2, f"▶ {active.title} ({int(elapsed)} min)", curses.A_BOLD)
             y += 2
 
-        since = get_since_from_period(period)
-        # Repository returns list of TimeLog instances
-        logs = time_repository.get_all_time_logs(since=since)
-        n = len(logs)
+        page = entries.page
+        n = len(page.rows)
         if n == 0:
             safe_addstr(pane, y, 2, "(no history)")
             pane.noutrefresh()
-            return 0
+            return
 
-        # Clamp selected_idx
-        selected_idx = max(0, min(selected_idx, n - 1))
+        selected_idx = entries.index(page)
         visible_rows = max_h - y - 2
-        start = max(0, selected_idx - visible_rows // 2)
-        end = min(start + visible_rows, n)
-        for i, r in enumerate(logs[start:end], start=start):
+        start, shown = entries.visible(visible_rows, page)
+        for i, r in enumerate(shown, start=start):
             duration = getattr(r, "duration_minutes", None) or 0
             m = int(duration)
             title_str = r.title or ""
@@ -112,12 +125,10 @@ def draw_time(pane, h, w, selected_idx):
                 attr = curses.A_REVERSE if i == selected_idx else curses.A_NORMAL
                 safe_addstr(pane, row_y, 2, line[:max_w - 4], attr)
         pane.noutrefresh()
-        return selected_idx
     except Exception as e:
         # On exception, show message at bottom
         safe_addstr(pane, h - 2, 2, f"Time err: {e}", curses.A_BOLD)
         pane.noutrefresh()
-        return 0
 
 
 # ——— Start Timer ———
@@ -257,23 +268,19 @@ def add_manual_time_entry_tui(_stdscr=None):
         npyscreen.notify_confirm(f"Error: {e}", title="Time Entry Error")
 
 
-def edit_time_entry_tui(_stdscr, sel):
+def edit_time_entry_tui(_stdscr, entry_id):
     """
     Edit an existing time entry via TimeEntryForm.
-    sel: index in the list returned by get_all_time_logs.
+    entry_id: id of the selected time_history row.
     """
-    # Fetch recent logs (past year)
     try:
-        logs = time_repository.get_all_time_logs(
-            since=now_utc() - timedelta(days=365))
+        entry = time_repository.get_time_log_by_id(entry_id) if entry_id is not None else None
     except Exception as e:
-        popup_show(_stdscr, [f"Error fetching logs: {e}"], title="Error")
+        popup_show(_stdscr, [f"Error fetching entry: {e}"], title="Error")
         return
-
-    if not (0 <= sel < len(logs)):
-        popup_show(_stdscr, [f"Invalid selection {sel}"], title="Error")
+    if entry is None:
+        popup_show(_stdscr, ["No entry selected"], title="Error")
         return
-    entry = logs[sel]
 
     # Prefill form with existing entry data
     class EditApp(npyscreen.NPSAppManaged):
@@ -407,21 +414,18 @@ def add_distracted_time_tui(stdscr):
                f"Added {mins} distracted min (Total distracted: {new_distracted} min)"])
 
 
-def delete_time_entry_tui(stdscr, sel):
+def delete_time_entry_tui(stdscr, entry_id):
     """
     Delete a selected time entry.
     """
     try:
-        logs = time_repository.get_all_time_logs(
-            since=now_utc() - timedelta(days=365))
+        entry = time_repository.get_time_log_by_id(entry_id) if entry_id is not None else None
     except Exception as e:
-        popup_show(stdscr, [f"Error fetching logs: {e}"], title="Error")
+        popup_show(stdscr, [f"Error fetching entry: {e}"], title="Error")
         return
-
-    if not (0 <= sel < len(logs)):
-        popup_show(stdscr, [f"Invalid selection {sel}"], title="Error")
+    if entry is None:
+        popup_show(stdscr, ["No entry selected"], title="Error")
         return
-    entry = logs[sel]
     if popup_confirm(stdscr, f"Delete entry #{entry.id}?"):
         try:
             time_repository.delete_time_entry(entry.id)
@@ -508,21 +512,18 @@ def stop_time_tui(stdscr):
     )
 
 
-def view_time_entry_tui(stdscr, sel):
+def view_time_entry_tui(stdscr, entry_id):
     """
     Show details of a time entry.
     """
     try:
-        logs = time_repository.get_all_time_logs(
-            since=now_utc() - timedelta(days=365))
+        entry = time_repository.get_time_log_by_id(entry_id) if entry_id is not None else None
     except Exception as e:
-        popup_show(stdscr, [f"Error fetching logs: {e}"], title="Error")
+        popup_show(stdscr, [f"Error fetching entry: {e}"], title="Error")
         return
-
-    if not (0 <= sel < len(logs)):
-        popup_show(stdscr, [f"Invalid selection {sel}"], title="Error")
+    if entry is None:
+        popup_show(stdscr, ["No entry selected"], title="Error")
         return
-    entry = logs[sel]
     # Format start/end as strings if datetime
     if isinstance(entry.start, datetime):
         start_str = entry.start.strftime("%Y-%m-%d %H:%M")
@@ -14,33 +14,86 @@ from lifelog.utils.goal_util import get_description_for_goal_kind
 from lifelog.utils.db import track_repository
 from lifelog.utils.shared_utils import add_category_to_config, filter_entries_for_current_period, get_available_categories, get_available_tags, now_utc, parse_date_string
 from lifelog.ui_views.popups import popup_confirm, popup_input, popup_select_option, popup_show
+from lifelog.ui_views.list_model import ListWindow
 from lifelog.ui_views.ui_helpers import log_exception, safe_addstr, tag_picker_tui
 from lifelog.ui_views.forms import GoalDetailForm, TrackerEntryForm, TrackerForm, run_form, run_goal_form
 from lifelog.utils.hooks import run_hooks
 
 
-def draw_trackers(pane, h, w, selected_idx, color_pair=None):
+def _goal_status(goal, entries):
+    """Short progress summary for one goal."""
+    # Filter entries by the goal’s period (day/week/month/all)
+    df = filter_entries_for_current_period(
+        [e.__dict__ for e in entries], period=goal.period
+    )
+
+    # Compute a simple progress summary
+    if goal.kind == "range":
+        # assume goal.amount is upper bound
+        current = df['value'].iloc[-1] if not df.empty else 0
+        return f"{current}/{goal.amount}"
+    elif goal.kind in ("count", "percentage"):
+        count = len(df)
+        target = goal.target or goal.amount
+        return f"{count}/{target}"
+    # fallback: show last value
+    return df['value'].iloc[-1] if not df.empty else "-"
+
+
+def make_tracker_list():
+    """Windowed, keyset-paged tracker list."""
+    return ListWindow(track_repository.tracker_keyset)
+
+
+def load_trackers(trackers):
+    """
+    Refresh the tracker window and the goal progress lines of the trackers
+    in it, as {tracker id: [line, ...]}. Runs off the UI thread: goal
+    progress needs every entry of the tracker.
+    """
+    page = trackers.load()
+    goal_lines = {}
+    for tracker in page.rows:
+        lines = []
+        goals = track_repository.get_goals_for_tracker(tracker.id)
+        if goals:
+            # Fetch all entries once, then filter per goal
+            entries = track_repository.get_entries_for_tracker(tracker.id)
+            for goal in goals:
+                status = _goal_status(goal, entries)
+                lines.append(f"   • {goal.title} [{goal.kind}] → {status}")
+        goal_lines[tracker.id] = lines
+    return goal_lines
+
+
+def draw_trackers(pane, h, w, trackers, goal_lines, color_pair=None):
     """
     pane: the curses window
     h, w: pane dimensions
-    selected_idx: which tracker is highlighted
+    trackers: ListWindow loaded by load_trackers
+    goal_lines: goal progress lines per tracker id, from load_trackers
     color_pair: optional curses color-pair number
     """
     pane.erase()
     max_h, max_w = pane.getmaxyx()
     pane.border()
 
-    # Title :contentReference[oaicite:0]{index=0}
     title = " Trackers "
     safe_addstr(pane, 0, max((max_w - len(title)) // 2, 1),
                 title, curses.A_BOLD)
 
+    page = trackers.page
+    selected_idx = trackers.index(page)
+    # Rows have different heights (goal lines), so walk back from the
+    # selection until half the pane is used.
+    start, used = selected_idx, 0
+    while start > 0 and used + 1 + len(goal_lines.get(page.rows[start - 1].id, [])) <= (max_h - 3) // 2:
+        start -= 1
+        used += 1 + len(goal_lines.get(page.rows[start].id, []))
+
     # Start drawing items two rows down
     y = 2
-    # :contentReference[oaicite:1]{index=1}
-    trackers = track_repository.get_all_trackers()
-
-    for i, tracker in enumerate(trackers):
+    for i, tracker in enumerate(page.rows[start:], start=start):
         if y >= max_h - 1:
             break  # no more room
 
@@ -50,41 +103,14 @@ def draw_trackers(pane, h, w, selected_idx, color_pair=None):
         attr = curses.color_pair(color_pair) if (i == selected_idx and color_pair) else \
             curses.A_REVERSE if i == selected_idx else curses.A_NORMAL
 
-        # Draw tracker :contentReference[oaicite:2]{index=2}
         safe_addstr(pane, y, 2, line[:max_w-4], attr)
         y += 1
 
-        # Now fetch and render any goals for this tracker
-        goals = track_repository.get_goals_for_tracker(
-            tracker.id)  # :contentReference[oaicite:3]{index=3}
-        if goals:
-            # Fetch all entries once, then filter per goal
-            entries = track_repository.get_entries_for_tracker(tracker.id)
-            for goal in goals:
-                if y >= max_h - 1:
-                    break
-
-                # Filter entries by the goal’s period (day/week/month/all) :contentReference[oaicite:4]{index=4}
-                df = filter_entries_for_current_period(
-                    [e.__dict__ for e in entries], period=goal.period
-                )
-
-                # Compute a simple progress summary
-                if goal.kind == "range":
-                    # assume goal.amount is upper bound
-                    current = df['value'].iloc[-1] if not df.empty else 0
-                    status = f"{current}/{goal.amount}"
-                elif goal.kind in ("count", "percentage"):
-                    count = len(df)
-                    target = goal.target or goal.amount
-                    status = f"{count}/{target}"
-                else:
-                    # fallback: show last value
-                    status = df['value'].iloc[-1] if not df.empty else "-"
-
-                goal_line = f"   • {goal.title} [{goal.kind}] → {status}"
-                safe_addstr(pane, y, 4, goal_line[:max_w-6], curses.A_DIM)
-                y += 1
+        for goal_line in goal_lines.get(tracker.id, []):
+            if y >= max_h - 1:
+                break
+            safe_addstr(pane, y, 4, goal_line[:max_w-6], curses.A_DIM)
+            y += 1
 
     pane.noutrefresh()
 
@@ -316,8 +342,10 @@ def log_tracker_entry_tui(stdscr, sel):
     popup_show(stdscr, [f"Entry logged for '{tracker.title}'."])
 
 
-def view_tracker_tui(stdscr, sel):
-    t = track_repository.get_all_trackers()[sel]
+def view_tracker_tui(stdscr, tracker_id):
+    t = track_repository.get_tracker_by_id(tracker_id)
+    if not t:
+        return popup_show(stdscr, [f"Tracker ID {tracker_id} not found."])
     goals = track_repository.get_goals_for_tracker(t.id)
     entries = track_repository.get_entries_for_tracker(t.id)
     lines = [
@@ -385,17 +413,16 @@ def draw_goal_progress_tui(stdscr, tracker):
         row_offset += 1
 
 
-def view_goal_tui(stdscr, tracker_sel, goal_idx=0):
+def view_goal_tui(stdscr, tracker_id, goal_idx=0):
     """
     Display details of a selected goal for a tracker.
-    tracker_sel: index in list of trackers
+    tracker_id: id of the selected tracker
     goal_idx: index in list of goals for that tracker
     """
     # Fetch tracker
-    trackers = track_repository.get_all_trackers()
-    if tracker_sel < 0 or tracker_sel >= len(trackers):
-        return popup_show(stdscr, [f"Invalid tracker selection: {tracker_sel}"])
-    t = trackers[tracker_sel]
+    t = track_repository.get_tracker_by_id(tracker_id)
+    if not t:
+        return popup_show(stdscr, [f"Tracker ID {tracker_id} not found."])
 
     # Fetch goals
     goals = track_repository.get_goals_for_tracker(t.id)
@@ -526,14 +553,13 @@ def view_goal_tui(stdscr, tracker_sel, goal_idx=0):
     popup_show(stdscr, lines, title=" Goal Details ")
 
 
-def view_goals_list_tui(stdscr, tracker_sel):
+def view_goals_list_tui(stdscr, tracker_id):
     """
     List all goals for selected tracker and allow viewing details.
     """
-    trackers = track_repository.get_all_trackers()
-    if tracker_sel < 0 or tracker_sel >= len(trackers):
-        return popup_show(stdscr, [f"Invalid tracker selection: {tracker_sel}"])
-    t = trackers[tracker_sel]
+    t = track_repository.get_tracker_by_id(tracker_id)
+    if not t:
+        return popup_show(stdscr, [f"Tracker ID {tracker_id} not found."])
     goals = track_repository.get_goals_for_tracker(t.id)
     if not goals:
         return popup_show(stdscr, ["No goals found"])
@@ -559,7 +585,7 @@ def view_goals_list_tui(stdscr, tracker_sel):
             break
         elif c in (10, 13):
             # view selected goal details
-            view_goal_tui(stdscr, tracker_sel, idx)
+            view_goal_tui(stdscr, tracker_id, idx)
         elif c == curses.KEY_DOWN:
             idx = min(idx + 1, len(goals) - 1)
         elif c == curses.KEY_UP:
@@ -776,9 +802,10 @@ def edit_goal_tui(stdscr, tracker_id, goal_id):
         npyscreen.notify_confirm("No changes made.", title="Edit Goal")
 
 
-def delete_goal_tui(stdscr, tracker_sel):
-    trackers = track_repository.get_all_trackers()
-    t = trackers[tracker_sel]
+def delete_goal_tui(stdscr, tracker_id):
+    t = track_repository.get_tracker_by_id(tracker_id)
+    if not t:
+        return popup_show(stdscr, [f"Tracker ID {tracker_id} not found."])
     goals = track_repository.get_goals_for_tracker(t.id)
     if not goals:
         return popup_show(stdscr, ["No goal to delete"])
@@ -35,7 +35,13 @@ def get_current_stdscr():
     return _current_stdscr
 
 
-def draw_status(stdscr, h, w, current_tab):
+def has_unread_notifications() -> bool:
+    profile = _ensure_profile()
+    return bool(get_unread_notifications(profile.id))
+
+
+def draw_status(stdscr, h, w, current_tab, unread=None):
+    """Draw the hint line; `unread` is queried when not supplied."""
     status_y = h - 1
     stdscr.attron(curses.color_pair(3))
     stdscr.hline(status_y, 0, " ", w)
@@ -56,8 +62,9 @@ def draw_status(stdscr, h, w, current_tab):
         hint = "←/→: Switch  ↑/↓: Move Q:Quit  ?:Help"
     stdscr.addstr(status_y, 1, hint[: w - 2])
     stdscr.attroff(curses.color_pair(3))
-    profile = _ensure_profile()
-    if get_unread_notifications(profile.id):
+    if unread is None:
+        unread = has_unread_notifications()
+    if unread:
         stdscr.addstr(status_y, w-2, "🔔")
 
 
@@ -0,0 +1,133 @@
+# lifelog/ui_views/view_model.py
+"""
+Background data loading for the TUI.
+
+Every tab has a loader that runs the repository queries (and, in client
+mode, whatever sync they trigger) on a worker thread and returns plain data.
+The main loop only ever reads the latest snapshot, so key presses never wait
+on SQLite or HTTP. `version` increases whenever a snapshot lands; the main
+loop compares it with what it last drew to decide whether to redraw.
+
+Loaders must not touch curses.
+"""
+import curses
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from lifelog.ui_views.ui_helpers import log_exception, safe_addstr
+
+SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+
+class ViewModel:
+    """Holds the latest snapshot per screen and refreshes them off-thread."""
+
+    def __init__(self, loaders: Dict[str, Callable[[], Any]]):
+        self._loaders = loaders
+        self._data: Dict[str, Any] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._queue: deque = deque()
+        self._loading: Optional[str] = None
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="lifelog-tui-loader", daemon=True)
+        self.version = 0
+
+    def start(self) -> "ViewModel":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    # ─── requests ───
+
+    def request(self, screen: str, urgent: bool = False) -> None:
+        """Queue a reload of `screen`; duplicate requests coalesce."""
+        if screen not in self._loaders:
+            return
+        with self._cond:
+            if screen in self._queue:
+                if not urgent:
+                    return
+                self._queue.remove(screen)
+            if urgent:
+                self._queue.appendleft(screen)
+            else:
+                self._queue.append(screen)
+            self._cond.notify()
+
+    def invalidate(self, first: Optional[str] = None) -> None:
+        """Data changed: reload `first` right away, then every other screen."""
+        if first:
+            self.request(first, urgent=True)
+        for screen in self._loaders:
+            if screen != first:
+                self.request(screen)
+
+    def refresh_if_older(self, screen: str, max_age: float) -> None:
+        loaded = self._loaded_at.get(screen)
+        if loaded is None or time.monotonic() - loaded > max_age:
+            self.request(screen)
+
+    # ─── snapshot access ───
+
+    def get(self, screen: str) -> Tuple[Any, Optional[Exception]]:
+        """(data, error) for a screen; data is None until the first load lands."""
+        return self._data.get(screen), self._errors.get(screen)
+
+    def has_data(self, screen: str) -> bool:
+        return screen in self._data or screen in self._errors
+
+    def is_loading(self, screen: str) -> bool:
+        with self._cond:
+            return self._loading == screen or screen in self._queue
+
+    # ─── worker ───
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                screen = self._queue.popleft()
+                self._loading = screen
+            try:
+                data, error = self._loaders[screen](), None
+            except Exception as e:
+                # Not the logger: its fallback handler would write over the screen.
+                log_exception(f"TUI loader {screen}", e)
+                data, error = None, e
+            with self._cond:
+                if error is None:
+                    self._data[screen] = data
+                    self._errors.pop(screen, None)
+                else:
+                    self._errors[screen] = error
+                self._loaded_at[screen] = time.monotonic()
+                self._loading = None
+                self.version += 1
+
+
+def draw_spinner(pane, tick: int) -> None:
+    """Draw one spinner frame in the pane's top-right border cell."""
+    _, max_w = pane.getmaxyx()
+    safe_addstr(pane, 0, max(max_w - 4, 1),
+                f" {SPINNER_FRAMES[tick % len(SPINNER_FRAMES)]} ")
+
+
+def draw_loading(pane, title: str) -> None:
+    """Placeholder for a tab whose first snapshot has not arrived yet."""
+    pane.erase()
+    max_h, max_w = pane.getmaxyx()
+    pane.border()
+    safe_addstr(pane, 0, max((max_w - len(title)) // 2, 1), title, curses.A_BOLD)
+    safe_addstr(pane, 2, 2, "Loading…", curses.A_DIM)
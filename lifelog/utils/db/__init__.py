@@ -12,13 +12,19 @@ from lifelog.utils.db.db_helper import (
     should_sync,
     direct_db_execute,
     normalize_for_db,
+    get_http_session,
+    get_sync_headers,
     get_sync_queue_connection,
     queue_sync_operation,
+    compact_sync_queue,
     process_sync_queue,
     auto_sync,
     fetch_from_server,
     get_last_synced,
     set_last_synced,
+    get_last_synced_seq,
+    set_last_synced_seq,
+    pull_table_changes,
     safe_execute,
     safe_query,
 )
@@ -56,13 +62,19 @@ __all__ = [
     "should_sync",
     "direct_db_execute",
     "normalize_for_db",
+    "get_http_session",
+    "get_sync_headers",
     "get_sync_queue_connection",
     "queue_sync_operation",
+    "compact_sync_queue",
     "process_sync_queue",
     "auto_sync",
     "fetch_from_server",
     "get_last_synced",
     "set_last_synced",
+    "get_last_synced_seq",
+    "set_last_synced_seq",
+    "pull_table_changes",
     "safe_execute",
     "safe_query",
     "add_record",
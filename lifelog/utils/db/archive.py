@@ -0,0 +1,341 @@
+# lifelog/utils/db/archive.py
+"""
+Cold storage for old time logs and tracker entries.
+
+`archive_old_rows()` moves rows older than `[archive] horizon_days` out of
+lifelog.db into one SQLite file per year next to it (archive/lifelog-2023.db,
+...). `archive_manifest` in the hot database records the rows and time span
+each file holds, so a reader knows without opening anything whether its
+window reaches into cold storage.
+
+Readers go through `select()`: it ATTACHes only the archives whose span
+overlaps the requested window and UNION ALLs their copy of the table with
+the hot one. A recent-window query, or any query before the first archive
+run, reads the hot database alone.
+
+Moving a row must not look like a delete to anything else:
+  • its change_log 'D' entry is dropped in the same transaction, so synced
+    devices keep their copy;
+  • time logs move only when finished and not attached to an open task,
+    and their minutes are folded into task_time_archived before the delete,
+    so per-task totals keep counting them;
+  • tag links move with the row, so tag filters still match archived logs.
+
+Archived rows are read-only history: edits and deletes by id, full-text
+search and a full sync dump (a newly paired device) see the hot rows only.
+Copy and delete are separate transactions (ATTACHed databases in WAL mode
+do not commit atomically together); a row interrupted in between exists in
+both places, readers prefer the hot copy and the next run finishes the move.
+"""
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from lifelog.utils.db import get_connection, migrations, task_time, time_keys
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive_manifest (
+    table_name  TEXT    NOT NULL,
+    year        INTEGER NOT NULL,
+    rows        INTEGER NOT NULL DEFAULT 0,
+    min_ts      TEXT,
+    max_ts      TEXT,
+    updated_at  TEXT,
+    PRIMARY KEY (table_name, year)
+);
+"""
+
+When = Union[datetime, str, None]
+# schema name ("main" or an archive alias) -> (WHERE fragment, params)
+Filters = Callable[[str], Tuple[str, Sequence[Any]]]
+
+
+class ArchivedTable(NamedTuple):
+    table: str
+    ts_column: str
+    eligible: str = "1=1"                  # extra condition on rows that may move
+    links: Tuple[Tuple[str, str], ...] = ()  # (link table, column holding table.id)
+    # (conn, source table, WHERE) adding the rows about to move to a rollup
+    fold: Optional[Callable[[sqlite3.Connection, str, str], None]] = None
+
+
+ARCHIVED_TABLES: Dict[str, ArchivedTable] = {
+    "time_history": ArchivedTable(
+        "time_history", "start",
+        eligible=("end IS NOT NULL AND (task_id IS NULL OR task_id IN "
+                  "(SELECT id FROM tasks WHERE status = 'done' OR COALESCE(deleted, 0) = 1))"),
+        links=(("time_history_tags", "entry_id"),),
+        fold=task_time.fold_archived,
+    ),
+    "tracker_entries": ArchivedTable("tracker_entries", "timestamp"),
+}
+
+
+def install_archive(conn: sqlite3.Connection) -> None:
+    """Create the archive manifest (idempotent)."""
+    conn.executescript(ARCHIVE_SCHEMA)
+
+
+def horizon_days() -> int:
+    """`[archive] horizon_days`; 0 (the default) turns archiving off."""
+    from lifelog.config.config_manager import get_config_value
+    try:
+        return max(0, int(get_config_value("archive", "horizon_days", 0) or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def archive_dir() -> Path:
+    from lifelog.utils.db import _resolve_db_path
+    return _resolve_db_path().parent / "archive"
+
+
+def archive_path(year: int) -> Path:
+    return archive_dir() / f"lifelog-{year:04d}.db"
+
+
+def _iso(when: When) -> Optional[str]:
+    if when is None:
+        return None
+    return when.isoformat() if isinstance(when, datetime) else str(when)
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Attaching
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def _attach(conn: sqlite3.Connection, year: int) -> str:
+    alias = f"archive_{year:04d}"
+    if alias not in {row[1] for row in conn.execute("PRAGMA database_list")}:
+        path = archive_path(year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn.execute(f"ATTACH DATABASE ? AS {alias}", (str(path),))
+    return alias
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str,
+             generated: bool = False) -> List[str]:
+    """Stored columns, plus the generated ones (time_keys) when `generated` is set."""
+    kinds = (0, 2, 3) if generated else (0,)
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_xinfo({table})")
+            if row[6] in kinds]
+
+
+def _prepare(conn: sqlite3.Connection, alias: str, spec: ArchivedTable) -> List[str]:
+    """
+    Create the archive copy of spec.table and its link tables, adding any
+    column the hot table gained since. Returns the shared column list.
+    """
+    for table, key in ((spec.table, "id"),) + spec.links:
+        hot = _columns(conn, "main", table)
+        cold = _columns(conn, alias, table)
+        if not cold:
+            # Columns and types only: no foreign keys into tables that live in main.
+            # Generated columns are added back as generated by time_keys.apply().
+            conn.execute(f"CREATE TABLE {alias}.{table} AS SELECT {', '.join(hot)} "
+                         f"FROM main.{table} WHERE 0")
+            if table == spec.table:
+                conn.execute(f"CREATE UNIQUE INDEX {alias}.idx_{table}_id ON {table}(id)")
+                conn.execute(f"CREATE INDEX {alias}.idx_{table}_{spec.ts_column} "
+                             f"ON {table}({spec.ts_column})")
+                if "uid" in hot:
+                    conn.execute(f"CREATE INDEX {alias}.idx_{table}_uid ON {table}(uid)")
+            else:
+                conn.execute(f"CREATE UNIQUE INDEX {alias}.idx_{table}_row "
+                             f"ON {table}({', '.join(hot)})")
+                conn.execute(f"CREATE INDEX {alias}.idx_{table}_{key} ON {table}({key})")
+        else:
+            for name in hot:
+                if name not in cold:
+                    conn.execute(f"ALTER TABLE {alias}.{table} ADD COLUMN {name}")
+    time_keys.apply(conn, alias, spec.table)
+    return _columns(conn, "main", spec.table)
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Moving rows
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def _move_year(conn: sqlite3.Connection, spec: ArchivedTable, year: int, cutoff: str) -> int:
+    from lifelog.utils.db.change_log import get_high_water_mark
+
+    table, ts = spec.table, spec.ts_column
+    conn.commit()                      # ATTACH is not allowed inside a transaction
+    alias = _attach(conn, year)
+    cols = ", ".join(_prepare(conn, alias, spec))
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_moving (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.archive_moving")
+    conn.execute(
+        f"INSERT INTO temp.archive_moving SELECT id FROM main.{table} "
+        f"WHERE {ts} < ? AND {ts} >= ? AND {ts} < ? AND ({spec.eligible})",
+        # Bounds must not look numeric: DATETIME columns have NUMERIC affinity,
+        # so '2025' would compare as the integer 2025, below every text value.
+        (cutoff, f"{year:04d}-01-01", f"{year + 1:04d}-01-01"))
+    moving = "(SELECT id FROM temp.archive_moving)"
+
+    # 1) copy, committed on its own
+    count = conn.execute(
+        f"INSERT OR REPLACE INTO {alias}.{table} ({cols}) "
+        f"SELECT {cols} FROM main.{table} WHERE id IN {moving}").rowcount
+    for link, key in spec.links:
+        conn.execute(f"INSERT OR IGNORE INTO {alias}.{link} "
+                     f"SELECT * FROM main.{link} WHERE {key} IN {moving}")
+    conn.commit()
+
+    # 2) delete from the hot database without it reading as a delete
+    seq = get_high_water_mark(conn)
+    if spec.fold:
+        spec.fold(conn, f"main.{table}", f"id IN {moving}")
+    conn.execute(f"DELETE FROM main.{table} WHERE id IN {moving}")
+    conn.execute("DELETE FROM change_log WHERE seq > ? AND table_name = ? AND op = 'D'",
+                 (seq, table))
+
+    rows, lo, hi = conn.execute(
+        f"SELECT COUNT(*), MIN({ts}), MAX({ts}) FROM {alias}.{table}").fetchone()
+    conn.execute(
+        "INSERT INTO archive_manifest (table_name, year, rows, min_ts, max_ts, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(table_name, year) DO UPDATE SET "
+        "rows = excluded.rows, min_ts = excluded.min_ts, max_ts = excluded.max_ts, "
+        "updated_at = excluded.updated_at",
+        (table, year, rows, lo, hi, datetime.now().isoformat()))
+    conn.commit()
+    conn.execute("DELETE FROM temp.archive_moving")
+    conn.commit()
+    conn.execute(f"DETACH DATABASE {alias}")
+    return count
+
+
+def archive_old_rows(horizon: Optional[int] = None,
+                     dry_run: bool = False) -> Dict[str, Dict[int, int]]:
+    """
+    Move rows older than `horizon` days (default: the configured horizon)
+    into the per-year archives. Returns {table: {year: rows}}, the rows that
+    would move when dry_run is set.
+    """
+    from lifelog.utils.core_utils import now_utc
+
+    days = horizon_days() if horizon is None else horizon
+    if days <= 0:
+        raise ValueError("Archiving is off: set [archive] horizon_days or pass a horizon")
+    cutoff = (now_utc() - timedelta(days=days)).isoformat()
+    migrations.ensure_migrated()
+
+    moved: Dict[str, Dict[int, int]] = {}
+    with get_connection() as conn:
+        for spec in ARCHIVED_TABLES.values():
+            ts = spec.ts_column
+            years = conn.execute(
+                f"SELECT substr({ts}, 1, 4) AS year, COUNT(*) FROM {spec.table} "
+                f"WHERE {ts} < ? AND ({spec.eligible}) GROUP BY year", (cutoff,)).fetchall()
+            for year, count in years:
+                if not (year or "").isdigit():
+                    logger.warning("Not archiving %d %s rows with unparseable %s",
+                                   count, spec.table, ts)
+                    continue
+                n = count if dry_run else _move_year(conn, spec, int(year), cutoff)
+                if n:
+                    moved.setdefault(spec.table, {})[int(year)] = n
+                    if not dry_run:
+                        logger.info("Archived %d %s rows from %s", n, spec.table, year)
+    return moved
+
+
+def fold_archives(conn: sqlite3.Connection, table: str, where: str = "1=1") -> None:
+    """Run `table`'s fold over the rows of every archive matching `where` (commits)."""
+    spec = ARCHIVED_TABLES[table]
+    if not spec.fold:
+        return
+    for year in years_for(conn, table):
+        conn.commit()                  # ATTACH is not allowed inside a transaction
+        alias = _attach(conn, year)
+        if _columns(conn, alias, table):
+            spec.fold(conn, f"{alias}.{table}", where)
+        conn.commit()
+        conn.execute(f"DETACH DATABASE {alias}")
+
+
+def manifest() -> List[Dict[str, Any]]:
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT * FROM archive_manifest ORDER BY table_name, year").fetchall()
+    return [dict(r) for r in rows]
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Reading
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def years_for(conn: sqlite3.Connection, table: str, since: When = None,
+              until: When = None) -> List[int]:
+    """Archive years holding `table` rows that can fall in [since, until)."""
+    sql = "SELECT year FROM archive_manifest WHERE table_name = ? AND rows > 0"
+    params: List[Any] = [table]
+    if since is not None:
+        sql += " AND max_ts >= ?"
+        params.append(_iso(since))
+    if until is not None:
+        sql += " AND min_ts < ?"
+        params.append(_iso(until))
+    return [row[0] for row in conn.execute(sql + " ORDER BY year", params)]
+
+
+def select(table: str, filters: Filters, order_by: str = "",
+           since: When = None, until: When = None,
+           columns: str = "*", group_by: str = "",
+           consume: Optional[Callable[[sqlite3.Cursor], Any]] = None) -> Any:
+    """
+    Rows of `table` matching `filters` from the hot database plus every
+    archive that overlaps [since, until). `filters(schema)` returns the WHERE
+    fragment for that schema ("main" or the archive alias); it should itself
+    restrict the window, which only decides which archives to open.
+
+    `columns` are computed over the combined rows, so with `group_by` a group
+    spanning hot and cold rows comes out whole. `consume`, if given, gets the
+    executed cursor (plain tuples, no row objects) and its result is returned
+    instead of the fetched rows.
+    """
+    spec = ARCHIVED_TABLES[table]
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        where, params = filters("main")
+        parts = [f"SELECT * FROM main.{table} WHERE {where}"]
+        params = list(params)
+        years = years_for(conn, table, since, until)
+        if years:
+            cols = _columns(conn, "main", table, generated=True)
+            parts = [f"SELECT {', '.join(cols)} FROM main.{table} WHERE {where}"]
+        for year in years:
+            alias = _attach(conn, year)
+            if not _columns(conn, alias, table):
+                continue
+            time_keys.apply(conn, alias, table)   # archives from before the keys, or another zone
+            cold = set(_columns(conn, alias, table, generated=True))
+            select_list = ", ".join(c if c in cold else f"NULL AS {c}" for c in cols)
+            where, extra = filters(alias)
+            # A row caught between copy and delete is still hot; the hot copy wins.
+            parts.append(
+                f"SELECT {select_list} FROM {alias}.{table} AS a WHERE ({where}) AND NOT "
+                f"EXISTS (SELECT 1 FROM main.{table} h WHERE h.id = a.id)")
+            params.extend(extra)
+        sql = " UNION ALL ".join(parts)
+        if group_by or columns != "*":
+            sql = f"SELECT {columns} FROM ({sql})"
+            if group_by:
+                sql += f" GROUP BY {group_by}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        logger.debug("archive.select(%s): %d archive(s) attached", spec.table, len(years))
+        cursor = conn.execute(sql, params)
+        if consume is None:
+            return cursor.fetchall()
+        cursor.row_factory = None
+        return consume(cursor)
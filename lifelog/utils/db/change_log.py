@@ -0,0 +1,255 @@
+# lifelog/utils/db/change_log.py
+"""
+Trigger-based change-data-capture log.
+
+Every INSERT / UPDATE / DELETE on the synced tables appends one compact row to
+`change_log` with a monotonically increasing sequence number (AUTOINCREMENT,
+so sequences are never reused even after compaction). Writes are captured no
+matter which code path made them, including `update_record` calls that never
+touch `updated_at`.
+
+Consumers:
+  • the host's /sync/<table>/changes endpoint serves rows by sequence;
+  • local caches and rollups read the feed through a named cursor
+    (`read_feed` / `ack`) and rebuild from scratch when `reset` is set.
+
+`compact_change_log` truncates sequences every consumer has acknowledged.
+"""
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from lifelog.utils.db import get_connection, migrations
+
+logger = logging.getLogger(__name__)
+
+CDC_TABLES = ("tasks", "time_history", "trackers", "tracker_entries", "goals")
+
+# Tables whose deletes are soft (deleted = 1) and therefore look like updates.
+SOFT_DELETE_TABLES = ("tasks", "time_history", "trackers")
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_MAX_AGE_DAYS = 30
+
+_SQLITE_MAX_VARS = 500
+
+
+def _trigger_sql(table: str) -> str:
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_cdc_insert AFTER INSERT ON {table}
+    BEGIN
+        INSERT INTO change_log (table_name, row_id, uid, op)
+        VALUES ('{table}', NEW.id, NEW.uid, 'I');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_cdc_update AFTER UPDATE ON {table}
+    BEGIN
+        INSERT INTO change_log (table_name, row_id, uid, op)
+        VALUES ('{table}', NEW.id, NEW.uid, 'U');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_cdc_delete AFTER DELETE ON {table}
+    BEGIN
+        INSERT INTO change_log (table_name, row_id, uid, op)
+        VALUES ('{table}', OLD.id, OLD.uid, 'D');
+    END;
+    """
+
+
+CHANGE_LOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS change_log (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name  TEXT    NOT NULL,
+    row_id      INTEGER NOT NULL,
+    uid         TEXT,
+    op          TEXT    NOT NULL CHECK (op IN ('I', 'U', 'D')),
+    changed_at  INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_table_seq ON change_log(table_name, seq);
+
+CREATE TABLE IF NOT EXISTS change_log_cursors (
+    consumer    TEXT PRIMARY KEY,
+    last_seq    INTEGER NOT NULL DEFAULT 0,
+    updated_at  TEXT
+);
+""" + "".join(_trigger_sql(t) for t in CDC_TABLES)
+
+
+def install_change_log(conn: sqlite3.Connection) -> None:
+    """Create the change_log tables and triggers (idempotent)."""
+    conn.executescript(CHANGE_LOG_SCHEMA)
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Watermarks
+# ───────────────────────────────────────────────────────────────────────────────
+
+def get_high_water_mark(conn: Optional[sqlite3.Connection] = None) -> int:
+    """Highest sequence ever assigned (survives compaction)."""
+    if conn is None:
+        migrations.ensure_migrated()
+        with get_connection() as c:
+            return get_high_water_mark(c)
+    row = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def get_low_water_mark(conn: sqlite3.Connection) -> int:
+    """
+    Every sequence above this value is still in the log. A cursor below it has
+    missed truncated entries and must rebuild from the base tables.
+    """
+    row = conn.execute("SELECT MIN(seq) FROM change_log").fetchone()
+    if row and row[0] is not None:
+        return int(row[0]) - 1
+    return get_high_water_mark(conn)
+
+
+def _chunks(items: Sequence[Any], size: int = _SQLITE_MAX_VARS) -> Iterable[Sequence[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Sync pull support (host side)
+# ───────────────────────────────────────────────────────────────────────────────
+
+def changed_rows_since(table: str, since_seq: int, limit: int = DEFAULT_PAGE_SIZE,
+                       after_id: int = 0, dump_seq: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Return one page of rows in `table` changed after `since_seq`:
+      {"rows": [...current row dicts...],
+       "deleted": [...uids of hard-deleted rows...],
+       "next_seq": int, "has_more": bool, "full": bool}
+
+    `since_seq` <= 0, or a cursor older than the compacted log, yields a full
+    table dump (`full` = True) so the caller can rebuild from scratch. The
+    dump is paged by id: each page also carries `after_id`, and the caller
+    asks for the next one with the same `since_seq` plus `after_id` and
+    `dump_seq` (the page's `next_seq`). `next_seq` stays pinned to the
+    high-water mark taken when the dump started, so changes made while it
+    runs are pulled from the log afterwards.
+    """
+    if table not in CDC_TABLES:
+        raise ValueError(f"Table '{table}' is not change-tracked")
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        hwm = get_high_water_mark(conn)
+        if since_seq <= 0 or since_seq < get_low_water_mark(conn):
+            mark = dump_seq if dump_seq is not None and 0 <= dump_seq <= hwm else hwm
+            rows = conn.execute(f"SELECT * FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                                (after_id, limit)).fetchall()
+            return {"rows": [dict(r) for r in rows], "deleted": [],
+                    "next_seq": mark, "has_more": len(rows) == limit, "full": True,
+                    "after_id": rows[-1]["id"] if rows else after_id}
+
+        entries = conn.execute(
+            "SELECT seq, row_id, uid, op FROM change_log "
+            "WHERE table_name = ? AND seq > ? AND seq <= ? "
+            "ORDER BY seq LIMIT ?",
+            (table, since_seq, hwm, limit)
+        ).fetchall()
+        has_more = len(entries) == limit
+        next_seq = entries[-1]["seq"] if has_more else hwm
+
+        # Collapse to the latest operation per row.
+        latest: Dict[int, sqlite3.Row] = {}
+        for entry in entries:
+            latest[entry["row_id"]] = entry
+        live_ids = [rid for rid, e in latest.items() if e["op"] != "D"]
+        deleted = [e["uid"] for e in latest.values()
+                   if e["op"] == "D" and e["uid"]]
+
+        rows: List[Dict[str, Any]] = []
+        for chunk in _chunks(live_ids):
+            ph = ", ".join("?" for _ in chunk)
+            rows.extend(dict(r) for r in conn.execute(
+                f"SELECT * FROM {table} WHERE id IN ({ph}) ORDER BY id", tuple(chunk)))
+
+    return {"rows": rows, "deleted": deleted, "next_seq": next_seq,
+            "has_more": has_more, "full": False}
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Consumer cursors (local caches, rollups, remote devices)
+# ───────────────────────────────────────────────────────────────────────────────
+
+def get_cursor(consumer: str) -> Optional[int]:
+    """Last acknowledged sequence for `consumer`, or None if it never read."""
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT last_seq FROM change_log_cursors WHERE consumer = ?",
+            (consumer,)
+        ).fetchone()
+    return int(row["last_seq"]) if row else None
+
+
+def ack(consumer: str, seq: int) -> None:
+    """Record that `consumer` has processed every change up to `seq`."""
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO change_log_cursors (consumer, last_seq, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(consumer) DO UPDATE SET
+              last_seq = MAX(last_seq, excluded.last_seq),
+              updated_at = excluded.updated_at
+            """,
+            (consumer, int(seq), datetime.now(timezone.utc).isoformat())
+        )
+
+
+def read_feed(consumer: str, tables: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Return unprocessed changes for `consumer`:
+      {"changes": [{"seq", "table_name", "row_id", "uid", "op"}, ...],
+       "last_seq": int, "reset": bool}
+
+    `reset` is True when the consumer has no cursor yet or fell behind
+    compaction; it should then rebuild from the base tables and `ack(last_seq)`.
+    Changes are not acknowledged until the consumer calls `ack`.
+    """
+    migrations.ensure_migrated()
+    cursor = get_cursor(consumer)
+    with get_connection() as conn:
+        hwm = get_high_water_mark(conn)
+        if cursor is None or cursor < get_low_water_mark(conn):
+            return {"changes": [], "last_seq": hwm, "reset": True}
+        sql = ("SELECT seq, table_name, row_id, uid, op FROM change_log "
+               "WHERE seq > ? AND seq <= ?")
+        params: List[Any] = [cursor, hwm]
+        if tables:
+            sql += f" AND table_name IN ({', '.join('?' for _ in tables)})"
+            params.extend(tables)
+        sql += " ORDER BY seq"
+        changes = [dict(r) for r in conn.execute(sql, tuple(params))]
+    return {"changes": changes, "last_seq": hwm, "reset": False}
+
+
+def compact_change_log(max_age_days: Optional[int] = DEFAULT_MAX_AGE_DAYS) -> int:
+    """
+    Delete log entries every registered consumer has acknowledged. Entries
+    older than `max_age_days` are dropped even if unacknowledged, so a device
+    that stopped syncing cannot pin the log forever; such consumers see
+    `reset`/`full` on their next read. Returns the number of rows removed.
+    """
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT MIN(last_seq) FROM change_log_cursors").fetchone()
+        acked = row[0] if row and row[0] is not None else get_high_water_mark(conn)
+        removed = conn.execute(
+            "DELETE FROM change_log WHERE seq <= ?", (acked,)).rowcount
+        if max_age_days is not None:
+            removed += conn.execute(
+                "DELETE FROM change_log WHERE changed_at < CAST(strftime('%s', 'now') AS INTEGER) - ?",
+                (int(max_age_days) * 86400,)
+            ).rowcount
+    if removed:
+        logger.info("Compacted change_log: removed %d acknowledged entries", removed)
+    return removed
@@ -5,7 +5,7 @@ from lifelog.config.config_manager import BASE_DIR
 import sqlite3
 from pathlib import Path
 
-from lifelog.utils.db import get_connection
+from lifelog.utils.db import get_connection, query_trace
 
 logger = logging.getLogger(__name__)
 
@@ -60,344 +60,352 @@ def is_initialized() -> bool:
         return False
 
 
+# ───────────────────────────────────────────────────────────────────────────────
+# Core tables (migration 1) and their indexes (migration 2)
+# ───────────────────────────────────────────────────────────────────────────────
+
+CORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trackers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT UNIQUE,
+    title TEXT,
+    type TEXT,
+    category TEXT,
+    created DATETIME,
+    notes TEXT,
+    tags TEXT,
+    updated_at TEXT,
+    deleted INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT UNIQUE,
+    title TEXT,
+    project TEXT,
+    category TEXT,
+    importance INTEGER,
+    created DATETIME,
+    due DATETIME,
+    status TEXT,
+    start DATETIME,
+    end DATETIME,
+    priority FLOAT,
+    recur_interval INTEGER,
+    recur_unit TEXT,
+    recur_days_of_week TEXT,
+    recur_base DATETIME,
+    notes TEXT,
+    tags TEXT,
+    updated_at TEXT,
+    deleted INTEGER DEFAULT 0,
+    next_occurrence TEXT
+);
+
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT UNIQUE,
+    tracker_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    period TEXT DEFAULT 'day',
+    FOREIGN KEY (tracker_id) REFERENCES trackers(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_sum (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    amount REAL NOT NULL,
+    unit TEXT,
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_count (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    amount INTEGER NOT NULL,
+    unit TEXT,
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_bool (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_streak (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    target_streak INTEGER NOT NULL,
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_duration (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    amount REAL NOT NULL,
+    unit TEXT DEFAULT 'minutes',
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_milestone (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    target REAL NOT NULL,
+    unit TEXT,
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_reduction (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    amount REAL NOT NULL,
+    unit TEXT,
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_range (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    min_amount REAL NOT NULL,
+    max_amount REAL NOT NULL,
+    unit TEXT,
+    mode TEXT CHECK (mode IN ('goal','tracker')) DEFAULT 'goal',
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_percentage (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    target_percentage REAL NOT NULL,
+    current_percentage REAL DEFAULT 0,
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS goal_replacement (
+    goal_id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE,
+    old_behavior TEXT NOT NULL,
+    new_behavior TEXT NOT NULL,
+    FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS task_tracking (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT UNIQUE,
+    task_id INTEGER,
+    start DATETIME,
+    end DATETIME,
+    duration_minutes FLOAT,
+    tags TEXT,
+    notes TEXT,
+    FOREIGN KEY (task_id) REFERENCES tasks(id)
+);
+
+CREATE TABLE IF NOT EXISTS tracker_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT UNIQUE,
+    tracker_id INTEGER,
+    timestamp DATETIME,
+    value FLOAT,
+    FOREIGN KEY (tracker_id) REFERENCES trackers(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS time_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT UNIQUE,
+    title TEXT NOT NULL,
+    start DATETIME NOT NULL,
+    end DATETIME,
+    duration_minutes FLOAT,
+    task_id INTEGER,
+    category TEXT,
+    project TEXT,
+    tags TEXT,
+    notes TEXT,
+    distracted_minutes FLOAT DEFAULT 0,
+    updated_at TEXT,
+    deleted INTEGER DEFAULT 0,
+    FOREIGN KEY (task_id) REFERENCES tasks(id)
+);
+
+CREATE TABLE IF NOT EXISTS environment_data (
+    uid TEXT UNIQUE,
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp DATETIME,
+    weather TEXT,
+    air_quality TEXT,
+    moon TEXT,
+    satellite TEXT
+);
+
+CREATE TABLE IF NOT EXISTS daily_quote (
+    date DATE PRIMARY KEY,
+    quote TEXT
+);
+
+CREATE TABLE IF NOT EXISTS feedback_sayings (
+    context TEXT PRIMARY KEY,
+    sayings JSON NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS first_command_flags (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    uid TEXT UNIQUE,
+    last_executed DATE
+);
+
+CREATE TABLE IF NOT EXISTS job_runs (
+    job TEXT PRIMARY KEY,
+    last_run TEXT NOT NULL,
+    detail TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_name TEXT PRIMARY KEY,
+    last_synced_at TEXT,
+    last_seq INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS api_devices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    device_name TEXT,
+    device_token TEXT UNIQUE NOT NULL,
+    paired_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS api_pairing_codes (
+    code TEXT PRIMARY KEY,
+    expires_at DATETIME,
+    device_name TEXT
+);
+
+CREATE TABLE IF NOT EXISTS user_profiles (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid            TEXT    UNIQUE,
+    xp             INTEGER NOT NULL DEFAULT 0,
+    level          INTEGER NOT NULL DEFAULT 1,
+    gold           INTEGER NOT NULL DEFAULT 0,
+    created_at     DATETIME,
+    last_level_up  DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS badges (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid         TEXT    UNIQUE,
+    name        TEXT    NOT NULL,
+    description TEXT,
+    icon        TEXT     -- e.g. emoji or path
+);
+
+CREATE TABLE IF NOT EXISTS profile_badges (
+    profile_id  INTEGER,
+    badge_id    INTEGER,
+    awarded_at  DATETIME,
+    PRIMARY KEY (profile_id, badge_id),
+    FOREIGN KEY (profile_id) REFERENCES user_profiles(id) ON DELETE CASCADE,
+    FOREIGN KEY (badge_id)   REFERENCES badges(id)        ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS skills (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid         TEXT    UNIQUE,
+    name        TEXT    NOT NULL,
+    description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS profile_skills (
+    profile_id  INTEGER,
+    skill_id    INTEGER,
+    level       INTEGER NOT NULL DEFAULT 1,
+    xp          INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile_id, skill_id),
+    FOREIGN KEY (profile_id) REFERENCES user_profiles(id) ON DELETE CASCADE,
+    FOREIGN KEY (skill_id)   REFERENCES skills(id)        ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS shop_items (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid         TEXT    UNIQUE,
+    name        TEXT    NOT NULL,
+    description TEXT,
+    cost_gold   INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS inventory (
+    profile_id  INTEGER,
+    item_id     INTEGER,
+    quantity    INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (profile_id, item_id),
+    FOREIGN KEY (profile_id) REFERENCES user_profiles(id) ON DELETE CASCADE,
+    FOREIGN KEY (item_id)    REFERENCES shop_items(id)     ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile_id    INTEGER NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+    message       TEXT      NOT NULL,
+    created_at    TEXT      NOT NULL,            -- ISO timestamp
+    read          INTEGER   NOT NULL DEFAULT 0   -- 0 = unread, 1 = read
+    );
+"""
+
+CORE_INDEXES = """
+-- Existing indexes
+CREATE INDEX IF NOT EXISTS idx_time_history_task_id ON time_history(task_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks(due);
+CREATE INDEX IF NOT EXISTS idx_goals_tracker_id ON goals(tracker_id);
+
+-- Performance-critical indexes for Pi Zero 2W
+CREATE INDEX IF NOT EXISTS idx_time_history_start ON time_history(start);
+CREATE INDEX IF NOT EXISTS idx_time_history_end ON time_history(end);
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
+CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created);
+CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks(project);
+CREATE INDEX IF NOT EXISTS idx_tracker_entries_timestamp ON tracker_entries(timestamp);
+CREATE INDEX IF NOT EXISTS idx_trackers_category ON trackers(category);
+
+-- Composite indexes for common query patterns
+CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks(status, due);
+CREATE INDEX IF NOT EXISTS idx_time_history_category_start ON time_history(category, start);
+CREATE INDEX IF NOT EXISTS idx_tracker_entries_tracker_timestamp ON tracker_entries(tracker_id, timestamp);
+
+-- Sync performance indexes (tracker_entries has no updated_at; its rows
+-- reach devices through the change log)
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks(updated_at);
+CREATE INDEX IF NOT EXISTS idx_time_history_updated_at ON time_history(updated_at);
+CREATE INDEX IF NOT EXISTS idx_trackers_updated_at ON trackers(updated_at);
+"""
+
+# Once in CORE_INDEXES, now covered by a composite index or a UNIQUE
+# autoindex; they only cost writes. Dropped by migration 16.
+REDUNDANT_CORE_INDEXES = (
+    "idx_tasks_status",                  # idx_tasks_status_due
+    "idx_tasks_uid",                     # UNIQUE(uid)
+    "idx_time_history_category",         # idx_time_history_category_start
+    "idx_time_history_uid",              # UNIQUE(uid)
+    "idx_tracker_entries_tracker_id",    # idx_tracker_entries_tracker_timestamp
+    "idx_tracker_entries_uid",           # UNIQUE(uid)
+    "idx_trackers_uid",                  # UNIQUE(uid)
+)
+
+
 def initialize_schema():
     """
-    Create all tables, indexes and do a simple test query.
-    Uses get_connection() as a context‐manager, which:
-      • commits on normal exit,
-      • rolls back on exception,
-      • and always closes.
+    Bring the database up to the current schema version (see migrations.py)
+    and run a simple test query. Errors are logged and re-raised: a database
+    that cannot be migrated should stop the caller, not limp on.
     """
+    from lifelog.utils.db import migrations
     try:
         with get_connection() as conn:
-            cursor = conn.cursor()
-
-            # ───────────────────────────────────────────────────────────────────────────
-            # Core tables
-            # ───────────────────────────────────────────────────────────────────────────
-            cursor.executescript("""
-            CREATE TABLE IF NOT EXISTS trackers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid TEXT UNIQUE,
-                title TEXT,
-                type TEXT,
-                category TEXT,
-                created DATETIME,
-                notes TEXT,
-                tags TEXT,
-                updated_at TEXT,
-                deleted INTEGER DEFAULT 0
-            );
-
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid TEXT UNIQUE,
-                title TEXT,
-                project TEXT,
-                category TEXT,
-                importance INTEGER,
-                created DATETIME,
-                due DATETIME,
-                status TEXT,
-                start DATETIME,
-                end DATETIME,
-                priority FLOAT,
-                recur_interval INTEGER,
-                recur_unit TEXT,
-                recur_days_of_week TEXT,
-                recur_base DATETIME,
-                notes TEXT,
-                tags TEXT,
-                updated_at TEXT,
-                deleted INTEGER DEFAULT 0
-            );
-
-            CREATE TABLE IF NOT EXISTS goals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid TEXT UNIQUE,
-                tracker_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                kind TEXT NOT NULL,
-                period TEXT DEFAULT 'day',
-                FOREIGN KEY (tracker_id) REFERENCES trackers(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_sum (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                amount REAL NOT NULL,
-                unit TEXT,
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_count (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                amount INTEGER NOT NULL,
-                unit TEXT,
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_bool (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_streak (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                target_streak INTEGER NOT NULL,
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_duration (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                amount REAL NOT NULL,
-                unit TEXT DEFAULT 'minutes',
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_milestone (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                target REAL NOT NULL,
-                unit TEXT,
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_reduction (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                amount REAL NOT NULL,
-                unit TEXT,
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_range (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                min_amount REAL NOT NULL,
-                max_amount REAL NOT NULL,
-                unit TEXT,
-                mode TEXT CHECK (mode IN ('goal','tracker')) DEFAULT 'goal',
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_percentage (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                target_percentage REAL NOT NULL,
-                current_percentage REAL DEFAULT 0,
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS goal_replacement (
-                goal_id INTEGER PRIMARY KEY,
-                uid TEXT UNIQUE,
-                old_behavior TEXT NOT NULL,
-                new_behavior TEXT NOT NULL,
-                FOREIGN KEY (goal_id) REFERENCES goals(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS task_tracking (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid TEXT UNIQUE,
-                task_id INTEGER,
-                start DATETIME,
-                end DATETIME,
-                duration_minutes FLOAT,
-                tags TEXT,
-                notes TEXT,
-                FOREIGN KEY (task_id) REFERENCES tasks(id)
-            );
-
-            CREATE TABLE IF NOT EXISTS tracker_entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid TEXT UNIQUE,
-                tracker_id INTEGER,
-                timestamp DATETIME,
-                value FLOAT,
-                FOREIGN KEY (tracker_id) REFERENCES trackers(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS time_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid TEXT UNIQUE,
-                title TEXT NOT NULL,
-                start DATETIME NOT NULL,
-                end DATETIME,
-                duration_minutes FLOAT,
-                task_id INTEGER,
-                category TEXT,
-                project TEXT,
-                tags TEXT,
-                notes TEXT,
-                distracted_minutes FLOAT DEFAULT 0,
-                updated_at TEXT,
-                deleted INTEGER DEFAULT 0,
-                FOREIGN KEY (task_id) REFERENCES tasks(id)
-            );
-
-            CREATE TABLE IF NOT EXISTS environment_data (
-                uid TEXT UNIQUE,
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
-                weather TEXT,
-                air_quality TEXT,
-                moon TEXT,
-                satellite TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS daily_quote (
-                date DATE PRIMARY KEY,
-                quote TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS feedback_sayings (
-                context TEXT PRIMARY KEY,
-                sayings JSON NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS first_command_flags (
-                id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
-                uid TEXT UNIQUE,
-                last_executed DATE
-            );
-
-            CREATE TABLE IF NOT EXISTS sync_state (
-                table_name TEXT PRIMARY KEY,
-                last_synced_at TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS api_devices (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                device_name TEXT,
-                device_token TEXT UNIQUE NOT NULL,
-                paired_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS api_pairing_codes (
-                code TEXT PRIMARY KEY,
-                expires_at DATETIME,
-                device_name TEXT
-            );
-            
-            CREATE TABLE IF NOT EXISTS user_profiles (
-                id             INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid            TEXT    UNIQUE,
-                xp             INTEGER NOT NULL DEFAULT 0,
-                level          INTEGER NOT NULL DEFAULT 1,
-                gold           INTEGER NOT NULL DEFAULT 0,
-                created_at     DATETIME,
-                last_level_up  DATETIME
-            );
-
-            CREATE TABLE IF NOT EXISTS badges (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid         TEXT    UNIQUE,
-                name        TEXT    NOT NULL,
-                description TEXT,
-                icon        TEXT     -- e.g. emoji or path
-            );
-
-            CREATE TABLE IF NOT EXISTS profile_badges (
-                profile_id  INTEGER,
-                badge_id    INTEGER,
-                awarded_at  DATETIME,
-                PRIMARY KEY (profile_id, badge_id),
-                FOREIGN KEY (profile_id) REFERENCES user_profiles(id) ON DELETE CASCADE,
-                FOREIGN KEY (badge_id)   REFERENCES badges(id)        ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS skills (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid         TEXT    UNIQUE,
-                name        TEXT    NOT NULL,
-                description TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS profile_skills (
-                profile_id  INTEGER,
-                skill_id    INTEGER,
-                level       INTEGER NOT NULL DEFAULT 1,
-                xp          INTEGER NOT NULL DEFAULT 0,
-                PRIMARY KEY (profile_id, skill_id),
-                FOREIGN KEY (profile_id) REFERENCES user_profiles(id) ON DELETE CASCADE,
-                FOREIGN KEY (skill_id)   REFERENCES skills(id)        ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS shop_items (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                uid         TEXT    UNIQUE,
-                name        TEXT    NOT NULL,
-                description TEXT,
-                cost_gold   INTEGER NOT NULL DEFAULT 0
-            );
-
-            CREATE TABLE IF NOT EXISTS inventory (
-                profile_id  INTEGER,
-                item_id     INTEGER,
-                quantity    INTEGER NOT NULL DEFAULT 1,
-                PRIMARY KEY (profile_id, item_id),
-                FOREIGN KEY (profile_id) REFERENCES user_profiles(id) ON DELETE CASCADE,
-                FOREIGN KEY (item_id)    REFERENCES shop_items(id)     ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS notifications (
-                id            INTEGER PRIMARY KEY AUTOINCREMENT,
-                profile_id    INTEGER NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
-                message       TEXT      NOT NULL,
-                created_at    TEXT      NOT NULL,            -- ISO timestamp
-                read          INTEGER   NOT NULL DEFAULT 0   -- 0 = unread, 1 = read
-                );
-            """)
-
-            # ───────────────────────────────────────────────────────────────────────
-            # Indexes
-            # ───────────────────────────────────────────────────────────────────────
-            cursor.executescript("""
-            -- Existing indexes
-            CREATE INDEX IF NOT EXISTS idx_tracker_entries_tracker_id ON tracker_entries(tracker_id);
-            CREATE INDEX IF NOT EXISTS idx_time_history_task_id ON time_history(task_id);
-            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
-            CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks(due);
-            CREATE INDEX IF NOT EXISTS idx_goals_tracker_id ON goals(tracker_id);
-            
-            -- Performance-critical indexes for Pi Zero 2W
-            CREATE INDEX IF NOT EXISTS idx_time_history_start ON time_history(start);
-            CREATE INDEX IF NOT EXISTS idx_time_history_end ON time_history(end);
-            CREATE INDEX IF NOT EXISTS idx_time_history_category ON time_history(category);
-            CREATE INDEX IF NOT EXISTS idx_time_history_uid ON time_history(uid);
-            CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
-            CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created);
-            CREATE INDEX IF NOT EXISTS idx_tasks_uid ON tasks(uid);
-            CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks(project);
-            CREATE INDEX IF NOT EXISTS idx_tracker_entries_timestamp ON tracker_entries(timestamp);
-            CREATE INDEX IF NOT EXISTS idx_tracker_entries_uid ON tracker_entries(uid);
-            CREATE INDEX IF NOT EXISTS idx_trackers_category ON trackers(category);
-            CREATE INDEX IF NOT EXISTS idx_trackers_uid ON trackers(uid);
-            
-            -- Composite indexes for common query patterns
-            CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks(status, due);
-            CREATE INDEX IF NOT EXISTS idx_time_history_category_start ON time_history(category, start);
-            CREATE INDEX IF NOT EXISTS idx_tracker_entries_tracker_timestamp ON tracker_entries(tracker_id, timestamp);
-            
-            -- Sync performance indexes
-            CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks(updated_at);
-            CREATE INDEX IF NOT EXISTS idx_time_history_updated_at ON time_history(updated_at);
-            CREATE INDEX IF NOT EXISTS idx_trackers_updated_at ON trackers(updated_at);
-            CREATE INDEX IF NOT EXISTS idx_tracker_entries_updated_at ON tracker_entries(updated_at);
-            """)
-
-            # simple test query
-            cursor.execute("SELECT COUNT(*) FROM feedback_sayings")
-            # all done; on exiting the with-block, commit & close happen automatically
-
+            migrations.migrate(conn)
+            conn.execute("SELECT COUNT(*) FROM feedback_sayings")
     except sqlite3.Error as e:
         # any error inside 'with' has already been rolled back
-        print(f"Schema initialization error: {e}")
+        logger.error("Schema initialization error: %s", e, exc_info=True)
+        raise
 
 
 def add_record(table, data, fields):
@@ -408,7 +416,10 @@ def add_record(table, data, fields):
         cols = ', '.join(fields)
         ph = ', '.join('?' for _ in fields)
         vals = [data.get(f) for f in fields]
-        cursor.execute(f"INSERT INTO {table} ({cols}) VALUES ({ph})", vals)
+        sql = f"INSERT INTO {table} ({cols}) VALUES ({ph})"
+        with query_trace.timed(sql) as trace:
+            cursor.execute(sql, vals)
+            trace.rows = cursor.rowcount
         new_id = cursor.lastrowid
         # no conn.commit() or conn.close() here—handled by the contextmanager
     return new_id
@@ -429,7 +440,9 @@ def update_record(table, record_id, updates):
     # 2) Execute inside the connection context (auto-commit & close)
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(sql, values)
+        with query_trace.timed(sql) as trace:
+            cursor.execute(sql, values)
+            trace.rows = cursor.rowcount
 
 
 def get_all_api_devices():
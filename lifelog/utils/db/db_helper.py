@@ -8,13 +8,17 @@ from contextlib import contextmanager
 import json
 import logging
 import sqlite3
+import threading
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from lifelog.config.config_manager import load_config
+from lifelog.utils import metrics
+from lifelog.utils.db import query_trace
 
 
 def _to_utc(dt: datetime) -> datetime:
@@ -78,6 +82,9 @@ def get_connection():
     
     # Apply hardware-optimized SQLite settings
     pi_optimizer.optimize_connection_settings(conn)
+    query_trace.instrument(conn)
+    metrics.DB_CONNECTIONS_OPENED.inc()
+    metrics.DB_CONNECTIONS_OPEN.inc()
 
     try:
         yield conn
@@ -87,6 +94,7 @@ def get_connection():
         raise
     finally:
         conn.close()
+        metrics.DB_CONNECTIONS_OPEN.dec()
 
 
 # ───────────────────────────────────────────────────────────────────────────────
@@ -163,6 +171,49 @@ def normalize_for_db(d: Dict[str, Any]) -> Dict[str, Any]:
             d[k] = _to_utc(v).isoformat()
     return d
 
+# ───────────────────────────────────────────────────────────────────────────────
+# Shared HTTP Session
+# ───────────────────────────────────────────────────────────────────────────────
+
+# Number of tables pulled concurrently by auto_sync (tasks, time, trackers→goals).
+SYNC_PULL_WORKERS = 3
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive Session used for all host sync traffic.
+    The connection pool is sized for the auto_sync worker pool so concurrent
+    pulls reuse TCP connections instead of opening new ones per request.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=SYNC_PULL_WORKERS + 1,
+                    pool_maxsize=SYNC_PULL_WORKERS + 1,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def get_sync_headers() -> Dict[str, str]:
+    """
+    Auth headers for host requests, or {} if this device is not paired.
+    Pairing stores `api.device_token`; older configs carry `api.key`.
+    """
+    api_cfg = load_config().get("api", {})
+    token = api_cfg.get("device_token") or api_cfg.get("key", "")
+    if not token:
+        return {}
+    return {"X-Device-Token": token, "X-API-Key": token}
+
 # ───────────────────────────────────────────────────────────────────────────────
 # Sync Queue Helpers
 # ───────────────────────────────────────────────────────────────────────────────
@@ -174,6 +225,30 @@ def get_sync_queue_connection() -> sqlite3.Connection:
     return sqlite3.connect(str(SYNC_QUEUE_PATH))
 
 
+def _ensure_sync_queue(conn: sqlite3.Connection) -> None:
+    """
+    Create the sync_queue table and its (table_name, uid) index.
+    Older queues lack the uid column; add and backfill it from the payload.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_queue (
+          id          INTEGER PRIMARY KEY,
+          table_name  TEXT,
+          operation   TEXT,
+          data        TEXT,
+          created_at  TEXT,
+          uid         TEXT
+        )
+    """)
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(sync_queue)")}
+    if "uid" not in cols:
+        conn.execute("ALTER TABLE sync_queue ADD COLUMN uid TEXT")
+        conn.execute(
+            "UPDATE sync_queue SET uid = json_extract(data, '$.uid') WHERE uid IS NULL")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sync_queue_table_uid ON sync_queue(table_name, uid)")
+
+
 def queue_sync_operation(table: str, operation: str, data: Dict[str, Any]) -> None:
     """
     In client mode, queue an operation (INSERT/UPDATE/DELETE) for later push.
@@ -182,22 +257,85 @@ def queue_sync_operation(table: str, operation: str, data: Dict[str, Any]) -> No
         return
 
     with get_sync_queue_connection() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS sync_queue (
-              id          INTEGER PRIMARY KEY,
-              table_name  TEXT,
-              operation   TEXT,
-              data        TEXT,
-              created_at  TEXT
-            )
-        """)
+        _ensure_sync_queue(conn)
         conn.execute(
-            "INSERT INTO sync_queue (table_name, operation, data, created_at) VALUES (?, ?, ?, ?)",
+            "INSERT INTO sync_queue (table_name, operation, data, created_at, uid) VALUES (?, ?, ?, ?, ?)",
             (table, operation, json.dumps(data),
-             datetime.now(timezone.utc).isoformat())
+             datetime.now(timezone.utc).isoformat(), data.get("uid"))
         )
 
 
+def _fold_operations(rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+    """
+    Coalesce one (table, uid) history, oldest first, into the minimal op list:
+      • create + update(s) → one create carrying the final state
+      • update + update    → one update with merged fields
+      • update + delete    → delete
+      • create + delete    → nothing
+    Each folded op keeps the id of the row it started from.
+    """
+    folded: List[Dict[str, Any]] = []
+    for row in rows:
+        op, data = row["operation"], json.loads(row["data"])
+        prev = folded[-1] if folded else None
+        if prev and op == "update" and prev["operation"] in ("create", "update"):
+            prev["data"].update(data)
+        elif prev and op == "delete" and prev["operation"] == "create":
+            folded.pop()
+        elif prev and op == "delete" and prev["operation"] == "update":
+            prev["operation"], prev["data"] = "delete", data
+        else:
+            folded.append({"id": row["id"], "operation": op, "data": data})
+    return folded
+
+
+def compact_sync_queue() -> Dict[str, Any]:
+    """
+    Coalesce queued operations per (table_name, uid) before pushing, so a task
+    created, edited five times and completed costs one HTTP call, and a
+    create followed by a delete costs none.
+    Returns {"before", "after", "ratio"} where ratio is the fraction removed.
+    """
+    conn = get_sync_queue_connection()
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            _ensure_sync_queue(conn)
+            before = conn.execute("SELECT COUNT(*) FROM sync_queue").fetchone()[0]
+            groups = conn.execute("""
+                SELECT table_name, uid FROM sync_queue
+                WHERE uid IS NOT NULL
+                GROUP BY table_name, uid
+                HAVING COUNT(*) > 1
+            """).fetchall()
+            for group in groups:
+                rows = conn.execute(
+                    "SELECT id, operation, data FROM sync_queue "
+                    "WHERE table_name = ? AND uid = ? ORDER BY id",
+                    (group["table_name"], group["uid"])
+                ).fetchall()
+                folded = _fold_operations(rows)
+                keep = {op["id"] for op in folded}
+                conn.executemany(
+                    "UPDATE sync_queue SET operation = ?, data = ? WHERE id = ?",
+                    [(op["operation"], json.dumps(op["data"]), op["id"])
+                     for op in folded]
+                )
+                conn.executemany(
+                    "DELETE FROM sync_queue WHERE id = ?",
+                    [(row["id"],) for row in rows if row["id"] not in keep]
+                )
+            after = conn.execute("SELECT COUNT(*) FROM sync_queue").fetchone()[0]
+    finally:
+        conn.close()
+
+    ratio = (before - after) / before if before else 0.0
+    if before != after:
+        logger.info("Compacted sync queue: %d → %d ops (%.1f%% fewer)",
+                    before, after, ratio * 100)
+    return {"before": before, "after": after, "ratio": ratio}
+
+
 def process_sync_queue() -> None:
     """
     Attempt to push queued operations to the host one‐by‐one, deleting on success.
@@ -206,23 +344,31 @@ def process_sync_queue() -> None:
         return
 
     mode, server_url = get_mode()
-    api_key = load_config().get("api", {}).get("key", "")
-    if not api_key:
+    headers = get_sync_headers()
+    if not headers:
+        return
+
+    from lifelog.utils.db.sync_breaker import NETWORK_ERRORS, request_timeout, sync_breaker
+    if not sync_breaker.allow_request(server_url):
         return
 
+    compact_sync_queue()
+
+    session = get_http_session()
+    timeout = request_timeout()
     conn = get_sync_queue_connection()
     conn.row_factory = sqlite3.Row
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM sync_queue ORDER BY created_at ASC")
+        cursor.execute("SELECT * FROM sync_queue ORDER BY created_at ASC, id ASC")
         for row in cursor.fetchall():
             try:
-                resp = requests.post(
+                resp = session.post(
                     f"{server_url}/sync/{row['table_name']}",
                     json={"operation": row["operation"],
                           "data": json.loads(row["data"])},
-                    headers={"X-API-Key": api_key},
-                    timeout=10
+                    headers=headers,
+                    timeout=timeout
                 )
                 if resp.status_code == 200:
                     conn.execute(
@@ -230,6 +376,11 @@ def process_sync_queue() -> None:
                     conn.commit()
                     logger.info("Synced %s id=%d",
                                 row["table_name"], row["id"])
+            except NETWORK_ERRORS as e:
+                # Host went away mid-push: open the breaker and leave the
+                # remaining rows queued instead of timing out on each one.
+                sync_breaker.record_failure(server_url, e)
+                break
             except Exception:
                 logger.exception("Error syncing %s id=%d",
                                  row["table_name"], row["id"])
@@ -237,51 +388,107 @@ def process_sync_queue() -> None:
         conn.close()
 
 
+def _timed_pull(fn) -> None:
+    """Run one table pull, logging its wall-clock duration."""
+    started = time.perf_counter()
+    try:
+        fn(push=False)
+        logger.info("auto_sync: %s succeeded in %.3fs",
+                    fn.__name__, time.perf_counter() - started)
+    except Exception:
+        logger.exception("auto_sync: %s failed after %.3fs",
+                         fn.__name__, time.perf_counter() - started)
+
+
 def auto_sync() -> None:
     """
-    High‐level sync: push queue, then pull fresh rows for all tracked tables.
+    High‐level sync: push the queue once, then pull fresh rows for all tracked
+    tables concurrently over the shared HTTP session.
+    Tasks and time logs are independent; goals reference trackers, so the
+    goals pull runs after the trackers pull on the same worker.
     """
     if not should_sync():
         return
 
+    from lifelog.utils.db.sync_breaker import host_available
+    _, server_url = get_mode()
+    if not host_available(server_url):
+        logger.info("auto_sync: host unavailable, skipping")
+        return
+
     from lifelog.utils.db.task_repository import _pull_changed_tasks_from_host
     from lifelog.utils.db.time_repository import _pull_changed_time_logs_from_host
     from lifelog.utils.db.track_repository import (_pull_changed_trackers_from_host,
                                                    _pull_changed_goals_from_host)
 
-    for fn in (_pull_changed_tasks_from_host,
-               _pull_changed_time_logs_from_host,
-               _pull_changed_trackers_from_host,
-               _pull_changed_goals_from_host):
-        try:
-            fn()
-            logger.info("auto_sync: %s succeeded", fn.__name__)
-        except Exception:
-            logger.exception("auto_sync: %s failed", fn.__name__)
+    started = time.perf_counter()
+    try:
+        process_sync_queue()
+    except Exception:
+        logger.exception("auto_sync: process_sync_queue failed")
+    logger.info("auto_sync: push finished in %.3fs",
+                time.perf_counter() - started)
+
+    # A freshly paired client installs a host snapshot instead of pulling
+    # every row as JSON; the pulls below then continue from its sequence.
+    from lifelog.utils.db.snapshot import bootstrap_from_host, needs_bootstrap
+    try:
+        if needs_bootstrap():
+            seq = bootstrap_from_host()
+            if seq is not None:
+                logger.info("auto_sync: bootstrapped from snapshot seq=%d in %.3fs",
+                            seq, time.perf_counter() - started)
+    except Exception:
+        logger.exception("auto_sync: snapshot bootstrap failed")
+
+    def _trackers_then_goals() -> None:
+        _timed_pull(_pull_changed_trackers_from_host)
+        _timed_pull(_pull_changed_goals_from_host)
+
+    with ThreadPoolExecutor(max_workers=SYNC_PULL_WORKERS,
+                            thread_name_prefix="auto_sync") as pool:
+        futures = [
+            pool.submit(_timed_pull, _pull_changed_tasks_from_host),
+            pool.submit(_timed_pull, _pull_changed_time_logs_from_host),
+            pool.submit(_trackers_then_goals),
+        ]
+        for fut in futures:
+            fut.result()
+
+    logger.info("auto_sync: completed in %.3fs",
+                time.perf_counter() - started)
 
 # ───────────────────────────────────────────────────────────────────────────────
 # Server Fetch Helper
 # ───────────────────────────────────────────────────────────────────────────────
 
 
-def fetch_from_server(endpoint: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+def fetch_from_server(endpoint: str, params: Dict[str, Any] = None) -> Any:
     """
     In client mode, GET data from the host at /<endpoint>?… 
-    Returns a list of JSON objects.
+    Returns the decoded JSON (usually a list of objects), or [] on failure.
     """
     if not should_sync():
         return []
 
     _, server_url = get_mode()
-    api_key = load_config().get("api", {}).get("key", "")
-    if not api_key:
+    headers = get_sync_headers()
+    if not headers:
+        return []
+
+    from lifelog.utils.db.sync_breaker import NETWORK_ERRORS, request_timeout, sync_breaker
+    if not sync_breaker.allow_request(server_url):
         return []
 
     try:
-        resp = requests.get(f"{server_url}/{endpoint}", params=params,
-                            headers={"X-API-Key": api_key}, timeout=10)
+        resp = get_http_session().get(f"{server_url}/{endpoint}", params=params,
+                                      headers=headers,
+                                      timeout=request_timeout())
         resp.raise_for_status()
         return resp.json()
+    except NETWORK_ERRORS as e:
+        sync_breaker.record_failure(server_url, e)
+        return []
     except Exception as e:
         logger.warning("fetch_from_server error: %s", e)
         return []
@@ -319,6 +526,87 @@ def set_last_synced(table_name: str, iso_ts: str) -> None:
                 (table_name, iso_ts)
             )
 
+
+def _ensure_sync_state_seq() -> None:
+    """sync_state.last_seq is added by a migration for databases that predate it."""
+    from lifelog.utils.db import migrations
+    migrations.ensure_migrated()
+
+
+def get_last_synced_seq(table_name: str) -> Optional[int]:
+    """
+    Returns the host change-log sequence this client has applied for
+    `table_name`, or None if the table was never pulled by sequence.
+    """
+    _ensure_sync_state_seq()
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT last_seq FROM sync_state WHERE table_name = ?",
+            (table_name,)
+        ).fetchone()
+    return row["last_seq"] if row and row["last_seq"] is not None else None
+
+
+def set_last_synced_seq(table_name: str, seq: int) -> None:
+    """
+    Upsert the host change-log sequence applied for `table_name`.
+    """
+    _ensure_sync_state_seq()
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO sync_state (table_name, last_synced_at, last_seq)
+            VALUES (?, ?, ?)
+            ON CONFLICT(table_name) DO UPDATE SET
+              last_synced_at = excluded.last_synced_at,
+              last_seq = excluded.last_seq
+            """,
+            (table_name, datetime.now(timezone.utc).isoformat(), int(seq))
+        )
+
+
+def pull_table_changes(
+    table_name: str,
+    upsert: Callable[[Dict[str, Any]], None],
+    mark_deleted: Callable[[str], None],
+) -> bool:
+    """
+    Incrementally pull `table_name` from the host's change log
+    (GET /sync/<table>/changes?since_seq=N), page by page, advancing the
+    local cursor after each applied page. A full dump (a new device, or a
+    cursor behind the compacted log) is paged by id and moves the cursor
+    only once its last page is applied.
+    Returns False if the host did not answer with a change page (older host
+    or network failure) so the caller can fall back to `since` pulls.
+    """
+    since_seq = get_last_synced_seq(table_name) or 0
+    params: Dict[str, Any] = {"since_seq": since_seq}
+    while True:
+        page = fetch_from_server(f"sync/{table_name}/changes", params=params)
+        if not isinstance(page, dict) or "next_seq" not in page:
+            return False
+        for remote in page.get("rows", []):
+            try:
+                upsert(remote)
+            except Exception:
+                logger.exception("pull %s: upsert failed for uid=%s",
+                                 table_name, remote.get("uid"))
+        for uid_val in page.get("deleted", []):
+            try:
+                mark_deleted(uid_val)
+            except Exception:
+                logger.exception("pull %s: delete failed for uid=%s",
+                                 table_name, uid_val)
+        if page.get("full") and page.get("has_more"):
+            params = {"since_seq": since_seq, "after_id": page["after_id"],
+                      "dump_seq": page["next_seq"]}
+            continue
+        since_seq = int(page["next_seq"])
+        set_last_synced_seq(table_name, since_seq)
+        if not page.get("has_more"):
+            return True
+        params = {"since_seq": since_seq}
+
 # ───────────────────────────────────────────────────────────────────────────────
 # Safe Execute / Query with Retries
 # ───────────────────────────────────────────────────────────────────────────────
@@ -338,16 +626,20 @@ def safe_execute(
     for attempt in range(1, retries + 1):
         try:
             with get_connection() as conn:
-                cur = conn.execute(sql, params)
+                with query_trace.timed(sql) as trace:
+                    cur = conn.execute(sql, params)
+                    trace.rows = cur.rowcount
                 return cur
         except sqlite3.OperationalError as e:
             last_exc = e
             logger.warning(
                 "safe_execute attempt %d/%d failed: %s", attempt, retries, e)
+            metrics.DB_RETRIES.inc(call="safe_execute")
             time.sleep(backoff * attempt)
         except sqlite3.DatabaseError as e:
             logger.exception("safe_execute unrecoverable DB error")
             raise
+    metrics.DB_RETRY_FAILURES.inc(call="safe_execute")
     logger.error("safe_execute failed after %d retries", retries)
     raise last_exc  # type: ignore
 
@@ -365,15 +657,19 @@ def safe_query(
     for attempt in range(1, retries + 1):
         try:
             with get_connection() as conn:
-                cur = conn.execute(sql, params)
-                return cur.fetchall()
+                with query_trace.timed(sql) as trace:
+                    rows = conn.execute(sql, params).fetchall()
+                    trace.rows = len(rows)
+                return rows
         except sqlite3.OperationalError as e:
             last_exc = e
             logger.warning("safe_query attempt %d/%d failed: %s",
                            attempt, retries, e)
+            metrics.DB_RETRIES.inc(call="safe_query")
             time.sleep(backoff * attempt)
         except sqlite3.DatabaseError as e:
             logger.exception("safe_query unrecoverable DB error")
             raise
+    metrics.DB_RETRY_FAILURES.inc(call="safe_query")
     logger.error("safe_query failed after %d retries", retries)
     raise last_exc  # type: ignore
@@ -0,0 +1,336 @@
+# lifelog/utils/db/migrations.py
+"""
+Versioned schema migrations.
+
+The schema version lives in `PRAGMA user_version`. MIGRATIONS is an ordered
+list of steps; `migrate()` applies every step above the stored version, bumps
+the version after each one and runs ANALYZE when anything changed.
+
+Every step is idempotent (CREATE ... IF NOT EXISTS, column checks before
+ALTER TABLE), because:
+
+  • databases created before this module existed report version 0 and
+    already hold most of the schema, so they replay every step;
+  • executescript() commits as it goes, so a step interrupted half-way is
+    simply run again next time.
+
+New schema goes in a new step at the end; existing steps are never edited
+once released, except to make them safer to replay.
+
+The CREATE INDEX statements in the steps' `schema` scripts double as the
+declared index spec: `verify_indexes()` compares it with sqlite_master and
+reports missing, drifted, redundant and (from traced queries) unused indexes.
+"""
+import logging
+import os
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+from lifelog.utils.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Rows ANALYZE samples per index; keeps it quick on large databases.
+ANALYSIS_LIMIT = 1000
+
+_migrated: Set[str] = set()
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], object]
+    schema: Callable[[], str] = lambda: ""   # SQL declaring the step's indexes
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Steps
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def _core_schema() -> str:
+    from lifelog.utils.db.database_manager import CORE_SCHEMA
+    return CORE_SCHEMA
+
+
+def _core_indexes() -> str:
+    from lifelog.utils.db.database_manager import CORE_INDEXES
+    return CORE_INDEXES
+
+
+def _script(source: Callable[[], str]) -> Callable[[sqlite3.Connection], None]:
+    return lambda conn: conn.executescript(source())
+
+
+def _installer(module: str, name: str) -> Callable[[sqlite3.Connection], object]:
+    def apply(conn: sqlite3.Connection):
+        mod = __import__(f"lifelog.utils.db.{module}", fromlist=[name])
+        return getattr(mod, name)(conn)
+    return apply
+
+
+def _schema_of(module: str, name: str) -> Callable[[], str]:
+    def schema() -> str:
+        mod = __import__(f"lifelog.utils.db.{module}", fromlist=[name])
+        return getattr(mod, name)
+    return schema
+
+
+def _drop_redundant_core_indexes(conn: sqlite3.Connection) -> None:
+    from lifelog.utils.db.database_manager import REDUNDANT_CORE_INDEXES
+    conn.executescript("".join(f"DROP INDEX IF EXISTS {name};\n"
+                               for name in REDUNDANT_CORE_INDEXES))
+
+
+def _sync_state_last_seq(conn: sqlite3.Connection) -> None:
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(sync_state)")}
+    if "last_seq" not in cols:
+        conn.execute("ALTER TABLE sync_state ADD COLUMN last_seq INTEGER")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "core tables", _script(_core_schema), _core_schema),
+    Migration(2, "core indexes", _script(_core_indexes), _core_indexes),
+    Migration(3, "change log", _installer("change_log", "install_change_log"),
+              _schema_of("change_log", "CHANGE_LOG_SCHEMA")),
+    Migration(4, "full-text search index", _installer("search_index", "install_search_index")),
+    Migration(5, "tag index", _installer("tag_index", "install_tag_index"),
+              _schema_of("tag_index", "TAG_INDEX_SCHEMA")),
+    Migration(6, "task recurrence pointer", _installer("recurrence", "install_recurrence"),
+              _schema_of("recurrence", "RECURRENCE_SCHEMA")),
+    Migration(7, "reminders and job queue", _installer("reminders", "install_reminders"),
+              _schema_of("reminders", "REMINDERS_SCHEMA")),
+    Migration(8, "per-task time totals", _installer("task_time", "install_task_time"),
+              _schema_of("task_time", "TASK_TIME_SCHEMA")),
+    Migration(9, "time interval indexes", _installer("time_audit", "install_time_audit"),
+              _schema_of("time_audit", "TIME_AUDIT_SCHEMA")),
+    Migration(10, "sync_state.last_seq", _sync_state_last_seq),
+    Migration(11, "cold-storage archive manifest", _installer("archive", "install_archive")),
+    Migration(12, "tracker retention and entry aggregates",
+              _installer("retention", "install_retention")),
+    Migration(13, "epoch and local-date keys", _installer("time_keys", "install_time_keys"),
+              _schema_of("time_keys", "TIME_KEYS_SCHEMA")),
+    Migration(14, "archived per-task time", _installer("task_time", "install_archived_task_time")),
+    Migration(15, "tag triggers keep trailing '+'",
+              _installer("tag_index", "reinstall_tag_triggers")),
+    Migration(16, "drop redundant core indexes", _drop_redundant_core_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Running
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending(conn: sqlite3.Connection) -> List[Migration]:
+    version = get_version(conn)
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+def analyze(conn: sqlite3.Connection) -> None:
+    """Refresh planner statistics (sqlite_stat1), sampling at most ANALYSIS_LIMIT rows per index."""
+    conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def migrate(conn: sqlite3.Connection, analyze_after: bool = True) -> List[Migration]:
+    """Apply pending steps in order; returns the steps that ran."""
+    version = get_version(conn)
+    if version > LATEST_VERSION:
+        logger.warning("Database schema version %d is newer than this lifelog (%d); "
+                       "not migrating.", version, LATEST_VERSION)
+        return []
+    applied = []
+    for step in MIGRATIONS:
+        if step.version <= version:
+            continue
+        logger.info("Applying migration %d: %s", step.version, step.name)
+        step.apply(conn)
+        conn.execute(f"PRAGMA user_version = {int(step.version)}")
+        conn.commit()
+        applied.append(step)
+    if applied and analyze_after:
+        analyze(conn)
+    return applied
+
+
+def ensure_migrated() -> None:
+    """
+    Migrate the current database once per process. Called by the feature
+    modules before they touch their tables, so an older database picks up new
+    schema on first use; after the first call this is a set lookup.
+    """
+    key = os.getenv("LIFELOG_DB_PATH", "")
+    if key in _migrated:
+        return
+    with get_connection() as conn:
+        if get_version(conn) < LATEST_VERSION:
+            migrate(conn)
+    _migrated.add(key)
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Index verification
+# ───────────────────────────────────────────────────────────────────────────────
+
+_CREATE_INDEX = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(\w+)\b.*?;",
+    re.IGNORECASE | re.DOTALL)
+_IF_NOT_EXISTS = re.compile(r"\s+IF\s+NOT\s+EXISTS", re.IGNORECASE)
+_WHERE = re.compile(r"\bwhere\b")
+_USING_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+class IndexSpec(NamedTuple):
+    name: str
+    table: str
+    sql: str
+    migration: int
+
+
+@dataclass
+class IndexReport:
+    declared: int = 0
+    missing: List[IndexSpec] = field(default_factory=list)
+    drifted: List[IndexSpec] = field(default_factory=list)     # same name, other definition
+    redundant: Dict[str, str] = field(default_factory=dict)     # index -> index covering it
+    undeclared: List[str] = field(default_factory=list)
+    unused: Optional[List[str]] = None     # None: no traced queries to judge by
+    traced_queries: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.drifted
+
+
+def _normalize_sql(sql: str) -> str:
+    sql = _IF_NOT_EXISTS.sub("", sql.strip().rstrip(";"))
+    sql = re.sub(r"\s+", " ", sql)
+    return re.sub(r"\s*([(),])\s*", r"\1", sql).lower()
+
+
+def declared_indexes() -> Dict[str, IndexSpec]:
+    """name -> spec, from the CREATE INDEX statements of every migration."""
+    spec: Dict[str, IndexSpec] = {}
+    for step in MIGRATIONS:
+        for match in _CREATE_INDEX.finditer(step.schema()):
+            name = match.group(1)
+            spec.setdefault(name, IndexSpec(name, match.group(2), match.group(0), step.version))
+    return spec
+
+
+def _index_columns(conn: sqlite3.Connection, name: str) -> Optional[List[str]]:
+    """Key columns of an index, or None if it has expression columns."""
+    cols = [row[2] for row in conn.execute(f"PRAGMA index_info('{name}')")]
+    return None if any(c is None for c in cols) else cols
+
+
+def _redundant(conn: sqlite3.Connection, existing: Dict[str, sqlite3.Row]) -> Dict[str, str]:
+    """Plain indexes whose columns are a left prefix of another index on the same table."""
+    by_table: Dict[str, List[tuple]] = {}
+    for name, row in existing.items():
+        cols = _index_columns(conn, name)
+        partial = bool(row["sql"]) and bool(_WHERE.search(_normalize_sql(row["sql"])))
+        unique = name.startswith("sqlite_autoindex") or (
+            bool(row["sql"]) and _normalize_sql(row["sql"]).startswith("create unique"))
+        if cols:
+            by_table.setdefault(row["tbl_name"], []).append((name, cols, partial, unique))
+    found = {}
+    for indexes in by_table.values():
+        for name, cols, partial, unique in indexes:
+            if partial or unique or name.startswith("sqlite_autoindex"):
+                continue
+            for other, other_cols, other_partial, _ in indexes:
+                if (other != name and not other_partial and len(other_cols) >= len(cols)
+                        and other_cols[:len(cols)] == cols
+                        and (len(other_cols) > len(cols) or other.startswith("sqlite_autoindex")
+                             or other < name)):
+                    found[name] = other
+                    break
+    return found
+
+
+def indexes_used(conn: sqlite3.Connection, sql: str) -> Set[str]:
+    """Index names EXPLAIN QUERY PLAN reports for `sql`; parameters are bound to NULL."""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", [None] * sql.count("?")).fetchall()
+    return {m.group(1) for row in plan for m in _USING_INDEX.finditer(row[-1])}
+
+
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with", "replace")
+
+
+def _traced_usage(conn: sqlite3.Connection) -> Optional[tuple]:
+    """(index names used, number of query shapes checked) from `llog debug` trace stats."""
+    from lifelog.utils.db import query_trace
+    stats = query_trace.stored_stats()
+    if not stats:
+        return None
+    used: Set[str] = set()
+    checked = 0
+    for stat in stats:
+        sql = stat.sql.replace("(?, …)", "(?)")
+        if not sql.lower().startswith(_EXPLAINABLE):
+            continue
+        try:
+            used |= indexes_used(conn, sql)
+            checked += 1
+        except sqlite3.Error:
+            continue    # shapes from other schema versions or unbindable statements
+    return used, checked
+
+
+def verify_indexes(conn: sqlite3.Connection, check_usage: bool = True) -> IndexReport:
+    spec = declared_indexes()
+    existing = {row["name"]: row for row in conn.execute(
+        "SELECT name, tbl_name, sql FROM main.sqlite_master WHERE type = 'index'")}
+    tables = {row[0] for row in conn.execute(
+        "SELECT name FROM main.sqlite_master WHERE type = 'table'")}
+
+    report = IndexReport(declared=len(spec))
+    for name, idx in spec.items():
+        if idx.table not in tables:
+            continue    # optional feature tables (e.g. no FTS5)
+        row = existing.get(name)
+        if row is None:
+            report.missing.append(idx)
+        elif _normalize_sql(row["sql"] or "") != _normalize_sql(idx.sql):
+            report.drifted.append(idx)
+    report.undeclared = sorted(n for n in existing
+                               if n not in spec and not n.startswith("sqlite_"))
+    report.redundant = _redundant(conn, existing)
+
+    if check_usage:
+        usage = _traced_usage(conn)
+        if usage is not None:
+            used, report.traced_queries = usage
+            report.unused = sorted(
+                n for n in existing if n in spec and n not in used
+                and not _normalize_sql(spec[n].sql).startswith("create unique"))
+    return report
+
+
+def repair_indexes(conn: sqlite3.Connection, report: IndexReport) -> List[str]:
+    """Create missing declared indexes and rebuild drifted ones; returns their names."""
+    fixed = []
+    for idx in report.missing + report.drifted:
+        if idx in report.drifted:
+            conn.execute(f"DROP INDEX IF EXISTS {idx.name}")
+        conn.execute(idx.sql.rstrip().rstrip(";"))
+        fixed.append(idx.name)
+    conn.commit()
+    return fixed
+
+
+def has_statistics(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'").fetchone()
+    return bool(row) and bool(conn.execute("SELECT 1 FROM sqlite_stat1 LIMIT 1").fetchone())
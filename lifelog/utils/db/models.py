@@ -196,6 +196,7 @@ class Tracker(BaseModel):
     uid: Optional[str] = None
     updated_at: Optional[str] = None
     deleted: int = 0
+    retention: Optional[str] = None   # e.g. "raw:90d,hour:365d,day"; see retention.py
 
 
 def tracker_from_row(row: Dict[str, Any]) -> Tracker:
@@ -209,7 +210,8 @@ def tracker_from_row(row: Dict[str, Any]) -> Tracker:
         notes=row.get("notes"),
         uid=row.get("uid"),
         updated_at=row.get("updated_at"),
-        deleted=row.get("deleted", 0)
+        deleted=row.get("deleted", 0),
+        retention=row.get("retention"),
     )
 
 
@@ -347,7 +349,8 @@ def get_tracker_fields() -> List[str]:
     Return all Tracker‐table columns except 'id'.  
     Must match the actual database schema.
     """
-    return ["uid", "title", "type", "category", "created", "tags", "notes", "updated_at", "deleted"]
+    return ["uid", "title", "type", "category", "created", "tags", "notes", "updated_at", "deleted",
+            "retention"]
 
 
 # ───────────────────────────────────────────────────────────────────────────────
@@ -410,6 +413,7 @@ class Tracker(BaseModel):
     uid: Optional[str] = None
     updated_at: Optional[str] = None
     deleted: int = 0
+    retention: Optional[str] = None   # e.g. "raw:90d,hour:365d,day"; see retention.py
 
 
 # ───────────────────────────────────────────────────────────────────────────────
@@ -453,6 +457,27 @@ class TrackerEntry(BaseModel):
     timestamp: str
     value: float
     uid: Optional[str] = None
+    # Set on rows a retention policy compacted: `value` is then the sum of
+    # `sample_count` raw values starting at `timestamp`, over one `resolution`.
+    sample_count: Optional[int] = None
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    last_value: Optional[float] = None
+    resolution: Optional[str] = None
+
+    @property
+    def count(self) -> int:
+        """Raw entries this row stands for."""
+        return self.sample_count or 1
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.value / self.count if self.value is not None else None
+
+    @property
+    def latest(self) -> float:
+        """The last raw value in the row."""
+        return self.value if self.last_value is None else self.last_value
 
 
 def entry_from_row(row: Dict[str, Any]) -> TrackerEntry:
@@ -465,6 +490,11 @@ def entry_from_row(row: Dict[str, Any]) -> TrackerEntry:
         timestamp=row.get("timestamp"),
         value=row.get("value"),
         uid=row.get("uid"),
+        sample_count=row.get("sample_count"),
+        min_value=row.get("min_value"),
+        max_value=row.get("max_value"),
+        last_value=row.get("last_value"),
+        resolution=row.get("resolution"),
     )
 
 
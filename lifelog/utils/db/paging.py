@@ -0,0 +1,92 @@
+# lifelog/utils/db/paging.py
+"""
+Keyset ("seek") pagination.
+
+Instead of OFFSET, a page is requested relative to the sort key of a row the
+caller already has: `WHERE (k0, k1) > (?, ?) ORDER BY k0, k1 LIMIT n`. The
+cost of a page does not grow with its position in the list, and a page stays
+anchored to a row when rows are inserted or deleted before it.
+
+Sort expressions must be non-NULL (wrap nullable columns in COALESCE) and
+the last one must be unique, normally the id.
+"""
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from lifelog.utils.db.db_helper import safe_query
+
+Key = Tuple[Any, ...]
+
+
+class KeysetQuery:
+    """A filtered, ordered view of one table that can be read page by page."""
+
+    def __init__(self, table: str, where: str = "1=1", params: Sequence[Any] = (),
+                 order: Sequence[Tuple[str, bool]] = (("id", False),),
+                 convert: Callable[[dict], Any] = dict):
+        """
+        order:   (SQL expression, descending) pairs, most significant first
+        convert: turns a row dict into the object handed to callers
+        """
+        self.table = table
+        self.where = where
+        self.params = tuple(params)
+        self.order = list(order)
+        self.convert = convert
+
+    def _seek(self, key: Key, backwards: bool, inclusive: bool) -> Tuple[str, List[Any]]:
+        terms, params = [], []
+        for i, (expr, desc) in enumerate(self.order):
+            op = "<" if desc != backwards else ">"
+            eq = [f"{e} = ?" for e, _ in self.order[:i]]
+            terms.append("(" + " AND ".join(eq + [f"{expr} {op} ?"]) + ")")
+            params.extend(key[:i + 1])
+        if inclusive:
+            terms.append("(" + " AND ".join(f"{e} = ?" for e, _ in self.order) + ")")
+            params.extend(key)
+        return "(" + " OR ".join(terms) + ")", params
+
+    def page(self, after: Optional[Key] = None, limit: int = 50,
+             backwards: bool = False, inclusive: bool = False) -> List[Tuple[Key, Any]]:
+        """
+        Up to `limit` (key, object) pairs following `after` in list order, or
+        preceding it with backwards=True. Results are always in list order.
+        """
+        keys = ", ".join(f"{expr} AS _k{i}" for i, (expr, _) in enumerate(self.order))
+        sql = f"SELECT *, {keys} FROM {self.table} WHERE ({self.where})"
+        params = list(self.params)
+        if after is not None:
+            seek, seek_params = self._seek(after, backwards, inclusive)
+            sql += f" AND {seek}"
+            params.extend(seek_params)
+        sql += " ORDER BY " + ", ".join(
+            f"{expr} {'DESC' if desc != backwards else 'ASC'}" for expr, desc in self.order)
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        result = []
+        for row in safe_query(sql, tuple(params)):
+            data = dict(row)
+            key = tuple(data.pop(f"_k{i}") for i in range(len(self.order)))
+            result.append((key, self.convert(data)))
+        if backwards:
+            result.reverse()
+        return result
+
+    def count(self, before: Optional[Key] = None) -> int:
+        """Number of rows in the view, or only of those preceding `before`."""
+        sql = f"SELECT COUNT(*) FROM {self.table} WHERE ({self.where})"
+        params = list(self.params)
+        if before is not None:
+            seek, seek_params = self._seek(before, True, False)
+            sql += f" AND {seek}"
+            params.extend(seek_params)
+        rows = safe_query(sql, tuple(params))
+        return rows[0][0] if rows else 0
+
+    def key_for(self, row_id: Any) -> Optional[Key]:
+        """Sort key of the row with this id, or None if it is not in the view."""
+        keys = ", ".join(expr for expr, _ in self.order)
+        rows = safe_query(
+            f"SELECT {keys} FROM {self.table} WHERE ({self.where}) AND id = ?",
+            self.params + (row_id,))
+        return tuple(rows[0]) if rows else None
@@ -0,0 +1,164 @@
+# lifelog/utils/db/priority.py
+"""
+Task priority scoring.
+
+    priority = (importance * 0.6 + urgency * 0.4) * category_weight
+    urgency  = max(0, 1 - days_until_due / 10)     (fractional days)
+
+Urgency grows continuously as a deadline approaches and keeps growing once
+it has passed, so a stored score goes stale with time. `rescore_open_tasks`
+recomputes every open task in one vectorized pass (the day arithmetic is
+done by SQLite's julianday, the formula by NumPy) and writes only the
+scores that moved, with a single executemany. It runs from the daily
+`llog task rescore` cron job and, through `rescore_if_stale`, before
+priority-sorted listings whenever the last pass is older than
+[settings] priority_max_age_hours.
+
+Category weights come from [category_importance] in the config; categories
+without an entry weigh 1.0.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from lifelog.utils.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+IMPORTANCE_WEIGHT = 0.6
+URGENCY_WEIGHT = 0.4
+URGENCY_HORIZON_DAYS = 10.0
+DEFAULT_IMPORTANCE = 3
+DEFAULT_MAX_AGE_HOURS = 6.0
+
+# Scores that moved less than this are not rewritten.
+WRITE_EPSILON = 0.005
+
+JOB_NAME = "priority_rescore"
+
+
+def _ensure_job_runs() -> None:
+    """job_runs is part of the core tables; older databases get it via migrations."""
+    from lifelog.utils.db import migrations
+    migrations.ensure_migrated()
+
+
+def _category_weights() -> Dict[str, float]:
+    from lifelog.config.config_manager import get_all_category_importance
+    return get_all_category_importance()
+
+
+def score(importance: Optional[float], days_left: Optional[float],
+          category_weight: float = 1.0) -> float:
+    """Scalar form of the formula, for scoring a single task on save."""
+    importance = DEFAULT_IMPORTANCE if importance is None else importance
+    urgency = 0.0 if days_left is None else max(0.0, 1.0 - days_left / URGENCY_HORIZON_DAYS)
+    return round((importance * IMPORTANCE_WEIGHT + urgency * URGENCY_WEIGHT) * category_weight, 4)
+
+
+def score_task(task: Any, now: Optional[datetime] = None,
+               weights: Optional[Dict[str, float]] = None) -> float:
+    """Score a Task or task dict (due may be a datetime or ISO string)."""
+    get = task.get if isinstance(task, dict) else lambda k, d=None: getattr(task, k, d)
+    now = now or datetime.now(timezone.utc)
+    days_left = None
+    due = get("due")
+    if isinstance(due, str):
+        try:
+            due = datetime.fromisoformat(due)
+        except ValueError:
+            due = None
+    if isinstance(due, datetime):
+        if due.tzinfo is None:
+            due = due.replace(tzinfo=timezone.utc)
+        days_left = (due - now).total_seconds() / 86400.0
+    weights = _category_weights() if weights is None else weights
+    return score(get("importance"), days_left, weights.get(get("category") or "", 1.0))
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Batch re-scoring
+# ───────────────────────────────────────────────────────────────────────────────
+
+def _scores_numpy(np, importance, days_left, weights):
+    imp = np.array([DEFAULT_IMPORTANCE if v is None else v for v in importance], dtype=float)
+    days = np.array([np.nan if v is None else v for v in days_left], dtype=float)
+    urgency = np.where(np.isnan(days), 0.0,
+                       np.maximum(0.0, 1.0 - days / URGENCY_HORIZON_DAYS))
+    return np.round((imp * IMPORTANCE_WEIGHT + urgency * URGENCY_WEIGHT)
+                    * np.array(weights, dtype=float), 4).tolist()
+
+
+def rescore_open_tasks(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Recompute the priority of every open task. Returns
+    {"scored": open tasks examined, "updated": rows rewritten}.
+    """
+    from lifelog.utils.shared_utils import get_numpy
+    now = now or datetime.now(timezone.utc)
+    now_iso = now.astimezone(timezone.utc).isoformat()
+    cat_weights = _category_weights()
+
+    _ensure_job_runs()
+    with get_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, importance, category, priority,
+                   julianday(due) - julianday(?) AS days_left
+            FROM tasks
+            WHERE COALESCE(deleted, 0) = 0
+              AND (status IS NULL OR status != 'done')
+            """,
+            (now_iso,)
+        ).fetchall()
+
+        importance = [r["importance"] for r in rows]
+        days_left = [r["days_left"] for r in rows]
+        weights = [cat_weights.get(r["category"] or "", 1.0) for r in rows]
+        np = get_numpy()
+        if np is not None and rows:
+            new_scores: List[float] = _scores_numpy(np, importance, days_left, weights)
+        else:
+            new_scores = [score(i, d, w) for i, d, w in zip(importance, days_left, weights)]
+
+        changed = [(new, r["id"]) for r, new in zip(rows, new_scores)
+                   if r["priority"] is None or abs(float(r["priority"]) - new) > WRITE_EPSILON]
+        conn.executemany("UPDATE tasks SET priority = ? WHERE id = ?", changed)
+        conn.execute(
+            "INSERT INTO job_runs (job, last_run, detail) VALUES (?, ?, ?) "
+            "ON CONFLICT(job) DO UPDATE SET last_run = excluded.last_run, "
+            "detail = excluded.detail",
+            (JOB_NAME, now_iso, f"scored={len(rows)} updated={len(changed)}"))
+
+    logger.info("Re-scored %d open task(s), %d changed", len(rows), len(changed))
+    return {"scored": len(rows), "updated": len(changed)}
+
+
+def last_rescored() -> Optional[datetime]:
+    """Time of the last batch pass, or None if it never ran."""
+    _ensure_job_runs()
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT last_run FROM job_runs WHERE job = ?", (JOB_NAME,)).fetchone()
+    return datetime.fromisoformat(row["last_run"]) if row else None
+
+
+def rescore_if_stale(max_age_hours: Optional[float] = None) -> bool:
+    """Run a batch pass when the last one is older than the configured age."""
+    if max_age_hours is None:
+        from lifelog.config.config_manager import get_config_value
+        try:
+            max_age_hours = float(get_config_value(
+                "settings", "priority_max_age_hours", DEFAULT_MAX_AGE_HOURS))
+        except (TypeError, ValueError):
+            max_age_hours = DEFAULT_MAX_AGE_HOURS
+    last = last_rescored()
+    now = datetime.now(timezone.utc)
+    if last is not None and (now - last).total_seconds() < max_age_hours * 3600:
+        return False
+    try:
+        rescore_open_tasks(now)
+    except Exception as e:
+        logger.error("Priority re-scoring failed: %s", e, exc_info=True)
+        return False
+    return True
@@ -0,0 +1,400 @@
+# lifelog/utils/db/query_audit.py
+"""
+EXPLAIN QUERY PLAN audit and index advisor.
+
+Statements come from two places:
+
+  • static:  string literals passed to execute()/safe_query()/... anywhere
+             in the lifelog package (f-strings are left to the next source);
+  • traced:  statements captured by query_trace while a workload runs, with
+             their literals, so dynamic SQL is covered too.
+
+Each statement is explained against a database, and two plan shapes are
+reported:
+
+  scan        `SCAN <table>` without an index, on a statement that filters
+              (a bare `SELECT * FROM t` reading everything is only "info")
+  temp-sort   `USE TEMP B-TREE FOR ORDER BY / GROUP BY / DISTINCT`
+
+For single-SELECT statements the advisor proposes an index from the WHERE
+and ORDER BY clauses: equality columns first, then the range or sort
+columns, with literal-only terms (`end IS NULL`, `status != 'done'`,
+`COALESCE(deleted, 0) = 0`) as the partial-index predicate. Each proposal
+is tried inside a savepoint and marked verified when the finding goes away;
+a proposal an existing index already matches is reported as that index
+instead, since the planner is passing it over (stale statistics, or a plan
+it prefers) and another CREATE INDEX would not help.
+
+scripts/query_audit.py runs this over synthetic data as a gate; `llog db
+audit` runs it over your own database and traced queries.
+"""
+import ast
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from lifelog.utils.db.query_trace import normalize
+
+SQL_CALLS = {"execute", "executemany", "safe_query", "safe_execute", "direct_db_execute"}
+EXPLAINABLE = ("select", "insert", "update", "delete", "with", "replace")
+
+# Findings on tables smaller than this are informational.
+DEFAULT_MIN_ROWS = 1000
+
+_IDENT = r"(?:(\w+)\.)?(\w+)"
+_PARAM = r"(?:\?\d*|:\w+)"
+_LITERAL = r"(?:'(?:[^']|'')*'|-?\d+(?:\.\d+)?|null)"
+_VALUE = rf"(?:{_PARAM}|{_LITERAL})"
+
+_EQ = re.compile(rf"^{_IDENT}\s*==?\s*({_VALUE})$", re.I)
+_IN = re.compile(rf"^{_IDENT}\s+in\s*\(.*\)$", re.I)
+_RANGE = re.compile(rf"^{_IDENT}\s*(?:<=?|>=?)\s*{_VALUE}$|^{_IDENT}\s+between\s+.+$", re.I)
+_IS_NULL = re.compile(rf"^{_IDENT}\s+is\s+(?:not\s+)?null$", re.I)
+_NOT_EQ = re.compile(rf"^{_IDENT}\s*(?:!=|<>)\s*{_LITERAL}$", re.I)
+_COALESCE = re.compile(rf"^coalesce\(\s*{_IDENT}\s*,\s*{_LITERAL}\s*\)\s*(?:=|==|!=|<>)\s*{_LITERAL}$", re.I)
+_INDEX_DEF = re.compile(r"^create\s+(?:unique\s+)?index\s+(?:if\s+not\s+exists\s+)?(\w+)\s+"
+                        r"on\s+(\w+)\s*\((.*)\)$", re.I | re.S)
+_FROM = re.compile(r"\b(?:from|join|update|into)\s+(\w+)(?:\s+(?:as\s+)?(?!where\b|join\b|on\b|left\b|inner\b|cross\b|order\b|group\b|limit\b|set\b|natural\b|using\b|values\b)(\w+))?", re.I)
+_QUOTED = re.compile(r"'(?:[^']|'')*'")
+_SCAN = re.compile(r"^SCAN (\w+)(?: (USING (?:COVERING )?INDEX|VIRTUAL TABLE))?")
+_TEMP = re.compile(r"^USE TEMP B-TREE FOR (.+)$")
+
+
+@dataclass
+class Statement:
+    sql: str
+    sites: Set[str] = field(default_factory=set)
+    sources: Set[str] = field(default_factory=set)
+
+    @property
+    def key(self) -> str:
+        return normalize(self.sql)
+
+
+@dataclass
+class Finding:
+    kind: str                 # "scan" | "temp-sort"
+    table: str
+    detail: str               # the plan line
+    statement: Statement
+    rows: int = 0             # table size in the audited database
+    filtered: bool = True     # statement has a WHERE / ORDER BY touching the table
+    suggestion: Optional[str] = None
+    verified: bool = False
+    existing: Optional[str] = None    # index that already matches the suggestion
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}|{self.table}|{self.statement.key}"
+
+    def severe(self, min_rows: int = DEFAULT_MIN_ROWS) -> bool:
+        return self.filtered and self.rows >= min_rows
+
+
+@dataclass
+class AuditResult:
+    statements: int = 0
+    explained: int = 0
+    errors: List[Tuple[Statement, str]] = field(default_factory=list)
+    findings: List[Finding] = field(default_factory=list)
+
+    def severe(self, min_rows: int = DEFAULT_MIN_ROWS,
+               accepted: Iterable[str] = ()) -> List[Finding]:
+        accepted = set(accepted)
+        return [f for f in self.findings if f.severe(min_rows) and f.key not in accepted]
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Collecting statements
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def _add(into: Dict[str, Statement], sql: str, site: str, source: str) -> None:
+    sql = sql.strip()
+    if not sql.lower().startswith(EXPLAINABLE):
+        return
+    stmt = into.setdefault(normalize(sql), Statement(sql))
+    # Traced statements arrive with their parameters expanded into literals;
+    # keep the text with the most placeholders, which is closest to the source.
+    if sql.count("?") > stmt.sql.count("?"):
+        stmt.sql = sql
+    stmt.sites.add(site)
+    stmt.sources.add(source)
+
+
+def collect_static(root: Path, into: Optional[Dict[str, Statement]] = None) -> Dict[str, Statement]:
+    """Literal SQL passed to the SQL_CALLS functions anywhere under `root`."""
+    into = {} if into is None else into
+    base = root.parent
+    for path in sorted(root.rglob("*.py")):
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        except (SyntaxError, UnicodeDecodeError):
+            continue
+        rel = path.relative_to(base).as_posix()
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call) or not node.args:
+                continue
+            func = node.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+            arg = node.args[0]
+            if name in SQL_CALLS and isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                _add(into, arg.value, f"{rel}:{node.lineno}", "static")
+    return into
+
+
+def add_captured(captured: Iterable[Tuple[str, str]],
+                 into: Optional[Dict[str, Statement]] = None) -> Dict[str, Statement]:
+    """Merge (sql, site) pairs from query_trace.capture()."""
+    into = {} if into is None else into
+    for sql, site in captured:
+        _add(into, sql, site, "traced")
+    return into
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Explaining
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def _bindings(sql: str):
+    bare = _QUOTED.sub("''", sql)
+    named = re.findall(r"(?<!:):(\w+)", bare)
+    if named:
+        return {name: None for name in named}
+    return [None] * bare.count("?")
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """Plan lines for `sql`, with every parameter bound to NULL."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", _bindings(sql)).fetchall()
+    return [row[-1] for row in rows]
+
+
+def _tables(sql: str, schema_tables: Set[str]) -> Dict[str, str]:
+    """alias-or-name -> table for the real tables a statement reads."""
+    found: Dict[str, str] = {}
+    for table, alias in _FROM.findall(sql):
+        if table.lower() in schema_tables:
+            found[table.lower()] = table.lower()
+            if alias:
+                found[alias.lower()] = table.lower()
+    return found
+
+
+def _plan_findings(plan: List[str], aliases: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    """(kind, table, plan line) for each scan / temp sort."""
+    out = []
+    first_table = next(iter(aliases.values()), None)
+    for line in plan:
+        scan = _SCAN.match(line)
+        if scan and not scan.group(2):
+            table = aliases.get(scan.group(1).lower())
+            if table:
+                out.append(("scan", table, line))
+            continue
+        if _TEMP.match(line) and first_table:
+            out.append(("temp-sort", first_table, line))
+    return out
+
+
+def _clause(sql: str, keyword: str, stops: Tuple[str, ...]) -> Optional[str]:
+    low = sql.lower()
+    match = re.search(rf"\b{keyword}\b", low)
+    if not match:
+        return None
+    end = len(sql)
+    for stop in stops:
+        hit = re.search(rf"\b{stop}\b", low[match.end():])
+        if hit:
+            end = min(end, match.end() + hit.start())
+    return sql[match.end():end].strip()
+
+
+def _split_and(where: str) -> Optional[List[str]]:
+    """Top-level AND terms, or None when a top-level OR makes advice unreliable."""
+    masked = _QUOTED.sub(lambda m: "_" * len(m.group()), where)
+    top, depth = [], 0
+    for ch in masked:
+        depth += ch == "("
+        top.append("_" if depth else ch)
+        depth -= ch == ")"
+    top = "".join(top)
+    if re.search(r"\sor\s", top, re.I):
+        return None
+    terms, start = [], 0
+    for m in re.finditer(r"\s+and\s+", top, re.I):
+        if re.search(r"\bbetween\s+\S+$", top[start:m.start()], re.I):
+            continue        # the AND of "x BETWEEN a AND b"
+        terms.append(where[start:m.start()].strip())
+        start = m.end()
+    terms.append(where[start:].strip())
+    return [t[1:-1].strip() if t.startswith("(") and t.endswith(")") else t
+            for t in terms if t]
+
+
+def _mine(prefix: str, aliases: Dict[str, str], table: str) -> bool:
+    return not prefix or aliases.get(prefix.lower()) == table
+
+
+def suggest_index(sql: str, table: str, aliases: Dict[str, str],
+                  expanded: bool = False) -> Optional[str]:
+    """
+    CREATE INDEX proposal for `table`, or None if the statement is too complex
+    to read. `expanded` marks SQL whose parameters were inlined by the trace
+    callback, where `col = 'x'` is a bound value rather than a constant.
+    """
+    flat = " ".join(sql.split())
+    low = flat.lower()
+    if low.count("select") > 1 or " union " in low:
+        return None
+    stops = ("group by", "order by", "limit", "returning", "window")
+    where = _clause(flat, "where", stops) or ""
+    terms = _split_and(where) if where else []
+    if terms is None:
+        return None
+
+    eq: List[str] = []
+    ranged: List[str] = []
+    partial: List[str] = []
+    for term in terms:
+        for pattern, bucket in ((_EQ, "eq"), (_IN, "eq"), (_RANGE, "range"),
+                                (_IS_NULL, "partial"), (_NOT_EQ, "partial"), (_COALESCE, "partial")):
+            m = pattern.match(term)
+            if not m:
+                continue
+            groups = [g for g in m.groups()]
+            prefix, column = (groups[0] or ""), groups[1]
+            if pattern is _RANGE and column is None:
+                prefix, column = (groups[2] or ""), groups[3]
+            if not _mine(prefix, aliases, table):
+                break
+            bare = re.sub(rf"\b{re.escape(prefix)}\.", "", term) if prefix else term
+            if (bucket == "eq" and pattern is _EQ and not expanded
+                    and not re.fullmatch(_PARAM, m.group(3))):
+                partial.append(bare)          # col = 'literal' can be a predicate
+            elif bucket == "eq":
+                eq.append(column)
+            elif bucket == "range":
+                ranged.append(column)
+            else:
+                partial.append(bare)
+            break
+
+    order = _clause(flat, "order by", ("limit", "returning", "window")) or ""
+    order_cols: List[str] = []
+    for part in filter(None, (p.strip() for p in order.split(","))):
+        m = re.fullmatch(rf"{_IDENT}(?:\s+(?:asc|desc))?(?:\s+nulls\s+(?:first|last))?", part, re.I)
+        if not m or not _mine(m.group(1) or "", aliases, table):
+            order_cols = []
+            break
+        order_cols.append(m.group(2))
+
+    key: List[str] = []
+    for col in eq:
+        if col not in key:
+            key.append(col)
+    if ranged and (not order_cols or order_cols[0] == ranged[0]):
+        key.append(ranged[0])
+    elif order_cols:
+        key.extend(c for c in order_cols if c not in key)
+    elif ranged:
+        key.append(ranged[0])
+    if not key and partial:
+        m = re.search(r"\b(\w+)\b", re.sub(r"(?i)^coalesce\(\s*", "", partial[0]))
+        key = [m.group(1)] if m else []
+    if not key:
+        return None
+
+    name = "idx_" + "_".join([table] + key)[:48]
+    if partial:
+        name += "_partial"
+    sql_out = f"CREATE INDEX {name} ON {table}({', '.join(key)})"
+    if partial:
+        sql_out += " WHERE " + " AND ".join(partial)
+    return sql_out
+
+
+def _index_shape(sql: str) -> Optional[Tuple[str, str, List[str], str]]:
+    """(name, table, key columns, partial predicate) of a CREATE INDEX statement."""
+    flat = " ".join(sql.split())
+    head, where = (re.split(r"(?i)\swhere\s", flat, maxsplit=1) + [""])[:2]
+    m = _INDEX_DEF.match(head.strip())
+    if not m:
+        return None
+    cols = [re.sub(r"(?i)\s+(?:asc|desc)$", "", c.strip()).lower() for c in m.group(3).split(",")]
+    return m.group(1), m.group(2).lower(), cols, where.strip().lower()
+
+
+def existing_index(conn: sqlite3.Connection, suggestion: str) -> Optional[str]:
+    """
+    Name of an index on the suggestion's table with the same partial
+    predicate whose leading columns are the suggested key, or None.
+    """
+    wanted = _index_shape(suggestion)
+    if not wanted:
+        return None
+    _, table, key, where = wanted
+    for name, sql in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            "AND tbl_name = ? COLLATE NOCASE ORDER BY name", (table,)):
+        shape = _index_shape(sql)
+        if shape and shape[2][:len(key)] == key and shape[3] == where:
+            return name
+    return None
+
+
+def _verify(conn: sqlite3.Connection, finding: Finding, aliases: Dict[str, str]) -> bool:
+    conn.execute("SAVEPOINT query_audit")
+    try:
+        conn.execute(finding.suggestion)
+        after = _plan_findings(explain(conn, finding.statement.sql), aliases)
+        return not any(kind == finding.kind and table == finding.table
+                       for kind, table, _ in after)
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.execute("ROLLBACK TO query_audit")
+        conn.execute("RELEASE query_audit")
+
+
+def audit(conn: sqlite3.Connection, statements: Iterable[Statement],
+          advise: bool = True) -> AuditResult:
+    schema = {r[0].lower(): r[1] or "" for r in conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table'")}
+    schema_tables = set(schema)
+    # No CREATE INDEX on virtual tables (FTS5 orders by rank internally).
+    virtual = {name for name, sql in schema.items() if sql.upper().startswith("CREATE VIRTUAL")}
+    counts: Dict[str, int] = {}
+    result = AuditResult()
+
+    for stmt in statements:
+        result.statements += 1
+        try:
+            plan = explain(conn, stmt.sql)
+        except sqlite3.Error as e:
+            result.errors.append((stmt, str(e)))
+            continue
+        result.explained += 1
+        aliases = _tables(stmt.sql, schema_tables)
+        low = " ".join(stmt.sql.split()).lower()
+        filtered = " where " in low or " order by " in low or " group by " in low \
+            or "distinct" in low
+        for kind, table, line in _plan_findings(plan, aliases):
+            if table not in counts:
+                counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            finding = Finding(kind, table, line, stmt, counts[table], filtered)
+            if advise and filtered and table not in virtual:
+                expanded = stmt.sources == {"traced"} and not _bindings(stmt.sql)
+                finding.suggestion = suggest_index(stmt.sql, table, aliases, expanded)
+                if finding.suggestion:
+                    finding.existing = existing_index(conn, finding.suggestion)
+                    if finding.existing:
+                        finding.suggestion = None
+                    else:
+                        finding.verified = _verify(conn, finding, aliases)
+            result.findings.append(finding)
+    result.findings.sort(key=lambda f: (not f.severe(), -f.rows, f.table, f.kind))
+    return result
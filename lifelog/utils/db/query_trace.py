@@ -0,0 +1,349 @@
+# lifelog/utils/db/query_trace.py
+"""
+Opt-in SQL tracing and slow-query log.
+
+Enable with LIFELOG_TRACE_SQL=1 or `[debug] trace_sql = true`. While on:
+
+  • safe_query / safe_execute / add_record / update_record are timed, with
+    the row count, and attributed to the first caller outside the db helpers;
+  • every other statement run on a get_connection() connection is seen via
+    sqlite3's trace callback and counted (untimed) against its caller;
+  • each record lands in an in-memory ring buffer and in per-(SQL, caller)
+    aggregates, with literals normalised away so one query shape is one row;
+  • statements slower than LIFELOG_SLOW_QUERY_MS / `[debug] slow_query_ms`
+    go to ~/.lifelog/logs/slow_queries.log (rotating);
+  • at exit the aggregates are merged into ~/.lifelog/logs/query_stats.json,
+    which `llog debug queries` reads.
+
+When tracing is off, the wrappers cost one boolean check.
+"""
+import atexit
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, List, Optional
+
+from lifelog.config.config_manager import BASE_DIR, get_config_value
+
+logger = logging.getLogger(__name__)
+
+LOG_DIR = BASE_DIR / "logs"
+STATS_FILE = LOG_DIR / "query_stats.json"
+SLOW_LOG_FILE = LOG_DIR / "slow_queries.log"
+
+RING_SIZE = 2000
+MAX_STORED_QUERIES = 1000
+STORED_RECENT = 200
+DEFAULT_SLOW_MS = 100.0
+
+# Frames in these files are plumbing, not call sites.
+_PLUMBING = ("db_helper.py", "database_manager.py", "query_trace.py",
+             "error_handler.py", "contextlib.py")
+
+
+@dataclass
+class QueryRecord:
+    ts: float
+    sql: str
+    site: str
+    rows: Optional[int]
+    duration: Optional[float]   # seconds; None when only the trace callback saw it
+
+
+@dataclass
+class QueryStat:
+    sql: str
+    site: str
+    calls: int = 0
+    timed_calls: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    rows: int = 0
+
+    def add(self, duration: Optional[float], rows: Optional[int]) -> None:
+        self.calls += 1
+        if duration is not None:
+            self.timed_calls += 1
+            self.total_s += duration
+            self.max_s = max(self.max_s, duration)
+        if rows and rows > 0:
+            self.rows += rows
+
+    @property
+    def mean_s(self) -> float:
+        return self.total_s / self.timed_calls if self.timed_calls else 0.0
+
+
+_enabled: Optional[bool] = None
+_slow_s = DEFAULT_SLOW_MS / 1000.0
+_lock = threading.Lock()
+_local = threading.local()
+_ring: Deque[QueryRecord] = deque(maxlen=RING_SIZE)
+_stats: Dict[str, QueryStat] = {}
+_slow_logger: Optional[logging.Logger] = None
+_captures: List[List[tuple]] = []
+
+
+# ─── switch ───────────────────────────────────────────────────────────────
+
+
+def enabled() -> bool:
+    """Whether tracing is on (read from env/config once per process)."""
+    if _enabled is None:
+        env = os.getenv("LIFELOG_TRACE_SQL", "").strip().lower()
+        on = env in ("1", "true", "yes", "on") if env else bool(
+            get_config_value("debug", "trace_sql", False))
+        slow_ms = os.getenv("LIFELOG_SLOW_QUERY_MS") or get_config_value(
+            "debug", "slow_query_ms", DEFAULT_SLOW_MS)
+        _configure(on, slow_ms)
+    return _enabled
+
+
+def enable(slow_ms: Optional[float] = None) -> None:
+    """Turn tracing on for this process regardless of env/config."""
+    _configure(True, slow_ms if slow_ms is not None else _slow_s * 1000.0)
+
+
+def _configure(on: bool, slow_ms: Any) -> None:
+    global _enabled, _slow_s
+    try:
+        _slow_s = float(slow_ms) / 1000.0
+    except (TypeError, ValueError):
+        _slow_s = DEFAULT_SLOW_MS / 1000.0
+    if on and not _enabled:
+        atexit.register(flush)
+    _enabled = on
+
+
+# ─── recording ────────────────────────────────────────────────────────────
+
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize(sql: str) -> str:
+    """One line per query shape: literals become ?, IN lists collapse."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip()
+    return _IN_LIST.sub("(?, …)", sql)
+
+
+def call_site() -> str:
+    """`path:line function` of the first frame outside the db plumbing."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.endswith(_PLUMBING):
+            marker = filename.rfind("lifelog" + os.sep)
+            short = filename[marker:] if marker >= 0 else os.path.basename(filename)
+            return f"{short}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def record(sql: str, duration: Optional[float], rows: Optional[int] = None,
+           site: Optional[str] = None) -> None:
+    norm = normalize(sql)
+    site = site or call_site()
+    for sink in _captures:
+        sink.append((sql, site))
+    rec = QueryRecord(time.time(), norm, site, rows, duration)
+    key = f"{site}\x00{norm}"
+    with _lock:
+        _ring.append(rec)
+        stat = _stats.get(key)
+        if stat is None:
+            stat = _stats[key] = QueryStat(norm, site)
+        stat.add(duration, rows)
+    if duration is not None and duration >= _slow_s:
+        _slow_log().warning("%8.1f ms  rows=%s  %s  %s",
+                            duration * 1000.0, "-" if rows is None else rows, site, norm)
+
+
+class _Timer:
+    __slots__ = ("sql", "rows", "_t0")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.rows: Optional[int] = None
+
+    def __enter__(self) -> "_Timer":
+        _local.depth = getattr(_local, "depth", 0) + 1
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        duration = time.perf_counter() - self._t0
+        _local.depth -= 1
+        record(self.sql, duration, self.rows)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ("rows",)
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL = _NullTimer()
+
+
+def timed(sql: str):
+    """Context manager timing one statement; set `.rows` inside the block."""
+    return _Timer(sql) if enabled() else _NULL
+
+
+def _on_statement(sql: str) -> None:
+    # Statements run inside a timed wrapper are recorded by the wrapper, and
+    # trigger bodies are reported as "-- TRIGGER name" comments.
+    if getattr(_local, "depth", 0) or sql.startswith("--"):
+        return
+    try:
+        record(sql, None)
+    except Exception:
+        pass
+
+
+def instrument(conn) -> None:
+    """Attach the trace callback to a connection (no-op when tracing is off)."""
+    if enabled():
+        conn.set_trace_callback(_on_statement)
+
+
+def _slow_log() -> logging.Logger:
+    global _slow_logger
+    if _slow_logger is None:
+        slow = logging.getLogger("lifelog.sql.slow")
+        slow.propagate = False
+        try:
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(SLOW_LOG_FILE, maxBytes=1024 * 1024,
+                                          backupCount=3, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            slow.addHandler(handler)
+        except OSError as e:
+            logger.warning("Could not open slow query log %s: %s", SLOW_LOG_FILE, e)
+            slow.addHandler(logging.NullHandler())
+        _slow_logger = slow
+    return _slow_logger
+
+
+@contextmanager
+def capture():
+    """
+    Turn tracing on and collect (raw SQL, call site) for every statement run
+    inside the block, literals intact. Used by the query-plan audit.
+    """
+    if not enabled():
+        enable()
+    sink: List[tuple] = []
+    _captures.append(sink)
+    try:
+        yield sink
+    finally:
+        _captures.remove(sink)
+
+
+# ─── reading ──────────────────────────────────────────────────────────────
+
+
+def recent(limit: int = 50) -> List[QueryRecord]:
+    with _lock:
+        return list(_ring)[-limit:]
+
+
+def current_stats() -> List[QueryStat]:
+    with _lock:
+        return [QueryStat(**vars(s)) for s in _stats.values()]
+
+
+def _load_stored() -> Dict[str, Any]:
+    try:
+        return json.loads(STATS_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"queries": [], "recent": []}
+
+
+def stored_stats(include_current: bool = True) -> List[QueryStat]:
+    """Aggregates from earlier processes, merged with this one's."""
+    merged: Dict[str, QueryStat] = {}
+    for item in _load_stored().get("queries", []):
+        stat = QueryStat(**item)
+        merged[f"{stat.site}\x00{stat.sql}"] = stat
+    if include_current:
+        for stat in current_stats():
+            _merge(merged, stat)
+    return list(merged.values())
+
+
+def stored_recent() -> List[QueryRecord]:
+    return [QueryRecord(**r) for r in _load_stored().get("recent", [])]
+
+
+def _merge(into: Dict[str, QueryStat], stat: QueryStat) -> None:
+    key = f"{stat.site}\x00{stat.sql}"
+    have = into.get(key)
+    if have is None:
+        into[key] = stat
+        return
+    have.calls += stat.calls
+    have.timed_calls += stat.timed_calls
+    have.total_s += stat.total_s
+    have.max_s = max(have.max_s, stat.max_s)
+    have.rows += stat.rows
+
+
+def flush() -> None:
+    """Merge this process's aggregates into the stats file and start afresh."""
+    with _lock:
+        if not _stats:
+            return
+        mine = list(_stats.values())
+        ring = list(_ring)[-STORED_RECENT:]
+        _stats.clear()
+    try:
+        stored = _load_stored()
+        merged: Dict[str, QueryStat] = {}
+        for item in stored.get("queries", []):
+            _merge(merged, QueryStat(**item))
+        for stat in mine:
+            _merge(merged, stat)
+        top = sorted(merged.values(), key=lambda s: (s.total_s, s.calls),
+                     reverse=True)[:MAX_STORED_QUERIES]
+        recent_rows = (stored.get("recent", []) + [vars(r) for r in ring])[-STORED_RECENT:]
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = STATS_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"queries": [vars(s) for s in top],
+                                   "recent": recent_rows}), encoding="utf-8")
+        os.replace(tmp, STATS_FILE)
+    except Exception as e:
+        logger.warning("Could not save query stats: %s", e)
+
+
+def reset() -> None:
+    """Drop in-memory and stored statistics (the slow log is left alone)."""
+    with _lock:
+        _stats.clear()
+        _ring.clear()
+    try:
+        STATS_FILE.unlink()
+    except FileNotFoundError:
+        pass
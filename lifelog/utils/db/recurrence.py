@@ -0,0 +1,342 @@
+# lifelog/utils/db/recurrence.py
+"""
+Recurrence engine for repeating tasks.
+
+A recurring task (recur_interval, recur_unit and recur_base set) is the
+template of its series. `tasks.next_occurrence` caches, in UTC ISO form, the
+first occurrence after `recur_base`, behind a partial index, so a scheduler
+run only touches templates that are actually due:
+
+  1. templates whose pointer is unknown (new rows, or recurrence fields
+     changed, which a trigger detects) get it computed;
+  2. templates with next_occurrence <= now are expanded: every occurrence
+     missed since recur_base becomes a task instance, all in one
+     transaction, and recur_base / next_occurrence advance past them.
+
+`next_occurrence` is derived per device from the synced recurrence fields
+and is not part of the Task model or the sync payload.
+
+Occurrence rules (wall-clock time of recur_base, in the user's timezone):
+  day    every N days
+  week   every N weeks on the given weekdays (0 = Monday), or on
+         recur_base's weekday when none are given
+  month  every N months on recur_base's day, clamped to the month's end
+  year   every N years on recur_base's month/day (Feb 29 → Feb 28)
+"""
+import calendar
+import json
+import logging
+import sqlite3
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from lifelog.utils.db import get_connection, migrations
+
+logger = logging.getLogger(__name__)
+
+RECUR_UNITS = ("day", "week", "month", "year")
+
+# Upper bound on instances generated per template in one run, so a template
+# that was left alone for years cannot flood the task list.
+MAX_CATCH_UP = 366
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Schema
+# ───────────────────────────────────────────────────────────────────────────────
+
+RECURRENCE_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_tasks_next_occurrence
+    ON tasks(next_occurrence) WHERE next_occurrence IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_recur_pending
+    ON tasks(id) WHERE next_occurrence IS NULL AND recur_unit IS NOT NULL;
+
+-- Any change to the schedule that did not also set next_occurrence
+-- (local edits, sync upserts) forces the pointer to be recomputed.
+CREATE TRIGGER IF NOT EXISTS trg_tasks_recur_invalidate
+AFTER UPDATE OF recur_interval, recur_unit, recur_days_of_week, recur_base, deleted ON tasks
+WHEN NEW.next_occurrence IS OLD.next_occurrence AND NEW.next_occurrence IS NOT NULL
+BEGIN
+    UPDATE tasks SET next_occurrence = NULL WHERE id = NEW.id;
+END;
+"""
+
+
+def install_recurrence(conn: sqlite3.Connection) -> None:
+    """Add tasks.next_occurrence plus its indexes and trigger (idempotent)."""
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    if "next_occurrence" not in cols:
+        conn.execute("ALTER TABLE tasks ADD COLUMN next_occurrence TEXT")
+    conn.executescript(RECURRENCE_SCHEMA)
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Occurrence arithmetic
+# ───────────────────────────────────────────────────────────────────────────────
+
+def _user_tz():
+    from lifelog.utils.shared_utils import get_user_timezone
+    return get_user_timezone()
+
+
+def _parse_dt(value: Any, tzinfo) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    # Naive timestamps are wall-clock time in the user's timezone.
+    return dt.replace(tzinfo=tzinfo) if dt.tzinfo is None else dt.astimezone(tzinfo)
+
+
+def _parse_days(value: Any) -> List[int]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            value = value.split(",")
+    if isinstance(value, int):
+        value = [value]
+    try:
+        return sorted({int(d) for d in value if 0 <= int(d) <= 6})
+    except (TypeError, ValueError):
+        return []
+
+
+def _add_months(d: date, months: int) -> date:
+    month_index = d.month - 1 + months
+    year, month = d.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(d.day, calendar.monthrange(year, month)[1]))
+
+
+def _candidate_dates(base: date, interval: int, unit: str,
+                     days_of_week: Sequence[int]) -> Iterator[date]:
+    """Dates of the series after `base`, in order, without an end."""
+    k = 1
+    if unit == "day":
+        while True:
+            yield base + timedelta(days=k * interval)
+            k += 1
+    elif unit == "week" and days_of_week:
+        week_start = base - timedelta(days=base.weekday())
+        k = 0
+        while True:
+            start = week_start + timedelta(weeks=k * interval)
+            for dow in days_of_week:
+                d = start + timedelta(days=dow)
+                if d > base:
+                    yield d
+            k += 1
+    elif unit == "week":
+        while True:
+            yield base + timedelta(weeks=k * interval)
+            k += 1
+    elif unit == "month":
+        while True:
+            yield _add_months(base, k * interval)
+            k += 1
+    elif unit == "year":
+        while True:
+            yield _add_months(base, 12 * k * interval)
+            k += 1
+
+
+def iter_occurrences(recur_base: Any, interval: Any, unit: Optional[str],
+                     days_of_week: Any = None,
+                     until: Optional[datetime] = None,
+                     limit: Optional[int] = None) -> Iterator[datetime]:
+    """
+    Yield occurrences strictly after `recur_base` as aware datetimes in the
+    user's timezone, stopping after `until` (inclusive) or `limit` items.
+    """
+    tzinfo = _user_tz()
+    base = _parse_dt(recur_base, tzinfo)
+    try:
+        interval = int(interval or 0)
+    except (TypeError, ValueError):
+        return
+    if base is None or interval < 1 or unit not in RECUR_UNITS:
+        return
+    wall_time = time(base.hour, base.minute, base.second)
+    count = 0
+    for d in _candidate_dates(base.date(), interval, unit, _parse_days(days_of_week)):
+        occurrence = datetime.combine(d, wall_time, tzinfo=tzinfo)
+        if until is not None and occurrence > until:
+            return
+        yield occurrence
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+
+def next_occurrence(recur_base: Any, interval: Any, unit: Optional[str],
+                    days_of_week: Any = None) -> Optional[datetime]:
+    """First occurrence after `recur_base`, or None for an invalid schedule."""
+    return next(iter_occurrences(recur_base, interval, unit, days_of_week), None)
+
+
+def _utc_iso(dt: Optional[datetime]) -> Optional[str]:
+    if dt is None:
+        return None
+    return dt.astimezone(timezone.utc).replace(microsecond=0).isoformat()
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Scheduler run
+# ───────────────────────────────────────────────────────────────────────────────
+
+_TEMPLATE_COLUMNS = ("id, uid, title, project, category, importance, created, due, "
+                     "recur_interval, recur_unit, recur_days_of_week, recur_base, "
+                     "tags, notes")
+
+
+def refresh_pending(conn: sqlite3.Connection) -> int:
+    """Compute next_occurrence for templates whose pointer is unknown."""
+    rows = conn.execute(
+        "SELECT id, recur_base, recur_interval, recur_unit, recur_days_of_week "
+        "FROM tasks WHERE next_occurrence IS NULL AND recur_unit IS NOT NULL "
+        "AND COALESCE(deleted, 0) = 0"
+    ).fetchall()
+    # Invalid schedules get an empty-string pointer, so they are not
+    # re-examined every run; the invalidation trigger resets it on edit.
+    updates = [(_utc_iso(next_occurrence(r["recur_base"], r["recur_interval"],
+                                         r["recur_unit"], r["recur_days_of_week"])) or "",
+                r["id"]) for r in rows]
+    conn.executemany("UPDATE tasks SET next_occurrence = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+def _instance_row(template: sqlite3.Row, occurrence: datetime,
+                  now_iso: str, weights: Dict[str, float]) -> Dict[str, Any]:
+    """A plain (non-recurring) task for one occurrence of `template`."""
+    from lifelog.utils.db.priority import score_task
+    tzinfo = occurrence.tzinfo
+    due = None
+    created = _parse_dt(template["created"], tzinfo)
+    template_due = _parse_dt(template["due"], tzinfo)
+    if created is not None and template_due is not None:
+        due = (occurrence + (template_due - created)).replace(microsecond=0)
+    row = {
+        "uid": str(uuid.uuid4()),
+        "title": template["title"],
+        "project": template["project"],
+        "category": template["category"],
+        "importance": template["importance"] if template["importance"] is not None else 1,
+        "created": occurrence.isoformat(),
+        "due": due.isoformat() if due else None,
+        "status": "backlog",
+        "tags": template["tags"],
+        "notes": template["notes"],
+        "updated_at": now_iso,
+        "deleted": 0,
+    }
+    row["priority"] = score_task({"importance": row["importance"], "due": due,
+                                  "category": row["category"]}, weights=weights)
+    return row
+
+
+def run_due_recurrences(now: Optional[datetime] = None,
+                        max_catch_up: int = MAX_CATCH_UP) -> List[Dict[str, Any]]:
+    """
+    Generate every task instance due up to `now` and advance the templates.
+    Returns the inserted instance rows (with their new ids).
+
+    Clients never generate instances: the host does, and they arrive through
+    sync like any other task, so a series is never expanded twice.
+    """
+    from lifelog.utils.db import should_sync
+    if should_sync():
+        return []
+    migrations.ensure_migrated()
+    now = (now or datetime.now(timezone.utc)).astimezone(_user_tz())
+    now_iso = datetime.now().isoformat()
+    created: List[Dict[str, Any]] = []
+    from lifelog.config.config_manager import get_all_category_importance
+    weights = get_all_category_importance()
+
+    with get_connection() as conn:
+        refresh_pending(conn)
+        templates = conn.execute(
+            f"SELECT {_TEMPLATE_COLUMNS} FROM tasks "
+            "WHERE next_occurrence IS NOT NULL AND next_occurrence <> '' "
+            "AND next_occurrence <= ? AND COALESCE(deleted, 0) = 0 "
+            "ORDER BY next_occurrence",
+            (_utc_iso(now),)
+        ).fetchall()
+
+        advances: List[Tuple[str, Optional[str], int]] = []
+        for t in templates:
+            occurrences = list(iter_occurrences(
+                t["recur_base"], t["recur_interval"], t["recur_unit"],
+                t["recur_days_of_week"], until=now))
+            if len(occurrences) > max_catch_up:
+                logger.warning("Task %s missed %d occurrences; generating the last %d",
+                               t["id"], len(occurrences), max_catch_up)
+                occurrences = occurrences[-max_catch_up:]
+            if not occurrences:
+                continue
+            created.extend(_instance_row(t, occ, now_iso, weights) for occ in occurrences)
+            last = occurrences[-1]
+            following = next_occurrence(last, t["recur_interval"], t["recur_unit"],
+                                        t["recur_days_of_week"])
+            advances.append((last.isoformat(), _utc_iso(following) or "", t["id"]))
+
+        if created:
+            cols = list(created[0])
+            conn.executemany(
+                f"INSERT INTO tasks ({', '.join(cols)}) "
+                f"VALUES ({', '.join('?' for _ in cols)})",
+                [tuple(r[c] for c in cols) for r in created])
+            uids = {r["uid"]: r for r in created}
+            for chunk_start in range(0, len(created), 500):
+                chunk = [r["uid"] for r in created[chunk_start:chunk_start + 500]]
+                for row in conn.execute(
+                        f"SELECT id, uid FROM tasks WHERE uid IN ({', '.join('?' for _ in chunk)})",
+                        chunk):
+                    uids[row["uid"]]["id"] = row["id"]
+        conn.executemany(
+            "UPDATE tasks SET recur_base = ?, next_occurrence = ?, updated_at = ? WHERE id = ?",
+            [(base, nxt, now_iso, tid) for base, nxt, tid in advances])
+
+    if created:
+        logger.info("Recurrence run created %d task(s) from %d template(s)",
+                    len(created), len(advances))
+    return created
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Future expansion (agenda / calendar)
+# ───────────────────────────────────────────────────────────────────────────────
+
+def expand_occurrences(start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """
+    Upcoming occurrences of every recurring task within [start, end], without
+    creating anything: [{"task_id", "title", "when"}], ordered by time.
+    """
+    migrations.ensure_migrated()
+    tzinfo = _user_tz()
+    start, end = start.astimezone(tzinfo), end.astimezone(tzinfo)
+    with get_connection() as conn:
+        refresh_pending(conn)
+        rows = conn.execute(
+            "SELECT id, title, recur_base, recur_interval, recur_unit, recur_days_of_week "
+            "FROM tasks WHERE next_occurrence IS NOT NULL AND next_occurrence <> '' "
+            "AND next_occurrence <= ? AND COALESCE(deleted, 0) = 0",
+            (_utc_iso(end),)
+        ).fetchall()
+    hits: List[Dict[str, Any]] = []
+    for r in rows:
+        for occ in iter_occurrences(r["recur_base"], r["recur_interval"], r["recur_unit"],
+                                    r["recur_days_of_week"], until=end, limit=1000):
+            if occ >= start:
+                hits.append({"task_id": r["id"], "title": r["title"], "when": occ})
+    hits.sort(key=lambda h: h["when"])
+    return hits
@@ -0,0 +1,206 @@
+# lifelog/utils/db/reminders.py
+"""
+Persistent timer queue for the `llog scheduler` daemon.
+
+  reminders       one-off task reminders: fire at (task.due - offset)
+  scheduler_jobs  recurring commands (mirrors the [cron] config section)
+
+Both tables store the next fire time as UTC ISO text behind a partial index
+on pending rows, so the daemon rebuilds its in-memory heap with one indexed
+read. `reminders` carries change-log triggers like the synced tables: the
+daemon follows the feed to pick up reminders added by other processes, and
+task changes, to re-time reminders whose due date moved. Reminders are local
+to a device and are never synced.
+"""
+import logging
+import sqlite3
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from lifelog.utils.db import get_connection, migrations
+
+logger = logging.getLogger(__name__)
+
+REMINDERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid         TEXT UNIQUE,
+    task_id     INTEGER REFERENCES tasks(id) ON DELETE CASCADE,
+    offset_minutes REAL NOT NULL DEFAULT 0,
+    fire_at     TEXT NOT NULL,
+    message     TEXT,
+    created_at  TEXT,
+    fired_at    TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_reminders_pending
+    ON reminders(fire_at) WHERE fired_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_reminders_task_id ON reminders(task_id);
+
+CREATE TABLE IF NOT EXISTS scheduler_jobs (
+    name        TEXT PRIMARY KEY,
+    schedule    TEXT NOT NULL,
+    command     TEXT NOT NULL,
+    next_run    TEXT,
+    last_run    TEXT,
+    last_status INTEGER
+);
+"""
+
+
+def install_reminders(conn: sqlite3.Connection) -> None:
+    """Create the reminder and job tables plus reminder change-log triggers (idempotent)."""
+    from lifelog.utils.db.change_log import CHANGE_LOG_SCHEMA, _trigger_sql
+    conn.executescript(REMINDERS_SCHEMA)
+    conn.executescript(CHANGE_LOG_SCHEMA + _trigger_sql("reminders"))
+
+
+def _utc_iso(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def _parse_due(value: Any) -> Optional[datetime]:
+    if value is None:
+        return None
+    dt = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Reminders
+# ───────────────────────────────────────────────────────────────────────────────
+
+def add_reminder(task_id: int, fire_at: datetime, message: str,
+                 offset: Optional[timedelta] = None) -> int:
+    """
+    Queue a reminder for `task_id`, replacing any pending one for that task.
+    Returns the reminder id.
+    """
+    migrations.ensure_migrated()
+    now = datetime.now(timezone.utc)
+    with get_connection() as conn:
+        conn.execute("DELETE FROM reminders WHERE task_id = ? AND fired_at IS NULL", (task_id,))
+        cur = conn.execute(
+            "INSERT INTO reminders (uid, task_id, offset_minutes, fire_at, message, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (str(uuid.uuid4()), task_id,
+             (offset or timedelta()).total_seconds() / 60.0,
+             _utc_iso(fire_at), message, _utc_iso(now))
+        )
+        return cur.lastrowid
+
+
+def clear_reminders(task_id: int) -> int:
+    """Drop pending reminders for a task. Returns how many were removed."""
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        return conn.execute(
+            "DELETE FROM reminders WHERE task_id = ? AND fired_at IS NULL", (task_id,)
+        ).rowcount
+
+
+def pending_reminders(task_ids: Optional[List[int]] = None,
+                      ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """Pending reminders, optionally only for given task or reminder ids."""
+    migrations.ensure_migrated()
+    sql = "SELECT * FROM reminders WHERE fired_at IS NULL"
+    params: List[Any] = []
+    if task_ids is not None:
+        sql += f" AND task_id IN ({', '.join('?' for _ in task_ids) or 'NULL'})"
+        params.extend(task_ids)
+    if ids is not None:
+        sql += f" AND id IN ({', '.join('?' for _ in ids) or 'NULL'})"
+        params.extend(ids)
+    with get_connection() as conn:
+        return [dict(r) for r in conn.execute(sql + " ORDER BY fire_at", params)]
+
+
+def retime_for_tasks(task_ids: List[int]) -> int:
+    """
+    Move pending reminders of tasks whose due date changed, and drop those
+    of deleted or finished tasks. Returns the number of reminders touched.
+    """
+    if not task_ids:
+        return 0
+    migrations.ensure_migrated()
+    ph = ", ".join("?" for _ in task_ids)
+    touched = 0
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"SELECT r.id, r.fire_at, r.offset_minutes, t.due, t.status, t.deleted "
+            f"FROM reminders r LEFT JOIN tasks t ON t.id = r.task_id "
+            f"WHERE r.fired_at IS NULL AND r.task_id IN ({ph})", task_ids
+        ).fetchall()
+        drop, move = [], []
+        for r in rows:
+            due = _parse_due(r["due"])
+            if due is None or r["deleted"] or r["status"] == "done":
+                drop.append((r["id"],))
+                continue
+            fire_at = _utc_iso(due - timedelta(minutes=r["offset_minutes"] or 0))
+            if fire_at != r["fire_at"]:
+                move.append((fire_at, r["id"]))
+        conn.executemany("DELETE FROM reminders WHERE id = ?", drop)
+        conn.executemany("UPDATE reminders SET fire_at = ? WHERE id = ?", move)
+        touched = len(drop) + len(move)
+    return touched
+
+
+def mark_fired(reminder_id: int) -> None:
+    with get_connection() as conn:
+        conn.execute("UPDATE reminders SET fired_at = ? WHERE id = ?",
+                     (_utc_iso(datetime.now(timezone.utc)), reminder_id))
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Recurring jobs
+# ───────────────────────────────────────────────────────────────────────────────
+
+def sync_jobs(jobs: List[tuple]) -> None:
+    """
+    Mirror (name, schedule, command) tuples from the [cron] config into
+    scheduler_jobs, keeping next_run for unchanged entries.
+    """
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        existing = {r["name"]: r for r in conn.execute("SELECT * FROM scheduler_jobs")}
+        names = [name for name, _, _ in jobs]
+        if names:
+            conn.execute(
+                f"DELETE FROM scheduler_jobs WHERE name NOT IN ({', '.join('?' for _ in names)})",
+                names)
+        else:
+            conn.execute("DELETE FROM scheduler_jobs")
+        for name, schedule, command in jobs:
+            old = existing.get(name)
+            if old and old["schedule"] == schedule and old["command"] == command:
+                continue
+            conn.execute(
+                "INSERT INTO scheduler_jobs (name, schedule, command, next_run) "
+                "VALUES (?, ?, ?, NULL) "
+                "ON CONFLICT(name) DO UPDATE SET schedule = excluded.schedule, "
+                "command = excluded.command, next_run = NULL",
+                (name, schedule, command))
+
+
+def get_jobs() -> List[Dict[str, Any]]:
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        return [dict(r) for r in conn.execute("SELECT * FROM scheduler_jobs ORDER BY name")]
+
+
+def set_job_next_run(name: str, next_run: Optional[datetime],
+                     ran_at: Optional[datetime] = None,
+                     status: Optional[int] = None) -> None:
+    with get_connection() as conn:
+        if ran_at is None:
+            conn.execute("UPDATE scheduler_jobs SET next_run = ? WHERE name = ?",
+                         (_utc_iso(next_run) if next_run else None, name))
+        else:
+            conn.execute(
+                "UPDATE scheduler_jobs SET next_run = ?, last_run = ?, last_status = ? "
+                "WHERE name = ?",
+                (_utc_iso(next_run) if next_run else None, _utc_iso(ran_at), status, name))
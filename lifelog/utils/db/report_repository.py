@@ -82,28 +82,19 @@ def get_daily_tracker_averages(metric_name: str, since_days: int = 7):
     if not tracker:
         return pd.DataFrame()
 
-    entries = []
     try:
-        raw_entries = track_repository.get_entries_for_tracker(tracker.id)
+        days = track_repository.get_daily_totals(tracker.id, since=since)
     except Exception as e:
         logger.error("get_daily_tracker_averages: failed to load entries for %r: %s",
                      metric_name, e, exc_info=True)
-        raw_entries = []
-
-    for entry in raw_entries:
-        try:
-            ts = datetime.fromisoformat(entry["timestamp"])
-            if ts >= since:
-                entries.append({"date": ts.date(), "value": entry["value"]})
-        except Exception as e:
-            logger.warning(
-                "get_daily_tracker_averages: skipping invalid entry %r: %s", entry, e)
-
-    if not entries:
+        days = []
+
+    if not days:
         return pd.DataFrame()
 
-    df = pd.DataFrame(entries)
-    return df.groupby('date')['value'].mean().reset_index()
+    # Grouped on local_date in SQL; compacted rows hold a sum of `count` entries.
+    return pd.DataFrame([{"date": datetime.fromisoformat(day).date(), "value": total / count}
+                         for day, total, count in days if day and count])
 
 
 def get_correlation_insights() -> List[Dict[str, Any]]:
@@ -0,0 +1,230 @@
+# lifelog/utils/db/retention.py
+"""
+Per-tracker downsampling of old entries.
+
+A tracker's `retention` policy lists resolutions with the age up to which
+each is kept, finest first; the last tier has no age and is kept forever:
+
+    raw:90d,hour:365d,day     raw for 90 days, hourly to a year, then daily
+
+`compact()` rewrites entries older than a tier's start into one row per
+bucket of that tier's resolution. The row's `value` is the bucket's sum and
+`sample_count`, `min_value`, `max_value` and `last_value` keep the rest, so
+
+    sum      SUM(value)                      count   SUM(COALESCE(sample_count, 1))
+    mean     SUM(value) / count              latest  COALESCE(last_value, value)
+    min/max  MIN/MAX(COALESCE(min_value/max_value, value))
+
+come out the same over compacted and raw rows (TrackerEntry.count, .mean
+and .latest). Buckets are local hours and days in the configured timezone,
+with the offsets the local_date columns and TrackerSeries use
+(time_keys.local_start), and a compacted row is stamped with the UTC instant
+its bucket starts, so local day/week/month grouping is unchanged too.
+
+The raw tier must cover at least MIN_RAW_DAYS: goals are evaluated over
+the current day, week or month, and kinds that look at individual values
+(replacement ratios, bool days from 0/1 values) then always see raw data.
+
+Compaction deletes and inserts through the normal tables, so change_log
+carries it to anything following the feed. Rows already moved to the cold
+archive are left as they are.
+"""
+import logging
+import re
+import sqlite3
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from lifelog.utils.db import get_connection, migrations, time_keys
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = ("raw", "hour", "day")
+MIN_RAW_DAYS = 31
+NUMERIC_TYPES = ("int", "float", "bool")
+
+_TIER = re.compile(r"^(raw|hour|day)(?::(\d+)d)?$")
+
+
+def _add_columns(conn: sqlite3.Connection) -> None:
+    tracker_cols = {row[1] for row in conn.execute("PRAGMA table_info(trackers)")}
+    if "retention" not in tracker_cols:
+        conn.execute("ALTER TABLE trackers ADD COLUMN retention TEXT")
+    entry_cols = {row[1] for row in conn.execute("PRAGMA table_info(tracker_entries)")}
+    for name, decl in (("sample_count", "INTEGER"), ("min_value", "REAL"), ("max_value", "REAL"),
+                       ("last_value", "REAL"), ("resolution", "TEXT")):
+        if name not in entry_cols:
+            conn.execute(f"ALTER TABLE tracker_entries ADD COLUMN {name} {decl}")
+
+
+def install_retention(conn: sqlite3.Connection) -> None:
+    """Add the policy and aggregate columns (idempotent)."""
+    _add_columns(conn)
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Policies
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class Tier:
+    resolution: str
+    max_age_days: Optional[int]     # None: kept forever
+
+
+def parse_policy(text: str) -> List[Tier]:
+    """Parse and validate a policy string; raises ValueError with the reason."""
+    tiers = []
+    for part in (p.strip().lower() for p in text.split(",") if p.strip()):
+        match = _TIER.match(part)
+        if not match:
+            raise ValueError(f"Bad retention tier '{part}' (expected e.g. raw:90d, hour:365d, day)")
+        days = int(match.group(2)) if match.group(2) else None
+        tiers.append(Tier(match.group(1), days))
+    if len(tiers) < 2:
+        raise ValueError("A retention policy needs a raw tier and at least one coarser tier")
+    if tiers[0].resolution != "raw":
+        raise ValueError("A retention policy starts with the raw tier, e.g. raw:90d")
+    if tiers[0].max_age_days is None or tiers[0].max_age_days < MIN_RAW_DAYS:
+        raise ValueError(f"Keep raw entries for at least {MIN_RAW_DAYS} days "
+                         "(goals are evaluated over the current month)")
+    for prev, tier in zip(tiers, tiers[1:]):
+        if RESOLUTIONS.index(tier.resolution) <= RESOLUTIONS.index(prev.resolution):
+            raise ValueError("Each tier must be coarser than the one before it")
+        if prev.max_age_days is None:
+            raise ValueError("Only the last tier can be kept forever")
+        if tier.max_age_days is not None and tier.max_age_days <= prev.max_age_days:
+            raise ValueError("Tier ages must increase")
+    if tiers[-1].max_age_days is not None:
+        raise ValueError("The last tier is kept forever; drop its age")
+    return tiers
+
+
+def format_policy(tiers: List[Tier]) -> str:
+    return ",".join(t.resolution + (f":{t.max_age_days}d" if t.max_age_days else "")
+                    for t in tiers)
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Compaction
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def bucket_start(epoch: Optional[int], resolution: str) -> Tuple[Optional[int], Optional[str]]:
+    """
+    (local bucket key, UTC ISO start) of the local hour/day holding `epoch`;
+    (None, None) for an unparseable timestamp.
+    """
+    if epoch is None:
+        return None, None
+    key, start = time_keys.local_start(int(epoch), resolution)
+    return key, datetime.fromtimestamp(start, timezone.utc).isoformat()
+
+
+def _buckets(rows: Iterator[sqlite3.Row],
+             resolution: str) -> Iterator[Tuple[str, List[sqlite3.Row]]]:
+    """Group epoch-ordered rows into consecutive buckets, as (UTC start, rows)."""
+    key, start, group = None, None, []
+    for row in rows:
+        row_key, row_start = bucket_start(row["_epoch"], resolution)
+        if row_key is None:
+            continue
+        if row_key != key and group:
+            yield start, group
+            group = []
+        if row_key != key:
+            key, start = row_key, row_start
+        group.append(row)
+    if group:
+        yield start, group
+
+
+def _aggregate(group: List[sqlite3.Row]) -> Dict[str, float]:
+    return {
+        "value": sum(r["value"] or 0 for r in group),
+        "sample_count": sum(r["sample_count"] or 1 for r in group),
+        "min_value": min(r["value"] if r["min_value"] is None else r["min_value"] for r in group),
+        "max_value": max(r["value"] if r["max_value"] is None else r["max_value"] for r in group),
+        "last_value": group[-1]["value"] if group[-1]["last_value"] is None else group[-1]["last_value"],
+    }
+
+
+def _compact_tier(conn: sqlite3.Connection, tracker_id: int, resolution: str,
+                  cutoff: str, finer: Tuple[str, ...]) -> Tuple[int, int]:
+    """Rewrite entries older than `cutoff` at a finer resolution; returns (rows in, rows out)."""
+    marks = ", ".join("?" for _ in finer)
+    older, params = time_keys.range_sql("tracker_entries", "timestamp", "<", cutoff)
+    epoch = time_keys.epoch_sql("tracker_entries", "timestamp")
+    rows = conn.execute(
+        f"SELECT *, {epoch} AS _epoch FROM tracker_entries WHERE tracker_id = ? AND {older} "
+        f"AND COALESCE(resolution, 'raw') IN ({marks}) ORDER BY _epoch, id",
+        (tracker_id, *params, *finer)).fetchall()
+    rows_in = rows_out = 0
+    for start, group in _buckets(iter(rows), resolution):
+        agg = _aggregate(group)
+        rows_in += len(group)
+        rows_out += 1
+        if len(group) == 1:
+            conn.execute(
+                "UPDATE tracker_entries SET sample_count = ?, min_value = ?, max_value = ?, "
+                "last_value = ?, resolution = ? WHERE id = ?",
+                (agg["sample_count"], agg["min_value"], agg["max_value"], agg["last_value"],
+                 resolution, group[0]["id"]))
+            continue
+        conn.executemany("DELETE FROM tracker_entries WHERE id = ?", [(r["id"],) for r in group])
+        conn.execute(
+            "INSERT INTO tracker_entries (tracker_id, timestamp, value, uid, sample_count, "
+            "min_value, max_value, last_value, resolution) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (tracker_id, start, agg["value"], str(uuid.uuid4()), agg["sample_count"],
+             agg["min_value"], agg["max_value"], agg["last_value"], resolution))
+    return rows_in, rows_out
+
+
+def compact(tracker_id: Optional[int] = None, dry_run: bool = False,
+            now: Optional[datetime] = None) -> Dict[int, Tuple[int, int]]:
+    """
+    Apply each tracker's retention policy (or only `tracker_id`'s). Returns
+    {tracker_id: (entries rewritten, rows written)}. Trackers without a
+    policy, or with an invalid one (logged), are skipped.
+    """
+    from lifelog.utils.core_utils import now_utc
+
+    migrations.ensure_migrated()
+    now = now or now_utc()
+    result: Dict[int, Tuple[int, int]] = {}
+    with get_connection() as conn:
+        sql = ("SELECT id, title, type, retention FROM trackers "
+               "WHERE retention IS NOT NULL AND retention != '' AND COALESCE(deleted, 0) = 0")
+        params: Tuple = ()
+        if tracker_id is not None:
+            sql += " AND id = ?"
+            params = (tracker_id,)
+        for tracker in conn.execute(sql, params).fetchall():
+            try:
+                tiers = parse_policy(tracker["retention"])
+            except ValueError as e:
+                logger.warning("Skipping tracker %r: %s", tracker["title"], e)
+                continue
+            if tracker["type"] not in NUMERIC_TYPES:
+                logger.warning("Skipping tracker %r: %s values cannot be aggregated",
+                               tracker["title"], tracker["type"])
+                continue
+            total_in = total_out = 0
+            # Coarsest first, so rows go straight to their final resolution.
+            for i in range(len(tiers) - 1, 0, -1):
+                cutoff = (now - timedelta(days=tiers[i - 1].max_age_days)).isoformat()
+                finer = tuple(t.resolution for t in tiers[:i])
+                rows_in, rows_out = _compact_tier(conn, tracker["id"], tiers[i].resolution,
+                                                  cutoff, finer)
+                total_in += rows_in
+                total_out += rows_out
+            if total_in:
+                result[tracker["id"]] = (total_in, total_out)
+            if dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+    return result
@@ -0,0 +1,269 @@
+# lifelog/utils/db/search_index.py
+"""
+Full-text search over tasks, time logs and trackers.
+
+A single FTS5 table, `search_index`, holds the title / notes / tags of every
+live (not soft-deleted) row. Triggers on the base tables keep it current no
+matter which code path writes. The FTS rowid encodes the source row:
+
+    rowid = source_id * 4 + kind_code      (task = 1, time = 2, tracker = 3)
+
+so a trigger replaces an entry by rowid, never by scanning the index.
+
+SQLite builds without FTS5 get no index; `search` then falls back to LIKE
+scans over the base tables, slower but with the same result shape.
+"""
+import logging
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lifelog.utils.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# kind name → (rowid code, source table, indexed columns present in the table)
+SEARCH_KINDS: Dict[str, Tuple[int, str, Tuple[str, ...]]] = {
+    "task":    (1, "tasks",        ("title", "notes", "tags")),
+    "time":    (2, "time_history", ("title", "notes", "tags")),
+    "tracker": (3, "trackers",     ("title", "notes", "tags")),
+}
+_KIND_BY_CODE = {code: kind for kind, (code, _, _) in SEARCH_KINDS.items()}
+
+DEFAULT_LIMIT = 20
+SNIPPET_TOKENS = 12
+
+# bm25 column weights: title, notes, tags (uid is unindexed).
+_BM25_WEIGHTS = "10.0, 2.0, 5.0, 0.0"
+
+_fts5_available: Optional[bool] = None
+
+
+def fts5_available(conn: Optional[sqlite3.Connection] = None) -> bool:
+    """True if the linked SQLite library was compiled with FTS5."""
+    global _fts5_available
+    if _fts5_available is None:
+        probe = conn or sqlite3.connect(":memory:")
+        try:
+            probe.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+            probe.execute("DROP TABLE temp.fts5_probe")
+            _fts5_available = True
+        except sqlite3.OperationalError:
+            logger.info("SQLite FTS5 not available; search falls back to LIKE scans")
+            _fts5_available = False
+        finally:
+            if conn is None:
+                probe.close()
+    return _fts5_available
+
+
+def _trigger_sql(kind: str) -> str:
+    code, table, _ = SEARCH_KINDS[kind]
+    insert = f"""
+        INSERT INTO search_index (rowid, title, notes, tags, uid)
+        SELECT NEW.id * 4 + {code}, NEW.title, NEW.notes, NEW.tags, NEW.uid
+        WHERE COALESCE(NEW.deleted, 0) = 0;"""
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table}
+    BEGIN{insert}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update
+    AFTER UPDATE OF title, notes, tags, deleted, uid ON {table}
+    BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + {code};{insert}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table}
+    BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + {code};
+    END;
+    """
+
+
+SEARCH_INDEX_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    title, notes, tags, uid UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+""" + "".join(_trigger_sql(k) for k in SEARCH_KINDS)
+
+
+def install_search_index(conn: sqlite3.Connection) -> bool:
+    """
+    Create the FTS table and triggers (idempotent). A freshly created index is
+    populated from the base tables. Returns False when FTS5 is unavailable.
+    """
+    if not fts5_available(conn):
+        return False
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).fetchone()
+    conn.executescript(SEARCH_INDEX_SCHEMA)
+    if not existed:
+        rebuild_search_index(conn)
+    return True
+
+
+def ensure_search_index() -> bool:
+    """Bring older databases up to date (see migrations); returns FTS5 availability."""
+    from lifelog.utils.db import migrations
+    migrations.ensure_migrated()
+    if _fts5_available is None:
+        with get_connection() as conn:
+            fts5_available(conn)
+    return bool(_fts5_available)
+
+
+def rebuild_search_index(conn: Optional[sqlite3.Connection] = None) -> int:
+    """Repopulate the index from the base tables. Returns the number of entries."""
+    if conn is None:
+        if not ensure_search_index():
+            return 0
+        with get_connection() as c:
+            return rebuild_search_index(c)
+    conn.execute("DELETE FROM search_index")
+    for code, table, _ in SEARCH_KINDS.values():
+        conn.execute(
+            f"""
+            INSERT INTO search_index (rowid, title, notes, tags, uid)
+            SELECT id * 4 + {code}, title, notes, tags, uid FROM {table}
+            WHERE COALESCE(deleted, 0) = 0
+            """
+        )
+    conn.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+    count = conn.execute("SELECT COUNT(*) FROM search_index").fetchone()[0]
+    logger.info("Rebuilt search index with %d entries", count)
+    return count
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Queries
+# ───────────────────────────────────────────────────────────────────────────────
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _terms(text: str) -> List[str]:
+    return _TERM_RE.findall(text or "")
+
+
+def to_match_query(text: str, column: Optional[str] = None) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 query: every word must match as a prefix.
+    User input never reaches the FTS5 query parser unquoted.
+    """
+    terms = [f'"{t}"*' for t in _terms(text)]
+    if not terms:
+        return None
+    query = " ".join(terms)
+    return f"{column} : ({query})" if column else query
+
+
+def title_filter(kind: str, text: str) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+    """
+    SQL fragment restricting `<table>.id` to rows whose title matches every
+    word of `text` as a prefix, served by the FTS index. Returns None when the
+    index is unavailable, so callers keep their LIKE filter.
+    """
+    match = to_match_query(text, column="title")
+    if match is None or not ensure_search_index():
+        return None
+    code = SEARCH_KINDS[kind][0]
+    return ("id IN (SELECT rowid >> 2 FROM search_index "
+            "WHERE search_index MATCH ? AND (rowid & 3) = ?)", (match, code))
+
+
+def search(text: str,
+           kinds: Optional[Sequence[str]] = None,
+           limit: int = DEFAULT_LIMIT,
+           highlight: Tuple[str, str] = ("[", "]")) -> List[Dict[str, Any]]:
+    """
+    Ranked search across tasks, time logs and trackers. Returns hits of
+    {"kind", "id", "uid", "title", "snippet", "rank"}, best first; lower rank
+    is better. `highlight` wraps each matched term in the snippet.
+    """
+    kinds = [k for k in (kinds or SEARCH_KINDS) if k in SEARCH_KINDS]
+    if not kinds or not _terms(text):
+        return []
+    if ensure_search_index():
+        return _search_fts(text, kinds, limit, highlight)
+    return _search_like(text, kinds, limit, highlight)
+
+
+def _search_fts(text: str, kinds: Sequence[str], limit: int,
+                highlight: Tuple[str, str]) -> List[Dict[str, Any]]:
+    codes = [SEARCH_KINDS[k][0] for k in kinds]
+    open_mark, close_mark = highlight
+    sql = f"""
+        SELECT rowid, uid, title,
+               snippet(search_index, -1, ?, ?, '…', {SNIPPET_TOKENS}) AS snippet,
+               bm25(search_index, {_BM25_WEIGHTS}) AS rank
+        FROM search_index
+        WHERE search_index MATCH ?
+          AND (rowid & 3) IN ({", ".join("?" for _ in codes)})
+        ORDER BY rank
+        LIMIT ?
+    """
+    with get_connection() as conn:
+        rows = conn.execute(
+            sql, (open_mark, close_mark, to_match_query(text), *codes, int(limit))
+        ).fetchall()
+    return [{
+        "kind": _KIND_BY_CODE[r["rowid"] & 3],
+        "id": r["rowid"] >> 2,
+        "uid": r["uid"],
+        "title": r["title"],
+        "snippet": r["snippet"],
+        "rank": r["rank"],
+    } for r in rows]
+
+
+def _like_snippet(row: Dict[str, Any], terms: List[str],
+                  highlight: Tuple[str, str], width: int = 40) -> str:
+    open_mark, close_mark = highlight
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    for col in ("title", "notes", "tags"):
+        value = row.get(col) or ""
+        m = pattern.search(value)
+        if not m:
+            continue
+        start, end = max(0, m.start() - width), min(len(value), m.end() + width)
+        excerpt = pattern.sub(lambda x: f"{open_mark}{x.group(0)}{close_mark}",
+                              value[start:end])
+        return ("…" if start else "") + excerpt + ("…" if end < len(value) else "")
+    return row.get("title") or ""
+
+
+def _search_like(text: str, kinds: Sequence[str], limit: int,
+                 highlight: Tuple[str, str]) -> List[Dict[str, Any]]:
+    """Fallback without FTS5: every word must appear in title, notes or tags."""
+    terms = _terms(text)
+    hits: List[Dict[str, Any]] = []
+    with get_connection() as conn:
+        for kind in kinds:
+            _, table, cols = SEARCH_KINDS[kind]
+            where = ["COALESCE(deleted, 0) = 0"]
+            params: List[Any] = []
+            for term in terms:
+                where.append("(" + " OR ".join(f"{c} LIKE ?" for c in cols) + ")")
+                params.extend([f"%{term}%"] * len(cols))
+            rows = conn.execute(
+                f"SELECT id, uid, title, notes, tags FROM {table} "
+                f"WHERE {' AND '.join(where)} LIMIT ?",
+                (*params, int(limit))
+            ).fetchall()
+            for r in rows:
+                row = dict(r)
+                title = (row["title"] or "").lower()
+                # Rough ranking: title matches first, then by term frequency.
+                score = -sum(10 if t.lower() in title else 1 for t in terms)
+                hits.append({
+                    "kind": kind, "id": row["id"], "uid": row["uid"],
+                    "title": row["title"],
+                    "snippet": _like_snippet(row, terms, highlight),
+                    "rank": float(score),
+                })
+    hits.sort(key=lambda h: h["rank"])
+    return hits[:limit]
@@ -0,0 +1,212 @@
+# lifelog/utils/db/snapshot.py
+"""
+Snapshot bootstrap for newly paired devices.
+
+Host side: `create_snapshot` takes a consistent copy of the live database with
+the SQLite online-backup API, strips host-only state (device tokens, pairing
+codes, change-log bookkeeping) and records the change-log high-water mark the
+copy corresponds to. `iter_compressed` streams it gzip-compressed.
+
+Client side: `bootstrap_from_host` downloads and decompresses the snapshot,
+verifies it, installs it atomically over the local database and sets every
+table's sync cursor to the snapshot's mark, so incremental sync continues from
+there instead of pulling every row as JSON.
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from lifelog.utils.db import get_connection, migrations
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SEQ_HEADER = "X-Lifelog-Snapshot-Seq"
+SYNC_TABLES = ("tasks", "time_history", "trackers", "goals")
+CHUNK_SIZE = 64 * 1024
+# sync_state row recording a bootstrap the host refused or that failed to
+# install; auto-sync then stops asking (`llog sync --bootstrap` still can).
+BOOTSTRAP_FAILED = "snapshot_bootstrap_failed"
+
+# Host-only state that must never leave the host in a snapshot
+# (reminders fire on the device that set them). Their deletes fire CDC
+# triggers, so the change-log bookkeeping is cleared last.
+_SCRUB_SQL = """
+DELETE FROM reminders;
+DELETE FROM scheduler_jobs;
+DELETE FROM api_devices;
+DELETE FROM api_pairing_codes;
+DELETE FROM sync_state;
+DELETE FROM change_log;
+DELETE FROM change_log_cursors;
+DELETE FROM sqlite_sequence WHERE name = 'change_log';
+"""
+
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def _db_dir() -> Path:
+    from lifelog.utils.db import _resolve_db_path
+    path = _resolve_db_path().parent
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Host side
+# ───────────────────────────────────────────────────────────────────────────────
+
+def create_snapshot() -> Tuple[Path, int]:
+    """
+    Write a scrubbed, vacuumed copy of the live DB to a temp file next to it.
+    Returns (path, change_log high-water mark). The caller deletes the file.
+    """
+    from lifelog.utils.db.change_log import get_high_water_mark
+    migrations.ensure_migrated()
+
+    fd, tmp_name = tempfile.mkstemp(prefix="snapshot-", suffix=".db", dir=_db_dir())
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        dest = sqlite3.connect(tmp_path)
+        try:
+            with get_connection() as live:
+                # pages=-1 copies in one step under a single read transaction,
+                # so the copy is consistent even while other processes write.
+                live.backup(dest, pages=-1)
+            # The mark is read from the copy itself, so it matches its contents.
+            seq = get_high_water_mark(dest)
+            dest.execute("PRAGMA journal_mode = DELETE")
+            dest.executescript(_SCRUB_SQL)
+            dest.execute("VACUUM")
+        finally:
+            dest.close()
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    logger.info("Created sync snapshot %s at seq %d (%d bytes)",
+                tmp_path.name, seq, tmp_path.stat().st_size)
+    return tmp_path, seq
+
+
+def iter_compressed(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield `path` gzip-compressed, chunk by chunk, without buffering it all."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, _GZIP_WBITS)
+    with open(path, "rb") as fh:
+        while True:
+            block = fh.read(chunk_size)
+            if not block:
+                break
+            out = compressor.compress(block)
+            if out:
+                yield out
+    yield compressor.flush()
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Client side
+# ───────────────────────────────────────────────────────────────────────────────
+
+def install_snapshot(path: Path, seq: int) -> None:
+    """
+    Atomically replace the local database contents with the snapshot at
+    `path` and continue incremental sync from change-log sequence `seq`.
+    """
+    snap = sqlite3.connect(path)
+    try:
+        result = snap.execute("PRAGMA quick_check").fetchone()[0]
+        if result != "ok":
+            raise sqlite3.DatabaseError(f"Snapshot failed integrity check: {result}")
+        with get_connection() as live:
+            # The backup API cannot change the page size of a WAL database,
+            # so rebuild the snapshot with the local page size first.
+            local_page_size = live.execute("PRAGMA page_size").fetchone()[0]
+            if snap.execute("PRAGMA page_size").fetchone()[0] != local_page_size:
+                snap.execute(f"PRAGMA page_size = {int(local_page_size)}")
+                snap.execute("VACUUM")
+            live.commit()
+            # Backup replaces the destination in a single transaction: other
+            # readers see either the old database or the new one.
+            snap.backup(live, pages=-1)
+    finally:
+        snap.close()
+
+    from lifelog.utils.db import set_last_synced_seq
+    migrations.ensure_migrated()
+    for table in SYNC_TABLES:
+        set_last_synced_seq(table, seq)
+    logger.info("Installed sync snapshot at seq %d", seq)
+
+
+def needs_bootstrap() -> bool:
+    """
+    True for a freshly paired client: no table was ever pulled by sequence and
+    there is no local data a snapshot would overwrite, and no earlier attempt
+    was refused by the host.
+    """
+    from lifelog.utils.db import get_last_synced, get_last_synced_seq, safe_query
+    if get_last_synced(BOOTSTRAP_FAILED) is not None:
+        return False
+    if any(get_last_synced_seq(t) is not None for t in SYNC_TABLES):
+        return False
+    for table in SYNC_TABLES:
+        if safe_query(f"SELECT 1 FROM {table} LIMIT 1"):
+            return False
+    return True
+
+
+def _record_failure(reason: str) -> None:
+    from lifelog.utils.core_utils import now_utc
+    from lifelog.utils.db import set_last_synced
+    logger.warning("Snapshot bootstrap failed (%s); not retrying automatically", reason)
+    set_last_synced(BOOTSTRAP_FAILED, now_utc().isoformat())
+
+
+def bootstrap_from_host() -> Optional[int]:
+    """
+    Download the host snapshot and install it. Returns the snapshot sequence,
+    or None if this is not a paired client or the host could not be reached.
+    A refused download or a failed install is recorded, so needs_bootstrap()
+    stops offering it; unreachable hosts are left to the sync breaker.
+    """
+    from lifelog.utils.db import get_http_session, get_mode, get_sync_headers, should_sync
+    from lifelog.utils.db.sync_breaker import NETWORK_ERRORS, request_timeout, sync_breaker
+
+    if not should_sync():
+        return None
+    _, server_url = get_mode()
+    headers = get_sync_headers()
+    if not headers or not sync_breaker.allow_request(server_url):
+        return None
+
+    fd, tmp_name = tempfile.mkstemp(prefix="snapshot-", suffix=".db", dir=_db_dir())
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        try:
+            resp = get_http_session().get(f"{server_url}/sync/snapshot", headers=headers,
+                                          timeout=request_timeout(), stream=True)
+        except NETWORK_ERRORS as e:
+            sync_breaker.record_failure(server_url, e)
+            return None
+        with resp:
+            if resp.status_code != 200:
+                _record_failure(f"HTTP {resp.status_code}")
+                return None
+            seq = int(resp.headers.get(SNAPSHOT_SEQ_HEADER, 0))
+            decompressor = zlib.decompressobj(_GZIP_WBITS)
+            with open(tmp_path, "wb") as out:
+                for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                    out.write(decompressor.decompress(chunk))
+                out.write(decompressor.flush())
+        try:
+            install_snapshot(tmp_path, seq)
+        except sqlite3.Error as e:
+            _record_failure(str(e))
+            raise
+        return seq
+    finally:
+        tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,192 @@
+# lifelog/utils/db/sync_breaker.py
+"""
+Circuit breaker for the client-mode sync connection.
+
+Host health (consecutive failures, last failure, backoff window) is persisted
+in sync_queue.db so that later CLI invocations skip network I/O instantly while
+the host is known to be down. Once the backoff window expires the breaker goes
+half-open: a single fast probe against /api/status decides whether to close it
+again or to double the backoff.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+from lifelog.config.config_manager import get_config_value
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_BACKOFF = 30.0      # seconds before the first half-open probe
+DEFAULT_MAX_BACKOFF = 30 * 60.0  # never wait longer than 30 minutes
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_PROBE_TIMEOUT = 1.5
+
+# Errors that mean "the host is unreachable", as opposed to a rejected request.
+NETWORK_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+
+def _sync_setting(key: str, default: float) -> float:
+    try:
+        return float(get_config_value("sync", key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def request_timeout() -> Tuple[float, float]:
+    """(connect, read) timeout tuple for sync requests, from [sync] config."""
+    return (_sync_setting("connect_timeout", DEFAULT_CONNECT_TIMEOUT),
+            _sync_setting("read_timeout", DEFAULT_READ_TIMEOUT))
+
+
+class HostCircuitBreaker:
+    """Persisted closed / open / half-open breaker keyed by server URL."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Per-process memo so concurrent auto_sync workers don't each probe.
+        self._verified_at: Dict[str, float] = {}
+
+    # ─── persistence ───
+
+    def _connect(self) -> sqlite3.Connection:
+        from lifelog.utils.db.db_helper import get_sync_queue_connection
+        conn = get_sync_queue_connection()
+        conn.row_factory = sqlite3.Row
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS host_health (
+              server_url    TEXT PRIMARY KEY,
+              failures      INTEGER NOT NULL DEFAULT 0,
+              last_failure  TEXT,
+              last_error    TEXT,
+              open_until    REAL NOT NULL DEFAULT 0
+            )
+        """)
+        return conn
+
+    def get_state(self, server_url: str) -> Dict[str, Any]:
+        """Return the persisted health row for `server_url` (closed if unknown)."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM host_health WHERE server_url = ?", (server_url,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return {"server_url": server_url, "failures": 0, "last_failure": None,
+                    "last_error": None, "open_until": 0.0}
+        return dict(row)
+
+    def _backoff(self, failures: int) -> float:
+        base = _sync_setting("breaker_base_backoff", DEFAULT_BASE_BACKOFF)
+        cap = _sync_setting("breaker_max_backoff", DEFAULT_MAX_BACKOFF)
+        return min(cap, base * (2 ** max(0, failures - 1)))
+
+    # ─── state transitions ───
+
+    def record_success(self, server_url: str) -> None:
+        """Close the breaker after any successful round-trip."""
+        self._verified_at[server_url] = time.monotonic()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM host_health WHERE server_url = ?",
+                             (server_url,))
+        finally:
+            conn.close()
+
+    def record_failure(self, server_url: str, error: Optional[BaseException] = None) -> float:
+        """
+        Count a network failure and (re)open the breaker with exponential backoff.
+        Returns the backoff window in seconds.
+        """
+        self._verified_at.pop(server_url, None)
+        state = self.get_state(server_url)
+        failures = int(state["failures"]) + 1
+        backoff = self._backoff(failures)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO host_health (server_url, failures, last_failure, last_error, open_until)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(server_url) DO UPDATE SET
+                      failures = excluded.failures,
+                      last_failure = excluded.last_failure,
+                      last_error = excluded.last_error,
+                      open_until = excluded.open_until
+                    """,
+                    (server_url, failures, datetime.now(timezone.utc).isoformat(),
+                     str(error)[:200] if error else None, time.time() + backoff)
+                )
+        finally:
+            conn.close()
+        logger.warning("Sync host %s unreachable (%d consecutive failures); "
+                       "skipping network sync for %.0fs", server_url, failures, backoff)
+        return backoff
+
+    def reset(self, server_url: str) -> None:
+        """Forget the failure history, e.g. before a user-initiated `llog sync`."""
+        self.record_success(server_url)
+        self._verified_at.pop(server_url, None)
+
+    def probe(self, server_url: str) -> bool:
+        """Fast connect-timeout health probe against /api/status."""
+        from lifelog.utils.db.db_helper import get_http_session
+        timeout = _sync_setting("probe_timeout", DEFAULT_PROBE_TIMEOUT)
+        try:
+            resp = get_http_session().get(f"{server_url}/api/status",
+                                          timeout=(timeout, timeout * 2))
+        except NETWORK_ERRORS as e:
+            self.record_failure(server_url, e)
+            return False
+        if resp.status_code >= 500:
+            self.record_failure(server_url, RuntimeError(
+                f"/api/status returned {resp.status_code}"))
+            return False
+        self.record_success(server_url)
+        return True
+
+    def allow_request(self, server_url: str) -> bool:
+        """
+        True if network sync should be attempted now.
+          • closed    → True without touching the network
+          • open      → False instantly until the backoff window expires
+          • half-open → one fast probe decides
+        """
+        if not server_url:
+            return False
+        if server_url in self._verified_at:
+            return True
+        with self._lock:
+            if server_url in self._verified_at:
+                return True
+            try:
+                state = self.get_state(server_url)
+            except sqlite3.Error as e:
+                logger.warning("Could not read host health state: %s", e)
+                return True
+            if int(state["failures"]) == 0:
+                self._verified_at[server_url] = time.monotonic()
+                return True
+            if time.time() < float(state["open_until"]):
+                logger.info("Sync host %s marked down until %s; skipping network I/O",
+                            server_url,
+                            datetime.fromtimestamp(state["open_until"]).isoformat(timespec="seconds"))
+                return False
+            return self.probe(server_url)
+
+
+sync_breaker = HostCircuitBreaker()
+
+
+def host_available(server_url: str) -> bool:
+    """Convenience wrapper around the process-wide breaker."""
+    return sync_breaker.allow_request(server_url)
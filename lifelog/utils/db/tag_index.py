@@ -0,0 +1,219 @@
+# lifelog/utils/db/tag_index.py
+"""
+Normalized tag index.
+
+Tags are still written as comma-separated text in the `tags` column of tasks,
+time_history and trackers (that is what the sync payloads and the UI carry),
+but every write is mirrored into a `tags` table plus one join table per
+entity:
+
+    tags(id, name)                  -- lower-cased, without a leading '+'
+    task_tags(tag_id, task_id)
+    time_history_tags(tag_id, entry_id)
+    tracker_tags(tag_id, tracker_id)
+
+Triggers on the base tables do the mirroring, so local writes and sync
+upserts are covered alike, and tag filters become indexed joins instead of
+LIKE scans over the text column.
+"""
+import logging
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from lifelog.utils.db import get_connection, migrations
+
+logger = logging.getLogger(__name__)
+
+# entity → (base table, join table, join column)
+TAG_ENTITIES: Dict[str, Tuple[str, str, str]] = {
+    "task":    ("tasks",        "task_tags",         "task_id"),
+    "time":    ("time_history", "time_history_tags", "entry_id"),
+    "tracker": ("trackers",     "tracker_tags",      "tracker_id"),
+}
+
+
+def normalize_tag(tag: str) -> str:
+    """'+DeepWork ' → 'deepwork' (same rule the triggers apply)."""
+    return (tag or "").strip().lstrip("+").strip().lower()
+
+
+def parse_tags(value: Any) -> List[str]:
+    """Split a comma-separated tag string (or a list) into normalized tags."""
+    if not value:
+        return []
+    parts = value if isinstance(value, (list, tuple, set)) else str(value).split(",")
+    seen: List[str] = []
+    for part in parts:
+        tag = normalize_tag(str(part))
+        if tag and tag not in seen:
+            seen.append(tag)
+    return seen
+
+
+def _split_sql(column: str) -> str:
+    """
+    SQL yielding one normalized tag per row from a comma-separated column.
+    Triggers cannot use recursive CTEs, so the text is turned into a JSON
+    array for json_each; malformed input yields no tags rather than failing
+    the write.
+    """
+    as_json = (f"'[\"' || replace(replace(replace({column}, '\\', '\\\\'), "
+               f"'\"', '\\\"'), ',', '\",\"') || '\"]'")
+    # Only a leading '+' is dropped, as in normalize_tag(): 'c++' stays 'c++'.
+    name = "trim(ltrim(trim(value), '+'))"
+    return (f"SELECT DISTINCT lower({name}) AS name FROM json_each("
+            f"CASE WHEN json_valid({as_json}) THEN {as_json} ELSE '[]' END) "
+            f"WHERE {name} <> ''")
+
+
+def _link_sql(entity: str, id_expr: str, tags_expr: str) -> str:
+    _, join_table, join_col = TAG_ENTITIES[entity]
+    split = _split_sql(tags_expr)
+    return f"""
+        INSERT OR IGNORE INTO tags (name) {split};
+        INSERT OR IGNORE INTO {join_table} (tag_id, {join_col})
+        SELECT t.id, {id_expr} FROM tags t WHERE t.name IN ({split});"""
+
+
+def _trigger_sql(entity: str) -> str:
+    table, join_table, join_col = TAG_ENTITIES[entity]
+    return f"""
+    CREATE TABLE IF NOT EXISTS {join_table} (
+        tag_id    INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+        {join_col} INTEGER NOT NULL REFERENCES {table}(id) ON DELETE CASCADE,
+        PRIMARY KEY (tag_id, {join_col})
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS idx_{join_table}_{join_col} ON {join_table}({join_col});
+
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_tags_insert AFTER INSERT ON {table}
+    WHEN NEW.tags IS NOT NULL
+    BEGIN{_link_sql(entity, "NEW.id", "NEW.tags")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_tags_update AFTER UPDATE OF tags ON {table}
+    BEGIN
+        DELETE FROM {join_table} WHERE {join_col} = OLD.id;{_link_sql(entity, "NEW.id", "COALESCE(NEW.tags, '')")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_tags_delete AFTER DELETE ON {table}
+    BEGIN
+        DELETE FROM {join_table} WHERE {join_col} = OLD.id;
+    END;
+    """
+
+
+TAG_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tags (
+    id    INTEGER PRIMARY KEY AUTOINCREMENT,
+    name  TEXT NOT NULL UNIQUE
+);
+""" + "".join(_trigger_sql(e) for e in TAG_ENTITIES)
+
+
+def install_tag_index(conn: sqlite3.Connection) -> None:
+    """
+    Create the tag tables and triggers (idempotent). The first install
+    migrates the existing free-text tag columns into the index.
+    """
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tags'"
+    ).fetchone()
+    conn.executescript(TAG_INDEX_SCHEMA)
+    if not existed:
+        rebuild_tag_index(conn)
+
+
+def reinstall_tag_triggers(conn: sqlite3.Connection) -> None:
+    """
+    Recreate the triggers (earlier ones also stripped a trailing '+') and
+    relink the rows whose tags contain one.
+    """
+    conn.executescript("".join(
+        f"DROP TRIGGER IF EXISTS trg_{table}_tags_{event};\n"
+        for table, _, _ in TAG_ENTITIES.values() for event in ("insert", "update", "delete"))
+        + TAG_INDEX_SCHEMA)
+    for table, join_table, join_col in TAG_ENTITIES.values():
+        rows = conn.execute(f"SELECT id, tags FROM {table} WHERE tags LIKE '%+%'").fetchall()
+        links = [(row[0], tag) for row in rows for tag in parse_tags(row[1])]
+        conn.executemany(f"DELETE FROM {join_table} WHERE {join_col} = ?",
+                         [(row[0],) for row in rows])
+        conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)",
+                         {(tag,) for _, tag in links})
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {join_table} (tag_id, {join_col}) "
+            f"SELECT id, ? FROM tags WHERE name = ?", links)
+    conn.commit()
+
+
+def rebuild_tag_index(conn: Optional[sqlite3.Connection] = None) -> int:
+    """Re-derive every join row from the text columns. Returns the link count."""
+    if conn is None:
+        migrations.ensure_migrated()
+        with get_connection() as c:
+            return rebuild_tag_index(c)
+    total = 0
+    for entity, (table, join_table, join_col) in TAG_ENTITIES.items():
+        conn.execute(f"DELETE FROM {join_table}")
+        rows = conn.execute(
+            f"SELECT id, tags FROM {table} WHERE tags IS NOT NULL AND tags <> ''"
+        ).fetchall()
+        links = [(row[0], tag) for row in rows for tag in parse_tags(row[1])]
+        conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)",
+                         {(tag,) for _, tag in links})
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {join_table} (tag_id, {join_col}) "
+            f"SELECT id, ? FROM tags WHERE name = ?", links)
+        total += len(links)
+    # Drop tags nothing refers to any more.
+    conn.execute(
+        "DELETE FROM tags WHERE " + " AND ".join(
+            f"id NOT IN (SELECT tag_id FROM {jt})" for _, jt, _ in TAG_ENTITIES.values()))
+    logger.info("Rebuilt tag index with %d links", total)
+    return total
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Queries
+# ───────────────────────────────────────────────────────────────────────────────
+
+def tag_filter(entity: str, tags: Iterable[str], match_all: bool = True,
+               schema: Optional[str] = None) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+    """
+    SQL fragment restricting `<table>.id` to rows carrying the given tags
+    (all of them by default, any of them with match_all=False).
+    Returns None when no tags were given. `schema` names the database holding
+    the link table, for rows read from an attached archive.
+    """
+    names = parse_tags(list(tags))
+    if not names:
+        return None
+    migrations.ensure_migrated()
+    _, join_table, join_col = TAG_ENTITIES[entity]
+    ph = ", ".join("?" for _ in names)
+    if schema:
+        join_table = f"{schema}.{join_table}"
+    sql = (f"id IN (SELECT j.{join_col} FROM {join_table} j "
+           f"JOIN tags t ON t.id = j.tag_id WHERE t.name IN ({ph})")
+    params: Tuple[Any, ...] = tuple(names)
+    if match_all and len(names) > 1:
+        sql += f" GROUP BY j.{join_col} HAVING COUNT(*) = ?"
+        params += (len(names),)
+    return sql + ")", params
+
+
+def get_tag_counts(entity: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Tags with the number of live rows using them, most used first."""
+    migrations.ensure_migrated()
+    entities = [entity] if entity else list(TAG_ENTITIES)
+    parts = [
+        f"SELECT j.tag_id FROM {jt} j JOIN {table} b ON b.id = j.{col} "
+        f"WHERE COALESCE(b.deleted, 0) = 0"
+        for table, jt, col in (TAG_ENTITIES[e] for e in entities)
+    ]
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"SELECT t.name, COUNT(*) AS uses FROM ({' UNION ALL '.join(parts)}) u "
+            f"JOIN tags t ON t.id = u.tag_id GROUP BY t.id ORDER BY uses DESC, t.name"
+        ).fetchall()
+    return [dict(r) for r in rows]
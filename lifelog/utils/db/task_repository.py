@@ -1,6 +1,6 @@
 from dataclasses import asdict
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import uuid
 from lifelog.config.config_manager import is_host_server
 from lifelog.utils.db.models import Task, TaskStatus, get_task_fields, task_from_row
@@ -15,6 +15,12 @@ from lifelog.utils.db import (
     queue_sync_operation,
 )
 from lifelog.utils.db import fetch_from_server, get_last_synced, process_sync_queue, set_last_synced, safe_execute, safe_query
+from lifelog.utils.db import pull_table_changes
+from lifelog.utils.db.paging import KeysetQuery
+from lifelog.utils.db.search_index import title_filter
+from lifelog.utils.db.tag_index import tag_filter
+from lifelog.utils.db.priority import rescore_if_stale
+from lifelog.utils.db import time_keys
 from lifelog.utils.core_utils import calculate_priority
 from lifelog.utils.error_handler import handle_db_errors, validate_task_data
 logger = logging.getLogger(__name__)
@@ -34,14 +40,18 @@ def get_all_tasks() -> List[Task]:
     return [task_from_row(dict(row)) for row in rows]
 
 
-def _pull_changed_tasks_from_host() -> None:
+def _pull_changed_tasks_from_host(push: bool = True) -> None:
     if not should_sync():
         return
 
-    # push local changes
-    process_sync_queue()
+    # push local changes (auto_sync pushes once up front and passes push=False)
+    if push:
+        process_sync_queue()
+
+    # pull remote deltas by change-log sequence; fall back to timestamps
+    if pull_table_changes("tasks", upsert_local_task, _mark_task_deleted):
+        return
 
-    # pull remote deltas
     last_ts = get_last_synced("tasks")
     params: Dict[str, Any] = {"since": last_ts} if last_ts else {}
     remote_list = fetch_from_server("tasks", params=params) or []
@@ -52,6 +62,10 @@ def _pull_changed_tasks_from_host() -> None:
     set_last_synced("tasks", datetime.now().isoformat())
 
 
+def _mark_task_deleted(uid_val: str) -> None:
+    safe_execute("UPDATE tasks SET deleted = 1 WHERE uid = ?", (uid_val,))
+
+
 def get_task_by_id(task_id):
     """
     Return a single task by numeric ID from the local DB.
@@ -243,6 +257,57 @@ def upsert_local_task(data: dict) -> None:
         add_record("tasks", db_data, fields)
 
 
+def _task_filters(
+    title_contains: Optional[str] = None,
+    uid: Optional[str] = None,
+    category: Optional[str] = None,
+    project: Optional[str] = None,
+    importance: Optional[int] = None,
+    due_contains: Optional[str] = None,
+    status: Optional[str] = None,
+    show_completed: bool = False,
+    tags: Optional[List[str]] = None,
+    match_all_tags: bool = True,
+) -> Tuple[str, List[Any]]:
+    """WHERE clause and params shared by query_tasks and task_keyset."""
+    query = "1=1"
+    params: List[Any] = []
+
+    if uid:
+        query += " AND uid = ?"
+        params.append(uid)
+    if title_contains:
+        fts = title_filter("task", title_contains)
+        if fts:
+            query += f" AND {fts[0]}"
+            params.extend(fts[1])
+        else:
+            query += " AND title LIKE ?"
+            params.append(f"%{title_contains}%")
+    if category:
+        query += " AND category = ?"
+        params.append(category)
+    if project:
+        query += " AND project = ?"
+        params.append(project)
+    if importance is not None:
+        query += " AND importance = ?"
+        params.append(importance)
+    if due_contains:
+        query += " AND due LIKE ?"
+        params.append(f"%{due_contains}%")
+    if status:
+        query += " AND status = ?"
+        params.append(status)
+    if not show_completed and status is None:
+        query += " AND (status IS NULL OR status != 'done')"
+    tagged = tag_filter("task", tags or [], match_all=match_all_tags)
+    if tagged:
+        query += f" AND {tagged[0]}"
+        params.extend(tagged[1])
+    return query, params
+
+
 def query_tasks(
     title_contains: Optional[str] = None,
     uid: Optional[str] = None,
@@ -253,41 +318,27 @@ def query_tasks(
     status: Optional[str] = None,
     show_completed: bool = False,
     sort: str = "priority",
+    tags: Optional[List[str]] = None,
+    match_all_tags: bool = True,
     **kwargs
 ) -> List[Task]:
     """
     Flexible query against local tasks, with optional remote pull in client mode.
+    `tags` keeps tasks carrying all (or, with match_all_tags=False, any) of them.
     """
     if should_sync():
         _pull_changed_tasks_from_host()
 
     if is_direct_db_mode() or should_sync():
-        query = "SELECT * FROM tasks WHERE 1=1"
-        params: List[Any] = []
-
-        if uid:
-            query += " AND uid = ?"
-            params.append(uid)
-        if title_contains:
-            query += " AND title LIKE ?"
-            params.append(f"%{title_contains}%")
-        if category:
-            query += " AND category = ?"
-            params.append(category)
-        if project:
-            query += " AND project = ?"
-            params.append(project)
-        if importance is not None:
-            query += " AND importance = ?"
-            params.append(importance)
-        if due_contains:
-            query += " AND due LIKE ?"
-            params.append(f"%{due_contains}%")
-        if status:
-            query += " AND status = ?"
-            params.append(status)
-        if not show_completed and status is None:
-            query += " AND (status IS NULL OR status != 'done')"
+        if sort == "priority":
+            # Urgency drifts with time; refresh stored scores if they are old.
+            rescore_if_stale()
+        where, params = _task_filters(
+            title_contains=title_contains, uid=uid, category=category,
+            project=project, importance=importance, due_contains=due_contains,
+            status=status, show_completed=show_completed, tags=tags,
+            match_all_tags=match_all_tags)
+        query = f"SELECT * FROM tasks WHERE {where}"
 
         sort_map = {
             "priority": "priority DESC",
@@ -310,12 +361,53 @@ def query_tasks(
         "due_contains":   due_contains,
         "status":         status,
         "sort":           sort,
+        "tags":           ",".join(tags) if tags else None,
+        "tag_mode":       ("all" if match_all_tags else "any") if tags else None,
         **kwargs,
     }.items() if v is not None}
 
     return fetch_from_server("tasks", params=params)
 
 
+# Sort keys for keyset paging; NULLs are folded so the keys stay comparable.
+_KEYSET_ORDERS = {
+    "priority": [("COALESCE(priority, 0)", True), ("id", False)],
+    "due":      [("COALESCE(due, '9999')", False), ("id", False)],
+    "created":  [("COALESCE(created, '')", False), ("id", False)],
+    "id":       [("id", False)],
+    "status":   [("COALESCE(status, '')", False), ("id", False)],
+}
+
+
+def task_keyset(sort: str = "priority", **filters) -> KeysetQuery:
+    """
+    Tasks matching the query_tasks filters as a keyset-paged view, for
+    callers that show a window of a possibly long list.
+    """
+    if should_sync():
+        _pull_changed_tasks_from_host()
+    if sort == "priority":
+        rescore_if_stale()
+    where, params = _task_filters(**filters)
+    return KeysetQuery("tasks", where, params,
+                       order=_KEYSET_ORDERS.get(sort, _KEYSET_ORDERS["priority"]),
+                       convert=task_from_row)
+
+
+def get_due_days(year: int, month: int, **filters) -> List[int]:
+    """Days of the month, in the configured timezone, on which a matching task is due."""
+    time_keys.ensure_time_keys()
+    where, params = _task_filters(**filters)
+    day = time_keys.local_date_sql("tasks")
+    start = f"{year:04d}-{month:02d}-01"
+    end = f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+    rows = safe_query(
+        f"SELECT DISTINCT CAST(substr({day}, 9, 2) AS INTEGER) FROM tasks "
+        f"WHERE {where} AND {day} >= ? AND {day} < ?",
+        tuple(params) + (start, end))
+    return [r[0] for r in rows]
+
+
 def update_task_by_uid(uid: str, updates: Dict[str, Any]) -> None:
     """Host-only: update fields, serialize Enum, set updated_at."""
     if not is_host_server():
@@ -0,0 +1,197 @@
+# lifelog/utils/db/task_time.py
+"""
+Per-task time totals.
+
+`task_time_totals` keeps one row per task with the minutes logged against
+it, maintained by triggers on time_history:
+
+    total_minutes       sum of duration_minutes of finished entries
+    distracted_minutes  sum of distracted_minutes
+    sessions            number of finished entries
+    last_worked         latest end time
+
+Each trigger recomputes the row of the affected task(s) from
+time_history through idx_time_history_task_id, so the totals stay exact
+under edits, soft deletes and sync upserts alike. Running entries (no
+`end`) are not counted; callers showing live totals add the running segment.
+
+Entries moved to cold storage (archive.py) are no longer in time_history;
+their minutes, sessions and latest end are folded into `task_time_archived`
+as they move, and every recompute adds that row back in.
+"""
+import sqlite3
+from typing import Any, Dict, Iterable, Optional
+
+from lifelog.utils.db import get_connection, migrations
+
+
+_EMPTY = {"total_minutes": 0.0, "distracted_minutes": 0.0, "focused_minutes": 0.0,
+          "sessions": 0, "last_worked": None}
+
+
+# Finished, live entries as (task_id, minutes, distracted, sessions, last end)
+# rows, unioned with the archived totals of the same tasks.
+def _totals_sql(hot_where: str, archived_where: str) -> str:
+    return f"""
+        SELECT task_id,
+               COALESCE(SUM(total_minutes), 0),
+               COALESCE(SUM(distracted_minutes), 0),
+               SUM(sessions),
+               MAX(last_worked)
+        FROM (
+            SELECT task_id, duration_minutes AS total_minutes, distracted_minutes,
+                   1 AS sessions, end AS last_worked
+            FROM time_history
+            WHERE {hot_where} AND end IS NOT NULL AND COALESCE(deleted, 0) = 0
+            UNION ALL
+            SELECT task_id, total_minutes, distracted_minutes, sessions, last_worked
+            FROM task_time_archived WHERE {archived_where}
+        )
+        GROUP BY task_id"""
+
+
+def _recompute_sql(task_expr: str) -> str:
+    # GROUP BY yields no row for a NULL id or a task without any entries.
+    return f"""
+        DELETE FROM task_time_totals WHERE task_id = {task_expr};
+        INSERT INTO task_time_totals
+            (task_id, total_minutes, distracted_minutes, sessions, last_worked)
+        {_totals_sql(f"task_id = {task_expr}", f"task_id = {task_expr}")};"""
+
+
+TASK_TIME_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS task_time_totals (
+    task_id            INTEGER PRIMARY KEY,
+    total_minutes      REAL NOT NULL DEFAULT 0,
+    distracted_minutes REAL NOT NULL DEFAULT 0,
+    sessions           INTEGER NOT NULL DEFAULT 0,
+    last_worked        TEXT
+);
+
+CREATE TABLE IF NOT EXISTS task_time_archived (
+    task_id            INTEGER PRIMARY KEY,
+    total_minutes      REAL NOT NULL DEFAULT 0,
+    distracted_minutes REAL NOT NULL DEFAULT 0,
+    sessions           INTEGER NOT NULL DEFAULT 0,
+    last_worked        TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_time_history_task_id ON time_history(task_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_time_history_task_time_insert
+AFTER INSERT ON time_history WHEN NEW.task_id IS NOT NULL
+BEGIN{_recompute_sql("NEW.task_id")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_time_history_task_time_update
+AFTER UPDATE OF task_id, duration_minutes, distracted_minutes, end, deleted ON time_history
+WHEN NEW.task_id IS NOT NULL OR OLD.task_id IS NOT NULL
+BEGIN{_recompute_sql("OLD.task_id")}{_recompute_sql("NEW.task_id")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_time_history_task_time_delete
+AFTER DELETE ON time_history WHEN OLD.task_id IS NOT NULL
+BEGIN{_recompute_sql("OLD.task_id")}
+END;
+"""
+
+
+def install_task_time(conn: sqlite3.Connection) -> None:
+    """Create the totals table and triggers (idempotent); backfill on first install."""
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_time_totals'"
+    ).fetchone()
+    conn.executescript(TASK_TIME_SCHEMA)
+    if not existed:
+        rebuild_task_time(conn)
+
+
+_TRIGGERS = ("trg_time_history_task_time_insert", "trg_time_history_task_time_update",
+             "trg_time_history_task_time_delete")
+
+
+def install_archived_task_time(conn: sqlite3.Connection) -> None:
+    """
+    Add task_time_archived, recreate the triggers to read it and fill it from
+    the archives written before it existed (idempotent).
+    """
+    from lifelog.utils.db import archive
+    conn.executescript("".join(f"DROP TRIGGER IF EXISTS {name};\n" for name in _TRIGGERS)
+                       + TASK_TIME_SCHEMA)
+    conn.execute("DELETE FROM task_time_archived")
+    # Rows caught between copy and delete are still hot and counted there.
+    archive.fold_archives(conn, "time_history",
+                          "id NOT IN (SELECT id FROM main.time_history)")
+    rebuild_task_time(conn)
+    conn.commit()
+
+
+def fold_archived(conn: sqlite3.Connection, source: str, where: str) -> None:
+    """Add the finished, live entries of `source` matching `where` to task_time_archived."""
+    conn.execute(f"""
+        INSERT INTO task_time_archived
+            (task_id, total_minutes, distracted_minutes, sessions, last_worked)
+        SELECT task_id, COALESCE(SUM(duration_minutes), 0),
+               COALESCE(SUM(distracted_minutes), 0), COUNT(*), MAX(end)
+        FROM {source}
+        WHERE ({where}) AND task_id IS NOT NULL AND end IS NOT NULL
+              AND COALESCE(deleted, 0) = 0
+        GROUP BY task_id
+        ON CONFLICT(task_id) DO UPDATE SET
+            total_minutes = total_minutes + excluded.total_minutes,
+            distracted_minutes = distracted_minutes + excluded.distracted_minutes,
+            sessions = sessions + excluded.sessions,
+            last_worked = CASE WHEN last_worked IS NULL OR excluded.last_worked > last_worked
+                               THEN excluded.last_worked ELSE last_worked END""")
+
+
+def rebuild_task_time(conn: Optional[sqlite3.Connection] = None) -> None:
+    """Recompute every row from time_history and the archived totals."""
+    if conn is None:
+        migrations.ensure_migrated()
+        with get_connection() as c:
+            return rebuild_task_time(c)
+    conn.execute("DELETE FROM task_time_totals")
+    conn.execute(
+        "INSERT INTO task_time_totals "
+        "(task_id, total_minutes, distracted_minutes, sessions, last_worked)"
+        + _totals_sql("task_id IS NOT NULL", "1=1"))
+
+
+def _as_dict(row) -> Dict[str, Any]:
+    total = row["total_minutes"] or 0.0
+    distracted = row["distracted_minutes"] or 0.0
+    return {
+        "total_minutes": total,
+        "distracted_minutes": distracted,
+        "focused_minutes": max(total - distracted, 0.0),
+        "sessions": row["sessions"] or 0,
+        "last_worked": row["last_worked"],
+    }
+
+
+def get_task_time(task_id: int) -> Dict[str, Any]:
+    """Totals for one task (zeros when nothing was logged)."""
+    migrations.ensure_migrated()
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM task_time_totals WHERE task_id = ?", (task_id,)).fetchone()
+    return _as_dict(row) if row else dict(_EMPTY)
+
+
+def get_task_times(task_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Totals for many tasks in primary-key lookups, keyed by task id."""
+    ids = [i for i in task_ids if i is not None]
+    if not ids:
+        return {}
+    migrations.ensure_migrated()
+    result = {i: dict(_EMPTY) for i in ids}
+    with get_connection() as conn:
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT * FROM task_time_totals WHERE task_id IN ({', '.join('?' for _ in chunk)})",
+                chunk).fetchall()
+            for row in rows:
+                result[row["task_id"]] = _as_dict(row)
+    return result
@@ -0,0 +1,253 @@
+# lifelog/utils/db/time_audit.py
+"""
+Overlap and gap analysis for time_history.
+
+Entries are read as half-open [start, end) intervals in epoch seconds; a
+running entry ends "now". Two expression indexes make range reads cheap:
+
+    idx_time_history_start_jd  julianday(start)
+    idx_time_history_span_jd   julianday(end) - julianday(start)
+
+An entry overlapping [since, until) must start before `until` and no earlier
+than `since` minus the longest entry span, which MAX() reads off the span
+index, so a range read touches only rows near the range instead of the whole
+table. julianday() also normalises the mix of offset-aware and naive (UTC)
+ISO strings that manual entries and sync produce.
+
+The analysis itself is a sorted-endpoint sweep: O(n log n) for n entries,
+plus O(k) to report k overlapping pairs.
+"""
+import heapq
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterable, List, NamedTuple, Optional, Union
+
+from lifelog.utils.core_utils import now_utc, to_utc
+from lifelog.utils.db import get_connection, migrations, time_keys
+from lifelog.utils.error_handler import ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+_UNIX_EPOCH_JD = 2440587.5
+
+TIME_AUDIT_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_time_history_start_jd
+    ON time_history(julianday(start));
+CREATE INDEX IF NOT EXISTS idx_time_history_span_jd
+    ON time_history((julianday(end) - julianday(start)));
+CREATE INDEX IF NOT EXISTS idx_time_history_running
+    ON time_history(start) WHERE end IS NULL;
+"""
+
+When = Union[datetime, str, float, None]
+
+
+class Interval(NamedTuple):
+    id: Optional[int]
+    start: float            # epoch seconds
+    end: float              # epoch seconds, exclusive
+    title: str = ""
+    running: bool = False
+
+    @property
+    def minutes(self) -> float:
+        return max(self.end - self.start, 0.0) / 60.0
+
+
+class Overlap(NamedTuple):
+    first: Interval
+    second: Interval
+    start: float
+    end: float
+
+    @property
+    def minutes(self) -> float:
+        return (self.end - self.start) / 60.0
+
+
+class Gap(NamedTuple):
+    start: float
+    end: float
+
+    @property
+    def minutes(self) -> float:
+        return (self.end - self.start) / 60.0
+
+
+@dataclass
+class AuditReport:
+    since: Optional[float]
+    until: float
+    entries: int = 0
+    overlaps: List[Overlap] = field(default_factory=list)
+    gaps: List[Gap] = field(default_factory=list)
+    logged_minutes: float = 0.0    # sum of entry lengths inside the range
+    tracked_minutes: float = 0.0   # length of their union
+
+    @property
+    def double_counted_minutes(self) -> float:
+        return max(self.logged_minutes - self.tracked_minutes, 0.0)
+
+    @property
+    def untracked_minutes(self) -> float:
+        return sum(g.minutes for g in self.gaps)
+
+
+class OverlapError(ValidationError):
+    """A new entry would overlap existing ones."""
+
+    def __init__(self, conflicts: List[Interval]):
+        self.conflicts = conflicts
+        names = ", ".join(f"#{c.id} '{c.title}'" for c in conflicts[:3])
+        more = f" and {len(conflicts) - 3} more" if len(conflicts) > 3 else ""
+        super().__init__(f"Entry overlaps {names}{more}")
+
+
+def install_time_audit(conn: sqlite3.Connection) -> None:
+    """Create the interval indexes (idempotent)."""
+    conn.executescript(TIME_AUDIT_SCHEMA)
+
+
+def to_epoch(value: When) -> Optional[float]:
+    """Epoch seconds for a datetime, ISO string (naive = UTC) or number."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return to_utc(value).timestamp()
+
+
+def from_epoch(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def _jd(ts: float) -> float:
+    return ts / 86400.0 + _UNIX_EPOCH_JD
+
+
+# ─── reading ──────────────────────────────────────────────────────────────
+
+
+def load_intervals(since: When = None, until: When = None,
+                   now: When = None) -> List[Interval]:
+    """Non-deleted entries intersecting [since, until); open bounds when None."""
+    migrations.ensure_migrated()
+    now_ts = to_epoch(now) if now is not None else now_utc().timestamp()
+    since_ts = to_epoch(since)
+    until_ts = to_epoch(until)
+    # Whole epoch seconds from the time_keys columns; julianday() arithmetic
+    # would leave whole-minute entries a hair short.
+    cols = f"""id, COALESCE(title, '') AS title,
+               {time_keys.epoch_sql("time_history", "start")} AS s"""
+
+    with get_connection() as conn:
+        where, params = ["end IS NOT NULL", "COALESCE(deleted, 0) = 0"], []
+        if until_ts is not None:
+            where.append("julianday(start) < ?")
+            params.append(_jd(until_ts))
+        if since_ts is not None:
+            span = max(conn.execute(
+                "SELECT MAX(julianday(end) - julianday(start)) FROM time_history"
+            ).fetchone()[0] or 0.0, 0.0)
+            where += ["julianday(start) >= ?", "julianday(end) > ?"]
+            params += [_jd(since_ts) - span, _jd(since_ts)]
+        rows = conn.execute(
+            f"""SELECT {cols}, {time_keys.epoch_sql("time_history", "end")} AS e
+                FROM time_history WHERE {' AND '.join(where)}""", params).fetchall()
+        running = conn.execute(
+            f"""SELECT {cols} FROM time_history
+                WHERE end IS NULL AND COALESCE(deleted, 0) = 0""").fetchall()
+
+    result = [Interval(r["id"], r["s"], r["e"], r["title"])
+              for r in rows if r["s"] is not None and r["e"] is not None]
+    for r in running:
+        if r["s"] is None:
+            continue
+        iv = Interval(r["id"], r["s"], max(now_ts, r["s"]), r["title"], running=True)
+        if (until_ts is None or iv.start < until_ts) and (since_ts is None or iv.end > since_ts):
+            result.append(iv)
+    return result
+
+
+# ─── analysis ─────────────────────────────────────────────────────────────
+
+
+def find_overlaps(intervals: Iterable[Interval]) -> List[Overlap]:
+    """Every overlapping pair, by a sweep over start-sorted intervals."""
+    ordered = sorted((iv for iv in intervals if iv.end > iv.start),
+                     key=lambda iv: (iv.start, iv.end))
+    active: List[tuple] = []      # min-heap of (end, index) still open
+    result = []
+    for i, iv in enumerate(ordered):
+        while active and active[0][0] <= iv.start:
+            heapq.heappop(active)
+        for end, j in active:
+            result.append(Overlap(ordered[j], iv, iv.start, min(end, iv.end)))
+        heapq.heappush(active, (iv.end, i))
+    result.sort(key=lambda o: (o.start, o.first.id or 0, o.second.id or 0))
+    return result
+
+
+def audit(since: When = None, until: When = None, min_gap_minutes: float = 0.0,
+          intervals: Optional[List[Interval]] = None) -> AuditReport:
+    """Overlaps, untracked gaps and logged vs. tracked minutes over a range."""
+    until_ts = to_epoch(until) if until is not None else now_utc().timestamp()
+    since_ts = to_epoch(since)
+    if intervals is None:
+        intervals = load_intervals(since_ts, until_ts)
+
+    clipped = []
+    for iv in intervals:
+        s = iv.start if since_ts is None else max(iv.start, since_ts)
+        e = min(iv.end, until_ts)
+        if e > s:
+            clipped.append(iv._replace(start=s, end=e))
+    clipped.sort(key=lambda iv: iv.start)
+
+    report = AuditReport(since=since_ts, until=until_ts, entries=len(clipped))
+    report.overlaps = find_overlaps(clipped)
+    report.logged_minutes = sum(iv.minutes for iv in clipped)
+
+    min_gap = min_gap_minutes * 60.0
+    cursor = since_ts if since_ts is not None else (clipped[0].start if clipped else until_ts)
+    tracked = 0.0
+    for iv in clipped:
+        if iv.start - cursor > min_gap:
+            report.gaps.append(Gap(cursor, iv.start))
+        if iv.end > cursor:
+            tracked += iv.end - max(iv.start, cursor)
+            cursor = iv.end
+    if until_ts - cursor > min_gap:
+        report.gaps.append(Gap(cursor, until_ts))
+    report.tracked_minutes = tracked / 60.0
+    return report
+
+
+# ─── validation hook ──────────────────────────────────────────────────────
+
+
+def find_conflicts(start: When, end: When = None,
+                   exclude_id: Optional[int] = None) -> List[Interval]:
+    """Entries overlapping [start, end); an open end means a running entry."""
+    s = to_epoch(start)
+    e = to_epoch(end)
+    if e is not None and e <= s:
+        return []
+    return sorted((iv for iv in load_intervals(s, e)
+                   if iv.id != exclude_id and iv.end > s and (e is None or iv.start < e)),
+                  key=lambda iv: iv.start)
+
+
+def check_overlap(start: When, end: When = None, exclude_id: Optional[int] = None) -> None:
+    """Raise OverlapError if [start, end) overlaps an existing entry."""
+    conflicts = find_conflicts(start, end, exclude_id)
+    if conflicts:
+        raise OverlapError(conflicts)
+
+
+def reject_overlaps_enabled() -> bool:
+    from lifelog.config.config_manager import get_config_value
+    return bool(get_config_value("time", "reject_overlaps", False))
@@ -0,0 +1,310 @@
+# lifelog/utils/db/time_keys.py
+"""
+Integer epoch columns and local-date keys for the time-stamped tables.
+
+Timestamps are stored as ISO text with whatever offset the writer used, so
+`start >= ?` compares strings: '2025-03-01T01:00:00+02:00' sorts after
+'2025-03-01T00:30:00+00:00' although it is earlier, and a day is whatever
+the first ten characters say. The generated columns here give every row
+
+    <col>_epoch   seconds since 1970 UTC (naive text is UTC, as SQLite reads it)
+    local_date    the YYYY-MM-DD it falls on in the configured timezone
+
+    time_history      start_epoch, end_epoch, local_date (of start)
+    tracker_entries   ts_epoch, local_date (of timestamp)
+    tasks             created_epoch, due_epoch, due_local_date
+
+Range filters compare the indexed epoch columns; daily grouping uses the
+local-date columns.
+
+The columns are VIRTUAL: computed from the text on read and stored only in
+their indexes, so nothing writing the tables has to know about them. A
+generated column cannot call 'localtime', so `local_date` adds the zone's
+UTC offset from a CASE over the zone's transitions between FIRST_YEAR and
+LAST_YEAR (outside them the nearest offset applies). The CASE is part of the
+column definition: when `[location] timezone` changes, `sync()` finds the
+definition stale and rebuilds the column, which needs SQLite 3.35 (DROP
+COLUMN). Generated columns need SQLite 3.31; older builds skip the step and
+readers fall back to comparing the text columns (SUPPORTED).
+"""
+import bisect
+import calendar
+import logging
+import os
+import sqlite3
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+
+from lifelog.utils.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED = sqlite3.sqlite_version_info >= (3, 31, 0)
+CAN_REBUILD = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+FIRST_YEAR = 2000
+LAST_YEAR = 2050
+
+When = Union[datetime, date, str, None]
+
+
+class TimeKeys(NamedTuple):
+    epochs: Tuple[Tuple[str, str], ...]     # (epoch column, text column)
+    local_date: Tuple[str, str]             # (local-date column, epoch column)
+    indexes: Tuple[Tuple[str, str], ...]    # (index name, column list)
+
+
+TIME_KEYS: Dict[str, TimeKeys] = {
+    "time_history": TimeKeys(
+        (("start_epoch", "start"), ("end_epoch", "end")),
+        ("local_date", "start_epoch"),
+        (("idx_time_history_start_epoch", "start_epoch"),
+         ("idx_time_history_local_date", "local_date"))),
+    "tracker_entries": TimeKeys(
+        (("ts_epoch", "timestamp"),),
+        ("local_date", "ts_epoch"),
+        (("idx_tracker_entries_tracker_epoch", "tracker_id, ts_epoch"),
+         ("idx_tracker_entries_tracker_local_date", "tracker_id, local_date"))),
+    "tasks": TimeKeys(
+        (("created_epoch", "created"), ("due_epoch", "due")),
+        ("due_local_date", "due_epoch"),
+        (("idx_tasks_due_epoch", "due_epoch"),
+         ("idx_tasks_due_local_date", "due_local_date"))),
+}
+
+# Declared for migrations.verify_indexes().
+TIME_KEYS_SCHEMA = "\n".join(
+    f"CREATE INDEX IF NOT EXISTS {name} ON {table}({cols});"
+    for table, keys in TIME_KEYS.items() for name, cols in keys.indexes)
+
+_synced: Set[str] = set()
+_transitions: Dict[str, Tuple[int, List[Tuple[int, int]]]] = {}
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Timezone offsets
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def _zone():
+    """The configured zone; zoneinfo knows DST rules past 2037, dateutil's tzfile does not."""
+    from lifelog.config.config_manager import get_config_value
+    name = get_config_value("location", "timezone", None)
+    if name:
+        try:
+            from zoneinfo import ZoneInfo
+            return ZoneInfo(name)
+        except Exception:
+            pass
+    from lifelog.utils.shared_utils import get_user_timezone
+    return get_user_timezone()
+
+
+def _offset(zone, epoch: int) -> int:
+    return int(datetime.fromtimestamp(epoch, zone).utcoffset().total_seconds())
+
+
+def transitions(zone=None) -> Tuple[int, List[Tuple[int, int]]]:
+    """(offset before FIRST_YEAR, [(epoch, offset from then on), ...]) for the zone."""
+    zone = zone or _zone()
+    key = str(zone)
+    if key not in _transitions:
+        _transitions[key] = _scan(zone)
+    return _transitions[key]
+
+
+def _scan(zone) -> Tuple[int, List[Tuple[int, int]]]:
+    step = 86400
+    t = calendar.timegm((FIRST_YEAR, 1, 1, 0, 0, 0))
+    end = calendar.timegm((LAST_YEAR + 1, 1, 1, 0, 0, 0))
+    first = current = _offset(zone, t)
+    found = []
+    while t < end:
+        nxt = t + step
+        off = _offset(zone, nxt)
+        if off != current:
+            lo, hi = t, nxt      # offset(lo) == current, offset(hi) == off
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if _offset(zone, mid) == current:
+                    lo = mid
+                else:
+                    hi = mid
+            found.append((hi, off))
+            current = off
+        t = nxt
+    return first, found
+
+
+def utc_offset(epoch: int) -> int:
+    """Configured-zone UTC offset (seconds) at `epoch`, from transitions()."""
+    first, changes = transitions()
+    i = bisect.bisect_right(changes, (epoch, float("inf")))
+    return changes[i - 1][1] if i else first
+
+
+def local_start(epoch: int, resolution: str) -> Tuple[int, int]:
+    """
+    (local wall-clock seconds, UTC epoch) at which the local hour or day
+    holding `epoch` starts; the local value is TrackerSeries' bucket key.
+    """
+    unit = 3600 if resolution == "hour" else 86400
+    local = epoch + utc_offset(epoch)
+    start = local - local % unit
+    # The offset at the start can differ from the row's (a DST day): look
+    # it up at the start as placed with the row's offset.
+    return start, start - utc_offset(start - utc_offset(epoch))
+
+
+def offset_sql(epoch_col: str, first: int, changes: List[Tuple[int, int]]) -> str:
+    """A CASE giving the UTC offset at `epoch_col`, as a binary search over the transitions."""
+    offsets = [first] + [off for _, off in changes]
+    starts = [None] + [epoch for epoch, _ in changes]
+
+    def build(lo: int, hi: int) -> str:
+        if all(o == offsets[lo] for o in offsets[lo:hi + 1]):
+            return str(offsets[lo])
+        mid = (lo + hi + 1) // 2
+        return (f"CASE WHEN {epoch_col} < {starts[mid]} THEN {build(lo, mid - 1)} "
+                f"ELSE {build(mid, hi)} END")
+
+    return build(0, len(offsets) - 1)
+
+
+def _definitions(table: str, zone_offsets: Tuple[int, List[Tuple[int, int]]]) -> Dict[str, str]:
+    """column -> its full column definition."""
+    keys = TIME_KEYS[table]
+    defs = {epoch: (f'{epoch} INTEGER GENERATED ALWAYS AS '
+                    f'(CAST(strftime(\'%s\', "{text}") AS INTEGER)) VIRTUAL')
+            for epoch, text in keys.epochs}
+    name, epoch = keys.local_date
+    defs[name] = (f"{name} TEXT GENERATED ALWAYS AS "
+                  f"(date({epoch} + ({offset_sql(epoch, *zone_offsets)}), 'unixepoch')) VIRTUAL")
+    return defs
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Installing
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def _table_sql(conn: sqlite3.Connection, schema: str, table: str) -> Optional[str]:
+    row = conn.execute(f"SELECT sql FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?",
+                       (table,)).fetchone()
+    return row[0] if row else None
+
+
+def apply(conn: sqlite3.Connection, schema: str, table: str,
+          zone_offsets: Optional[Tuple[int, List[Tuple[int, int]]]] = None) -> bool:
+    """
+    Add `table`'s key columns and indexes in `schema`, rebuilding a local-date
+    column keyed to another timezone. Returns False when the table is missing
+    or SQLite cannot hold generated columns.
+    """
+    if not SUPPORTED or table not in TIME_KEYS:
+        return False
+    sql = _table_sql(conn, schema, table)
+    if sql is None:
+        return False
+    keys = TIME_KEYS[table]
+    defs = _definitions(table, zone_offsets or transitions())
+    have = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_xinfo({table})")}
+    local = keys.local_date[0]
+    if local in have and defs[local] not in sql:
+        if not CAN_REBUILD:
+            logger.warning("%s.%s is keyed to another timezone; rebuilding it needs SQLite 3.35",
+                           table, local)
+        else:
+            logger.info("Rebuilding %s.%s for the configured timezone", table, local)
+            for name, cols in keys.indexes:
+                if local in cols:
+                    conn.execute(f"DROP INDEX IF EXISTS {schema}.{name}")
+            conn.execute(f"ALTER TABLE {schema}.{table} DROP COLUMN {local}")
+            have.discard(local)
+    for name, decl in defs.items():     # epochs first: local_date reads them
+        if name not in have:
+            conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {decl}")
+    for name, cols in keys.indexes:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.{name} ON {table}({cols})")
+    return True
+
+
+def install_time_keys(conn: sqlite3.Connection) -> None:
+    """Add the generated columns and their indexes (idempotent)."""
+    if not SUPPORTED:
+        logger.warning("SQLite %s has no generated columns; epoch and local-date keys "
+                       "are off until it is 3.31 or newer", sqlite3.sqlite_version)
+        return
+    offsets = transitions()
+    for table in TIME_KEYS:
+        apply(conn, "main", table, offsets)
+
+
+def sync(conn: sqlite3.Connection) -> None:
+    """Re-key the local-date columns if the configured timezone changed."""
+    offsets = transitions()
+    for table in TIME_KEYS:
+        apply(conn, "main", table, offsets)
+    conn.commit()
+
+
+def ensure_time_keys() -> None:
+    """Migrate, then check the local-date keys against the timezone once per process."""
+    from lifelog.utils.db import migrations
+    migrations.ensure_migrated()
+    key = os.getenv("LIFELOG_DB_PATH", "")
+    if key in _synced or not SUPPORTED:
+        return
+    with get_connection() as conn:
+        sync(conn)
+    _synced.add(key)
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Query helpers
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def to_epoch(when: When) -> Optional[int]:
+    """Seconds since 1970 UTC; naive values are UTC, matching the generated columns."""
+    if when is None:
+        return None
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when.replace("Z", "+00:00"))
+    elif not isinstance(when, datetime):
+        when = datetime(when.year, when.month, when.day)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp())
+
+
+def range_sql(table: str, text_col: str, op: str, when: When) -> Tuple[str, List[Any]]:
+    """`<col> <op> ?` on the epoch key of `text_col`, or on the text where keys are off."""
+    if SUPPORTED:
+        epoch = next(e for e, t in TIME_KEYS[table].epochs if t == text_col)
+        return f"{epoch} {op} ?", [to_epoch(when)]
+    value = when.isoformat() if isinstance(when, (datetime, date)) else str(when)
+    return f'"{text_col}" {op} ?', [value]
+
+
+def epoch_sql(table: str, text_col: str) -> str:
+    """Expression for the epoch of `text_col` (computed from the text where keys are off)."""
+    epoch = next(e for e, t in TIME_KEYS[table].epochs if t == text_col)
+    return epoch if SUPPORTED else f'CAST(strftime(\'%s\', "{text_col}") AS INTEGER)'
+
+
+def local_date_sql(table: str) -> str:
+    """Expression for the local day of `table`'s rows (its text column's date where keys are off)."""
+    name, epoch = TIME_KEYS[table].local_date
+    if SUPPORTED:
+        return name
+    text = next(t for e, t in TIME_KEYS[table].epochs if e == epoch)
+    return f'substr("{text}", 1, 10)'
+
+
+def local_day(when: Optional[datetime] = None) -> str:
+    """YYYY-MM-DD of `when` (default now) in the configured zone, to compare with local_date."""
+    when = when or datetime.now(timezone.utc)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.astimezone(_zone()).date().isoformat() if SUPPORTED else when.date().isoformat()
@@ -1,7 +1,7 @@
 import logging
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from lifelog.utils.db import (
     safe_execute,
@@ -13,9 +13,13 @@ from lifelog.utils.db import (
     is_direct_db_mode,
     queue_sync_operation,
     process_sync_queue,
+    pull_table_changes,
 )
 from lifelog.utils.db import add_record, update_record
 from lifelog.utils.db.models import TimeLog, time_log_from_row, fields as dataclass_fields
+from lifelog.utils.db import archive, migrations, time_audit, time_keys
+from lifelog.utils.db.paging import KeysetQuery
+from lifelog.utils.db.tag_index import tag_filter
 from lifelog.utils.core_utils import now_utc, to_utc
 from lifelog.utils.error_handler import handle_db_errors, validate_time_entry_data
 
@@ -29,19 +33,26 @@ def _get_all_time_field_names() -> List[str]:
         logger.error("Error retrieving time field names: %s", e, exc_info=True)
         return []
 
+def _mark_time_log_deleted(uid_val: str) -> None:
+    safe_execute(
+        "UPDATE time_history SET deleted = 1 WHERE uid = ?", (uid_val,))
+
 # Pull changed time logs from host, using updated_at and deleted
 
 
-def _pull_changed_time_logs_from_host() -> None:
+def _pull_changed_time_logs_from_host(push: bool = True) -> None:
     if not should_sync():
         return
-    # 1) push any queued local changes
-    try:
-        process_sync_queue()
-    except Exception as e:
-        logger.error("Error pushing queued time log changes: %s",
-                     e, exc_info=True)
-    # 2) fetch since last sync
+    # 1) push any queued local changes (skipped when auto_sync already pushed)
+    if push:
+        try:
+            process_sync_queue()
+        except Exception as e:
+            logger.error("Error pushing queued time log changes: %s",
+                         e, exc_info=True)
+    # 2) pull by change-log sequence; older hosts fall through to `since`
+    if pull_table_changes("time_history", upsert_local_time_log, _mark_time_log_deleted):
+        return
     try:
         last_ts = get_last_synced("time_history")
     except Exception as e:
@@ -134,7 +145,27 @@ def upsert_local_time_log(data: Dict[str, Any]) -> None:
                 "upsert_local_time_log: insert failed uid=%s: %s", uid_val, e, exc_info=True)
 
 
-def get_all_time_logs(since: Optional[Union[str, datetime]] = None) -> List[TimeLog]:
+def _time_log_filters(since: Optional[Union[str, datetime]] = None,
+                      tags: Optional[List[str]] = None,
+                      match_all_tags: bool = True,
+                      schema: Optional[str] = None) -> Tuple[str, List[Any]]:
+    query = "1=1"
+    params: List[Any] = []
+    if since:
+        # Epoch key: text comparison misorders starts written with other offsets.
+        where, values = time_keys.range_sql("time_history", "start", ">=", since)
+        query += f" AND {where}"
+        params.extend(values)
+    tagged = tag_filter("time", tags or [], match_all=match_all_tags, schema=schema)
+    if tagged:
+        query += f" AND {tagged[0]}"
+        params.extend(tagged[1])
+    return query, params
+
+
+def get_all_time_logs(since: Optional[Union[str, datetime]] = None,
+                      tags: Optional[List[str]] = None,
+                      match_all_tags: bool = True) -> List[TimeLog]:
     if should_sync():
         try:
             _pull_changed_time_logs_from_host()
@@ -142,14 +173,12 @@ def get_all_time_logs(since: Optional[Union[str, datetime]] = None) -> List[Time
             logger.error(
                 "Error pulling time logs before get_all: %s", e, exc_info=True)
 
-    if since:
-        since_iso = since.isoformat() if isinstance(since, datetime) else str(since)
-        rows = safe_query(
-            "SELECT * FROM time_history WHERE start >= ? ORDER BY start ASC",
-            (since_iso,)
-        )
-    else:
-        rows = safe_query("SELECT * FROM time_history ORDER BY start ASC")
+    time_keys.ensure_time_keys()
+    # Older history may live in per-year archives; only those `since` reaches are opened.
+    rows = archive.select(
+        "time_history",
+        lambda schema: _time_log_filters(since, tags, match_all_tags, schema),
+        order_by="start ASC", since=since)
 
     result: List[TimeLog] = []
     for r in rows:
@@ -161,6 +190,28 @@ def get_all_time_logs(since: Optional[Union[str, datetime]] = None) -> List[Time
     return result
 
 
+def time_log_keyset(since: Optional[Union[str, datetime]] = None,
+                    tags: Optional[List[str]] = None,
+                    match_all_tags: bool = True) -> KeysetQuery:
+    """Time logs in get_all_time_logs order as a keyset-paged view."""
+    if should_sync():
+        try:
+            _pull_changed_time_logs_from_host()
+        except Exception as e:
+            logger.error(
+                "Error pulling time logs before paging: %s", e, exc_info=True)
+    time_keys.ensure_time_keys()
+    where, params = _time_log_filters(since, tags, match_all_tags)
+    return KeysetQuery("time_history", where, params,
+                       order=[("COALESCE(start, '')", False), ("id", False)],
+                       convert=time_log_from_row)
+
+
+def get_time_log_by_id(entry_id: int) -> Optional[TimeLog]:
+    rows = safe_query("SELECT * FROM time_history WHERE id = ?", (entry_id,))
+    return time_log_from_row(dict(rows[0])) if rows else None
+
+
 def get_time_log_by_uid(uid_val: str) -> Optional[TimeLog]:
     if should_sync():
         try:
@@ -181,8 +232,12 @@ def get_time_log_by_uid(uid_val: str) -> Optional[TimeLog]:
 
 
 def get_active_time_entry() -> Optional[TimeLog]:
+    # Pinned to the partial index: the running entries come out already in
+    # start order, where idx_time_history_end would need a sort.
+    migrations.ensure_migrated()
     rows = safe_query(
-        "SELECT * FROM time_history WHERE end IS NULL ORDER BY start DESC LIMIT 1"
+        "SELECT * FROM time_history INDEXED BY idx_time_history_running "
+        "WHERE end IS NULL ORDER BY start DESC LIMIT 1"
     )
     if not rows:
         return None
@@ -193,8 +248,19 @@ def get_active_time_entry() -> Optional[TimeLog]:
         return None
 
 
+def _check_overlaps(data: Dict[str, Any], reject_overlap: Optional[bool]) -> None:
+    """
+    Refuse an entry that overlaps existing ones when `reject_overlap` is set,
+    or, if it is None, when [time] reject_overlaps is enabled in the config.
+    """
+    if reject_overlap is None:
+        reject_overlap = time_audit.reject_overlaps_enabled()
+    if reject_overlap and data.get("start"):
+        time_audit.check_overlap(data["start"], data.get("end"))
+
+
 @handle_db_errors("start_time_entry")
-def start_time_entry(data: Dict[str, Any]) -> TimeLog:
+def start_time_entry(data: Dict[str, Any], reject_overlap: Optional[bool] = None) -> TimeLog:
     """Start a new time entry with validation and error handling."""
     from lifelog.utils.core_utils import now_utc
     
@@ -208,6 +274,8 @@ def start_time_entry(data: Dict[str, Any]) -> TimeLog:
     elif not start_val:
         data["start"] = now_utc().isoformat()
 
+    _check_overlaps(data, reject_overlap)
+
     # assign uid
     data.setdefault("uid", str(uuid.uuid4()))
 
@@ -324,7 +392,7 @@ def stop_active_time_entry(
 
 
 # Add a new time entry: set updated_at and deleted=0
-def add_time_entry(data: Dict[str, Any]) -> TimeLog:
+def add_time_entry(data: Dict[str, Any], reject_overlap: Optional[bool] = None) -> TimeLog:
     # Normalize datetimes
     if isinstance(data.get("start"), datetime):
         data["start"] = data["start"].isoformat()
@@ -339,6 +407,7 @@ def add_time_entry(data: Dict[str, Any]) -> TimeLog:
                 0.0, (ed - st).total_seconds() / 60.0)
         except Exception:
             pass
+    _check_overlaps(data, reject_overlap)
     # Assign UID
     data.setdefault("uid", str(uuid.uuid4()))
     # Set updated_at and deleted
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import logging
 import uuid
@@ -13,15 +13,22 @@ from lifelog.utils.db import (
     safe_query, safe_execute,
     fetch_from_server, get_last_synced, set_last_synced,
     should_sync, is_direct_db_mode,
-    queue_sync_operation, process_sync_queue
+    queue_sync_operation, process_sync_queue,
+    pull_table_changes
 )
 from lifelog.utils.db.db_helper import normalize_for_db
+from lifelog.utils.db import archive, migrations, time_keys
+from lifelog.utils.db.paging import KeysetQuery
+from lifelog.utils.db.search_index import title_filter
+from lifelog.utils.db.tag_index import tag_filter
 
 logger = logging.getLogger(__name__)
 
 
 def _get_all_tracker_field_names() -> List[str]:
-    # Now get_tracker_fields includes 'updated_at' and 'deleted'
+    # Now get_tracker_fields includes 'updated_at' and 'deleted', and
+    # 'retention', which an older database only has once migrated.
+    migrations.ensure_migrated()
     return [f for f in get_tracker_fields() if f != "id"]
 
 
@@ -29,15 +36,26 @@ def _get_all_goal_field_names() -> List[str]:
     return [f for f in get_goal_fields() if f != "id"]
 
 
+def _mark_tracker_deleted(uid_val: str) -> None:
+    safe_execute("UPDATE trackers SET deleted = 1 WHERE uid = ?", (uid_val,))
+
+
+def _delete_local_goal(uid_val: str) -> None:
+    safe_execute("DELETE FROM goals WHERE uid = ?", (uid_val,))
+
+
 # Pull changed trackers from host, unchanged but upsert_local_tracker will handle updated_at/deleted
-def _pull_changed_trackers_from_host() -> None:
+def _pull_changed_trackers_from_host(push: bool = True) -> None:
     if not should_sync():
         return
-    try:
-        process_sync_queue()
-    except Exception as e:
-        logger.error(
-            "Trackers pull: process_sync_queue failed: %s", e, exc_info=True)
+    if push:
+        try:
+            process_sync_queue()
+        except Exception as e:
+            logger.error(
+                "Trackers pull: process_sync_queue failed: %s", e, exc_info=True)
+    if pull_table_changes("trackers", upsert_local_tracker, _mark_tracker_deleted):
+        return
     try:
         last_ts = get_last_synced("trackers")
     except Exception as e:
@@ -66,15 +84,19 @@ def _pull_changed_trackers_from_host() -> None:
                      e, exc_info=True)
 
 
-def _pull_changed_goals_from_host() -> None:
+def _pull_changed_goals_from_host(push: bool = True) -> None:
     if not should_sync():
         return
 
-    try:
-        process_sync_queue()
-    except Exception as e:
-        logger.error("Goals pull: process_sync_queue failed: %s",
-                     e, exc_info=True)
+    if push:
+        try:
+            process_sync_queue()
+        except Exception as e:
+            logger.error("Goals pull: process_sync_queue failed: %s",
+                         e, exc_info=True)
+
+    if pull_table_changes("goals", upsert_local_goal, _delete_local_goal):
+        return
 
     try:
         last_ts = get_last_synced("goals")
@@ -211,23 +233,56 @@ def get_tracker_by_uid(uid_val: str) -> Optional[Tracker]:
 # Fetch all trackers, exclude deleted
 
 
-def get_all_trackers(
-    title_contains: Optional[str] = None,
-    category: Optional[str] = None
-) -> List[Tracker]:
-    if should_sync():
-        _pull_changed_trackers_from_host()
-    query = "SELECT * FROM trackers WHERE deleted = 0"
+def _tracker_filters(title_contains: Optional[str] = None,
+                     category: Optional[str] = None,
+                     tags: Optional[List[str]] = None,
+                     match_all_tags: bool = True) -> Tuple[str, List[Any]]:
+    query = "deleted = 0"
     params: List[Any] = []
     if title_contains:
-        query += " AND title LIKE ?"
-        params.append(f"%{title_contains}%")
+        fts = title_filter("tracker", title_contains)
+        if fts:
+            query += f" AND {fts[0]}"
+            params.extend(fts[1])
+        else:
+            query += " AND title LIKE ?"
+            params.append(f"%{title_contains}%")
     if category:
         query += " AND category = ?"
         params.append(category)
+    tagged = tag_filter("tracker", tags or [], match_all=match_all_tags)
+    if tagged:
+        query += f" AND {tagged[0]}"
+        params.extend(tagged[1])
+    return query, params
+
+
+def get_all_trackers(
+    title_contains: Optional[str] = None,
+    category: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    match_all_tags: bool = True
+) -> List[Tracker]:
+    if should_sync():
+        _pull_changed_trackers_from_host()
+    where, params = _tracker_filters(title_contains, category, tags, match_all_tags)
+    query = f"SELECT * FROM trackers WHERE {where}"
     query += " ORDER BY created DESC"
     rows = safe_query(query, tuple(params))
     return [tracker_from_row(dict(r)) for r in rows]
+
+
+def tracker_keyset(title_contains: Optional[str] = None,
+                   category: Optional[str] = None,
+                   tags: Optional[List[str]] = None,
+                   match_all_tags: bool = True) -> KeysetQuery:
+    """Trackers in get_all_trackers order as a keyset-paged view."""
+    if should_sync():
+        _pull_changed_trackers_from_host()
+    where, params = _tracker_filters(title_contains, category, tags, match_all_tags)
+    return KeysetQuery("trackers", where, params,
+                       order=[("COALESCE(created, '')", True), ("id", True)],
+                       convert=tracker_from_row)
 # Add tracker: set created, updated_at, deleted, serialize any enums if needed
 
 
@@ -320,14 +375,40 @@ def add_tracker_entry(tracker_id: int, timestamp: Union[str, datetime], value: f
     return entry_from_row(dict(rows[0]))
 
 
-def get_entries_for_tracker(tracker_id: int) -> List[TrackerEntry]:
-    rows = safe_query(
-        "SELECT * FROM tracker_entries WHERE tracker_id = ? ORDER BY timestamp ASC",
-        (tracker_id,)
-    )
+def get_entries_for_tracker(tracker_id: int,
+                            since: Optional[Union[str, datetime]] = None) -> List[TrackerEntry]:
+    """Entries oldest first; `since` also keeps archives older than it closed."""
+    time_keys.ensure_time_keys()
+    rows = archive.select("tracker_entries", _entry_filters(tracker_id, since),
+                          order_by="timestamp ASC", since=since)
     return [entry_from_row(dict(r)) for r in rows]
 
 
+def _entry_filters(tracker_id: int, since: Optional[Union[str, datetime]]):
+    def filters(schema: str):
+        if since:
+            where, params = time_keys.range_sql("tracker_entries", "timestamp", ">=", since)
+            return f"tracker_id = ? AND {where}", (tracker_id, *params)
+        return "tracker_id = ?", (tracker_id,)
+    return filters
+
+
+def get_daily_totals(tracker_id: int,
+                     since: Optional[Union[str, datetime]] = None) -> List[Tuple[str, float, int]]:
+    """
+    (local date, sum of values, number of entries) per day in the configured
+    timezone, oldest first. Compacted rows count as the entries they hold.
+    """
+    time_keys.ensure_time_keys()
+    day = time_keys.local_date_sql("tracker_entries")
+    rows = archive.select(
+        "tracker_entries", _entry_filters(tracker_id, since),
+        columns=(f"{day} AS day, SUM(value) AS total, "
+                 "SUM(COALESCE(sample_count, 1)) AS entries"),
+        group_by="day", order_by="day", since=since)
+    return [(r["day"], r["total"] or 0.0, r["entries"]) for r in rows]
+
+
 def get_goals_for_tracker(tracker_id: int) -> List[Goal]:
     if should_sync():
         _pull_changed_goals_from_host()
@@ -3,19 +3,7 @@ from enum import Enum
 from typing import Dict, Any
 from rich.console import Console
 from rich.panel import Panel
-from datetime import datetime
-# Lazy loading for pandas - memory optimization for Pi
-_pd = None
-
-def get_pandas():
-    """Lazy load pandas only when needed for goal calculations"""
-    global _pd
-    if _pd is None:
-        import pandas as pd
-        _pd = pd
-    return _pd
 from lifelog.utils.db import track_repository
-from lifelog.utils.shared_utils import filter_entries_for_current_period
 from lifelog.utils.db.models import Tracker, Goal
 app = typer.Typer()
 console = Console()
@@ -169,10 +157,14 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
     """
     Given a Tracker dataclass, calculate its first-goal progress summary.
     """
-    # Fetch entries as dataclass instances
-    entries = track_repository.get_entries_for_tracker(tracker.id)
+    # Lazy: numpy and the series module only load when progress is shown
+    import numpy as np
+    from lifelog.utils.reporting.analytics.series import TrackerSeries, local_epoch, period_start
+
+    # Fetch entries as arrays
+    series = TrackerSeries.load(tracker.id)
     # If no entries, early return
-    if not entries:
+    if not len(series):
         return {
             "progress": 0,
             "status": "This tracker is ready for your first entry! 📝"
@@ -188,24 +180,17 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
     kind = goal.kind
     period = getattr(goal, "period", None)
 
-    # Lazy load pandas when needed for data processing
-    pd = get_pandas()
-    # Build DataFrame from entries
-    df_all = pd.DataFrame([e.to_dict() for e in entries])
-    # Filter by period if needed
+    # Filter to the current local day/week/month if needed
     if period:
-        # filter_entries_for_current_period should accept DataFrame and return DataFrame
-        df_filtered = filter_entries_for_current_period(df_all, period)
-    else:
-        df_filtered = df_all
+        series = series.window(period_start(period))
 
-    if df_filtered.empty:
+    if not len(series):
         return {"progress": 0, "status": f"No entries yet for this {period} period."}
 
     progress: Dict[str, Any] = {}
-    # Now handle each kind, using attribute access on goal and DataFrame columns
+    # Now handle each kind, using attribute access on goal and the series arrays
     if kind == "sum":
-        total = df_filtered["value"].sum()
+        total = series.total()
         target = getattr(goal, "amount", None)
         completed = (total >= target) if target is not None else False
         progress.update({
@@ -214,7 +199,8 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
             "completed": completed
         })
     elif kind == "count":
-        count = len(df_filtered)
+        # Compacted rows stand for sample_count entries each.
+        count = series.samples()
         target = getattr(goal, "amount", None)
         completed = (count >= target) if target is not None else False
         progress.update({
@@ -223,10 +209,8 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
             "completed": completed
         })
     elif kind == "bool":
-        # Count distinct days where value True
-        # Ensure timestamp parsed
-        df_filtered["date"] = pd.to_datetime(df_filtered["timestamp"]).dt.date
-        true_days = df_filtered[df_filtered["value"]].date.unique()
+        # Count distinct local days where value True
+        true_days = np.unique(series.local_days()[series.value != 0])
         num = len(true_days)
         progress.update({
             "progress": num,
@@ -234,13 +218,12 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
             "completed": bool(num >= 1)
         })
     elif kind == "streak":
-        # Example streak logic: count consecutive days up to today
-        df_filtered["date"] = pd.to_datetime(df_filtered["timestamp"]).dt.date
-        dates = sorted(df_filtered["date"].unique())
-        today = datetime.today().date()
+        # Example streak logic: count consecutive local days up to today
+        dates = np.unique(series.local_days())
+        today = np.datetime64(local_epoch() // 86400, "D")
         streak = 0
-        for d in reversed(dates):
-            if (today - d).days == streak:
+        for d in dates[::-1]:
+            if (today - d).astype(int) == streak:
                 streak += 1
             else:
                 break
@@ -253,7 +236,7 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
             "completed": completed
         })
     elif kind == "duration":
-        total = df_filtered["value"].sum()
+        total = series.total()
         target = getattr(goal, "amount", None)
         completed = (total >= target) if target is not None else False
         progress.update({
@@ -264,7 +247,7 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
     elif kind == "milestone":
         # Assume 'current' stored or sum entries?
         # If your model stores current separately, use that; else sum:
-        current = df_filtered["value"].sum()
+        current = series.total()
         target = getattr(goal, "target", None)
         completed = (current >= target) if target is not None else False
         progress.update({
@@ -273,8 +256,8 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
             "completed": completed
         })
     elif kind == "range":
-        # Latest entry value
-        latest = df_filtered["value"].iloc[-1]
+        # Latest entry value; a compacted row carries its bucket's last value
+        latest = series.latest()
         min_amt = getattr(goal, "min_amount", None)
         max_amt = getattr(goal, "max_amount", None)
         in_range = False
@@ -286,7 +269,7 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
             "completed": in_range
         })
     elif kind == "reduction":
-        latest = df_filtered["value"].iloc[-1]
+        latest = series.latest()
         target = getattr(goal, "amount", None)
         completed = (latest <= target) if target is not None else False
         progress.update({
@@ -296,7 +279,7 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
         })
     elif kind == "percentage":
         # If entries store percent over time? Otherwise use stored current_percentage?
-        latest_pct = df_filtered["value"].iloc[-1]
+        latest_pct = series.latest()
         target_pct = getattr(goal, "target_percentage", None)
         completed = (
             latest_pct >= target_pct) if target_pct is not None else False
@@ -307,8 +290,8 @@ def calculate_goal_progress(tracker: Tracker) -> Dict[str, Any]:
         })
     elif kind == "replacement":
         # E.g., positive values count new behavior, negative old
-        new_count = (df_filtered["value"] > 0).sum()
-        old_count = (df_filtered["value"] < 0).sum()
+        new_count = int((series.value > 0).sum())
+        old_count = int((series.value < 0).sum())
         total = new_count + old_count
         ratio = (new_count / total * 100) if total else 0
         completed = ratio >= 75
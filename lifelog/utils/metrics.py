@@ -0,0 +1,280 @@
+# lifelog/utils/metrics.py
+"""
+In-process metrics registry rendered in the Prometheus text format.
+
+Counters, gauges and histograms with labels, safe to update from the Flask
+worker threads, and no third-party client library. The host server fills
+them from request hooks, sync handlers and the db helpers; `GET /api/metrics`
+returns `REGISTRY.render()`.
+
+    from lifelog.utils import metrics
+    metrics.SYNC_OPS.inc(table="tasks", operation="create", result="ok")
+"""
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """(suffix, rendered labels, value) triples."""
+        return ()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelKey, float] = {} if self.labels else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", _format_labels(self.labels, key), value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelKey, float] = {} if self.labels else {(): 0.0}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", _format_labels(self.labels, key), value
+
+
+class Callback(_Metric):
+    """An unlabelled value read at render time; None skips the sample."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Optional[float]],
+                 kind: str = "gauge"):
+        super().__init__(name, help)
+        self.kind = kind
+        self._fn = fn
+
+    def samples(self):
+        value = self._fn()
+        if value is not None:
+            yield "", "", value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket..., +Inf count], sum
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, list(c), self._sums[k]) for k, c in self._counts.items())
+        for key, counts, total in items:
+            running = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                running += n
+                le = "+Inf" if math.isinf(bound) else _format_value(bound)
+                yield "_bucket", _format_labels(self.labels, key, ("le", le)), running
+            yield "_sum", _format_labels(self.labels, key), total
+            yield "_count", _format_labels(self.labels, key), running
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def callback(self, name: str, help: str, fn: Callable[[], Optional[float]],
+                 kind: str = "gauge") -> Callback:
+        return self.register(Callback(name, help, fn, kind))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ─── process ──────────────────────────────────────────────────────────────
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_START_TIME = time.time()
+
+
+def _rss_bytes() -> Optional[float]:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return float(int(f.read().split()[1]) * _PAGE_SIZE)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return float(psutil.Process().memory_info().rss)
+    except Exception:
+        return None
+
+
+def _cpu_seconds() -> float:
+    try:
+        import resource     # POSIX only
+    except ImportError:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+# ─── lifelog metrics ──────────────────────────────────────────────────────
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "lifelog_http_requests_total", "HTTP requests by route and status.",
+    ("method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "lifelog_http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route"))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "lifelog_http_requests_in_flight", "Requests currently being handled.")
+
+SYNC_OPS = REGISTRY.counter(
+    "lifelog_sync_operations_total", "Sync operations received, by table, operation and result.",
+    ("table", "operation", "result"))
+SYNC_ROWS_SERVED = REGISTRY.counter(
+    "lifelog_sync_rows_served_total", "Rows returned to devices by /sync/<table>/changes.",
+    ("table", "kind"))
+
+DB_RETRIES = REGISTRY.counter(
+    "lifelog_db_retries_total",
+    "safe_execute/safe_query attempts that failed with OperationalError (SQLITE_BUSY, locked) and backed off.",
+    ("call",))
+DB_RETRY_FAILURES = REGISTRY.counter(
+    "lifelog_db_retry_failures_total", "safe_execute/safe_query calls that ran out of retries.",
+    ("call",))
+DB_CONNECTIONS_OPEN = REGISTRY.gauge(
+    "lifelog_db_connections_open", "SQLite connections currently open via get_connection().")
+DB_CONNECTIONS_OPENED = REGISTRY.counter(
+    "lifelog_db_connections_opened_total", "SQLite connections opened via get_connection().")
+
+REGISTRY.callback("process_resident_memory_bytes", "Resident memory size in bytes.", _rss_bytes)
+REGISTRY.callback("process_start_time_seconds", "Start time of the process since the epoch.",
+                  lambda: _START_TIME)
+REGISTRY.callback("process_cpu_seconds_total", "User and system CPU time in seconds.",
+                  _cpu_seconds, kind="counter")
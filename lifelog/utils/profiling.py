@@ -0,0 +1,280 @@
+# lifelog/utils/profiling.py
+"""
+`llog --profile[=PATH] <command>`: where did the time go?
+
+The profiler starts from the first lines of lifelog.llog, before the heavy
+imports, so start-up is measured too. Two cProfile runs split the process
+at the moment the root callback runs:
+
+    startup   interpreter → lifelog imports → argument parsing
+    command   the command itself (lazy imports such as pandas included)
+
+A sampling thread records the main thread's stack every millisecond for
+flamegraph-style collapsed stacks. On exit it writes
+
+    PATH.pstats     both phases, for `python -m pstats` / snakeviz
+    PATH.collapsed  "frame;frame;frame count" lines (flamegraph.pl, speedscope)
+    PATH.imports    modules by cumulative import time
+
+and prints a summary splitting command time into imports, DB, network,
+rendering, data libraries and other Python, from per-function self time.
+
+`--profile` is taken out of sys.argv before Typer parses it, because an
+optional-value option would otherwise swallow the command name.
+"""
+import atexit
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+FLAG = "--profile"
+SAMPLE_INTERVAL = 0.001
+
+# Category of a pstats function key by self time; first match wins.
+_CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("imports", ("<frozen importlib", "<frozen zipimport", "marshal.loads",
+                 "_imp.create_dynamic", "_imp.exec_dynamic", "<module>")),
+    ("db", ("sqlite3",)),
+    ("network", ("/requests/", "/urllib3/", "http/client.py", "/socket.py", "/ssl.py",
+                 "_socket.", "_ssl.", "'_socket.socket'", "'_ssl._SSLSocket'", "/dns/")),
+    ("rendering", ("/rich/", "/plotext/", "/plotille/", "/termplotlib/", "/pyfiglet/",
+                   "_io.TextIOWrapper", "_curses")),
+    ("data libs", ("/pandas/", "/numpy/", "/scipy/", "/pendulum/")),
+]
+
+_session: Optional["ProfileSession"] = None
+
+
+def _category(key: Tuple[str, int, str]) -> str:
+    filename, _, func = key
+    text = f"{filename}:{func}"
+    if func == "<module>":
+        return "imports"
+    for name, needles in _CATEGORIES:
+        if any(n in text for n in needles):
+            return name
+    return "other"
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    marker = filename.rfind("site-packages" + os.sep)
+    if marker >= 0:
+        filename = filename[marker + len("site-packages" + os.sep):]
+    else:
+        marker = filename.rfind("lifelog" + os.sep)
+        filename = filename[marker:] if marker >= 0 else os.path.basename(filename)
+    return f"{filename.replace(os.sep, '/')}:{code.co_name}"
+
+
+class _Sampler(threading.Thread):
+    """Collapsed stacks of one thread, sampled on a timer."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        super().__init__(name="lifelog-profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._halt = threading.Event()
+
+    def run(self) -> None:
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self) -> None:
+        self._halt.set()
+        self.join(timeout=1.0)
+
+
+class ProfileSession:
+    def __init__(self, prefix: Path, argv: List[str]):
+        self.prefix = prefix
+        self.argv = argv
+        self.t0 = time.perf_counter()
+        self.process_start = _process_start()
+        self.t_command: Optional[float] = None
+        self.startup = cProfile.Profile()
+        self.command: Optional[cProfile.Profile] = None
+        self.sampler = _Sampler(threading.get_ident())
+        self.finished = False
+
+    def start(self) -> None:
+        self.sampler.start()
+        self.startup.enable()
+
+    def mark_command(self) -> None:
+        """End of start-up: switch to the command profiler."""
+        if self.t_command is not None:
+            return
+        self.startup.disable()
+        self.t_command = time.perf_counter()
+        self.command = cProfile.Profile()
+        self.command.enable()
+
+    def finish(self) -> None:
+        if self.finished:
+            return
+        self.finished = True
+        t_end = time.perf_counter()
+        (self.command or self.startup).disable()
+        self.sampler.stop()
+        if self.t_command is None:
+            self.t_command = t_end
+        try:
+            self._write(t_end)
+        except Exception as e:   # never turn a profiled run into a failed one
+            print(f"Profiling failed: {e}", file=sys.stderr)
+
+    # ─── output ───
+
+    def _write(self, t_end: float) -> None:
+        self.prefix.parent.mkdir(parents=True, exist_ok=True)
+        pstats_path = self.prefix.with_name(self.prefix.name + ".pstats")
+        collapsed_path = self.prefix.with_name(self.prefix.name + ".collapsed")
+        imports_path = self.prefix.with_name(self.prefix.name + ".imports")
+
+        sink = open(os.devnull, "w")
+        combined = pstats.Stats(self.startup, stream=sink)
+        command_stats = None
+        if self.command is not None:
+            command_stats = pstats.Stats(self.command, stream=sink)
+            combined.add(self.command)
+        combined.dump_stats(str(pstats_path))
+
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in self.sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        imports = _import_times(combined)
+        with open(imports_path, "w", encoding="utf-8") as f:
+            f.write("# cumulative seconds  module (includes its own imports)\n")
+            for seconds, module in imports:
+                f.write(f"{seconds:10.4f}  {module}\n")
+
+        self._print_summary(t_end, command_stats, imports,
+                            [pstats_path, collapsed_path, imports_path])
+
+    def _print_summary(self, t_end, command_stats, imports, paths) -> None:
+        from rich.console import Console
+        from rich.table import Table
+
+        console = Console(stderr=True)
+        wall = t_end - self.t0
+        startup = self.t_command - self.t0
+        command = t_end - self.t_command
+        interp = None
+        if self.process_start is not None:
+            interp = max(time.time() - wall - self.process_start, 0.0)
+
+        table = Table(title=f"Profile: llog {' '.join(self.argv)}", show_header=True)
+        table.add_column("Phase")
+        table.add_column("Seconds", justify="right")
+        table.add_column("Share", justify="right")
+        total = wall + (interp or 0.0)
+
+        def row(label, seconds, style=None):
+            table.add_row(label, f"{seconds:.3f}", f"{seconds / total:.0%}" if total else "-",
+                          style=style)
+
+        if interp is not None:
+            row("interpreter start", interp)
+        row("startup (imports + CLI setup)", startup)
+        row("command", command, style="bold")
+        if command_stats is not None:
+            by_cat: Dict[str, float] = Counter()
+            for key, (_, _, tt, _, _) in command_stats.stats.items():
+                by_cat[_category(key)] += tt
+            measured = sum(by_cat.values()) or 1.0
+            # Self times carry profiler overhead; scale them onto wall time.
+            for name in ("imports", "db", "network", "rendering", "data libs", "other"):
+                if by_cat.get(name):
+                    row(f"  {name}", by_cat[name] / measured * command)
+        console.print(table)
+
+        if imports:
+            top = ", ".join(f"{m} {s:.2f}s" for s, m in imports[:6])
+            console.print(f"[bold]Slowest imports:[/bold] {top}")
+        console.print("[dim]Wrote " + ", ".join(str(p) for p in paths) + "[/dim]")
+
+
+def _import_times(stats: pstats.Stats, limit: int = 60) -> List[Tuple[float, str]]:
+    """(cumulative seconds, module path) of each module body that ran."""
+    rows = []
+    for (filename, _, func), (_, _, _, ct, _) in stats.stats.items():
+        if func == "<module>" and not filename.startswith("<"):
+            marker = filename.rfind("site-packages" + os.sep)
+            name = filename[marker + 14:] if marker >= 0 else filename
+            rows.append((ct, name))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def _process_start() -> Optional[float]:
+    try:
+        import psutil
+        return psutil.Process().create_time()
+    except Exception:
+        return None
+
+
+def _default_prefix(argv: List[str]) -> Path:
+    from lifelog.config.config_manager import BASE_DIR
+    words = [a for a in argv if not a.startswith("-")][:2] or ["llog"]
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return BASE_DIR / "profiles" / f"{'-'.join(words)}-{stamp}"
+
+
+def start_from_argv(argv: List[str] = None) -> Optional[ProfileSession]:
+    """
+    If argv holds --profile or --profile=PATH, remove it and start profiling.
+    Called from the top of lifelog.llog, before the heavy imports.
+    """
+    global _session
+    argv = sys.argv if argv is None else argv
+    if _session is not None:
+        return _session
+    path = None
+    for i, arg in enumerate(argv[1:], start=1):
+        if arg == "--":
+            break
+        if arg == FLAG or arg.startswith(FLAG + "="):
+            path = arg.partition("=")[2]
+            del argv[i]
+            break
+    else:
+        return None
+
+    rest = argv[1:]
+    if path:
+        prefix = Path(path).expanduser()
+        if prefix.suffix in (".pstats", ".prof", ".collapsed"):
+            prefix = prefix.with_suffix("")
+    else:
+        prefix = _default_prefix(rest)
+    _session = ProfileSession(prefix, rest)
+    _session.start()
+    atexit.register(_session.finish)
+    return _session
+
+
+def mark_command() -> None:
+    """Start-up is over; called from the root CLI callback."""
+    if _session is not None:
+        _session.mark_command()
+
+
+def active() -> bool:
+    return _session is not None
@@ -9,9 +9,10 @@ It also provides options to export the reports in JSON or CSV format.
 
 from lifelog.utils.shared_utils import parse_date_string, now_utc
 from lifelog.utils.db.time_repository import get_all_time_logs
-from lifelog.utils.db.track_repository import get_all_trackers, get_entries_for_tracker
+from lifelog.utils.db.track_repository import get_all_trackers
+from lifelog.utils.reporting.analytics.series import TrackerSeries
 from datetime import datetime, timedelta
-import statistics
+import numpy as np
 import json
 import csv
 from rich.console import Console
@@ -33,15 +34,15 @@ def report_descriptive(since: str = "30d", export: str = None):
     trackers = get_all_trackers()
     stats = {}
     for tracker in trackers:
-        entries = get_entries_for_tracker(tracker.id)
-        # Only use values after cutoff
-        values = [e.value for e in entries if e.timestamp >= cutoff]
-        if not values:
+        series = TrackerSeries.load(tracker.id, since=cutoff)
+        if not len(series):
             continue
+        # Compacted rows contribute their bucket mean to the median and stdev
+        values = series.mean
         stats[tracker.title] = {
-            "mean": round(statistics.mean(values), 2),
-            "median": round(statistics.median(values), 2),
-            "stdev": round(statistics.stdev(values), 2) if len(values) > 1 else 0.0,
+            "mean": round(series.total() / series.samples(), 2),
+            "median": round(float(np.median(values)), 2),
+            "stdev": round(float(np.std(values, ddof=1)), 2) if len(values) > 1 else 0.0,
         }
     console.print("[blue]Tracker Statistics (Mean):[/blue]")
     render_radar_chart({k: v["mean"] for k, v in stats.items()})
@@ -5,14 +5,13 @@ This module provides functionality to generate diagnostic reports based on user
 It includes functions to analyze user data, identify low wellness days, and compute correlations between different metrics.
 It is designed to help users identify patterns and relationships in their data, providing valuable feedback for self-improvement and habit tracking.'''
 
-from datetime import datetime
 import json
 import csv
 from rich.console import Console
 # Insight engine functionality removed
-from lifelog.config.config_manager import get_time_file
 from lifelog.utils.reporting.analytics.report_utils import render_line_chart, render_calendar_heatmap
-from lifelog.utils.db.track_repository import get_all_trackers, get_entries_for_tracker
+from lifelog.utils.db.track_repository import get_all_trackers
+from lifelog.utils.reporting.analytics.series import TrackerSeries
 from lifelog.utils.shared_utils import parse_date_string
 from lifelog.utils.reporting.insight_engine import compute_correlation
 
@@ -32,21 +31,11 @@ def report_diagnostics(since: str = "30d", export: str = None):
     # Build daily averages per tracker
     tracker_daily = {}
     for tracker in trackers:
-        entries = get_entries_for_tracker(tracker.id)
-        # Map by date string
-        day_map = {}
-        for e in entries:
-            if e.timestamp >= cutoff:
-                date_str = e.timestamp.date().isoformat()
-                day_map.setdefault(date_str, []).append(e.value)
-        # Average per day
-        tracker_daily[tracker.title] = {
-            d: sum(vals)/len(vals) for d, vals in day_map.items()}
+        tracker_daily[tracker.title] = TrackerSeries.load(tracker.id, since=cutoff).daily().to_dict()
 
     # 2. Identify low-mood days
     mood_map = tracker_daily.get('mood', {})
-    low_days = [d for d, v in mood_map.items(
-    ) if v <= 3 and datetime.fromisoformat(d) >= cutoff]
+    low_days = [d for d, v in mood_map.items() if v <= 3]
     console.print(f"[red]Low mood days:[/] {len(low_days)} days since {since}")
 
     # 3. Sleep/Energy on those days
@@ -12,7 +12,8 @@ import json
 import numpy as np
 from rich.console import Console
 from lifelog.utils.reporting.analytics.report_utils import render_line_chart
-from lifelog.utils.db.track_repository import get_all_trackers, get_entries_for_tracker
+from lifelog.utils.db.track_repository import get_all_trackers
+from lifelog.utils.reporting.analytics.series import TrackerSeries
 
 console = Console()
 
@@ -24,17 +25,11 @@ def report_prediction(model: str = "simple", days: int = 7, export: str = None):
 
     trackers = get_all_trackers()
     for tracker in trackers:
-        entries = get_entries_for_tracker(tracker.id)
-        if not entries:
+        daily = TrackerSeries.load(tracker.id).daily()
+        if not len(daily):
             continue
-        # Build daily avg map for this tracker
-        day_map = {}
-        for e in entries:
-            date_str = e.timestamp.date().isoformat()
-            day_map.setdefault(date_str, []).append(e.value)
-        day_avg = {d: sum(vals)/len(vals) for d, vals in day_map.items()}
-        dates = sorted(day_avg.keys())
-        values = [day_avg[d] for d in dates]
+        dates = daily.labels()
+        values = daily.mean.tolist()
         console.print(f"\n[bold]Forecast for '{tracker.title}':[/bold]")
 
         if not dates:
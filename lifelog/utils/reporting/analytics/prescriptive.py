@@ -10,7 +10,8 @@ import csv
 import json
 from rich.console import Console
 from lifelog.utils.reporting.analytics.report_utils import render_pie_chart
-from lifelog.utils.db.track_repository import get_all_trackers, get_entries_for_tracker
+from lifelog.utils.db.track_repository import get_all_trackers
+from lifelog.utils.reporting.analytics.series import TrackerSeries
 console = Console()
 
 
@@ -25,13 +26,7 @@ def report_prescriptive(scenario: str = "sleep_food", export: str = None):
     trackers = get_all_trackers()
     tracker_daily = {}
     for tracker in trackers:
-        entries = get_entries_for_tracker(tracker.id)
-        day_map = {}
-        for e in entries:
-            date_str = e.timestamp.date().isoformat()
-            day_map.setdefault(date_str, []).append(e.value)
-        tracker_daily[tracker.title] = {
-            d: sum(vals)/len(vals) for d, vals in day_map.items()}
+        tracker_daily[tracker.title] = TrackerSeries.load(tracker.id).daily().to_dict()
 
     if scenario == "sleep_food":
         sleep_map = tracker_daily.get("sleepq", {})
@@ -0,0 +1,245 @@
+# lifelog/utils/reporting/analytics/series.py
+'''
+Lifelog Tracker Series Module
+A tracker's entries as NumPy arrays, shared by the analytics modules and goal progress.
+
+`TrackerSeries.read()` reads epoch, value, sample count and last value
+straight off the cursor into flat arrays (no TrackerEntry objects), oldest
+first; `load()` serves the same arrays from the on-disk cache
+(series_cache.py). Compacted rows (see db/retention.py) keep their sum in `value` and
+the number of entries in `count`, so totals, counts and count-weighted means
+come out the same before and after compaction.
+
+Days, weeks and months are local to the configured timezone, using the same
+offsets as the local_date columns (db/time_keys.py).
+'''
+
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from lifelog.utils.db import archive, time_keys
+
+When = Union[datetime, str, int, None]
+
+# Bucket sizes understood by resample(); weeks start on Monday.
+RESOLUTIONS = ("hour", "day", "week", "month")
+
+_DAY = 86400
+_MONDAY_SHIFT = 3 * _DAY    # 1970-01-01 was a Thursday
+
+
+def _epoch(when: When) -> Optional[int]:
+    return when if isinstance(when, (int, np.integer)) or when is None else time_keys.to_epoch(when)
+
+
+def _datetime(when: When) -> Union[datetime, str, None]:
+    """`when` as archive.select() takes it."""
+    if isinstance(when, (int, np.integer)):
+        return datetime.fromtimestamp(int(when), timezone.utc)
+    return when
+
+
+def utc_offsets(epochs: np.ndarray) -> np.ndarray:
+    """Configured-zone UTC offset (seconds) at each epoch."""
+    first, changes = time_keys.transitions()
+    if not changes:
+        return np.full(len(epochs), first, dtype=np.int64)
+    starts = np.fromiter((t for t, _ in changes), dtype=np.int64, count=len(changes))
+    offsets = np.fromiter(itertools.chain((first,), (o for _, o in changes)),
+                          dtype=np.int64, count=len(changes) + 1)
+    return offsets[np.searchsorted(starts, epochs, side="right")]
+
+
+def local_epoch(when: When = None) -> int:
+    """Local wall-clock seconds since 1970 of `when` (default now)."""
+    epoch = _epoch(when) if when is not None else int(time.time())
+    return int(epoch + utc_offsets(np.array([epoch], dtype=np.int64))[0])
+
+
+def period_start(period: str, when: When = None) -> Optional[int]:
+    """Epoch at which the current local day, week or month began; None for other periods."""
+    if period not in ("day", "week", "month"):
+        return None
+    local = local_epoch(when)
+    start = _floor(np.array([local], dtype=np.int64), period)[0]
+    # Back to UTC with the offset in force then (off by the DST shift only
+    # if a period starts inside a transition, which real zones avoid).
+    return int(start - utc_offsets(np.array([start], dtype=np.int64))[0])
+
+
+def _floor(local: np.ndarray, resolution: str) -> np.ndarray:
+    """Start of each local-seconds value's bucket, in local seconds."""
+    if resolution == "hour":
+        return local - local % 3600
+    if resolution == "day":
+        return local - local % _DAY
+    if resolution == "week":
+        shifted = local + _MONDAY_SHIFT
+        return shifted - shifted % (7 * _DAY) - _MONDAY_SHIFT
+    if resolution == "month":
+        months = local.astype("datetime64[s]").astype("datetime64[M]")
+        return months.astype("datetime64[s]").astype(np.int64)
+    raise ValueError(f"Unknown resolution '{resolution}' (expected one of {', '.join(RESOLUTIONS)})")
+
+
+def row_columns() -> str:
+    """SELECT list of the rows from_rows() takes: id, epoch, value, count, last (no NULLs)."""
+    epoch = time_keys.epoch_sql("tracker_entries", "timestamp")
+    return (f"id, {epoch}, CAST(COALESCE(value, 0) AS REAL), COALESCE(sample_count, 1), "
+            "CAST(COALESCE(last_value, value, 0) AS REAL)")
+
+
+def rows_from_cursor(cursor) -> np.ndarray:
+    """Read row_columns() rows into an (n, 5) float64 array without per-row objects."""
+    flat = np.fromiter(itertools.chain.from_iterable(cursor), dtype=np.float64)
+    return flat.reshape(-1, 5)
+
+
+class Buckets(NamedTuple):
+    """A resampled series: one row per non-empty bucket, oldest first."""
+    resolution: str
+    start: np.ndarray     # int64 local wall-clock seconds at which each bucket starts
+    total: np.ndarray     # float64 sum of values
+    count: np.ndarray     # float64 number of entries
+    last: np.ndarray      # float64 newest value
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.total / self.count
+
+    def labels(self) -> List[str]:
+        """ISO dates (hour buckets: date and hour) of the bucket starts."""
+        unit = "m" if self.resolution == "hour" else "D"
+        return np.datetime_as_string(self.start.astype("datetime64[s]"), unit=unit).tolist()
+
+    def to_dict(self) -> Dict[str, float]:
+        """label -> count-weighted mean."""
+        return dict(zip(self.labels(), self.mean.tolist()))
+
+    def rolling(self, window: timedelta, stat: str = "mean") -> np.ndarray:
+        """
+        Trailing statistic over the buckets starting within `window` of each
+        bucket (inclusive): "mean" (count-weighted), "sum" or "count". Gaps
+        are calendar time, not skipped buckets.
+        """
+        span = int(window.total_seconds())
+        lo = np.searchsorted(self.start, self.start - span, side="right")
+        hi = np.arange(1, len(self.start) + 1)
+        totals = np.concatenate(([0.0], np.cumsum(self.total)))
+        counts = np.concatenate(([0.0], np.cumsum(self.count)))
+        if stat == "sum":
+            return totals[hi] - totals[lo]
+        if stat == "count":
+            return counts[hi] - counts[lo]
+        if stat == "mean":
+            return (totals[hi] - totals[lo]) / (counts[hi] - counts[lo])
+        raise ValueError(f"Unknown rolling statistic '{stat}'")
+
+
+class TrackerSeries:
+    """
+    Entries of one tracker as parallel arrays sorted by time:
+    ts (int64 epoch seconds), value, count and last (float64).
+    """
+    __slots__ = ("ts", "value", "count", "last")
+
+    def __init__(self, ts: np.ndarray, value: np.ndarray,
+                 count: Optional[np.ndarray] = None, last: Optional[np.ndarray] = None):
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.count = np.ones(len(self.ts)) if count is None else np.asarray(count, dtype=np.float64)
+        self.last = self.value if last is None else np.asarray(last, dtype=np.float64)
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray) -> "TrackerSeries":
+        """An (n, 5) array of row_columns() values, already in time order."""
+        return cls(rows[:, 1].astype(np.int64), rows[:, 2].copy(), rows[:, 3].copy(), rows[:, 4].copy())
+
+    @classmethod
+    def read(cls, tracker_id: int, since: When = None,
+             until: When = None) -> Tuple["TrackerSeries", np.ndarray]:
+        """(series, row ids) of the entries in [since, until), hot and archived, from SQLite."""
+        time_keys.ensure_time_keys()
+        epoch = time_keys.epoch_sql("tracker_entries", "timestamp")
+
+        def filters(schema: str):
+            where, params = f"tracker_id = ? AND {epoch} IS NOT NULL", [tracker_id]
+            for op, when in ((">=", since), ("<", until)):
+                if when is not None:
+                    where += f" AND {epoch} {op} ?"
+                    params.append(_epoch(when))
+            return where, params
+
+        rows = archive.select(
+            "tracker_entries", filters, columns=row_columns(),
+            order_by=f"{epoch}, id", since=_datetime(since), until=_datetime(until),
+            consume=rows_from_cursor)
+        return cls.from_rows(rows), rows[:, 0].astype(np.int64)
+
+    @classmethod
+    def load(cls, tracker_id: int, since: When = None, until: When = None) -> "TrackerSeries":
+        """
+        A tracker's entries in [since, until), hot and archived; unparseable
+        timestamps are left out. Served from the on-disk series cache when
+        `[reporting] series_cache` is on (the default).
+        """
+        from lifelog.utils.reporting.analytics import series_cache
+        if series_cache.enabled():
+            return series_cache.get(tracker_id).window(since, until)
+        return cls.read(tracker_id, since, until)[0]
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Per-row mean: the value itself for raw rows, sum / count for compacted ones."""
+        return self.value / self.count
+
+    def total(self) -> float:
+        return float(self.value.sum())
+
+    def samples(self) -> int:
+        """Number of entries, counting those folded into compacted rows."""
+        return int(self.count.sum())
+
+    def latest(self) -> Optional[float]:
+        return float(self.last[-1]) if len(self) else None
+
+    def local_seconds(self) -> np.ndarray:
+        """Local wall-clock seconds since 1970 of each row."""
+        return self.ts + utc_offsets(self.ts)
+
+    def local_days(self) -> np.ndarray:
+        """Local date of each row as datetime64[D]."""
+        return (self.local_seconds() // _DAY).astype("datetime64[D]")
+
+    def window(self, start: When = None, end: When = None) -> "TrackerSeries":
+        """Rows in [start, end), as views into this series."""
+        lo = 0 if start is None else int(np.searchsorted(self.ts, _epoch(start), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.ts, _epoch(end), side="left"))
+        return TrackerSeries(self.ts[lo:hi], self.value[lo:hi], self.count[lo:hi], self.last[lo:hi])
+
+    def resample(self, resolution: str = "day") -> Buckets:
+        """One row per non-empty local bucket with its sum, count and newest value."""
+        keys = _floor(self.local_seconds(), resolution)
+        # Unique + bincount rather than reduceat: local hours repeat when DST ends.
+        start, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        n = len(start)
+        newest = np.full(n, -1, dtype=np.int64)
+        np.maximum.at(newest, inverse, np.arange(len(self)))
+        return Buckets(resolution, start,
+                       np.bincount(inverse, weights=self.value, minlength=n),
+                       np.bincount(inverse, weights=self.count, minlength=n),
+                       self.last[newest] if n else np.empty(0))
+
+    def daily(self) -> Buckets:
+        return self.resample("day")
@@ -0,0 +1,207 @@
+# lifelog/utils/reporting/analytics/series_cache.py
+'''
+Lifelog Series Cache Module
+Per-tracker TrackerSeries arrays kept as .npy files next to the database
+(~/.lifelog/cache/series/), opened with np.load(mmap_mode='r').
+
+A cold analytics run then reads a few small files instead of every entry:
+the arrays are mapped, not loaded, and pages are only read when touched.
+
+Each tracker has one file per array (id, ts, value, count, last) plus a JSON
+meta file recording the change_log sequence the arrays are current to.
+`get()` reads the tracker_entries changes after that sequence:
+
+  • none                       the cached arrays are used as they are;
+  • only inserts, all newer    the new rows are read and appended;
+  • an update or delete of a cached row, an insert older than the cached
+    tail, or a log truncated past the meta sequence
+                               the tracker is re-read from SQLite.
+
+Rows moved to the cold archive leave no change_log entry, so they stay
+cached; retention compaction deletes and inserts, so it triggers a re-read.
+
+Files are written to a temporary name and renamed into place, so another
+process with the old arrays mapped keeps a consistent view. A run that
+stops between files leaves arrays whose lengths disagree with the meta
+file; the next get() rebuilds them.
+'''
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from lifelog.utils.db import get_connection
+from lifelog.utils.reporting.analytics.series import TrackerSeries, row_columns, rows_from_cursor
+
+logger = logging.getLogger(__name__)
+
+FORMAT = 1
+ARRAYS = ("id", "ts", "value", "count", "last")
+
+
+def enabled() -> bool:
+    """`[reporting] series_cache`, on by default."""
+    from lifelog.config.config_manager import get_config_value
+    return bool(get_config_value("reporting", "series_cache", True))
+
+
+def cache_dir() -> Path:
+    from lifelog.utils.db import _resolve_db_path
+    return _resolve_db_path().parent / "cache" / "series"
+
+
+def _path(tracker_id: int, name: str) -> Path:
+    suffix = "json" if name == "meta" else f"{name}.npy"
+    return cache_dir() / f"tracker-{tracker_id}.{suffix}"
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Files
+# ───────────────────────────────────────────────────────────────────────────────
+
+
+def _read_meta(tracker_id: int) -> Optional[dict]:
+    try:
+        meta = json.loads(_path(tracker_id, "meta").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("format") == FORMAT else None
+
+
+def _open(tracker_id: int, rows: int) -> Optional[Dict[str, np.ndarray]]:
+    """The mapped arrays, or None if any is missing or not `rows` long."""
+    if rows == 0:
+        return {"id": np.empty(0, dtype=np.int64), "ts": np.empty(0, dtype=np.int64),
+                "value": np.empty(0), "count": np.empty(0), "last": np.empty(0)}
+    arrays = {}
+    for name in ARRAYS:
+        try:
+            arrays[name] = np.load(_path(tracker_id, name), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if arrays[name].shape != (rows,):
+            return None
+    return arrays
+
+
+def _replace(path: Path, write) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _write(tracker_id: int, arrays: Dict[str, np.ndarray], seq: int) -> None:
+    cache_dir().mkdir(parents=True, exist_ok=True)
+    for name in ARRAYS:
+        _replace(_path(tracker_id, name), lambda f, a=arrays[name]: np.save(f, np.ascontiguousarray(a)))
+    _write_meta(tracker_id, seq, len(arrays["id"]))
+
+
+def _write_meta(tracker_id: int, seq: int, rows: int) -> None:
+    meta = json.dumps({"format": FORMAT, "seq": seq, "rows": rows}).encode("utf-8")
+    _replace(_path(tracker_id, "meta"), lambda f: f.write(meta))
+
+
+def _arrays(series: TrackerSeries, ids: np.ndarray) -> Dict[str, np.ndarray]:
+    return {"id": ids, "ts": series.ts, "value": series.value,
+            "count": series.count, "last": series.last}
+
+
+def _series(arrays: Dict[str, np.ndarray]) -> TrackerSeries:
+    return TrackerSeries(arrays["ts"], arrays["value"], arrays["count"], arrays["last"])
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Reading
+# ───────────────────────────────────────────────────────────────────────────────
+
+_CHANGES = ("FROM change_log WHERE table_name = 'tracker_entries' "
+            "AND seq > ? AND seq <= ? AND op {}")
+
+
+def _rebuild(tracker_id: int, seq: int) -> TrackerSeries:
+    # `seq` is read before the rows: an insert in between is then both cached
+    # and replayed next time, and the replay skips ids already cached.
+    series, ids = TrackerSeries.read(tracker_id)
+    _write(tracker_id, _arrays(series, ids), seq)
+    logger.debug("series cache: rebuilt tracker %d (%d rows)", tracker_id, len(ids))
+    return series
+
+
+def get(tracker_id: int) -> TrackerSeries:
+    """All of a tracker's entries, brought up to date with the change log."""
+    from lifelog.utils.db import time_keys
+    from lifelog.utils.db.change_log import get_high_water_mark, get_low_water_mark
+
+    time_keys.ensure_time_keys()
+    meta = _read_meta(tracker_id)
+    with get_connection() as conn:
+        high = get_high_water_mark(conn)
+        arrays = _open(tracker_id, meta["rows"]) if meta else None
+        if arrays is None or not get_low_water_mark(conn) <= meta["seq"] <= high:
+            stale = True
+        elif meta["seq"] == high:
+            return _series(arrays)
+        else:
+            seq = meta["seq"]
+            touched = np.fromiter(
+                (r[0] for r in conn.execute(f"SELECT row_id {_CHANGES.format('!= ?')}",
+                                            (seq, high, "I"))), dtype=np.int64)
+            stale = bool(len(touched)) and (
+                bool(np.isin(touched, arrays["id"]).any())
+                or conn.execute(
+                    f"SELECT 1 FROM tracker_entries WHERE tracker_id = ? AND id IN "
+                    f"(SELECT row_id {_CHANGES.format('!= ?')}) LIMIT 1",
+                    (tracker_id, seq, high, "I")).fetchone() is not None)
+            if not stale:
+                epoch = time_keys.epoch_sql("tracker_entries", "timestamp")
+                cursor = conn.execute(
+                    f"SELECT {row_columns()} FROM tracker_entries WHERE tracker_id = ? "
+                    f"AND {epoch} IS NOT NULL AND id IN "
+                    f"(SELECT row_id {_CHANGES.format('= ?')}) ORDER BY 2, 1",
+                    (tracker_id, seq, high, "I"))
+                cursor.row_factory = None
+                rows = rows_from_cursor(cursor)
+                rows = rows[~np.isin(rows[:, 0].astype(np.int64), arrays["id"])]
+                if len(rows) and len(arrays["ts"]) and rows[0, 1] < arrays["ts"][-1]:
+                    stale = True                        # back-dated entry: order changes
+    if stale:
+        return _rebuild(tracker_id, high)
+    if not len(rows):
+        _write_meta(tracker_id, high, meta["rows"])
+        return _series(arrays)
+    new = TrackerSeries.from_rows(rows)
+    merged = {name: np.concatenate((arrays[name], part)) for name, part in
+              _arrays(new, rows[:, 0].astype(np.int64)).items()}
+    del arrays                                          # drop the maps before replacing
+    _write(tracker_id, merged, high)
+    logger.debug("series cache: appended %d rows to tracker %d", len(rows), tracker_id)
+    return _series(_open(tracker_id, len(merged["id"])) or merged)
+
+
+def clear(tracker_id: Optional[int] = None) -> int:
+    """Delete cached series (all, or one tracker's); returns the number of files removed."""
+    pattern = f"tracker-{tracker_id}.*" if tracker_id is not None else "tracker-*"
+    removed = 0
+    for path in cache_dir().glob(pattern):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def cached() -> List[dict]:
+    """Meta of every cached tracker, with its tracker id and size on disk."""
+    out = []
+    for meta_path in sorted(cache_dir().glob("tracker-*.json")):
+        tracker_id = int(meta_path.name.split("-", 1)[1].split(".", 1)[0])
+        meta = _read_meta(tracker_id)
+        if meta is None:
+            continue
+        size = sum(p.stat().st_size for p in cache_dir().glob(f"tracker-{tracker_id}.*"))
+        out.append({"tracker_id": tracker_id, "bytes": size, **meta})
+    return sorted(out, key=lambda m: m["tracker_id"])
@@ -13,23 +13,16 @@ from datetime import datetime
 from typing import List, Dict, Any
 from scipy.stats import pearsonr, spearmanr
 import lifelog.config.config_manager as cf
-from lifelog.utils.db import track_repository, time_repository
+from lifelog.utils.db import time_keys, track_repository, time_repository
 
 MIN_OVERLAP_DAYS = 7
 
 
-def load_tracker_data():
-    """Fetch all tracker data from SQL."""
-    trackers = track_repository.get_all_trackers_with_entries()
-    combined = []
-    for t in trackers:
-        for e in t.get("entries", []):
-            combined.append({
-                "tracker": t.title,
-                "timestamp": e["timestamp"],
-                "value": e["value"]
-            })
-    return combined
+def load_tracker_daily(since=None) -> Dict[str, Dict[str, float]]:
+    """{tracker title: {local date: mean}} for every tracker, from its TrackerSeries."""
+    from lifelog.utils.reporting.analytics.series import TrackerSeries
+    return {t.title: TrackerSeries.load(t.id, since=since).daily().to_dict()
+            for t in track_repository.get_all_trackers()}
 
 
 def load_time_data():
@@ -37,21 +30,24 @@ def load_time_data():
     logs = time_repository.get_all_time_logs()
     combined = []
     for l in logs:
-        if l["duration_minutes"]:
+        if l.duration_minutes:
             combined.append({
                 "tracker": f"Time: {l.title}",
                 "timestamp": l.start,
-                "value": l["duration_minutes"]
+                "value": l.duration_minutes
             })
     return combined
 
 
 def daily_averages(entries: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """{metric: {local date: mean}}, days in the configured zone as in load_tracker_daily()."""
     daily = defaultdict(lambda: defaultdict(list))
     for e in entries:
         try:
-            ts = datetime.fromisoformat(e["timestamp"])
-            day = ts.date().isoformat()
+            ts = e["timestamp"]
+            if not isinstance(ts, datetime):
+                ts = datetime.fromisoformat(ts)
+            day = time_keys.local_day(ts)
             daily[day][e["tracker"]].append(float(e["value"]))
         except Exception:
             continue
@@ -76,8 +72,7 @@ def compute_correlation(x: List[float], y: List[float]) -> Dict[str, float]:
 
 
 def generate_insights():
-    entries = load_tracker_data() + load_time_data()
-    metrics_data = daily_averages(entries)
+    metrics_data = {**load_tracker_daily(), **daily_averages(load_time_data())}
     metric_names = list(metrics_data.keys())
     insights = []
 
@@ -10,13 +10,14 @@ from datetime import datetime, timedelta
 import csv
 import json
 from rich.console import Console
-from lifelog.utils.db import track_repository
+from lifelog.utils.db import time_keys, track_repository
 import lifelog.config.config_manager as cf
 from lifelog.utils.reporting.analytics.report_utils import render_pie_chart
 from rich.table import Table
 
 from lifelog.utils.shared_utils import now_utc
-from lifelog.utils.reporting.insight_engine import daily_averages, load_time_data, load_tracker_data
+from lifelog.utils.reporting.insight_engine import load_time_data, load_tracker_daily
+from lifelog.utils.reporting.analytics.series import TrackerSeries
 
 console = Console()
 cfg = cf.load_config()
@@ -31,14 +32,13 @@ def summary_metric(since: str = "7d", export: str = None):
         f"[bold]Trackers ({since} since {cutoff.date().isoformat()}):[/bold]")
 
     # Load all trackers and their entries via SQL
-    trackers = track_repository.get_all_trackers_with_entries()
+    trackers = track_repository.get_all_trackers()
 
     data = {}
     for t in trackers:
-        entries = [e for e in t.get("entries", []) if datetime.fromisoformat(
-            e["timestamp"]) >= cutoff]
-        total = sum(e["value"] for e in entries)
-        data[t.title] = total
+        series = TrackerSeries.load(t.id, since=cutoff)
+        if len(series):
+            data[t.title] = series.total()
 
     if not data:
         console.print("[yellow]⚠️ No tracker data to summarize yet.[/yellow]")
@@ -85,8 +85,7 @@ def summary_daily(since: str = "7d", export: str = None):
 
     # Load data
     time_data = load_time_data()
-    metric_data = load_tracker_data()
-    daily_moods = daily_averages(metric_data).get(
+    daily_moods = load_tracker_daily(since=cutoff).get(
         "mood", {})  # {day: mood avg}
 
     try:
@@ -110,9 +109,9 @@ def summary_daily(since: str = "7d", export: str = None):
 
         # Total minutes tracked
         minutes = sum(
-            rec.get('duration_minutes', 0)
+            rec['value']
             for rec in time_data
-            if datetime.fromisoformat(rec['start']).date().isoformat() == day
+            if time_keys.local_day(rec['timestamp']) == day
         )
 
         summary.append({
@@ -0,0 +1,327 @@
+# lifelog/utils/scheduler.py
+"""
+`llog scheduler`: a long-running, in-process timer for reminders and jobs.
+
+The daemon keeps a heap of (fire time, entry) built from the persistent
+queue in lifelog.utils.db.reminders and sleeps until the earliest entry or
+the next change-log poll, whichever comes first. Every poll reads the change
+feed for `reminders` and `tasks`, so reminders queued by other `llog`
+processes and due dates that moved are picked up without restarting and
+without touching the crontab.
+
+Heap entries are never removed in place. When one pops, it is checked
+against the database and dropped if the reminder was re-timed, fired or
+deleted in the meantime.
+
+With run_jobs enabled the daemon also runs the [cron] jobs from the config
+(mirrored into scheduler_jobs), so a machine can use the daemon instead of
+crontab entries. Only enable one of the two.
+"""
+import heapq
+import itertools
+import logging
+import os
+import platform
+import shlex
+import signal
+import subprocess
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from lifelog.config.config_manager import BASE_DIR, get_config_value
+from lifelog.utils.db import migrations, reminders
+from lifelog.utils.db.change_log import ack, read_feed
+
+logger = logging.getLogger(__name__)
+
+PID_FILE: Path = BASE_DIR / "scheduler.pid"
+FEED_CONSUMER = "scheduler"
+DEFAULT_POLL_INTERVAL = 30.0
+JOB_TIMEOUT = 30 * 60
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Cron expressions
+# ───────────────────────────────────────────────────────────────────────────────
+
+_CRON_MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+
+def _cron_field(field: str, lo: int, hi: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.split(","):
+        rng, _, step = part.partition("/")
+        step_n = int(step) if step else 1
+        if rng == "*":
+            start, end = lo, hi
+        elif "-" in rng:
+            a, b = rng.split("-", 1)
+            start, end = int(a), int(b)
+        else:
+            start = end = int(rng)
+            if step:
+                end = hi
+        if start < lo or end > hi or step_n < 1:
+            raise ValueError(f"Cron field '{field}' out of range {lo}-{hi}")
+        values.update(range(start, end + 1, step_n))
+    return values
+
+
+def next_cron_time(expr: str, after: datetime) -> datetime:
+    """
+    Next local time strictly after `after` matching a 5-field cron
+    expression (or an @daily-style macro). Returns an aware datetime.
+    """
+    fields = _CRON_MACROS.get(expr.strip(), expr).split()
+    if len(fields) != 5:
+        raise ValueError(f"Unsupported cron schedule: '{expr}'")
+    minutes = _cron_field(fields[0], 0, 59)
+    hours = _cron_field(fields[1], 0, 23)
+    doms = _cron_field(fields[2], 1, 31)
+    months = _cron_field(fields[3], 1, 12)
+    dows = {d % 7 for d in _cron_field(fields[4], 0, 7)}
+    dom_any, dow_any = fields[2] == "*", fields[4] == "*"
+
+    local = after.astimezone().replace(second=0, microsecond=0) + timedelta(minutes=1)
+    day = local.replace(hour=0, minute=0)
+    for _ in range(366 * 5):
+        cron_dow = (day.weekday() + 1) % 7  # cron: 0 = Sunday
+        if dom_any or dow_any:
+            day_ok = (day.day in doms) and (cron_dow in dows)
+        else:
+            day_ok = (day.day in doms) or (cron_dow in dows)
+        if day.month in months and day_ok:
+            for h in sorted(hours):
+                for m in sorted(minutes):
+                    candidate = day.replace(hour=h, minute=m)
+                    if candidate >= local:
+                        return candidate
+        day = (day + timedelta(days=1)).replace(hour=0, minute=0)
+    raise ValueError(f"Cron schedule '{expr}' never fires")
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Notifications
+# ───────────────────────────────────────────────────────────────────────────────
+
+def notify(message: str) -> Optional[subprocess.Popen]:
+    """Show a desktop notification without blocking the timer loop."""
+    from lifelog.config.schedule_manager import build_linux_notifier, build_windows_notifier
+    system = platform.system()
+    if system in ("Linux", "Darwin"):
+        cmd = shlex.split(build_linux_notifier(message))
+    elif system == "Windows":
+        cmd = build_windows_notifier(message)
+    else:
+        logger.warning("No notifier for %s: %s", system, message)
+        return None
+    try:
+        return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError as e:
+        logger.error("Failed to launch notifier: %s", e)
+        return None
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Daemon
+# ───────────────────────────────────────────────────────────────────────────────
+
+def _parse_utc(value: str) -> datetime:
+    dt = datetime.fromisoformat(value)
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+class ReminderScheduler:
+    """Heap-driven timer loop over the persisted reminder/job queue."""
+
+    def __init__(self, run_jobs: bool = False,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.run_jobs = run_jobs
+        self.poll_interval = poll_interval
+        self._heap: List[Tuple[float, int, str, Any, str]] = []
+        self._counter = itertools.count()
+        self._stop = threading.Event()
+        self._children: List[subprocess.Popen] = []
+        self.fired = 0
+
+    # ─── heap ───
+
+    def _push(self, when: datetime, kind: str, key: Any) -> None:
+        stamp = when.astimezone(timezone.utc).replace(microsecond=0).isoformat()
+        heapq.heappush(self._heap, (when.timestamp(), next(self._counter), kind, key, stamp))
+
+    def _push_reminders(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._push(_parse_utc(row["fire_at"]), "reminder", row["id"])
+
+    def _schedule_job(self, job: Dict[str, Any], now: datetime) -> None:
+        try:
+            if job["next_run"]:
+                when = _parse_utc(job["next_run"])
+            else:
+                when = next_cron_time(job["schedule"], now)
+                reminders.set_job_next_run(job["name"], when)
+        except ValueError as e:
+            logger.warning("Skipping job %s: %s", job["name"], e)
+            return
+        self._push(when, "job", job["name"])
+
+    def load(self) -> None:
+        """(Re)build the heap from the database."""
+        self._heap.clear()
+        self._push_reminders(reminders.pending_reminders())
+        if self.run_jobs:
+            from lifelog.config.schedule_manager import build_cron_jobs
+            reminders.sync_jobs(build_cron_jobs())
+            now = datetime.now(timezone.utc)
+            for job in reminders.get_jobs():
+                self._schedule_job(job, now)
+        logger.info("Scheduler loaded %d timer(s)", len(self._heap))
+
+    # ─── change feed ───
+
+    def poll_changes(self) -> None:
+        """Apply reminder and task changes made by other processes."""
+        feed = read_feed(FEED_CONSUMER, tables=("reminders", "tasks"))
+        if feed["reset"]:
+            self.load()
+        else:
+            reminder_ids = {c["row_id"] for c in feed["changes"]
+                            if c["table_name"] == "reminders" and c["op"] != "D"}
+            task_ids = {c["row_id"] for c in feed["changes"] if c["table_name"] == "tasks"}
+            if task_ids:
+                # Re-timing writes reminders rows; they are pushed on the next poll.
+                reminders.retime_for_tasks(sorted(task_ids))
+            if reminder_ids:
+                self._push_reminders(reminders.pending_reminders(ids=sorted(reminder_ids)))
+        ack(FEED_CONSUMER, feed["last_seq"])
+
+    # ─── firing ───
+
+    def _fire(self, kind: str, key: Any, stamp: str) -> None:
+        if kind == "reminder":
+            rows = reminders.pending_reminders(ids=[key])
+            if not rows or rows[0]["fire_at"] != stamp:
+                return  # fired, deleted or re-timed since it was queued
+            proc = notify(rows[0]["message"] or "Lifelog reminder")
+            if proc:
+                self._children.append(proc)
+            reminders.mark_fired(key)
+            self.fired += 1
+            logger.info("Fired reminder %s for task %s", key, rows[0]["task_id"])
+        elif kind == "job":
+            job = next((j for j in reminders.get_jobs() if j["name"] == key), None)
+            if not job or job["next_run"] != stamp:
+                return
+            started = datetime.now(timezone.utc)
+            status = self._run_job(job)
+            following = next_cron_time(job["schedule"], started)
+            reminders.set_job_next_run(key, following, ran_at=started, status=status)
+            self._push(following, "job", key)
+
+    def _run_job(self, job: Dict[str, Any]) -> int:
+        logger.info("Running job %s: %s", job["name"], job["command"])
+        try:
+            result = subprocess.run(shlex.split(job["command"]), timeout=JOB_TIMEOUT,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                    text=True)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.error("Job %s failed: %s", job["name"], e)
+            return -1
+        if result.returncode:
+            logger.error("Job %s exited %d: %s", job["name"], result.returncode,
+                         (result.stderr or "").strip()[-500:])
+        return result.returncode
+
+    def run_due(self, now: Optional[datetime] = None) -> None:
+        """Fire every heap entry whose time has come."""
+        now_ts = (now or datetime.now(timezone.utc)).timestamp()
+        while self._heap and self._heap[0][0] <= now_ts:
+            _, _, kind, key, stamp = heapq.heappop(self._heap)
+            try:
+                self._fire(kind, key, stamp)
+            except Exception as e:
+                logger.error("Scheduler entry %s %s failed: %s", kind, key, e, exc_info=True)
+        self._children = [p for p in self._children if p.poll() is None]
+
+    # ─── loop ───
+
+    def stop(self, *_args) -> None:
+        self._stop.set()
+
+    def run_forever(self) -> None:
+        self.load()
+        ack(FEED_CONSUMER, read_feed(FEED_CONSUMER, tables=("reminders", "tasks"))["last_seq"])
+        while not self._stop.is_set():
+            self.run_due()
+            timeout = self.poll_interval
+            if self._heap:
+                timeout = max(0.0, min(timeout, self._heap[0][0] - datetime.now(timezone.utc).timestamp()))
+            if self._stop.wait(timeout):
+                break
+            try:
+                self.poll_changes()
+            except Exception as e:
+                logger.error("Scheduler change poll failed: %s", e, exc_info=True)
+
+    def next_entries(self, limit: int = 5) -> List[Tuple[datetime, str, Any]]:
+        return [(datetime.fromtimestamp(ts, timezone.utc), kind, key)
+                for ts, _, kind, key, _ in heapq.nsmallest(limit, self._heap)]
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Process management
+# ───────────────────────────────────────────────────────────────────────────────
+
+def running_pid() -> Optional[int]:
+    """PID of a live scheduler daemon, or None."""
+    try:
+        pid = int(PID_FILE.read_text().strip())
+    except (OSError, ValueError):
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except PermissionError:
+        pass
+    return pid
+
+
+def run_daemon(run_jobs: Optional[bool] = None,
+               poll_interval: Optional[float] = None) -> None:
+    """Run the scheduler in the foreground until SIGINT/SIGTERM."""
+    if run_jobs is None:
+        run_jobs = bool(get_config_value("scheduler", "run_jobs", False))
+    if poll_interval is None:
+        poll_interval = float(get_config_value(
+            "scheduler", "poll_interval", DEFAULT_POLL_INTERVAL))
+    existing = running_pid()
+    if existing and existing != os.getpid():
+        raise RuntimeError(f"Scheduler already running (pid {existing})")
+
+    migrations.ensure_migrated()
+    scheduler = ReminderScheduler(run_jobs=run_jobs, poll_interval=poll_interval)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    PID_FILE.parent.mkdir(parents=True, exist_ok=True)
+    PID_FILE.write_text(str(os.getpid()))
+    try:
+        scheduler.run_forever()
+    finally:
+        try:
+            if PID_FILE.read_text().strip() == str(os.getpid()):
+                PID_FILE.unlink()
+        except OSError:
+            pass
+    logger.info("Scheduler stopped after firing %d reminder(s)", scheduler.fired)
@@ -125,25 +125,12 @@ def log_error(error_msg, traceback=None):
 
 
 def calculate_priority(task: Task) -> float:
-    if isinstance(task, dict):
-        importance = task.get("importance", 3)
-        due_val = task.get("due", None)
-    else:
-        importance = getattr(task, "importance", 3) or 3
-        due_val = getattr(task, "due", None)
-    urgency = 0.0
-    if due_val:
-        if isinstance(due_val, str):
-            try:
-                due_date = datetime.fromisoformat(due_val)
-            except Exception:
-                due_date = None
-        else:
-            due_date = due_val
-        if due_date:
-            days_left = (due_date - now_utc()).days
-            urgency = max(0.0, 1.0 - days_left / 10)
-    return (importance * 0.6) + (urgency * 0.4)
+    """
+    Calculate task priority based on importance, urgency and category weight.
+    Works with both Task instances and dict representations.
+    """
+    from lifelog.utils.db.priority import score_task
+    return score_task(task)
 
 
 def parse_date_string(time_string: str, future: bool = False, now: datetime = now_utc()) -> datetime:
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Benchmark lifelog's hot paths against a synthetic multi-year database.
+
+Each case runs in a fresh child process, so import costs, caches and peak
+memory are measured per case rather than accumulating. With --memory-mb the
+children run under an address-space limit (RLIMIT_AS), which approximates a
+small board such as a 512 MB Raspberry Pi: a case that does not fit fails
+with status "oom" instead of swapping.
+
+    python scripts/benchmark.py --years 3 --out bench.json
+    python scripts/benchmark.py --memory-mb 512 --compare bench.json
+
+Results are JSON: run metadata plus, per case, the first (cold) run, the
+median/mean/min/max of the warm runs and the child's peak RSS. --compare
+prints the change against an earlier file and exits 1 when a case's median
+got slower than --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: no memory cap, no per-child RSS
+    resource = None
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = Path(__file__).resolve().parent
+
+CASES = {}
+
+
+def case(name, description):
+    """Register `setup() -> callable`; only the returned callable is timed."""
+    def decorator(setup):
+        CASES[name] = (description, setup)
+        return setup
+    return decorator
+
+
+# ─── in-process cases (run inside the child) ──────────────────────────────
+
+
+@case("query_tasks", "Open tasks sorted by priority")
+def _query_tasks():
+    from lifelog.utils.db import task_repository
+    return lambda: len(task_repository.query_tasks())
+
+
+@case("query_tasks_all", "All tasks including completed, sorted by due date")
+def _query_tasks_all():
+    from lifelog.utils.db import task_repository
+    return lambda: len(task_repository.query_tasks(show_completed=True, sort="due"))
+
+
+@case("time_logs_all", "get_all_time_logs over the whole history")
+def _time_logs_all():
+    from lifelog.utils.db import time_repository
+    return lambda: len(time_repository.get_all_time_logs())
+
+
+@case("time_logs_30d", "get_all_time_logs for the last 30 days of data")
+def _time_logs_30d():
+    from lifelog.utils.db import safe_query, time_repository
+    last = safe_query("SELECT MAX(start) FROM time_history")[0][0]
+    since = datetime.fromisoformat(last) - _days(30)
+    return lambda: len(time_repository.get_all_time_logs(since=since))
+
+
+@case("goal_reports", "generate_goal_report for every tracker")
+def _goal_reports():
+    from lifelog.commands.report import generate_goal_report
+    from lifelog.utils.db import track_repository
+
+    def run():
+        trackers = track_repository.get_all_trackers()
+        return len([generate_goal_report(t) for t in trackers])
+    return run
+
+
+@case("time_reports", "Time trend and distribution reports over a year")
+def _time_reports():
+    from lifelog.utils.reporting import time_reports
+
+    def run():
+        time_reports.report_time_trend("365d")
+        time_reports.report_time_distribution("365d")
+    return run
+
+
+@case("insights", "generate_insights over all trackers and time logs")
+def _insights():
+    from lifelog.utils.reporting.insight_engine import generate_insights
+    return lambda: len(generate_insights())
+
+
+@case("sync_push", "POST 200 task creates to /sync/tasks via the Flask test client")
+def _sync_push():
+    import uuid
+    client, headers = _api_client()
+    counter = iter(range(10 ** 9))
+
+    def run():
+        for _ in range(200):
+            n = next(counter)
+            resp = client.post("/sync/tasks", headers=headers, json={
+                "operation": "create",
+                "data": {"uid": str(uuid.uuid4()), "title": f"bench push {n}",
+                         "category": "work", "importance": 3}})
+            if resp.status_code != 200:
+                raise RuntimeError(f"push failed: {resp.status_code} {resp.get_data(as_text=True)[:200]}")
+        return 200
+    return run
+
+
+@case("sync_pull", "Page every time_history change through /sync/<table>/changes")
+def _sync_pull():
+    client, headers = _api_client()
+
+    def run():
+        seq, rows = 1, 0
+        while True:
+            resp = client.get(f"/sync/time_history/changes?since_seq={seq}&limit=1000",
+                              headers=headers)
+            page = resp.get_json()
+            if resp.status_code != 200:
+                raise RuntimeError(f"pull failed: {resp.status_code} {page}")
+            rows += len(page["rows"])
+            if not page["has_more"] or page["next_seq"] == seq:
+                return rows
+            seq = page["next_seq"]
+    return run
+
+
+def _days(n):
+    from datetime import timedelta
+    return timedelta(days=n)
+
+
+def _api_client():
+    from lifelog.app import app
+    from lifelog.utils.db import get_connection
+    token = "benchmark-device"
+    with get_connection() as conn:
+        conn.execute("INSERT OR IGNORE INTO api_devices (device_name, device_token) VALUES (?, ?)",
+                     ("benchmark", token))
+    return app.test_client(), {"X-Device-Token": token}
+
+
+def run_case_in_child(name: str, repeat: int, result_file: str) -> int:
+    """Entry point of a case child: time the case and write its JSON result."""
+    sys.path.insert(0, str(ROOT))
+    result = {"name": name, "description": CASES[name][0]}
+    sink = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+            t0 = time.perf_counter()
+            fn = CASES[name][1]()
+            result["setup_s"] = time.perf_counter() - t0
+            runs = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                out = fn()
+                runs.append(time.perf_counter() - t0)
+        result.update(_stats(runs), status="ok")
+        if isinstance(out, int):
+            result["items"] = out
+    except MemoryError:
+        result["status"] = "oom"
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    if resource is not None:
+        result["peak_rss_mb"] = _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    Path(result_file).write_text(json.dumps(result))
+    return 0
+
+
+# ─── parent side ──────────────────────────────────────────────────────────
+
+
+def _stats(runs):
+    warm = runs[1:] or runs
+    return {
+        "runs": len(runs),
+        "first_s": runs[0],
+        "median_s": statistics.median(warm),
+        "mean_s": statistics.fmean(warm),
+        "min_s": min(warm),
+        "max_s": max(warm),
+    }
+
+
+def _rss_mb(maxrss: int) -> float:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS.
+    return round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _limit(memory_mb):
+    if not memory_mb or resource is None:
+        return None
+
+    def apply():
+        cap = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (cap, cap))
+    return apply
+
+
+def _spawn(cmd, env, memory_mb, capture=False):
+    """Run a child; returns (returncode, seconds, peak RSS MB or None, output)."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, cwd=str(ROOT), preexec_fn=_limit(memory_mb),
+                            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+                            stderr=subprocess.STDOUT if capture else subprocess.DEVNULL)
+    output = proc.stdout.read().decode(errors="replace") if capture else ""
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        rss = _rss_mb(usage.ru_maxrss)
+    else:
+        proc.wait()
+        rss = None
+    return proc.returncode, time.perf_counter() - t0, rss, output
+
+
+def _child_env(workdir: Path, memory_mb):
+    env = dict(os.environ)
+    env.update(HOME=str(workdir), USERPROFILE=str(workdir),
+               LIFELOG_DB_PATH=str(workdir / ".lifelog" / "lifelog.db"),
+               PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")])))
+    if memory_mb:
+        # Thread pools reserve address space per thread; keep them small under a cap.
+        env.setdefault("OPENBLAS_NUM_THREADS", "1")
+        env.setdefault("OMP_NUM_THREADS", "1")
+        env.setdefault("MALLOC_ARENA_MAX", "2")
+    return env
+
+
+def _cli_case(name, description, argv, env, repeat, memory_mb):
+    runs, rss, status, error = [], None, "ok", None
+    for _ in range(repeat):
+        code, seconds, rss, output = _spawn(
+            [sys.executable, "-m", "lifelog.llog", *argv], env, memory_mb, capture=True)
+        if code != 0:
+            status = "oom" if "MemoryError" in output else "error"
+            error = output.strip().splitlines()[-1:] or [f"exit {code}"]
+            error = error[0][:300]
+            break
+        runs.append(seconds)
+    result = {"name": name, "description": description, "status": status, "peak_rss_mb": rss}
+    if runs:
+        result.update(_stats(runs))
+    if error:
+        result["error"] = error
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _compare(results, baseline_path, threshold):
+    baseline = json.loads(Path(baseline_path).read_text())["results"]
+    regressions = []
+    print(f"\nAgainst {baseline_path}:")
+    for name, res in results.items():
+        old = baseline.get(name)
+        if not old or res.get("status") != "ok" or old.get("status") != "ok":
+            continue
+        change = res["median_s"] / old["median_s"] - 1 if old["median_s"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"  {name:18} {old['median_s'] * 1000:9.1f} ms -> {res['median_s'] * 1000:9.1f} ms "
+              f"({change:+.0%}){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark lifelog hot paths on synthetic data.")
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiplier on generated rows per day.")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timed runs per case; the first counts as cold.")
+    parser.add_argument("--memory-mb", type=int, default=None,
+                        help="Address-space cap for every child (e.g. 512).")
+    parser.add_argument("--only", default=None,
+                        help="Comma-separated case names (see --list).")
+    parser.add_argument("--list", action="store_true", help="List cases and exit.")
+    parser.add_argument("--workdir", default=None,
+                        help="Reuse/keep this directory instead of a temporary one.")
+    parser.add_argument("--out", default="benchmark.json", help="Result file (JSON).")
+    parser.add_argument("--compare", default=None, help="Earlier result file to diff against.")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Slowdown of the median that counts as a regression (default 0.20).")
+    parser.add_argument("--case", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        return run_case_in_child(args.case, args.repeat, args.result_file)
+
+    cli_cases = {
+        "cli_help": ("Cold start: llog --help", ["--help"]),
+        "cli_task_list": ("Cold start: llog task list", ["task", "list"]),
+    }
+    if args.list:
+        for name, (desc, _) in {**CASES, **cli_cases}.items():
+            print(f"{name:18} {desc}")
+        return 0
+    selected = args.only.split(",") if args.only else [*CASES, *cli_cases]
+    unknown = [n for n in selected if n not in CASES and n not in cli_cases]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    with contextlib.ExitStack() as stack:
+        if args.workdir:
+            workdir = Path(args.workdir).resolve()
+            workdir.mkdir(parents=True, exist_ok=True)
+        else:
+            workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="lifelog-bench-")))
+        env = _child_env(workdir, args.memory_mb)
+        db_path = Path(env["LIFELOG_DB_PATH"])
+
+        if not db_path.exists():
+            print(f"Generating {args.years:g} years of data (seed {args.seed}, scale {args.scale:g})…")
+            code, seconds, _, output = _spawn(
+                [sys.executable, str(SCRIPTS / "synthetic_data.py"), "--db", str(db_path),
+                 "--years", str(args.years), "--seed", str(args.seed), "--scale", str(args.scale)],
+                env, None, capture=True)
+            if code != 0:
+                print(output)
+                return 2
+            print(f"  done in {seconds:.1f}s")
+        with sqlite3.connect(db_path) as conn:
+            rows = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                    for t in ("tasks", "time_history", "trackers", "tracker_entries", "goals")}
+
+        results = {}
+        for name in selected:
+            if name in cli_cases:
+                desc, cli_argv = cli_cases[name]
+                res = _cli_case(name, desc, cli_argv, env, args.repeat, args.memory_mb)
+            else:
+                result_file = workdir / f"result-{name}.json"
+                code, _, rss, output = _spawn(
+                    [sys.executable, str(Path(__file__).resolve()), "--case", name,
+                     "--repeat", str(args.repeat), "--result-file", str(result_file)],
+                    env, args.memory_mb, capture=True)
+                if result_file.exists():
+                    res = json.loads(result_file.read_text())
+                    result_file.unlink()
+                else:
+                    # Died before writing a result: most likely the memory cap.
+                    tail = output.strip().splitlines()[-1:] or [f"exit {code}"]
+                    res = {"name": name, "description": CASES[name][0],
+                           "status": "oom" if args.memory_mb else "error", "error": tail[0][:300]}
+                if rss is not None:
+                    res["peak_rss_mb"] = rss
+            results[name] = res
+            if res["status"] == "ok":
+                print(f"{name:18} median {res['median_s'] * 1000:9.1f} ms  "
+                      f"cold {res['first_s'] * 1000:9.1f} ms  rss {res.get('peak_rss_mb') or '-':>6} MB")
+            else:
+                print(f"{name:18} {res['status'].upper()}: {res.get('error', '')}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "sqlite": sqlite3.sqlite_version,
+            "memory_cap_mb": args.memory_mb,
+            "years": args.years, "seed": args.seed, "scale": args.scale,
+            "repeat": args.repeat,
+            "rows": rows,
+        },
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {args.out}")
+
+    if args.compare:
+        regressions = _compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Query-plan gate: EXPLAIN every SQL statement lifelog issues and fail on new
+full-table scans or temp B-tree sorts.
+
+Statements are collected statically from the package source and by running
+a workload of repository calls with SQL capture on, then explained against a
+synthetic database (scripts/synthetic_data.py) so the planner sees realistic
+table sizes. Findings on tables under --min-rows rows, and statements that
+read a whole table on purpose, are informational.
+
+    python scripts/query_audit.py                    # gate: exit 1 on new findings
+    python scripts/query_audit.py --all              # list informational findings too
+    python scripts/query_audit.py --update-baseline  # accept the current findings
+
+Accepted findings live in scripts/query_audit_baseline.json, keyed by kind,
+table and normalized SQL; give each one a reason there.
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = Path(__file__).resolve().parent
+BASELINE = SCRIPTS / "query_audit_baseline.json"
+
+
+def _workload():
+    """(label, callable) pairs that exercise the repositories' read and write paths."""
+    from datetime import datetime, timedelta, timezone
+    from lifelog.utils.reporting.analytics import series_cache
+    from lifelog.utils.reporting.analytics.series import TrackerSeries
+    from lifelog.utils.db import (change_log, environment_repository, priority,
+                                  report_repository, reminders, search_index, tag_index,
+                                  task_repository, task_time, time_audit, time_repository,
+                                  track_repository)
+
+    since = datetime.now(timezone.utc) - timedelta(days=30)
+    tracker = (track_repository.get_all_trackers() or [None])[0]
+    tracker_id = tracker.id if tracker else 1
+    sections = sorted(environment_repository.VALID_SECTIONS)
+    return [
+        ("query_tasks", lambda: task_repository.query_tasks()),
+        ("query_tasks due", lambda: task_repository.query_tasks(show_completed=True, sort="due")),
+        ("query_tasks category", lambda: task_repository.query_tasks(category="work")),
+        ("get_all_tasks", task_repository.get_all_tasks),
+        ("get_task_by_id", lambda: task_repository.get_task_by_id(1)),
+        ("get_due_days", lambda: task_repository.get_due_days(2025, 6)),
+        ("get_all_time_logs", time_repository.get_all_time_logs),
+        ("get_all_time_logs since", lambda: time_repository.get_all_time_logs(since=since)),
+        ("get_active_time_entry", time_repository.get_active_time_entry),
+        ("get_time_log_by_id", lambda: time_repository.get_time_log_by_id(1)),
+        ("get_all_trackers", track_repository.get_all_trackers),
+        ("get_entries_for_tracker", lambda: track_repository.get_entries_for_tracker(tracker_id)),
+        ("get_daily_totals", lambda: track_repository.get_daily_totals(tracker_id, since)),
+        ("TrackerSeries.read", lambda: TrackerSeries.read(tracker_id, since=since)),
+        ("series_cache.get", lambda: series_cache.get(tracker_id)),
+        ("get_goals_for_tracker", lambda: track_repository.get_goals_for_tracker(tracker_id)),
+        ("query_goals", track_repository.query_goals),
+        *[(f"get_latest_environment_data {s}",
+           (lambda s=s: environment_repository.get_latest_environment_data(s))) for s in sections],
+        ("get_tracker_summary", lambda: report_repository.get_tracker_summary(30)),
+        ("get_time_summary", lambda: report_repository.get_time_summary(30)),
+        ("get_daily_tracker_averages", lambda: report_repository.get_daily_tracker_averages("Mood", 30)),
+        ("time audit", lambda: time_audit.audit(since=since)),
+        ("task_times", lambda: task_time.get_task_times(range(1, 50))),
+        ("changed_rows_since", lambda: change_log.changed_rows_since("tasks", 0, 500)),
+        ("tag counts", tag_index.get_tag_counts),
+        ("search", lambda: search_index.search("Coding")),
+        ("pending_reminders", reminders.pending_reminders),
+        ("rescore_open_tasks", priority.rescore_open_tasks),
+    ]
+
+
+def run_workload():
+    """Run the workload with SQL capture on; returns (captured statements, failures)."""
+    from lifelog.utils.db import query_trace
+    failures = []
+    logging.disable(logging.CRITICAL)   # repositories log and swallow their own errors
+    with query_trace.capture() as captured:
+        for label, fn in _workload():
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    fn()
+            except Exception as e:
+                failures.append((label, f"{type(e).__name__}: {e}"))
+    logging.disable(logging.NOTSET)
+    return captured, failures
+
+
+def _load_baseline(path: Path) -> dict:
+    try:
+        return {item["key"]: item for item in json.loads(path.read_text(encoding="utf-8"))["accepted"]}
+    except FileNotFoundError:
+        return {}
+
+
+def _print_finding(f, accepted: dict, min_rows: int) -> None:
+    mark = "accepted" if f.key in accepted else ("NEW" if f.severe(min_rows) else "info")
+    print(f"[{mark}] {f.kind} on {f.table} ({f.rows} rows): {f.detail}")
+    print(f"    {' '.join(f.statement.sql.split())[:300]}")
+    for site in sorted(f.statement.sites)[:3]:
+        print(f"    at {site}")
+    if f.suggestion:
+        print(f"    suggest: {f.suggestion}{'' if f.verified else '  (not verified)'}")
+    if f.existing:
+        print(f"    existing index {f.existing} matches but is not used (pin it with INDEXED BY?)")
+    if f.key in accepted and accepted[f.key].get("reason"):
+        print(f"    reason: {accepted[f.key]['reason']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN gate for lifelog's SQL.")
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-rows", type=int, default=None,
+                        help="Findings on smaller tables are informational (default 1000).")
+    parser.add_argument("--workdir", default=None,
+                        help="Reuse/keep this directory instead of a temporary one.")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write the current severe findings to the baseline and exit 0.")
+    parser.add_argument("--all", action="store_true", help="Also print informational findings.")
+    parser.add_argument("--no-workload", action="store_true",
+                        help="Only audit statements found in the source.")
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        if args.workdir:
+            workdir = Path(args.workdir).resolve()
+            workdir.mkdir(parents=True, exist_ok=True)
+        else:
+            workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="lifelog-audit-")))
+        db_path = workdir / ".lifelog" / "lifelog.db"
+        os.environ.update(HOME=str(workdir), USERPROFILE=str(workdir), LIFELOG_DB_PATH=str(db_path))
+        sys.path[:0] = [str(ROOT), str(SCRIPTS)]
+
+        if not db_path.exists():
+            import synthetic_data
+            print(f"Generating {args.years:g} year(s) of data…")
+            with contextlib.redirect_stdout(io.StringIO()):
+                synthetic_data.generate(str(db_path), years=args.years, seed=args.seed)
+
+        from lifelog.utils.db import get_connection, initialize_schema, migrations, query_audit
+        initialize_schema()
+        with get_connection() as conn:
+            if not migrations.has_statistics(conn):
+                migrations.analyze(conn)
+        min_rows = args.min_rows if args.min_rows is not None else query_audit.DEFAULT_MIN_ROWS
+
+        statements = query_audit.collect_static(ROOT / "lifelog")
+        failures = []
+        if not args.no_workload:
+            captured, failures = run_workload()
+            query_audit.add_captured(captured, statements)
+        with get_connection() as conn:
+            result = query_audit.audit(conn, statements.values())
+
+    baseline_path = Path(args.baseline)
+    accepted = _load_baseline(baseline_path)
+    severe = result.severe(min_rows)
+    new = [f for f in severe if f.key not in accepted]
+
+    print(f"{result.statements} statements, {result.explained} explained, "
+          f"{len(result.findings)} findings ({len(severe)} on tables ≥ {min_rows} rows, "
+          f"{len(new)} new)")
+    for label, error in failures:
+        print(f"  workload step '{label}' failed: {error}")
+    for stmt, error in result.errors:
+        print(f"  could not explain ({error}): {' '.join(stmt.sql.split())[:120]}")
+    print()
+    for f in result.findings:
+        if args.all or f.severe(min_rows):
+            _print_finding(f, accepted, min_rows)
+
+    if args.update_baseline:
+        items = [{"key": f.key, "reason": accepted.get(f.key, {}).get("reason", "")}
+                 for f in severe]
+        unique = {item["key"]: item for item in items}
+        baseline_path.write_text(json.dumps({"accepted": sorted(unique.values(), key=lambda i: i["key"])},
+                                            indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nWrote {len(unique)} accepted finding(s) to {baseline_path}")
+        return 0
+    stale = set(accepted) - {f.key for f in severe}
+    if stale:
+        print(f"\n{len(stale)} baseline entr{'y is' if len(stale) == 1 else 'ies are'} "
+              "no longer found; run with --update-baseline to drop them.")
+    return 1 if new else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic data for benchmarking lifelog.
+
+Fills a lifelog database with N years of tasks, time logs, trackers,
+tracker entries and goals. The same --seed, --years, --scale and --end
+always produce the same rows (uids included), so benchmark runs are
+comparable across commits.
+
+Usage:
+    python scripts/synthetic_data.py --db /tmp/bench/lifelog.db --years 3
+
+The target database is created (schema included) if it does not exist.
+Run it against a scratch path: rows are added, never replaced.
+"""
+import argparse
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+DEFAULT_END = "2026-01-01"
+
+CATEGORIES = ["work", "health", "home", "learning", "social", "admin"]
+PROJECTS = ["lifelog", "thesis", "garden", "taxes", "fitness", None, None]
+TAGS = ["urgent", "deep", "quick", "errand", "call", "review", "writing", "reading"]
+ACTIVITIES = ["Coding", "Email", "Reading", "Meeting", "Workout", "Cooking",
+              "Writing", "Planning", "Commute", "Study"]
+
+# title, type, entries per day, value generator, goal (kind, title, details)
+TRACKERS = [
+    ("Mood", "int", 1.0, lambda r: r.randint(1, 10),
+     ("range", "Stay positive", {"min_amount": 5, "max_amount": 9, "unit": "pts", "mode": "goal"})),
+    ("Water", "int", 4.0, lambda r: r.randint(1, 3),
+     ("sum", "Drink 8 glasses", {"amount": 8, "unit": "glasses"})),
+    ("Sleep", "float", 1.0, lambda r: round(r.gauss(7.2, 1.0), 1),
+     ("range", "Sleep 7-9h", {"min_amount": 7, "max_amount": 9, "unit": "h", "mode": "goal"})),
+    ("Exercise", "bool", 0.6, lambda r: 1,
+     ("bool", "Move every day", {})),
+    ("Weight", "float", 1.0, lambda r: round(r.gauss(78.0, 1.5), 1),
+     ("reduction", "Lose weight", {"amount": 75, "unit": "kg"})),
+    ("Steps", "int", 1.0, lambda r: r.randint(1500, 16000),
+     ("sum", "10k steps", {"amount": 10000, "unit": "steps"})),
+    ("Coffee", "int", 2.0, lambda r: 1,
+     ("count", "Max 3 coffees", {"amount": 3, "unit": "cups"})),
+    ("Meditation", "int", 0.5, lambda r: r.choice([5, 10, 15, 20, 30]),
+     ("duration", "Meditate 20 min", {"amount": 20, "unit": "minutes"})),
+]
+
+GOAL_DETAIL_TABLES = {
+    "sum": "goal_sum", "count": "goal_count", "bool": "goal_bool",
+    "range": "goal_range", "duration": "goal_duration", "reduction": "goal_reduction",
+}
+
+
+class Generator:
+    def __init__(self, years: float, seed: int, scale: float, end: datetime):
+        self.rng = random.Random(seed)
+        self.scale = scale
+        self.end = end
+        self.start = end - timedelta(days=int(365 * years))
+        self.days = (self.end - self.start).days
+
+    def uid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def iso(self, dt: datetime) -> str:
+        return dt.astimezone(timezone.utc).isoformat()
+
+    def tags(self, k: int = 2) -> str:
+        return ",".join(sorted(self.rng.sample(TAGS, self.rng.randint(0, k))))
+
+    def days_iter(self):
+        for d in range(self.days):
+            yield self.start + timedelta(days=d)
+
+    # ─── rows ───
+
+    def tasks(self):
+        rng = self.rng
+        per_day = 1.6 * self.scale
+        for day in self.days_iter():
+            for _ in range(_poisson(rng, per_day)):
+                created = day + timedelta(minutes=rng.randint(7 * 60, 22 * 60))
+                due = created + timedelta(days=rng.randint(0, 21)) if rng.random() < 0.6 else None
+                age = (self.end - created).days
+                done = age > 14 and rng.random() < 0.85
+                status = "done" if done else rng.choice(["backlog", "backlog", "active"])
+                end = created + timedelta(days=rng.randint(0, 14), hours=rng.randint(0, 8)) if done else None
+                yield {
+                    "uid": self.uid(),
+                    "title": f"{rng.choice(ACTIVITIES)} {rng.choice(['notes', 'plan', 'fix', 'draft', 'prep'])} #{rng.randint(1, 9999)}",
+                    "project": rng.choice(PROJECTS),
+                    "category": rng.choice(CATEGORIES),
+                    "importance": rng.randint(1, 5),
+                    "created": self.iso(created),
+                    "due": self.iso(due) if due else None,
+                    "status": status,
+                    "start": self.iso(created + timedelta(hours=1)) if status != "backlog" else None,
+                    "end": self.iso(min(end, self.end)) if end else None,
+                    "priority": round(rng.uniform(0, 10), 2),
+                    "notes": None,
+                    "tags": self.tags(),
+                    "updated_at": self.iso(end or created),
+                    "deleted": 0,
+                }
+
+    def time_logs(self, task_ids):
+        rng = self.rng
+        for day in self.days_iter():
+            cursor = day + timedelta(hours=8, minutes=rng.randint(0, 60))
+            for _ in range(_poisson(rng, 5.0 * self.scale)):
+                length = rng.randint(10, 120)
+                start = cursor + timedelta(minutes=rng.randint(0, 45))
+                end = start + timedelta(minutes=length)
+                if end.hour >= 23 or end.date() != day.date():
+                    break
+                cursor = end
+                yield {
+                    "uid": self.uid(),
+                    "title": rng.choice(ACTIVITIES),
+                    "start": self.iso(start),
+                    "end": self.iso(end),
+                    "duration_minutes": float(length),
+                    "task_id": rng.choice(task_ids) if task_ids and rng.random() < 0.3 else None,
+                    "category": rng.choice(CATEGORIES),
+                    "project": rng.choice(PROJECTS),
+                    "tags": self.tags(1),
+                    "notes": None,
+                    "distracted_minutes": float(rng.choice([0, 0, 0, 5, 10])),
+                    "updated_at": self.iso(end),
+                    "deleted": 0,
+                }
+
+    def tracker_entries(self, tracker_id, per_day, value):
+        rng = self.rng
+        for day in self.days_iter():
+            for _ in range(_poisson(rng, per_day * self.scale)):
+                ts = day + timedelta(minutes=rng.randint(6 * 60, 23 * 60))
+                yield {"uid": self.uid(), "tracker_id": tracker_id,
+                       "timestamp": self.iso(ts), "value": value(rng)}
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    """Small-lambda Poisson sample (Knuth)."""
+    if lam <= 0:
+        return 0
+    limit, k, p = pow(2.718281828459045, -lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def _insert(conn, table, rows) -> int:
+    rows = list(rows)
+    if not rows:
+        return 0
+    cols = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+        [tuple(r[c] for c in cols) for r in rows])
+    return len(rows)
+
+
+def generate(db_path: str, years: float = 3, seed: int = 42, scale: float = 1.0,
+             end: str = DEFAULT_END) -> dict:
+    """Populate `db_path`; returns row counts per table."""
+    os.environ["LIFELOG_DB_PATH"] = str(db_path)
+    from lifelog.utils.db import get_connection
+    from lifelog.utils.db.database_manager import initialize_schema
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    initialize_schema()
+
+    end_dt = datetime.fromisoformat(end)
+    if end_dt.tzinfo is None:
+        end_dt = end_dt.replace(tzinfo=timezone.utc)
+    gen = Generator(years, seed, scale, end_dt)
+    counts = {}
+
+    with get_connection() as conn:
+        counts["tasks"] = _insert(conn, "tasks", gen.tasks())
+        task_ids = [r[0] for r in conn.execute("SELECT id FROM tasks ORDER BY id")]
+        counts["time_history"] = _insert(conn, "time_history", gen.time_logs(task_ids))
+
+        counts["trackers"] = counts["tracker_entries"] = counts["goals"] = 0
+        for title, kind, per_day, value, (goal_kind, goal_title, details) in TRACKERS:
+            cur = conn.execute(
+                "INSERT INTO trackers (uid, title, type, category, created, tags, updated_at, deleted) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (gen.uid(), title, kind, "health", gen.iso(gen.start), None, gen.iso(gen.start)))
+            tracker_id = cur.lastrowid
+            counts["trackers"] += 1
+            counts["tracker_entries"] += _insert(
+                conn, "tracker_entries", gen.tracker_entries(tracker_id, per_day, value))
+
+            cur = conn.execute(
+                "INSERT INTO goals (uid, tracker_id, title, kind, period) VALUES (?, ?, ?, ?, 'day')",
+                (gen.uid(), tracker_id, goal_title, goal_kind))
+            _insert(conn, GOAL_DETAIL_TABLES[goal_kind],
+                    [{"goal_id": cur.lastrowid, "uid": gen.uid(), **details}])
+            counts["goals"] += 1
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--db", required=True, help="Database file to fill.")
+    parser.add_argument("--years", type=float, default=3, help="Years of history (default 3).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiplier on rows per day (default 1.0).")
+    parser.add_argument("--end", default=DEFAULT_END,
+                        help=f"Last day of generated history (default {DEFAULT_END}).")
+    args = parser.parse_args(argv)
+
+    counts = generate(args.db, args.years, args.seed, args.scale, args.end)
+    for table, n in counts.items():
+        print(f"{table:16} {n:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    sys.exit(main())